@@ -7,14 +7,28 @@ Features:
 - Create collections
 - Sync with Zotero cloud
 - Attach PDFs to items
+- Bulk sync: multi-object writes (50 items per request), collections
+  assigned at creation, and a local paper ID -> (key, version, hash)
+  mapping so repeated syncs only push new or changed papers
+- Backoff on 429/503 (honouring Retry-After/Backoff) and version refresh
+  on 412 conflicts
 """
 
+import asyncio
+import hashlib
+import json
+import uuid
+from pathlib import Path
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Zotero accepts at most 50 objects per write request
+WRITE_BATCH_SIZE = 50
+MAX_RETRIES = 5
+
 
 class ZoteroService:
     """
@@ -25,7 +39,14 @@ class ZoteroService:
     - User ID or Group ID
     """
     
-    def __init__(self, api_key: str, user_id: Optional[str] = None, group_id: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        user_id: Optional[str] = None,
+        group_id: Optional[str] = None,
+        base_url: str = "https://api.zotero.org",
+        backoff_base: float = 1.0
+    ):
         """
         Initialize Zotero service.
         
@@ -33,11 +54,15 @@ class ZoteroService:
             api_key: Zotero API key
             user_id: Zotero user ID (for personal library)
             group_id: Zotero group ID (for group library)
+            base_url: API root (override for a local stand-in server)
+            backoff_base: Initial retry delay in seconds when the server
+                gives no Retry-After hint
         """
         self.api_key = api_key
         self.user_id = user_id
         self.group_id = group_id
-        self.base_url = "https://api.zotero.org"
+        self.base_url = base_url.rstrip("/")
+        self.backoff_base = backoff_base
         
         if not user_id and not group_id:
             raise ValueError("Must provide either user_id or group_id")
@@ -52,6 +77,7 @@ class ZoteroService:
         """Get API request headers."""
         return {
             "Zotero-API-Key": self.api_key,
+            "Zotero-API-Version": "3",
             "Content-Type": "application/json"
         }
     
@@ -235,45 +261,291 @@ class ZoteroService:
         logger.warning("PDF attachment not fully implemented - requires multi-step upload")
         return False
     
-    async def bulk_add_papers(self, papers: List[Dict[str, Any]], 
-                             collection_name: Optional[str] = None) -> Dict[str, Any]:
+    # =========================================================================
+    # BULK SYNC
+    # =========================================================================
+    
+    @staticmethod
+    def paper_id(paper: Dict[str, Any]) -> str:
+        """Stable local identifier for a paper (id, DOI, or normalized title)."""
+        for field in ("id", "paper_id", "doi"):
+            value = paper.get(field)
+            if value:
+                return f"{field}:{str(value).strip().lower()}"
+        title = " ".join(str(paper.get("title", "")).lower().split())
+        return "title:" + hashlib.sha1(title.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _item_hash(item: Dict[str, Any]) -> str:
+        return hashlib.sha1(json.dumps(item, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _load_state(state_path: Optional[Path]) -> Dict[str, Any]:
+        if state_path and state_path.exists():
+            try:
+                state = json.loads(state_path.read_text(encoding="utf-8"))
+                state.setdefault("items", {})
+                state.setdefault("collections", {})
+                return state
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable Zotero sync state {state_path}: {e}")
+        return {"items": {}, "collections": {}, "library_version": 0}
+    
+    @staticmethod
+    def _save_state(state_path: Optional[Path], state: Dict[str, Any]):
+        if not state_path:
+            return
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = state_path.with_suffix(state_path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        tmp_path.replace(state_path)
+    
+    async def _request(self, client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
         """
-        Add multiple papers to Zotero.
+        Send a request, backing off on 429/503.
+        
+        Honours Retry-After and Backoff headers; otherwise waits
+        backoff_base * 2^attempt seconds.
+        """
+        headers = {**self._get_headers(), **kwargs.pop("headers", {})}
+        for attempt in range(MAX_RETRIES + 1):
+            response = await client.request(method, url, headers=headers, **kwargs)
+            if response.status_code not in (429, 503) or attempt == MAX_RETRIES:
+                break
+            hint = response.headers.get("Retry-After") or response.headers.get("Backoff")
+            try:
+                delay = float(hint) if hint else self.backoff_base * (2 ** attempt)
+            except ValueError:
+                delay = self.backoff_base * (2 ** attempt)
+            logger.warning(f"Zotero returned {response.status_code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        
+        # Server asks clients to slow down even on success
+        backoff = response.headers.get("Backoff")
+        if backoff and response.status_code < 400:
+            try:
+                await asyncio.sleep(float(backoff))
+            except ValueError:
+                pass
+        return response
+    
+    async def _ensure_collection(self, client: httpx.AsyncClient, name: str, state: Dict[str, Any]) -> Optional[str]:
+        """Return the collection key for `name`, creating it on first sync."""
+        cached = state["collections"].get(name)
+        if cached:
+            return cached
+        
+        response = await self._request(
+            client, "POST", f"{self.base_url}{self.library_path}/collections",
+            json=[{"name": name, "parentCollection": False}]
+        )
+        response.raise_for_status()
+        success = response.json().get("success", {})
+        if not success:
+            return None
+        key = list(success.values())[0]
+        state["collections"][name] = key
+        logger.info(f"Created Zotero collection: {key}")
+        return key
+    
+    async def _fetch_versions(self, client: httpx.AsyncClient, keys: List[str]) -> Dict[str, int]:
+        """Current versions for item keys (used after a 412 conflict)."""
+        versions = {}
+        for i in range(0, len(keys), WRITE_BATCH_SIZE):
+            response = await self._request(
+                client, "GET", f"{self.base_url}{self.library_path}/items",
+                params={"format": "versions", "itemKey": ",".join(keys[i:i + WRITE_BATCH_SIZE])}
+            )
+            response.raise_for_status()
+            versions.update(response.json())
+        return versions
+    
+    async def _write_batch(
+        self,
+        client: httpx.AsyncClient,
+        batch: List[Tuple[str, Dict[str, Any], str]]
+    ) -> Tuple[Dict[str, Tuple[str, int]], Dict[str, Dict[str, Any]]]:
+        """
+        POST up to 50 items in one multi-object write.
+        
+        Returns:
+            ({paper_id: (key, version)}, {paper_id: failure})
+        """
+        payload = [item for _, item, _ in batch]
+        headers = {}
+        if all("key" not in item for item in payload):
+            # Lets the server de-duplicate a retried create
+            headers["Zotero-Write-Token"] = uuid.uuid4().hex
+        
+        response = await self._request(
+            client, "POST", f"{self.base_url}{self.library_path}/items",
+            json=payload, headers=headers
+        )
+        if response.status_code == 412:
+            # Whole-request precondition failure: report every item as a conflict
+            return {}, {pid: {"code": 412, "message": response.text} for pid, _, _ in batch}
+        response.raise_for_status()
+        
+        result = response.json()
+        library_version = int(response.headers.get("Last-Modified-Version", 0) or 0)
+        written = {}
+        for section in ("successful", "unchanged"):
+            for index, value in (result.get(section) or {}).items():
+                pid = batch[int(index)][0]
+                if isinstance(value, dict):
+                    written[pid] = (value.get("key"), int(value.get("version", library_version)))
+                else:
+                    written[pid] = (value, library_version)
+        for index, key in (result.get("success") or {}).items():
+            pid = batch[int(index)][0]
+            written.setdefault(pid, (key, library_version))
+        
+        failed = {batch[int(index)][0]: failure for index, failure in (result.get("failed") or {}).items()}
+        return written, failed
+    
+    async def sync_papers(
+        self,
+        papers: List[Dict[str, Any]],
+        collection_name: Optional[str] = None,
+        state_path: Optional[Path] = None
+    ) -> Dict[str, Any]:
+        """
+        Push papers to Zotero, writing only new or changed items.
         
         Args:
             papers: List of paper dictionaries
-            collection_name: Optional collection name to create
-            
+            collection_name: Optional collection (created once, assigned inline)
+            state_path: JSON file mapping paper ID -> Zotero key/version/hash.
+                Without it every paper is treated as new.
+                
         Returns:
-            Results dictionary
+            Results dictionary (total, created, updated, unchanged, failed,
+            successful, item_keys, requests, errors)
         """
+        state_path = Path(state_path) if state_path else None
+        state = self._load_state(state_path)
+        mapping = state["items"]
         results = {
             "total": len(papers),
-            "successful": 0,
+            "created": 0,
+            "updated": 0,
+            "unchanged": 0,
             "failed": 0,
-            "item_keys": []
+            "successful": 0,
+            "item_keys": [],
+            "requests": 0,
+            "errors": {}
         }
         
-        # Create collection if specified
-        collection_key = None
-        if collection_name:
-            collection_key = await self.create_collection(collection_name)
-        
-        # Add papers
-        for paper in papers:
-            item_key = await self.create_item(paper)
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            collection_key = None
+            if collection_name:
+                collection_key = await self._ensure_collection(client, collection_name, state)
+                results["requests"] += 1
             
-            if item_key:
-                results["successful"] += 1
-                results["item_keys"].append(item_key)
+            # Work out what actually needs pushing
+            pending: List[Tuple[str, Dict[str, Any], str]] = []
+            seen = set()
+            for paper in papers:
+                pid = self.paper_id(paper)
+                if pid in seen:
+                    continue
+                seen.add(pid)
                 
-                # Add to collection
+                item = self.paper_to_zotero_item(paper)
                 if collection_key:
-                    await self.add_to_collection(item_key, collection_key)
-            else:
-                results["failed"] += 1
+                    item["collections"] = [collection_key]
+                content_hash = self._item_hash(item)
+                
+                known = mapping.get(pid)
+                if known and known.get("hash") == content_hash:
+                    results["unchanged"] += 1
+                    results["item_keys"].append(known["key"])
+                    continue
+                if known:
+                    item = {**item, "key": known["key"], "version": known["version"]}
+                    if collection_key:
+                        item["collections"] = sorted(set(known.get("collections", [])) | {collection_key})
+                pending.append((pid, item, content_hash))
+            
+            # Multi-object writes, retrying version conflicts once
+            for attempt in range(2):
+                conflicts = []
+                for i in range(0, len(pending), WRITE_BATCH_SIZE):
+                    batch = pending[i:i + WRITE_BATCH_SIZE]
+                    try:
+                        written, failed = await self._write_batch(client, batch)
+                    except httpx.HTTPError as e:
+                        logger.error(f"Zotero batch write failed: {e}")
+                        written, failed = {}, {pid: {"code": 0, "message": str(e)} for pid, _, _ in batch}
+                    results["requests"] += 1
+                    
+                    for pid, item, content_hash in batch:
+                        if pid in written:
+                            key, version = written[pid]
+                            results["updated" if "key" in item else "created"] += 1
+                            results["item_keys"].append(key)
+                            mapping[pid] = {
+                                "key": key,
+                                "version": version,
+                                "hash": content_hash,
+                                "collections": item.get("collections", [])
+                            }
+                        elif failed.get(pid, {}).get("code") == 412 and "key" in item and attempt == 0:
+                            conflicts.append((pid, item, content_hash))
+                        else:
+                            results["failed"] += 1
+                            results["errors"][pid] = failed.get(pid, {}).get("message", "Not written")
+                    
+                    self._save_state(state_path, state)
+                
+                if not conflicts:
+                    break
+                
+                # Someone edited these items in Zotero: refresh versions and retry
+                logger.info(f"Refreshing versions for {len(conflicts)} conflicting Zotero items")
+                versions = await self._fetch_versions(client, [item["key"] for _, item, _ in conflicts])
+                results["requests"] += 1
+                pending = []
+                for pid, item, content_hash in conflicts:
+                    if item["key"] in versions:
+                        pending.append((pid, {**item, "version": versions[item["key"]]}, content_hash))
+                    else:
+                        # Deleted remotely: create it again
+                        mapping.pop(pid, None)
+                        fresh = {k: v for k, v in item.items() if k not in ("key", "version")}
+                        pending.append((pid, fresh, content_hash))
+        
+        results["successful"] = results["created"] + results["updated"] + results["unchanged"]
+        state["library_version"] = max(
+            [state.get("library_version", 0)] + [entry["version"] for entry in mapping.values()]
+        )
+        self._save_state(state_path, state)
         
+        logger.info(
+            f"Zotero sync: {results['created']} created, {results['updated']} updated, "
+            f"{results['unchanged']} unchanged, {results['failed']} failed in {results['requests']} requests"
+        )
         return results
+    
+    async def bulk_add_papers(self, papers: List[Dict[str, Any]], 
+                             collection_name: Optional[str] = None,
+                             state_path: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Add multiple papers to Zotero.
+        
+        Papers are written 50 per request with the collection assigned at
+        creation. Pass `state_path` to skip papers already synced unchanged.
+        
+        Args:
+            papers: List of paper dictionaries
+            collection_name: Optional collection name to create
+            state_path: Optional sync state file (see sync_papers)
+            
+        Returns:
+            Results dictionary
+        """
+        return await self.sync_papers(papers, collection_name=collection_name, state_path=state_path)
 
 
 # Example usage
@@ -11,8 +11,6 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, Field
-import pandas as pd
-import numpy as np
 
 from fastapi import FastAPI, HTTPException, Request, Query, UploadFile, File, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
@@ -69,7 +67,6 @@ from services.chat_history_service import chat_history_service
 from services.skills_manager import get_skills_manager
 from core.events import events
 from services.objective_generator import extract_short_theme, generate_smart_objectives
-from services.spreadsheet_service import get_spreadsheet_service
 
 # Import RAG router for fast document upload and semantic search
 try:
@@ -267,179 +264,8 @@ def convert_future_to_past_tense(text: str) -> str:
     Convert proposal-style (future tense) text to thesis-style (past tense).
     Preserves content meaning while changing tense for completed research reporting.
     """
-    import re
-    
-    # Common future-to-past conversions for academic writing
-    conversions = [
-        # Modal verbs
-        (r'\bwill be\b', 'was'),
-        (r'\bWill be\b', 'Was'),
-        (r'\bwill have\b', 'had'),
-        (r'\bWill have\b', 'Had'),
-        (r'\bwill\b', 'did'),
-        (r'\bWill\b', 'Did'),
-        (r'\bshall be\b', 'was'),
-        (r'\bShall be\b', 'Was'),
-        (r'\bshall\b', 'did'),
-        (r'\bShall\b', 'Did'),
-        
-        # Future expressions
-        (r'\bis expected to\b', 'was found to'),
-        (r'\bIs expected to\b', 'Was found to'),
-        (r'\bare expected to\b', 'were found to'),
-        (r'\bAre expected to\b', 'Were found to'),
-        (r'\bis anticipated to\b', 'was observed to'),
-        (r'\bIs anticipated to\b', 'Was observed to'),
-        (r'\bwill be used\b', 'was used'),
-        (r'\bWill be used\b', 'Was used'),
-        (r'\bwill be employed\b', 'was employed'),
-        (r'\bWill be employed\b', 'Was employed'),
-        (r'\bwill be conducted\b', 'was conducted'),
-        (r'\bWill be conducted\b', 'Was conducted'),
-        (r'\bwill be collected\b', 'was collected'),
-        (r'\bWill be collected\b', 'Was collected'),
-        (r'\bwill be analyzed\b', 'was analyzed'),
-        (r'\bWill be analyzed\b', 'Was analyzed'),
-        (r'\bwill be analysed\b', 'was analysed'),
-        (r'\bWill be analysed\b', 'Was analysed'),
-        
-        # Common research verbs
-        (r'\bwill examine\b', 'examined'),
-        (r'\bWill examine\b', 'Examined'),
-        (r'\bwill investigate\b', 'investigated'),
-        (r'\bWill investigate\b', 'Investigated'),
-        (r'\bwill explore\b', 'explored'),
-        (r'\bWill explore\b', 'Explored'),
-        (r'\bwill assess\b', 'assessed'),
-        (r'\bWill assess\b', 'Assessed'),
-        (r'\bwill evaluate\b', 'evaluated'),
-        (r'\bWill evaluate\b', 'Evaluated'),
-        (r'\bwill determine\b', 'determined'),
-        (r'\bWill determine\b', 'Determined'),
-        (r'\bwill identify\b', 'identified'),
-        (r'\bWill identify\b', 'Identified'),
-        (r'\bwill analyze\b', 'analyzed'),
-        (r'\bWill analyze\b', 'Analyzed'),
-        (r'\bwill analyse\b', 'analysed'),
-        (r'\bWill analyse\b', 'Analysed'),
-        (r'\bwill measure\b', 'measured'),
-        (r'\bWill measure\b', 'Measured'),
-        (r'\bwill study\b', 'studied'),
-        (r'\bWill study\b', 'Studied'),
-        (r'\bwill test\b', 'tested'),
-        (r'\bWill test\b', 'Tested'),
-        (r'\bwill develop\b', 'developed'),
-        (r'\bWill develop\b', 'Developed'),
-        (r'\bwill establish\b', 'established'),
-        (r'\bWill establish\b', 'Established'),
-        (r'\bwill provide\b', 'provided'),
-        (r'\bWill provide\b', 'Provided'),
-        (r'\bwill contribute\b', 'contributed'),
-        (r'\bWill contribute\b', 'Contributed'),
-        (r'\bwill focus\b', 'focused'),
-        (r'\bWill focus\b', 'Focused'),
-        (r'\bwill utilize\b', 'utilized'),
-        (r'\bWill utilize\b', 'Utilized'),
-        (r'\bwill utilise\b', 'utilised'),
-        (r'\bWill utilise\b', 'Utilised'),
-        (r'\bwill employ\b', 'employed'),
-        (r'\bWill employ\b', 'Employed'),
-        (r'\bwill adopt\b', 'adopted'),
-        (r'\bWill adopt\b', 'Adopted'),
-        (r'\bwill use\b', 'used'),
-        (r'\bWill use\b', 'Used'),
-        (r'\bwill apply\b', 'applied'),
-        (r'\bWill apply\b', 'Applied'),
-        (r'\bwill collect\b', 'collected'),
-        (r'\bWill collect\b', 'Collected'),
-        (r'\bwill gather\b', 'gathered'),
-        (r'\bWill gather\b', 'Gathered'),
-        (r'\bwill select\b', 'selected'),
-        (r'\bWill select\b', 'Selected'),
-        (r'\bwill sample\b', 'sampled'),
-        (r'\bWill sample\b', 'Sampled'),
-        (r'\bwill conduct\b', 'conducted'),
-        (r'\bWill conduct\b', 'Conducted'),
-        (r'\bwill perform\b', 'performed'),
-        (r'\bWill perform\b', 'Performed'),
-        (r'\bwill administer\b', 'administered'),
-        (r'\bWill administer\b', 'Administered'),
-        (r'\bwill distribute\b', 'distributed'),
-        (r'\bWill distribute\b', 'Distributed'),
-        (r'\bwill interview\b', 'interviewed'),
-        (r'\bWill interview\b', 'Interviewed'),
-        (r'\bwill observe\b', 'observed'),
-        (r'\bWill observe\b', 'Observed'),
-        (r'\bwill record\b', 'recorded'),
-        (r'\bWill record\b', 'Recorded'),
-        (r'\bwill ensure\b', 'ensured'),
-        (r'\bWill ensure\b', 'Ensured'),
-        (r'\bwill maintain\b', 'maintained'),
-        (r'\bWill maintain\b', 'Maintained'),
-        (r'\bwill seek\b', 'sought'),
-        (r'\bWill seek\b', 'Sought'),
-        (r'\bwill obtain\b', 'obtained'),
-        (r'\bWill obtain\b', 'Obtained'),
-        
-        # Present tense to past (for methodology)
-        (r'\bThis study aims to\b', 'This study aimed to'),
-        (r'\bthis study aims to\b', 'this study aimed to'),
-        (r'\bThis study seeks to\b', 'This study sought to'),
-        (r'\bthis study seeks to\b', 'this study sought to'),
-        (r'\bThis research aims to\b', 'This research aimed to'),
-        (r'\bthis research aims to\b', 'this research aimed to'),
-        (r'\bThe study aims to\b', 'The study aimed to'),
-        (r'\bthe study aims to\b', 'the study aimed to'),
-        (r'\bThe research aims to\b', 'The research aimed to'),
-        (r'\bthe research aims to\b', 'the research aimed to'),
-        (r'\bThe researcher will\b', 'The researcher'),
-        (r'\bthe researcher will\b', 'the researcher'),
-        
-        # Phrases
-        (r'\bIn order to achieve\b', 'To achieve'),
-        (r'\bin order to achieve\b', 'to achieve'),
-        (r'\bwill be obtained from\b', 'was obtained from'),
-        (r'\bWill be obtained from\b', 'Was obtained from'),
-        (r'\bwill be gathered from\b', 'was gathered from'),
-        (r'\bWill be gathered from\b', 'Was gathered from'),
-        (r'\bwill be selected using\b', 'was selected using'),
-        (r'\bWill be selected using\b', 'Was selected using'),
-        (r'\bwill be determined by\b', 'was determined by'),
-        (r'\bWill be determined by\b', 'Was determined by'),
-        
-        # Data collection
-        (r'\bData will be collected\b', 'Data was collected'),
-        (r'\bdata will be collected\b', 'data was collected'),
-        (r'\bData will be gathered\b', 'Data was gathered'),
-        (r'\bdata will be gathered\b', 'data was gathered'),
-        (r'\bData will be analyzed\b', 'Data was analyzed'),
-        (r'\bdata will be analyzed\b', 'data was analyzed'),
-        (r'\bData will be analysed\b', 'Data was analysed'),
-        (r'\bdata will be analysed\b', 'data was analysed'),
-        
-        # Sampling
-        (r'\bwill be purposively selected\b', 'were purposively selected'),
-        (r'\bwill be randomly selected\b', 'were randomly selected'),
-        (r'\bwill be stratified\b', 'were stratified'),
-        
-        # Ethics
-        (r'\bwill be sought\b', 'was sought'),
-        (r'\bWill be sought\b', 'Was sought'),
-        (r'\bwill be ensured\b', 'was ensured'),
-        (r'\bWill be ensured\b', 'Was ensured'),
-        (r'\bwill be maintained\b', 'was maintained'),
-        (r'\bWill be maintained\b', 'Was maintained'),
-        (r'\bwill be protected\b', 'was protected'),
-        (r'\bWill be protected\b', 'Was protected'),
-        (r'\bwill be kept confidential\b', 'was kept confidential'),
-        (r'\bWill be kept confidential\b', 'Was kept confidential'),
-    ]
-    
-    result = text
-    for pattern, replacement in conversions:
-        result = re.sub(pattern, replacement, result)
-    
-    return result
+    from services.tense_converter import convert_to_past_tense_regex
+    return convert_to_past_tense_regex(text)
 
 def convert_past_to_future_tense(text: str) -> str:
     """
@@ -1112,61 +938,155 @@ async def get_file(workspace_id: str, file_path: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/workspace/{workspace_id}/spreadsheet/{file_path:path}")
-async def get_spreadsheet_data(workspace_id: str, file_path: str):
-    """Get structured data from Excel or CSV file."""
+async def get_spreadsheet_data(
+    workspace_id: str,
+    file_path: str,
+    sheet: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0, le=5000),
+    columns: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    filter: Optional[List[str]] = Query(None)
+):
+    """
+    Get a window of structured data from an Excel or CSV file.
+    
+    Served from a cached columnar sidecar (rebuilt when the file changes).
+    Query params: sheet, offset, limit, columns (comma-separated), sort,
+    order (asc|desc), filter (repeatable, "column:op:value").
+    """
     try:
+        from services.spreadsheet_data_service import get_spreadsheet_data_service, SPREADSHEET_EXTENSIONS
+        
         # Use central thesis_data directory
-        target_path = WORKSPACES_DIR / workspace_id / file_path
+        workspace_root = WORKSPACES_DIR / workspace_id
+        target_path = workspace_root / file_path
         
         if not (target_path.exists() and target_path.is_file()):
             raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
         
-        service = get_spreadsheet_service()
+        if target_path.suffix.lower() not in SPREADSHEET_EXTENSIONS:
+            raise HTTPException(status_code=400, detail="Only .csv, .xlsx, and .xls files are supported")
+        
+        service = get_spreadsheet_data_service()
+        result = await asyncio.to_thread(
+            service.query,
+            target_path,
+            workspace_root,
+            sheet=sheet,
+            offset=offset,
+            limit=limit,
+            columns=[c.strip() for c in columns.split(",") if c.strip()] if columns else None,
+            sort_by=sort,
+            descending=order == "desc",
+            filters=filter
+        )
+        
+        if not result.get("success"):
+            status = 400 if result.get("invalid_request") else 500
+            raise HTTPException(status_code=status, detail=result.get("error", "Failed to read spreadsheet"))
         
+        # Keep the legacy preview shape (data / sheets) alongside the window fields
         if target_path.suffix.lower() == '.csv':
-            result = service.read_csv(target_path)
-        elif target_path.suffix.lower() in ['.xlsx', '.xls']:
-            result = service.read_excel(target_path)
+            result["data"] = result["rows"]
+            result["row_count"] = result["filtered_rows"]
         else:
-            raise HTTPException(status_code=400, detail="Only .csv, .xlsx, and .xls files are supported")
-            
-        if not result.get("success"):
-            # If it failed because it's not a spreadsheet but has the extension, 
-            # maybe pandas failed. return error.
-            raise HTTPException(status_code=500, detail=result.get("error", "Failed to read spreadsheet"))
-            
-        # Remove non-serializable DataFrames
-        result.pop("dataframe", None)
-        result.pop("dataframes", None)
-        
-        # Clean up numpy types for JSON serialization
-        def clean_data(obj):
-            if isinstance(obj, dict):
-                return {k: clean_data(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [clean_data(i) for i in obj]
-            elif isinstance(obj, (np.int64, np.int32, np.intc, np.intp)):
-                return int(obj)
-            elif isinstance(obj, (np.float64, np.float32, np.float16)):
-                return float(obj)
-            elif isinstance(obj, np.ndarray):
-                return clean_data(obj.tolist())
-            elif pd.isna(obj):
-                return None
-            return obj
-            
-        return clean_data(result)
+            sheet_name = result["sheet"]
+            result["sheets"] = {sheet_name: result["rows"]}
+            result["columns"] = {sheet_name: result["columns"]}
+            result["row_count"] = {sheet_name: result["filtered_rows"]}
+        
+        return result
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _parse_byte_range(range_header: str, file_size: int) -> Optional[tuple]:
+    """Parse a single "bytes=start-end" range. Returns (start, end) inclusive, or None."""
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start_str, _, end_str = range_header[6:].strip().partition("-")
+    try:
+        if start_str:
+            start = int(start_str)
+            end = int(end_str) if end_str else file_size - 1
+        else:
+            # Suffix range: last N bytes
+            start = max(0, file_size - int(end_str))
+            end = file_size - 1
+    except ValueError:
+        return None
+    if start >= file_size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    return start, min(end, file_size - 1)
+
+
+def _conditional_file_response(
+    request: Request,
+    path: Path,
+    media_type: str,
+    etag: str,
+    headers: Dict[str, str]
+) -> Response:
+    """Serve a file with ETag / If-None-Match (304) and single Range (206) support."""
+    headers = {**headers, "ETag": etag, "Accept-Ranges": "bytes"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "Content-Disposition"})
+    
+    file_size = path.stat().st_size
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    byte_range = _parse_byte_range(range_header, file_size) if range_header and (not if_range or if_range == etag) else None
+    
+    if byte_range is None:
+        return FileResponse(path=str(path), media_type=media_type, headers=headers)
+    
+    start, end = byte_range
+    
+    def iter_range(chunk_size: int = 256 * 1024):
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    
+    headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(iter_range(), status_code=206, media_type=media_type, headers=headers)
+
+
 @app.get("/api/workspace/{workspace_id}/serve/{file_path:path}")
-async def serve_file(workspace_id: str, file_path: str):
-    """Serve binary files (images, PDFs, etc.) with correct Content-Type for inline viewing."""
+async def serve_file(
+    workspace_id: str,
+    file_path: str,
+    request: Request,
+    variant: Optional[str] = Query(None, pattern="^(thumb|web|original)$"),
+    download: bool = False
+):
+    """
+    Serve binary files (images, PDFs, etc.) with correct Content-Type for inline viewing.
+    
+    - Raster images default to the cached "web" rendition; ?variant=thumb gives
+      a thumbnail, ?variant=original or ?download=true the untouched original
+    - PDFs are served as-is with Range support; ?variant=thumb|web renders page 1
+    - All responses carry an ETag and honour If-None-Match (304)
+    """
     try:
         # Use central thesis_data directory
-        workspace_path = WORKSPACES_DIR / workspace_id / file_path
+        workspace_root = WORKSPACES_DIR / workspace_id
+        workspace_path = workspace_root / file_path
         
         if not (workspace_path.exists() and workspace_path.is_file()):
             print(f"❌ File not found: {file_path}")
@@ -1178,24 +1098,51 @@ async def serve_file(workspace_id: str, file_path: str):
         if not media_type:
             media_type = "application/octet-stream"
         
+        # Serve a cached derivative unless the original was explicitly requested
+        if not download and variant != "original":
+            from services.derivative_service import get_derivative_service, RASTER_EXTENSIONS
+            
+            wanted = variant
+            if wanted is None and workspace_path.suffix.lower() in RASTER_EXTENSIONS:
+                wanted = "web"
+            
+            if wanted:
+                service = get_derivative_service()
+                derivative = None
+                if service.supports(workspace_path, wanted):
+                    derivative = await asyncio.to_thread(service.get_derivative, workspace_path, workspace_root, wanted)
+                if derivative:
+                    return _conditional_file_response(
+                        request,
+                        Path(derivative["path"]),
+                        derivative["media_type"],
+                        f'"{derivative["etag"]}"',
+                        {
+                            "Content-Disposition": f"inline; filename=\"{workspace_path.stem}_{wanted}\"",
+                            # Keyed by content hash, so safe to cache for a long time
+                            "Cache-Control": "public, max-age=31536000, immutable"
+                        }
+                    )
+        
+        stat = workspace_path.stat()
+        etag = f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        
         # For viewable files (PDFs, images), use inline disposition to display in browser
-        # For other files, use attachment to force download
+        # For other files (or explicit downloads), use attachment to force download
         viewable_types = ['application/pdf', 'image/png', 'image/jpeg', 'image/gif', 'image/webp', 'image/svg+xml']
         
-        if media_type in viewable_types:
-            # Return without filename to display inline (not download)
-            return FileResponse(
-                path=str(workspace_path),
-                media_type=media_type,
-                headers={"Content-Disposition": f"inline; filename=\"{workspace_path.name}\""}
-            )
+        if media_type in viewable_types and not download:
+            disposition = f"inline; filename=\"{workspace_path.name}\""
         else:
-            # Force download for other file types
-            return FileResponse(
-                path=str(workspace_path),
-                media_type=media_type,
-                filename=workspace_path.name
-            )
+            disposition = f"attachment; filename=\"{workspace_path.name}\""
+        
+        return _conditional_file_response(
+            request,
+            workspace_path,
+            media_type,
+            etag,
+            {"Content-Disposition": disposition, "Cache-Control": "private, no-cache"}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -1374,81 +1321,65 @@ async def delete_source(workspace_id: str, source_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/workspace/{workspace_id}/upload-pdfs")
-async def upload_pdfs(workspace_id: str, files: List[UploadFile] = File(...)):
-    """Upload multiple PDFs and extract metadata. Supports bulk upload of 100+ PDFs."""
+async def upload_pdfs(workspace_id: str, files: List[UploadFile] = File(...), wait: bool = False):
+    """
+    Upload multiple PDFs and extract metadata. Supports bulk upload of 100+ PDFs.
+    
+    Uploads are streamed to disk, then extracted in a process pool and added
+    to the sources index in one write. By default this returns immediately
+    with a job_id; per-file progress is published as pdf_progress events and
+    the summary as a stage_completed event (stage "pdf_upload").
+    With ?wait=true the summary is returned directly instead.
+    """
+    from services.pdf_ingestion import pdf_ingestion_service
+    
     try:
-        from services.sources_service import sources_service
-        from services.pdf_metadata_extractor import pdf_metadata_extractor
-        import tempfile
-        import shutil
-        
-        results = []
-        errors = []
-        
         print(f"📚 Uploading {len(files)} PDFs to workspace {workspace_id}")
-        
-        for i, file in enumerate(files):
-            try:
-                if not file.filename.lower().endswith('.pdf'):
-                    errors.append({"filename": file.filename, "error": "Not a PDF file"})
-                    continue
-                
-                # Create temp file with proper extension
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                    # Read and write file content
-                    content = await file.read()
-                    temp_file.write(content)
-                    temp_path = Path(temp_file.name)
-                
-                # Extract metadata
-                print(f"  [{i+1}/{len(files)}] Extracting: {file.filename}")
-                metadata = pdf_metadata_extractor.extract_metadata(temp_path)
-                
-                # Override with original filename if title extraction failed
-                if not metadata.get("title") or metadata["title"] == temp_path.stem:
-                    metadata["title"] = file.filename.replace('.pdf', '').replace('_', ' ').title()
-                
-                # Add to sources (this copies PDF to workspace)
-                source = await sources_service.add_pdf_source(
-                    workspace_id=workspace_id,
-                    pdf_path=temp_path,
-                    metadata=metadata,
-                    original_filename=file.filename
-                )
-                
-                # Clean up temp file
-                try:
-                    temp_path.unlink()
-                except:
-                    pass
-                
-                results.append({
-                    "filename": file.filename,
-                    "source_id": source["id"],
-                    "title": source["title"],
-                    "authors": source["authors"],
-                    "year": source["year"],
-                    "citation_key": source["citation_key"],
-                    "status": "success"
-                })
-                
-                print(f"    ✓ {source['title'][:50]}")
-                
-            except Exception as e:
-                print(f"    ✗ Error processing {file.filename}: {str(e)}")
-                errors.append({"filename": file.filename, "error": str(e)})
-        
-        return {
-            "workspace_id": workspace_id,
-            "total_uploaded": len(files),
-            "successful": len(results),
-            "failed": len(errors),
-            "results": results,
-            "errors": errors
-        }
-        
+        staging = await pdf_ingestion_service.stage_uploads(workspace_id, files)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if wait:
+        try:
+            return await pdf_ingestion_service.ingest(workspace_id, staging["staged"], staging["errors"])
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    job_id = str(uuid.uuid4())
+    
+    async def run_ingestion():
+        async def on_progress(event: Dict[str, Any]):
+            await events.publish(job_id, "pdf_progress", event, session_id=workspace_id)
+        
+        try:
+            summary = await pdf_ingestion_service.ingest(
+                workspace_id, staging["staged"], staging["errors"], on_progress=on_progress
+            )
+            await events.publish(job_id, "stage_completed", {
+                "stage": "pdf_upload",
+                "status": "success",
+                **summary
+            }, session_id=workspace_id)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            await events.publish(job_id, "stage_completed", {
+                "stage": "pdf_upload",
+                "status": "error",
+                "error": str(e)
+            }, session_id=workspace_id)
+    
+    asyncio.create_task(run_ingestion())
+    
+    return {
+        "status": "started",
+        "job_id": job_id,
+        "workspace_id": workspace_id,
+        "total_uploaded": len(files),
+        "accepted": len(staging["staged"]),
+        "errors": staging["errors"],
+        "stream_url": f"/api/stream/agent-actions?session_id={workspace_id}&job_id={job_id}"
+    }
 
 
 
@@ -1930,13 +1861,9 @@ async def list_jobs(
 async def get_active_jobs(workspace_id: str):
     """Get currently running or paused jobs."""
     try:
-        from services.job_manager import job_manager, JobStatus
+        from services.job_manager import job_manager
         
-        jobs = job_manager.list_jobs(workspace_id)
-        active_jobs = [
-            job for job in jobs 
-            if job.status in [JobStatus.RUNNING, JobStatus.PAUSED, JobStatus.PENDING]
-        ]
+        active_jobs = job_manager.get_active_jobs(workspace_id)
         
         return {
             "workspace_id": workspace_id,
@@ -2153,80 +2080,73 @@ async def download_image(workspace_id: str, request: DownloadImageRequest):
         raise HTTPException(status_code=500, detail=f"Failed to download image: {str(e)}")
 
 @app.post("/api/workspace/{workspace_id}/batch-download-images")
-async def batch_download_images(workspace_id: str, request: BatchDownloadImagesRequest):
-    """Download multiple images and save to workspace."""
-    try:
-        import httpx
-        from pathlib import Path
-        
-        workspace_path = WORKSPACES_DIR / workspace_id
-        images_dir = workspace_path / "images"
-        images_dir.mkdir(parents=True, exist_ok=True)
-        
-        success_count = 0
-        failed_count = 0
-        results = []
-        
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-            for img_data in request.images:
-                try:
-                    image_url = img_data.get("url") or img_data.get("image_url")
-                    filename = img_data.get("filename")
-                    
-                    if not image_url:
-                        failed_count += 1
-                        results.append({"url": image_url, "status": "failed", "error": "No URL provided"})
-                        continue
-                    
-                    # Generate filename if not provided
-                    if not filename:
-                        url_path = image_url.split('/')[-1].split('?')[0]
-                        if url_path and '.' in url_path:
-                            filename = url_path
-                        else:
-                            filename = f"image_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jpg"
-                    
-                    # Ensure filename has extension
-                    if '.' not in filename:
-                        filename += ".jpg"
-                    
-                    file_path = images_dir / filename
-                    
-                    # Download image
-                    response = await client.get(image_url)
-                    response.raise_for_status()
-                    
-                    # Save to workspace
-                    file_path.write_bytes(response.content)
-                    
-                    relative_path = str(file_path.relative_to(workspace_path))
-                    success_count += 1
-                    results.append({
-                        "url": image_url,
-                        "status": "success",
-                        "path": relative_path,
-                        "filename": filename
-                    })
-                    
-                except Exception as e:
-                    failed_count += 1
-                    results.append({
-                        "url": img_data.get("url", "unknown"),
-                        "status": "failed",
-                        "error": str(e)
-                    })
-        
+async def batch_download_images(workspace_id: str, request: BatchDownloadImagesRequest, stream: bool = False):
+    """
+    Download multiple images concurrently and save to workspace.
+    
+    Images are deduplicated by content hash and named by their sniffed format.
+    With ?stream=true, returns an SSE stream of per-image progress events
+    (image_progress) followed by a complete event with the summary.
+    """
+    from services.image_ingestion import image_ingestion_service
+    
+    workspace_path = WORKSPACES_DIR / workspace_id
+    images_dir = workspace_path / "images"
+    
+    def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        formatted = []
+        for r in results:
+            if r["status"] == "success":
+                formatted.append({
+                    "url": r["url"],
+                    "status": "success",
+                    "path": str((images_dir / r["filename"]).relative_to(workspace_path)),
+                    "filename": r["filename"],
+                    "duplicate": r.get("duplicate", False)
+                })
+            else:
+                formatted.append({"url": r["url"] or "unknown", "status": "failed", "error": r.get("error")})
+        success_count = sum(1 for r in formatted if r["status"] == "success")
         return {
             "status": "completed",
             "total": len(request.images),
             "success": success_count,
-            "failed": failed_count,
-            "results": results
+            "failed": len(formatted) - success_count,
+            "results": formatted
         }
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Failed to batch download images: {str(e)}")
+    
+    if not stream:
+        try:
+            results = await image_ingestion_service.ingest(request.images, images_dir)
+            return summarize(results)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"Failed to batch download images: {str(e)}")
+    
+    async def event_generator():
+        progress_queue: asyncio.Queue = asyncio.Queue()
+        
+        async def on_progress(event: Dict[str, Any]):
+            await progress_queue.put(event)
+        
+        task = asyncio.create_task(image_ingestion_service.ingest(request.images, images_dir, on_progress=on_progress))
+        try:
+            while not (task.done() and progress_queue.empty()):
+                try:
+                    event = await asyncio.wait_for(progress_queue.get(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                yield {"event": "image_progress", "data": json.dumps(event)}
+            
+            yield {"event": "complete", "data": json.dumps(summarize(task.result()))}
+        except Exception as e:
+            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    return EventSourceResponse(event_generator())
 
 @app.post("/api/workspace/{workspace_id}/rename")
 async def rename_item(workspace_id: str, request: RenameRequest):
@@ -2372,42 +2292,15 @@ async def batch_delete_files(workspace_id: str, request: BatchDeleteRequest):
 
 @app.post("/api/workspace/{workspace_id}/batch-download")
 async def batch_download_files(workspace_id: str, request: BatchDownloadRequest):
-    """Download multiple files as a zip."""
+    """Download multiple files as a zip (streamed while files are read)."""
     try:
-        import zipfile
-        import io
-        from pathlib import Path
+        from services.archive_service import collect_entries, iter_zip
         
         workspace_path = WORKSPACES_DIR / workspace_id
+        entries = await asyncio.to_thread(collect_entries, workspace_path, request.paths)
         
-        # Create zip in memory
-        zip_buffer = io.BytesIO()
-        
-        # Track added files to prevent duplicates
-        added_files = set()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for file_path in request.paths:
-                target_path = workspace_path / file_path
-                if target_path.exists():
-                    if target_path.is_file():
-                        # File case
-                        if file_path not in added_files:
-                            zip_file.write(target_path, file_path)
-                            added_files.add(file_path)
-                    else:
-                        # Directory case - Add folder recursively
-                        for item in target_path.rglob('*'):
-                            if item.is_file():
-                                arcname = str(item.relative_to(workspace_path))
-                                if arcname not in added_files:
-                                    zip_file.write(item, arcname)
-                                    added_files.add(arcname)
-        
-        zip_buffer.seek(0)
-        
-        return Response(
-            content=zip_buffer.getvalue(),
+        return StreamingResponse(
+            iter_zip(entries),
             media_type="application/zip",
             headers={
                 "Content-Disposition": f"attachment; filename=files-{workspace_id}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
@@ -2418,34 +2311,15 @@ async def batch_download_files(workspace_id: str, request: BatchDownloadRequest)
 
 @app.post("/api/workspace/{workspace_id}/zip")
 async def zip_files(workspace_id: str, request: ZipRequest):
-    """Create a zip file from selected files/folders."""
+    """Create a zip file from selected files/folders (streamed while files are read)."""
     try:
-        import zipfile
-        import io
-        from pathlib import Path
+        from services.archive_service import collect_entries, iter_zip
         
         workspace_path = WORKSPACES_DIR / workspace_id
+        entries = await asyncio.to_thread(collect_entries, workspace_path, request.paths)
         
-        # Create zip in memory
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for file_path in request.paths:
-                target_path = workspace_path / file_path
-                if target_path.exists():
-                    if target_path.is_file():
-                        zip_file.write(target_path, file_path)
-                    else:
-                        # Add folder recursively
-                        for item in target_path.rglob('*'):
-                            if item.is_file():
-                                arcname = item.relative_to(workspace_path)
-                                zip_file.write(item, str(arcname))
-        
-        zip_buffer.seek(0)
-        
-        return Response(
-            content=zip_buffer.getvalue(),
+        return StreamingResponse(
+            iter_zip(entries),
             media_type="application/zip",
             headers={
                 "Content-Disposition": f"attachment; filename=workspace-{workspace_id}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
@@ -2548,6 +2422,7 @@ async def chat_with_documents(workspace_id: str, request: DocumentChatRequest):
     try:
         from services.document_service import DocumentService
         from services.deepseek_direct import deepseek_direct
+        from services.provider_admission import Priority
         
         doc_service = DocumentService(workspace_id=workspace_id)
         
@@ -2604,7 +2479,8 @@ Answer:"""
             system_prompt="You are a document analysis assistant. Always cite your sources with document names and page numbers.",
             temperature=0.3,
             max_tokens=2000,
-            use_reasoning=False
+            use_reasoning=False,
+            priority=Priority.INTERACTIVE
         )
         
         return {
@@ -3019,7 +2895,8 @@ async def background_agent_workflow(request: ChatMessageRequest, job_id: str):
             session_service.update_session_metadata(request.session_id, session_metadata)
 
         # 3. Formulate final response
-        from services.deepseek_direct import deepseek_direct
+        from services.api_hub import api_hub
+        from services.provider_admission import Priority
         history_str = ""
         if hasattr(request, 'conversation_history') and request.conversation_history:
             for msg in request.conversation_history[-5:]:
@@ -3028,17 +2905,17 @@ async def background_agent_workflow(request: ChatMessageRequest, job_id: str):
         workflow_context = f"Workflow Result: {json.dumps(workflow_result)}\nUser Message: {request.message}\nHistory: {history_str}"
         system_prompt = "You are AntiGravity, a PhD-level research architect. Explain your accomplishments naturally."
         
-        final_response = await deepseek_direct.generate_content(
-            prompt=f"Based on this outcome, respond to the user:\n{workflow_context}",
-            system_prompt=system_prompt,
-            temperature=0.7
+        # 4. Stream final response token by token via SSE (admitted as
+        # interactive, so it goes ahead of queued generation jobs)
+        final_response = await events.stream_response(
+            job_id,
+            api_hub.generate_llm_response(
+                prompt=f"Based on this outcome, respond to the user:\n{workflow_context}",
+                system_prompt=system_prompt,
+                priority=Priority.INTERACTIVE
+            ),
+            session_id=request.session_id
         )
-
-        # 4. Stream final response via SSE
-        await events.publish(job_id, "response_chunk", {
-            "chunk": final_response,
-            "accumulated": final_response
-        }, session_id=request.session_id)
         
         # 5. Signal completion
         await events.publish(job_id, "stage_completed", {
@@ -3559,6 +3436,20 @@ async def convert_to_docx(workspace_id: str, request: ConvertDocxRequest):
         raise HTTPException(status_code=500, detail=f"Failed to convert to DOCX: {str(e)}")
 
 
+# ============================================================================
+# CIRCUIT BREAKER METRICS
+# ============================================================================
+
+@app.get("/api/circuit-breakers")
+async def get_circuit_breakers():
+    """Get circuit breaker states and transition metrics for this process."""
+    from services.circuit_breaker import circuit_breakers, circuit_metrics
+    return {
+        "breakers": [await cb.get_status() for cb in circuit_breakers.values()],
+        "metrics": dict(circuit_metrics)
+    }
+
+
 # ============================================================================
 # REDIS & WORKER TEST ENDPOINTS
 # ============================================================================
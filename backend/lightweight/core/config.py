@@ -10,6 +10,11 @@ class Settings(BaseSettings):
     )
     PROJECT_NAME: str = "PhD Thesis Generator"
     
+    # Queue worker runtime (core.queue)
+    WORKER_CONCURRENCY: int = 4  # Concurrent job slots per worker process
+    WORKER_PREFETCH: int = 2  # Jobs reserved ahead of free slots
+    WORKER_VISIBILITY_TIMEOUT: int = 900  # Seconds before an unacked job is requeued
+    
     # Supabase
     SUPABASE_URL: str
     SUPABASE_SERVICE_ROLE_KEY: str
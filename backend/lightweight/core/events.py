@@ -7,6 +7,7 @@ import json
 import time
 import redis.asyncio as redis
 import os
+from typing import AsyncIterator
 
 
 class ExtendedJSONEncoder(json.JSONEncoder):
@@ -147,6 +148,48 @@ class EventPublisher:
             "completed": completed
         }, session_id=session_id)
     
+    async def stream_response(
+        self,
+        job_id: str,
+        tokens: AsyncIterator[str],
+        session_id: str = None,
+        min_chars: int = 32,
+        max_delay: float = 0.08
+    ) -> str:
+        """
+        Relay an LLM token stream as coalesced response_chunk events.
+        
+        Tokens are buffered and flushed once `min_chars` have accumulated, a
+        newline arrives, or `max_delay` seconds have passed since the last
+        flush, so the client sees text immediately without one Redis publish
+        per token. A final chunk with completed=True closes the stream.
+        
+        Returns:
+            The full assembled response
+        """
+        accumulated = []
+        pending = []
+        pending_chars = 0
+        last_flush = time.monotonic()
+        
+        async for token in tokens:
+            if not token:
+                continue
+            accumulated.append(token)
+            pending.append(token)
+            pending_chars += len(token)
+            
+            now = time.monotonic()
+            if pending_chars >= min_chars or "\n" in token or now - last_flush >= max_delay:
+                await self.response_chunk(job_id, "".join(pending), "".join(accumulated), session_id=session_id)
+                pending, pending_chars, last_flush = [], 0, now
+        
+        full_text = "".join(accumulated)
+        if pending:
+            await self.response_chunk(job_id, "".join(pending), full_text, session_id=session_id)
+        await self.response_chunk(job_id, "", full_text, completed=True, session_id=session_id)
+        return full_text
+    
     async def stream_start(self, job_id: str, session_id: str = None):
         """Publish stream start event."""
         await self.publish(job_id, "stream_start", {"timestamp": time.time()}, session_id=session_id)
@@ -2,11 +2,19 @@
 Job Queue System for On-Demand Agent Awakening
 
 Agents sleep until work appears in Redis queue, then wake up and process.
+
+Workers run N concurrent job slots per process. Jobs are reserved with
+LMOVE/BLMOVE into a per-queue processing list and acknowledged on
+completion; jobs whose visibility deadline passes without an ack (worker
+crashed or was killed) are requeued.
 """
+import os
 import json
+import time
 import uuid
+import signal
 import asyncio
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional, Callable, Tuple
 from datetime import datetime
 from enum import Enum
 
@@ -87,12 +95,31 @@ class JobQueue:
         
         return job_id
     
+    @staticmethod
+    def _keys(queue_name: str) -> Dict[str, str]:
+        return {
+            "priority": f"queue:{queue_name}:priority",
+            "normal": f"queue:{queue_name}",
+            "processing": f"queue:{queue_name}:processing",
+            "deadlines": f"queue:{queue_name}:deadlines",
+        }
+    
+    @staticmethod
+    async def _mark_processing(job_json: str) -> Dict:
+        job = json.loads(job_json)
+        job["status"] = JobStatus.PROCESSING
+        job["started_at"] = datetime.now().isoformat()
+        await cache.set(f"job:{job['job_id']}", job)
+        return job
+    
     @classmethod
     async def pop(cls, queue_name: str, timeout: int = 0) -> Optional[Dict]:
         """
         Pop job from queue (blocking).
         
-        Agent sleeps here until work appears.
+        Agent sleeps here until work appears. A single BRPOP watches the
+        priority and normal queues; Redis checks keys in order, so priority
+        jobs always win and wake a sleeping worker immediately.
         
         Args:
             queue_name: Queue name
@@ -101,40 +128,93 @@ class JobQueue:
         Returns:
             Job data or None
         """
-        try:
-            client = await cache.get_client()
-            
-            # Try priority queue first (non-blocking)
-            priority_result = await client.rpop(f"queue:{queue_name}:priority")
-            if priority_result:
-                job = json.loads(priority_result)
-                job["status"] = JobStatus.PROCESSING
-                job["started_at"] = datetime.now().isoformat()
-                await cache.set(f"job:{job['job_id']}", job)
-                return job
-            
-            # Blocking pop from normal queue (agent sleeps here)
-            result = await client.brpop(f"queue:{queue_name}", timeout=timeout)
-            
-            with open("queue_debug.log", "a") as f:
-                f.write(f"BRPOP returned: {result}\n")
-            
-            if result:
-                _, job_json = result
-                job = json.loads(job_json)
-                
-                # Mark as processing
-                job["status"] = JobStatus.PROCESSING
-                job["started_at"] = datetime.now().isoformat()
-                await cache.set(f"job:{job['job_id']}", job)
-                
-                return job
-            
+        client = await cache.get_client()
+        keys = cls._keys(queue_name)
+        
+        result = await client.brpop([keys["priority"], keys["normal"]], timeout=timeout)
+        if not result:
             return None
-        except Exception as e:
-            with open("queue_debug.log", "a") as f:
-                f.write(f"Queue error: {e}\n")
-            raise
+        
+        _, job_json = result
+        return await cls._mark_processing(job_json)
+    
+    @classmethod
+    async def reserve(
+        cls,
+        queue_name: str,
+        visibility_timeout: int,
+        block_timeout: int = 1
+    ) -> Optional[Tuple[Dict, str]]:
+        """
+        Reliably reserve a job (at-least-once delivery).
+        
+        The raw job is atomically moved to the processing list and given a
+        visibility deadline; it stays there until `ack`. Priority jobs are
+        taken with a non-blocking LMOVE, then the worker blocks on the normal
+        queue for at most `block_timeout` seconds, which bounds how long a
+        newly arrived priority job can wait.
+        
+        Returns:
+            (job, raw) tuple, or None if nothing arrived. `raw` is needed to ack.
+        """
+        client = await cache.get_client()
+        keys = cls._keys(queue_name)
+        
+        raw = await client.lmove(keys["priority"], keys["processing"], "RIGHT", "LEFT")
+        if raw is None:
+            raw = await client.blmove(keys["normal"], keys["processing"], block_timeout, "RIGHT", "LEFT")
+        if raw is None:
+            return None
+        
+        await client.zadd(keys["deadlines"], {raw: time.time() + visibility_timeout})
+        return await cls._mark_processing(raw), raw
+    
+    @classmethod
+    async def extend(cls, queue_name: str, raw: str, visibility_timeout: int):
+        """Push back the visibility deadline of a job still being worked on."""
+        client = await cache.get_client()
+        await client.zadd(cls._keys(queue_name)["deadlines"], {raw: time.time() + visibility_timeout}, xx=True)
+    
+    @classmethod
+    async def ack(cls, queue_name: str, raw: str):
+        """Remove a finished (completed or failed) job from the processing list."""
+        client = await cache.get_client()
+        keys = cls._keys(queue_name)
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.lrem(keys["processing"], 1, raw)
+            pipe.zrem(keys["deadlines"], raw)
+            await pipe.execute()
+    
+    # Requeue jobs whose deadline has passed. Processing entries without a
+    # deadline (worker died between BLMOVE and ZADD) are adopted first.
+    _REQUEUE_SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local processing = redis.call('LRANGE', KEYS[2], 0, -1)
+    for _, raw in ipairs(processing) do
+        if not redis.call('ZSCORE', KEYS[1], raw) then
+            redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), raw)
+        end
+    end
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, 100)
+    for _, raw in ipairs(expired) do
+        redis.call('ZREM', KEYS[1], raw)
+        if redis.call('LREM', KEYS[2], 1, raw) > 0 then
+            redis.call('RPUSH', KEYS[3], raw)
+        end
+    end
+    return #expired
+    """
+    
+    @classmethod
+    async def requeue_expired(cls, queue_name: str, visibility_timeout: int) -> int:
+        """Return timed-out jobs to the front of the normal queue."""
+        client = await cache.get_client()
+        keys = cls._keys(queue_name)
+        return await client.eval(
+            cls._REQUEUE_SCRIPT, 3,
+            keys["deadlines"], keys["processing"], keys["normal"],
+            time.time(), visibility_timeout
+        )
     
     @classmethod
     async def complete(cls, job_id: str, result: Any):
@@ -164,8 +244,170 @@ class JobQueue:
         return await cache.get(f"job:{job_id}")
 
 
+def _worker_setting(name: str, default: int) -> int:
+    """Read a worker setting from config, falling back to env vars."""
+    try:
+        from core.config import settings
+        return int(getattr(settings, name))
+    except Exception:
+        return int(os.getenv(name, default))
+
+
+class WorkerRuntime:
+    """
+    Concurrent worker runtime for one queue.
+    
+    - `concurrency` job slots run in parallel (jobs are mostly LLM I/O)
+    - a fetcher keeps up to `prefetch` reserved jobs buffered for free slots
+    - reserved jobs (buffered or running) heartbeat their visibility
+      deadline; expired jobs from dead workers are requeued by a reaper
+    - SIGINT/SIGTERM stop fetching and drain in-flight jobs before exit
+    """
+    
+    def __init__(
+        self,
+        queue_name: str,
+        func: Callable,
+        concurrency: Optional[int] = None,
+        prefetch: Optional[int] = None,
+        visibility_timeout: Optional[int] = None,
+        drain_timeout: float = 300.0
+    ):
+        self.queue_name = queue_name
+        self.func = func
+        self.concurrency = max(1, concurrency or _worker_setting("WORKER_CONCURRENCY", 4))
+        self.prefetch = max(0, prefetch if prefetch is not None else _worker_setting("WORKER_PREFETCH", 2))
+        self.visibility_timeout = visibility_timeout or _worker_setting("WORKER_VISIBILITY_TIMEOUT", 900)
+        self.drain_timeout = drain_timeout
+        self._buffer: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.prefetch))
+        self._stopping = asyncio.Event()
+    
+    def stop(self):
+        """Stop reserving new jobs; in-flight and buffered jobs still finish."""
+        if not self._stopping.is_set():
+            print(f"🛑 Draining worker {self.queue_name}...", flush=True)
+            self._stopping.set()
+    
+    async def _fetch(self):
+        while not self._stopping.is_set():
+            try:
+                reserved = await JobQueue.reserve(self.queue_name, self.visibility_timeout)
+                if reserved:
+                    # The deadline starts at reserve time, so keep it alive
+                    # while the job waits in the buffer for a free slot
+                    job, raw = reserved
+                    await self._buffer.put((job, raw, asyncio.create_task(self._heartbeat(raw))))
+            except Exception as e:
+                print(f"Worker error: {e}", flush=True)
+                import traceback
+                traceback.print_exc()
+                await asyncio.sleep(5)  # Brief pause on error
+        
+        for _ in range(self.concurrency):
+            await self._buffer.put(None)  # One stop sentinel per slot
+    
+    async def _heartbeat(self, raw: str):
+        interval = max(1.0, self.visibility_timeout / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await JobQueue.extend(self.queue_name, raw, self.visibility_timeout)
+            except Exception as e:
+                print(f"⚠️ Heartbeat failed: {e}", flush=True)
+    
+    async def _reap(self):
+        interval = max(1.0, self.visibility_timeout / 3)
+        while not self._stopping.is_set():
+            try:
+                requeued = await JobQueue.requeue_expired(self.queue_name, self.visibility_timeout)
+                if requeued:
+                    print(f"♻️ Requeued {requeued} timed-out job(s) on {self.queue_name}", flush=True)
+            except Exception as e:
+                print(f"⚠️ Requeue check failed: {e}", flush=True)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _slot(self, slot: int):
+        while True:
+            reserved = await self._buffer.get()
+            if reserved is None:
+                return
+            
+            job, raw, heartbeat = reserved
+            job_id = job["job_id"]
+            print(f"⚡ Agent awakened! Processing job {job_id} (slot {slot})", flush=True)
+            
+            try:
+                try:
+                    # Agent does work
+                    result = await self.func(job["data"])
+                except Exception as e:
+                    error = e
+                    import traceback
+                    traceback.print_exc()
+                else:
+                    error = None
+                
+                # Status bookkeeping in its own guard: a Redis blip here must
+                # not kill the slot (the job is still acked below)
+                try:
+                    if error is None:
+                        await JobQueue.complete(job_id, result)
+                        print(f"✓ Job {job_id} completed", flush=True)
+                    else:
+                        await JobQueue.fail(job_id, str(error))
+                        print(f"✗ Job {job_id} failed: {str(error)}", flush=True)
+                except Exception as e:
+                    print(f"⚠️ Could not record result of job {job_id}: {e}", flush=True)
+            
+            finally:
+                heartbeat.cancel()
+                try:
+                    await JobQueue.ack(self.queue_name, raw)
+                except Exception as e:
+                    # Unacked jobs are requeued after the visibility timeout
+                    print(f"⚠️ Ack failed for job {job_id}: {e}", flush=True)
+    
+    async def run(self):
+        print(f"🔄 Worker started: {self.queue_name} "
+              f"({self.concurrency} slots, prefetch {self.prefetch})", flush=True)
+        print(f"   Waiting for jobs (sleeping)...", flush=True)
+        
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported on this platform / thread
+        
+        fetcher = asyncio.create_task(self._fetch())
+        reaper = asyncio.create_task(self._reap())
+        slots = [asyncio.create_task(self._slot(i + 1)) for i in range(self.concurrency)]
+        
+        await self._stopping.wait()
+        try:
+            await asyncio.wait_for(asyncio.gather(fetcher, *slots), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ Drain timed out; unfinished jobs will be requeued", flush=True)
+            for task in [fetcher, *slots]:
+                task.cancel()
+            while not self._buffer.empty():
+                reserved = self._buffer.get_nowait()
+                if reserved is not None:
+                    reserved[2].cancel()
+        reaper.cancel()
+        print(f"💤 Worker {self.queue_name} stopped", flush=True)
+
+
 # Worker decorator
-def worker(queue_name: str):
+def worker(
+    queue_name: str,
+    concurrency: Optional[int] = None,
+    prefetch: Optional[int] = None,
+    visibility_timeout: Optional[int] = None
+):
     """
     Decorator to create a worker that processes jobs from queue.
     
@@ -174,46 +416,20 @@ def worker(queue_name: str):
         async def process_objective(data: Dict) -> Any:
             # Agent work here
             return result
+    
+    Slot count, prefetch and visibility timeout default to the
+    WORKER_CONCURRENCY, WORKER_PREFETCH and WORKER_VISIBILITY_TIMEOUT settings.
     """
     def decorator(func: Callable):
         async def run_worker():
-            print(f"🔄 Worker started: {queue_name}", flush=True)
-            print(f"   Waiting for jobs (sleeping)...", flush=True)
-            
-            while True:
-                try:
-                    # Agent sleeps here until work appears
-                    job = await JobQueue.pop(queue_name)
-                    
-                    if job:
-                        job_id = job["job_id"]
-                        data = job["data"]
-                        
-                        print(f"⚡ Agent awakened! Processing job {job_id}", flush=True)
-                        
-                        try:
-                            # Agent does work
-                            result = await func(data)
-                            
-                            # Mark complete
-                            await JobQueue.complete(job_id, result)
-                            
-                            print(f"✓ Job {job_id} completed", flush=True)
-                        
-                        except Exception as e:
-                            # Mark failed
-                            await JobQueue.fail(job_id, str(e))
-                            print(f"✗ Job {job_id} failed: {str(e)}", flush=True)
-                            import traceback
-                            traceback.print_exc()
-                        
-                        print(f"💤 Agent sleeping...", flush=True)
-                
-                except Exception as e:
-                    print(f"Worker error: {e}", flush=True)
-                    import traceback
-                    traceback.print_exc()
-                    await asyncio.sleep(5)  # Brief pause on error
+            runtime = WorkerRuntime(
+                queue_name,
+                func,
+                concurrency=concurrency,
+                prefetch=prefetch,
+                visibility_timeout=visibility_timeout
+            )
+            await runtime.run()
         
         return run_worker
     
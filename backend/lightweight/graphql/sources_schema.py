@@ -225,53 +225,15 @@ class Query:
         query: str,
         limit: int = 10
     ) -> List[SearchResult]:
-        """Full-text search across sources."""
+        """
+        Full-text search across sources: BM25 with title > citation key >
+        abstract > authors > venue > full text, "quoted phrases" and prefix*.
+        """
         service = get_sources_service()
-        all_sources = service.list_sources(workspace_id)
-        
-        query_lower = query.lower()
-        results = []
-        
-        for s in all_sources:
-            score = 0.0
-            matched = []
-            
-            # Title match (highest weight)
-            if query_lower in s.get("title", "").lower():
-                score += 10.0
-                matched.append("title")
-            
-            # Abstract match
-            if query_lower in s.get("abstract", "").lower():
-                score += 5.0
-                matched.append("abstract")
-            
-            # Author match
-            for author in s.get("authors", []):
-                if query_lower in str(author).lower():
-                    score += 3.0
-                    matched.append("authors")
-                    break
-            
-            # Venue match
-            if query_lower in s.get("venue", "").lower():
-                score += 2.0
-                matched.append("venue")
-            
-            # Citation key match
-            if query_lower in s.get("citation_key", "").lower():
-                score += 8.0
-                matched.append("citation_key")
-            
-            if score > 0:
-                results.append({
-                    "source": s,
-                    "score": score,
-                    "matched": matched
-                })
-        
-        # Sort by score descending
-        results.sort(key=lambda x: x["score"], reverse=True)
+        results = [
+            {"source": r["source"], "score": r["score"], "matched": r["matched_fields"]}
+            for r in service.search_sources(workspace_id, query, limit=limit)
+        ]
         
         # Convert to SearchResult objects
         return [
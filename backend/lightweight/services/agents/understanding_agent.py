@@ -167,6 +167,7 @@ class UnderstandingAgent(BaseAgent):
                 return context
 
             from services.deepseek_direct import deepseek_direct_service
+            from services.provider_admission import Priority
             
             # Build prompt
             prompt = f"""You are the customized Understanding Agent for 'AntiGravity'—a PhD-level research assistant.
@@ -206,7 +207,8 @@ Output JSON ONLY:
             response = await deepseek_direct_service.generate_content(
                 prompt=prompt,
                 system_prompt="You are a strict JSON-outputting analysis agent.",
-                temperature=0.1
+                temperature=0.1,
+                priority=Priority.INTERACTIVE
             )
             
             # Parse JSON
@@ -3,8 +3,9 @@ Unified API Hub - Central Manager for All External API Communications
 
 This module provides:
 1. Centralized API client management
-2. Rate limiting and circuit breakers
-3. Fallback chains for LLMs
+2. Shared (cross-process) rate limiting, adaptive concurrency and circuit
+   breakers via provider_admission
+3. Fallback chains for LLMs, with interactive/background priorities
 4. Unified error handling
 5. Request/response logging to Redis
 """
@@ -12,11 +13,32 @@ This module provides:
 import asyncio
 import os
 import json
+import re
 import time
 from typing import Dict, Any, Optional, AsyncGenerator, List
-from dataclasses import dataclass
 from enum import Enum
 
+from services.provider_admission import (
+    Priority,
+    ProviderUnavailable,
+    estimate_tokens,
+    failure_outcome,
+    get_provider_admission,
+)
+
+
+# Error chunks some providers yield instead of raising
+ERROR_CHUNK_RE = re.compile(r"^❌ (?:Error: (\d{3})|Connection Error)")
+
+
+class ProviderError(Exception):
+    """A provider call failed; status is the HTTP status when known."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
 
 class APIProvider(Enum):
     """Available API providers."""
@@ -29,51 +51,8 @@ class APIProvider(Enum):
     PEXELS = "pexels"
 
 
-@dataclass
-class RateLimitConfig:
-    """Rate limiting configuration."""
-    requests_per_minute: int = 60
-    tokens_per_minute: int = 100000
-    concurrent_requests: int = 10
-
-
-class CircuitBreaker:
-    """Simple circuit breaker for API resilience."""
-    
-    def __init__(self, failure_threshold: int = 5, recovery_time: int = 60):
-        self.failure_threshold = failure_threshold
-        self.recovery_time = recovery_time
-        self.failures: Dict[str, int] = {}
-        self.last_failure_time: Dict[str, float] = {}
-        self.open_circuits: Dict[str, bool] = {}
-    
-    def is_open(self, provider: str) -> bool:
-        """Check if circuit is open (blocking requests)."""
-        if provider not in self.open_circuits:
-            return False
-        
-        if self.open_circuits[provider]:
-            # Check if recovery time has passed
-            if time.time() - self.last_failure_time.get(provider, 0) > self.recovery_time:
-                self.open_circuits[provider] = False
-                self.failures[provider] = 0
-                return False
-            return True
-        return False
-    
-    def record_failure(self, provider: str):
-        """Record a failure for a provider."""
-        self.failures[provider] = self.failures.get(provider, 0) + 1
-        self.last_failure_time[provider] = time.time()
-        
-        if self.failures[provider] >= self.failure_threshold:
-            self.open_circuits[provider] = True
-            print(f"⚡ Circuit breaker OPEN for {provider}", flush=True)
-    
-    def record_success(self, provider: str):
-        """Record a success, resetting failure count."""
-        self.failures[provider] = 0
-        self.open_circuits[provider] = False
+# Max wait for a provider that still has a fallback after it
+FALLBACK_ADMISSION_WAIT = 2.0
 
 
 class APIHub:
@@ -83,16 +62,14 @@ class APIHub:
     Features:
     - Unified interface for LLM calls
     - Automatic fallback between providers
-    - Rate limiting
-    - Circuit breaker pattern
+    - Shared rate limiting and AIMD concurrency per provider/model
+    - Circuit breaker pattern (shared across workers)
     - Request logging to Redis
     """
     
     def __init__(self):
-        self.circuit_breaker = CircuitBreaker()
+        self.admission = get_provider_admission()
         self.redis = None
-        self._request_counts: Dict[str, int] = {}
-        self._last_minute: Dict[str, float] = {}
         
         # LLM fallback order
         self.llm_fallback_order = [
@@ -132,65 +109,89 @@ class APIHub:
             except:
                 pass
     
-    def _check_rate_limit(self, provider: str, limit: int = 60) -> bool:
-        """Check if rate limit is exceeded."""
-        current_minute = time.time() // 60
-        
-        if self._last_minute.get(provider) != current_minute:
-            self._request_counts[provider] = 0
-            self._last_minute[provider] = current_minute
-        
-        if self._request_counts.get(provider, 0) >= limit:
-            return False
-        
-        self._request_counts[provider] = self._request_counts.get(provider, 0) + 1
-        return True
-    
     async def generate_llm_response(
         self,
         prompt: str,
         system_prompt: str = "You are a helpful assistant.",
         provider: Optional[APIProvider] = None,
         stream: bool = True,
+        priority: Priority = Priority.INTERACTIVE,
+        model: str = "default",
+        max_tokens: int = 4000,
         **kwargs
     ) -> AsyncGenerator[str, None]:
         """
         Generate LLM response with automatic fallback.
         
+        Each provider call first waits for admission from the shared
+        controller; a provider that is saturated, cooling down after a 429
+        or has an open circuit is skipped in favour of the next one.
+        
         Args:
             prompt: User prompt
             system_prompt: System prompt
             provider: Specific provider to use (or auto-fallback)
             stream: Whether to stream response
+            priority: INTERACTIVE (chat) or BACKGROUND (generation jobs)
+            model: Model name, for per-model budgets
+            max_tokens: Max completion tokens, used for the token estimate
         
         Yields:
             Response chunks
         """
         providers_to_try = [provider] if provider else self.llm_fallback_order
+        estimate = estimate_tokens(prompt) + estimate_tokens(system_prompt) + max_tokens
         
-        for prov in providers_to_try:
-            if self.circuit_breaker.is_open(prov.value):
-                print(f"⚡ Skipping {prov.value} - circuit open", flush=True)
-                continue
-            
-            if not self._check_rate_limit(prov.value):
-                print(f"⚠️ Rate limit hit for {prov.value}", flush=True)
+        for i, prov in enumerate(providers_to_try):
+            has_fallback = i < len(providers_to_try) - 1
+            try:
+                lease = await self.admission.acquire(
+                    prov.value, model, estimate, priority,
+                    timeout=FALLBACK_ADMISSION_WAIT if has_fallback else None
+                )
+            except ProviderUnavailable as e:
+                print(f"⚡ Skipping {prov.value} - {e.reason}", flush=True)
                 continue
             
             start_time = time.time()
+            first_chunk_latency = None
+            output_chars = 0
+            started = False
             try:
-                async for chunk in self._call_llm_provider(prov, prompt, system_prompt, stream, **kwargs):
+                async for chunk in self._call_llm_provider(prov, prompt, system_prompt, stream, model=model, **kwargs):
+                    if not started:
+                        match = ERROR_CHUNK_RE.match(chunk)
+                        if match:
+                            status = int(match.group(1)) if match.group(1) else None
+                            raise ProviderError(chunk, status=status)
+                        started = True
+                        first_chunk_latency = time.time() - start_time
+                    output_chars += len(chunk)
                     yield chunk
                 
-                self.circuit_breaker.record_success(prov.value)
+                # Release runs a SQLite write transaction; keep it off the event loop
+                used = estimate - max_tokens + output_chars // 4
+                await asyncio.to_thread(
+                    self.admission.release, lease, "success", used_tokens=used, latency=first_chunk_latency
+                )
                 await self._log_request(prov.value, "llm", True, time.time() - start_time)
                 return
                 
             except Exception as e:
                 print(f"❌ {prov.value} failed: {e}", flush=True)
-                self.circuit_breaker.record_failure(prov.value)
+                await asyncio.to_thread(self.admission.release, lease, **failure_outcome(e))
                 await self._log_request(prov.value, "llm", False, time.time() - start_time)
+                if started:
+                    # Part of the answer was already streamed; don't splice another provider's
+                    return
                 continue
+            
+            except BaseException:
+                # Caller stopped consuming (client disconnect): free the slot
+                await asyncio.to_thread(
+                    self.admission.release, lease, "success", used_tokens=estimate - max_tokens + output_chars // 4
+                )
+                raise
         
         # All providers failed
         yield "I apologize, but I'm having trouble connecting to AI services right now. Please try again in a moment."
@@ -201,13 +202,14 @@ class APIHub:
         prompt: str,
         system_prompt: str,
         stream: bool,
+        model: str = "default",
         **kwargs
     ) -> AsyncGenerator[str, None]:
         """Call specific LLM provider."""
         
         if provider == APIProvider.DEEPSEEK:
             from services.deepseek_direct import deepseek_direct
-            async for chunk in deepseek_direct.generate_stream(prompt, system_prompt=system_prompt):
+            async for chunk in deepseek_direct.generate_stream(prompt, system_prompt=system_prompt, model_key=model):
                 yield chunk
         
         elif provider == APIProvider.OPENROUTER:
@@ -252,15 +254,16 @@ class APIHub:
     
     async def get_health_status(self) -> Dict[str, Any]:
         """Get health status of all API providers."""
+        status = await asyncio.to_thread(self.admission.status)
         return {
             "circuit_breakers": {
                 p.value: {
-                    "open": self.circuit_breaker.is_open(p.value),
-                    "failures": self.circuit_breaker.failures.get(p.value, 0)
+                    "open": status.get(p.value, {}).get("circuit_open", False),
+                    "failures": status.get(p.value, {}).get("failures", 0)
                 }
                 for p in APIProvider
             },
-            "rate_limits": self._request_counts.copy()
+            "rate_limits": status
         }
 
 
@@ -12,14 +12,31 @@ This module generates research instruments as separate appendix files:
 - Survey Instruments
 
 Methodology-Driven: Analyzes Chapter 3 content to determine appropriate tools.
+
+Per-objective AI content (questionnaire items, interview themes) for every
+instrument is generated up front under a shared concurrency budget, then
+the documents are assembled in objective order. Generated item sets are
+cached in appendices/.item_cache.json and reused while the objective,
+topic and variables are unchanged.
 """
 
 import os
 import re
+import json
+import asyncio
+import hashlib
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 
+# Maximum simultaneous LLM calls across all instruments
+MAX_CONCURRENT_GENERATIONS = 6
+ITEM_CACHE_FILE = ".item_cache.json"
+
+# Instruments whose content is generated per objective
+OBJECTIVE_CONTENT_KINDS = ("questionnaire", "interview_guide")
+
+
 class AppendixGenerator:
     """Generates study tools as separate appendix markdown files.
     
@@ -70,6 +87,11 @@ class AppendixGenerator:
         
         # Create appendices directory
         os.makedirs(self.appendices_dir, exist_ok=True)
+        
+        # Per-objective AI content: (kind, objective_num) -> markdown
+        self._objective_content: Dict[tuple, str] = {}
+        self._generation_slots = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+        self._item_cache = self._load_item_cache()
     
     def _detect_research_design(self) -> str:
         """Detect research design from methodology content."""
@@ -401,43 +423,98 @@ FOLLOWUP2: [Second follow-up question]
 """
 
     
+    # =========================================================================
+    # BUILD PLANNER - concurrent per-objective generation with caching
+    # =========================================================================
+    
+    def _load_item_cache(self) -> Dict[str, str]:
+        cache_path = os.path.join(self.appendices_dir, ITEM_CACHE_FILE)
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_item_cache(self):
+        cache_path = os.path.join(self.appendices_dir, ITEM_CACHE_FILE)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._item_cache, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    
+    def _item_cache_key(self, kind: str, objective_num: int, objective: str) -> str:
+        """Changes whenever anything that feeds the prompt changes."""
+        obj_vars = self.objective_variables.get(str(objective_num), self.objective_variables.get(objective_num, []))
+        payload = json.dumps([kind, objective_num, objective, self.topic, self.case_study, obj_vars], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    async def _generate_objective_content(self, kind: str, objective_num: int) -> str:
+        """Items/theme for one objective: from cache, else one bounded LLM call."""
+        objective = self.objectives[objective_num - 1]
+        key = self._item_cache_key(kind, objective_num, objective)
+        if key in self._item_cache:
+            return self._item_cache[key]
+        
+        async with self._generation_slots:
+            if kind == "questionnaire":
+                content = await self._generate_questionnaire_items_ai(objective_num, objective, objective_num)
+                fallback = self._generate_fallback_items(objective, objective_num)
+            else:
+                content = await self._generate_interview_theme_ai(objective_num, objective, objective_num)
+                fallback = self._generate_fallback_interview_theme(objective, objective_num)
+        
+        # Only cache real AI output, so a failed run is retried next time
+        if content and content != fallback:
+            self._item_cache[key] = content
+        return content
+    
+    async def _prefetch_objective_content(self, kinds: List[str]):
+        """Fan out every missing (instrument, objective) generation at once."""
+        jobs = [
+            (kind, num)
+            for kind in kinds
+            for num in range(1, len(self.objectives) + 1)
+            if (kind, num) not in self._objective_content
+        ]
+        if not jobs:
+            return
+        
+        cached_before = len(self._item_cache)
+        print(f"📋 Generating {len(jobs)} objective item sets (max {MAX_CONCURRENT_GENERATIONS} concurrent)")
+        results = await asyncio.gather(*[self._generate_objective_content(kind, num) for kind, num in jobs])
+        for job, content in zip(jobs, results):
+            self._objective_content[job] = content
+        
+        if len(self._item_cache) != cached_before:
+            try:
+                self._save_item_cache()
+            except OSError as e:
+                print(f"⚠️ Failed to save appendix item cache: {e}")
+    
     async def generate_all_appendices(self) -> List[str]:
         """
         Generates all appropriate appendices based on objectives.
         
+        All per-objective AI content is generated first (concurrently), then
+        the instruments are written in parallel.
+        
         Returns:
-            List of generated file paths
+            List of generated file paths (in tool order)
         """
         tools_needed = self.analyse_objectives_for_tools()
-        generated_files = []
+        builders = {
+            'questionnaire': self.generate_questionnaire,
+            'interview_guide': self.generate_interview_guide,
+            'fgd_guide': self.generate_fgd_guide,
+            'observation_checklist': self.generate_observation_checklist,
+            'document_analysis': self.generate_document_analysis,
+            'desktop_review': self.generate_desktop_review,
+        }
         
-        for i, tool in enumerate(tools_needed):
-            if tool == 'questionnaire':
-                # Pass 1-based index for objective variables
-                file_path = await self.generate_questionnaire()
-                generated_files.append(file_path)
-            
-            elif tool == 'interview_guide':
-                file_path = await self.generate_interview_guide()
-                generated_files.append(file_path)
-            
-            elif tool == 'fgd_guide':
-                file_path = await self.generate_fgd_guide()
-                generated_files.append(file_path)
-            
-            elif tool == 'observation_checklist':
-                file_path = await self.generate_observation_checklist()
-                generated_files.append(file_path)
-            
-            elif tool == 'document_analysis':
-                file_path = await self.generate_document_analysis()
-                generated_files.append(file_path)
-            
-            elif tool == 'desktop_review':
-                file_path = await self.generate_desktop_review()
-                generated_files.append(file_path)
+        await self._prefetch_objective_content([k for k in OBJECTIVE_CONTENT_KINDS if k in tools_needed])
         
-        return generated_files
+        generated_files = await asyncio.gather(*[builders[tool]() for tool in tools_needed if tool in builders])
+        return list(generated_files)
     
     async def generate_questionnaire(self) -> str:
         """Generates structured questionnaire appendix with AI-generated items."""
@@ -446,9 +523,11 @@ FOLLOWUP2: [Second follow-up question]
         objective_sections = ""
         section_letter = ord('B')  # Start from Section B
         
+        # AI-powered questionnaire items for all objectives (1-based for variable lookup)
+        await self._prefetch_objective_content(["questionnaire"])
+        
         for i, objective in enumerate(self.objectives if self.objectives else []):
-            # Generate AI-powered questionnaire items (passing objective index + 1 for variable lookup)
-            items_table = await self._generate_questionnaire_items_ai(i + 1, objective, i + 1)
+            items_table = self._objective_content[("questionnaire", i + 1)]
             
             objective_sections += f"""
 ---
@@ -613,9 +692,9 @@ Data Entry: __________
         
         # Generate interview themes for each objective
         interview_themes = ""
+        await self._prefetch_objective_content(["interview_guide"])
         for i, objective in enumerate(self.objectives if self.objectives else [], 1):
-            theme_content = await self._generate_interview_theme_ai(i, objective, i)
-            interview_themes += theme_content
+            interview_themes += self._objective_content[("interview_guide", i)]
         
         # If no objectives, add default themes
         if not interview_themes:
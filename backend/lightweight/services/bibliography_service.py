@@ -6,30 +6,94 @@ Features:
 - Support multiple citation styles (APA, Harvard, Chicago)
 - Maintain references.bib file per workspace
 - Auto-update when sources added
+- Keyed entry store (.bibliography.json) deduplicated by normalized DOI
+  and by title + year (a work matches on either), with O(1) upsert and
+  bulk upsert for batch ingestion
+- Stable cite keys: collisions get a/b/c suffixes, and a work keeps its
+  key once assigned
+- references.bib and the APA list regenerated only when the entry set
+  changes; a legacy .bib file is imported and compacted, and a hand-edited
+  one is authoritative for its keys (edits are kept, deletions stick)
 """
 
+import json
 import re
+import threading
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 
+BIB_STORE_FILE = ".bibliography.json"
+BIB_FILE = "references.bib"
+BIB_HEADER = "% BibTeX References\n% Auto-generated\n\n"
+
+# Entry fields kept in the store (anything else on a source is ignored)
+ENTRY_FIELDS = ("type", "title", "authors", "year", "abstract", "doi", "venue", "url")
+
+BIBTEX_TYPES = {
+    "article", "book", "booklet", "conference", "inbook", "incollection", "inproceedings",
+    "manual", "mastersthesis", "misc", "phdthesis", "proceedings", "techreport", "unpublished"
+}
+BIBTEX_TYPE_ALIASES = {"paper": "article", "pdf": "article"}
+
+_DOI_PREFIX_RE = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_BIB_ENTRY_RE = re.compile(r"@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\s*\}", re.DOTALL)
+_BIB_FIELD_RE = re.compile(r"(\w+)\s*=\s*\{(.*?)\}\s*(?:,|$)", re.DOTALL)
+
+
+def normalize_doi(doi: str) -> str:
+    """Lower-cased bare DOI (no resolver URL or doi: prefix)."""
+    return _DOI_PREFIX_RE.sub("", (doi or "").strip()).strip().lower()
+
+
+def normalize_title(title: str) -> str:
+    return _NON_ALNUM_RE.sub(" ", (title or "").lower()).strip()
+
+
+def entry_identity(source: Dict) -> str:
+    """Primary key for a new work: its DOI if known, otherwise title + year."""
+    doi = normalize_doi(source.get("doi", ""))
+    if doi:
+        return f"doi:{doi}"
+    return f"title:{normalize_title(source.get('title', ''))}|{source.get('year', '')}"
+
+
+def entry_identities(source: Dict) -> List[str]:
+    """Every identity a work can be matched on: DOI and/or title + year."""
+    identities = []
+    doi = normalize_doi(source.get("doi", ""))
+    if doi:
+        identities.append(f"doi:{doi}")
+    title = normalize_title(source.get("title", ""))
+    if title:
+        identities.append(f"title:{title}|{source.get('year', '')}")
+    return identities or [entry_identity(source)]
+
+
 class BibliographyService:
     """Manage bibliography generation and updates."""
     
+    def __init__(self):
+        self._stores: Dict[str, Tuple[Optional[int], Dict]] = {}  # workspace -> (store mtime_ns, store)
+        self._apa_cache: Dict[str, Tuple[int, List[str]]] = {}  # workspace -> (revision, APA list)
+        self._lock = threading.RLock()
+    
     @staticmethod
-    def generate_bibtex_entry(source: Dict) -> str:
+    def generate_bibtex_entry(source: Dict, cite_key: Optional[str] = None) -> str:
         """
         Generate BibTeX entry from source metadata.
         
         Args:
             source: Source dict with title, authors, year, etc.
+            cite_key: Cite key to use (default: AuthorYear from the source)
             
         Returns:
             BibTeX formatted entry
         """
         # Generate cite key (AuthorYear format)
-        cite_key = BibliographyService._generate_cite_key(source)
+        cite_key = cite_key or BibliographyService._generate_cite_key(source)
         
         # Format authors
         authors = source.get("authors", ["Unknown"])
@@ -39,11 +103,16 @@ class BibliographyService:
             authors_str = str(authors)
         
         # Build BibTeX entry
-        entry_type = source.get("type", "article")
+        entry_type = source.get("type") or "article"
+        entry_type = BIBTEX_TYPE_ALIASES.get(entry_type, entry_type)
+        if entry_type not in BIBTEX_TYPES:
+            entry_type = "misc"
         title = source.get("title", "Untitled")
         year = source.get("year", "n.d.")
         abstract = source.get("abstract", "")
         doi = source.get("doi", "")
+        venue = source.get("venue", "")
+        url = source.get("url", "")
         
         bibtex = f"""@{entry_type}{{{cite_key},
     title = {{{title}}},
@@ -54,10 +123,18 @@ class BibliographyService:
             bibtex += f""",
     abstract = {{{abstract}}}"""
         
+        if venue:
+            bibtex += f""",
+    journal = {{{venue}}}"""
+        
         if doi:
             bibtex += f""",
     doi = {{{doi}}}"""
         
+        if url:
+            bibtex += f""",
+    url = {{{url}}}"""
+        
         bibtex += "\n}\n"
         
         return bibtex
@@ -84,30 +161,288 @@ class BibliographyService:
         
         return f"{last_name}{year}"
     
+    # =========================================================================
+    # ENTRY STORE
+    # =========================================================================
+    
     @staticmethod
-    async def update_bibliography(workspace_id: str, new_source: Dict):
-        """
-        Add source to workspace bibliography file.
-        
-        Args:
-            workspace_id: Workspace ID
-            new_source: Source metadata dict
-        """
+    def _workspace_path(workspace_id: str) -> Path:
         from services.workspace_service import WORKSPACES_DIR
         
         workspace_path = WORKSPACES_DIR / workspace_id
         workspace_path.mkdir(parents=True, exist_ok=True)
+        return workspace_path
+    
+    @staticmethod
+    def _entry_fields(source: Dict) -> Dict:
+        """The bibliographic fields of a source, with authors as plain names."""
+        fields = {k: source[k] for k in ENTRY_FIELDS if source.get(k) not in (None, "", [])}
+        authors = fields.get("authors")
+        if isinstance(authors, list):
+            fields["authors"] = [a.get("name", "") if isinstance(a, dict) else str(a) for a in authors]
+            fields["authors"] = [a for a in fields["authors"] if a]
+        elif authors:
+            fields["authors"] = [str(authors)]
+        return fields
+    
+    @staticmethod
+    def _parse_bibtex(content: str) -> List[Tuple[str, Dict]]:
+        """Parse a .bib file into (cite key, entry fields) pairs."""
+        entries = []
+        for entry_type, cite_key, body in _BIB_ENTRY_RE.findall(content):
+            raw = {name.lower(): value.strip() for name, value in _BIB_FIELD_RE.findall(body + ",")}
+            source = {
+                "type": entry_type.lower(),
+                "title": raw.get("title", ""),
+                "authors": [a.strip() for a in raw.get("author", "").split(" and ") if a.strip()],
+                "year": raw.get("year", ""),
+                "abstract": raw.get("abstract", ""),
+                "doi": raw.get("doi", ""),
+                "venue": raw.get("journal") or raw.get("booktitle", ""),
+                "url": raw.get("url", ""),
+            }
+            entries.append((cite_key, source))
+        return entries
+    
+    def _load_store(self, workspace_id: str) -> Dict:
+        """
+        Load the workspace entry store (cached until the file changes).
         
-        bib_path = workspace_path / "references.bib"
+        A references.bib that changed outside the store is read back: a
+        legacy append-only file (no store yet) is merged in, deduplicated;
+        a manual edit of a file the store rendered wins for the keys it
+        lists, and entries whose keys were removed are dropped.
+        """
+        workspace_path = self._workspace_path(workspace_id)
+        store_path = workspace_path / BIB_STORE_FILE
+        bib_path = workspace_path / BIB_FILE
+        
+        mtime = store_path.stat().st_mtime_ns if store_path.exists() else None
+        cached = self._stores.get(workspace_id)
+        if cached and cached[0] == mtime and mtime is not None:
+            store = cached[1]
+        else:
+            store = None
+            if store_path.exists():
+                try:
+                    store = json.loads(store_path.read_text(encoding="utf-8"))
+                except Exception as e:
+                    print(f"⚠️ Error loading bibliography store: {e}")
+            store = store or {"version": 2, "revision": 0, "entries": {}, "cite_keys": {}, "identities": {}, "bib_stat": None}
+            if "identities" not in store:
+                # Version 1 stores only indexed each entry under one identity
+                store["identities"] = {}
+                for entry_id, entry in store["entries"].items():
+                    store["identities"][entry_id] = entry_id
+                    for identity in entry_identities(entry["fields"]):
+                        store["identities"].setdefault(identity, entry_id)
+                store["version"] = 2
+            self._stores[workspace_id] = (mtime, store)
         
-        # Generate BibTeX entry
-        entry = BibliographyService.generate_bibtex_entry(new_source)
+        if bib_path.exists():
+            stat = bib_path.stat()
+            if store.get("bib_stat") != [stat.st_mtime_ns, stat.st_size]:
+                imported = self._parse_bibtex(bib_path.read_text(encoding="utf-8"))
+                if store.get("bib_stat") is None:
+                    for cite_key, source in imported:
+                        self._upsert(store, source, cite_key)
+                    if imported:
+                        print(f"📚 Imported {len(imported)} BibTeX entries into {len(store['entries'])} unique references")
+                else:
+                    self._apply_bib_edits(store, imported)
+                self._save_store(workspace_id, store)
         
-        # Append to file (create if doesn't exist)
-        with open(bib_path, "a", encoding="utf-8") as f:
-            f.write(entry + "\n")
+        return store
+    
+    def _save_store(self, workspace_id: str, store: Dict):
+        """Render references.bib and persist the store (both atomically)."""
+        workspace_path = self._workspace_path(workspace_id)
+        bib_path = workspace_path / BIB_FILE
+        store_path = workspace_path / BIB_STORE_FILE
+        
+        tmp_bib = bib_path.with_suffix(".bib.tmp")
+        tmp_bib.write_text(self._render_bibtex(store), encoding="utf-8")
+        tmp_bib.replace(bib_path)
+        stat = bib_path.stat()
+        store["bib_stat"] = [stat.st_mtime_ns, stat.st_size]
         
-        print(f"✅ Added to bibliography: {BibliographyService._generate_cite_key(new_source)}")
+        tmp_store = store_path.with_suffix(".tmp")
+        tmp_store.write_text(json.dumps(store, ensure_ascii=False), encoding="utf-8")
+        tmp_store.replace(store_path)
+        self._stores[workspace_id] = (store_path.stat().st_mtime_ns, store)
+    
+    @staticmethod
+    def _upsert(store: Dict, source: Dict, cite_key: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        Insert or merge one work into the store.
+        
+        Returns:
+            (cite key, whether the entry set changed)
+        """
+        fields = BibliographyService._entry_fields(source)
+        identities = entry_identities(source)
+        doi = normalize_doi(fields.get("doi", ""))
+        
+        # Match on DOI first, then on title + year unless the DOIs conflict
+        existing = None
+        for identity in identities:
+            entry_id = store["identities"].get(identity)
+            if entry_id is None:
+                continue
+            candidate = store["entries"][entry_id]
+            stored_doi = normalize_doi(candidate["fields"].get("doi", ""))
+            if not doi or not stored_doi or stored_doi == doi:
+                existing = candidate
+                break
+        
+        if existing:
+            # Keep the assigned key; fill in fields the stored entry lacks
+            merged = {**fields, **existing["fields"]}
+            entry_id = store["cite_keys"][existing["cite_key"]]
+            for identity in entry_identities(merged):
+                store["identities"].setdefault(identity, entry_id)
+            if merged == existing["fields"]:
+                return existing["cite_key"], False
+            existing["fields"] = merged
+            store["revision"] += 1
+            return existing["cite_key"], True
+        
+        identity = entry_identity(source)
+        
+        base_key = re.sub(r"[^\w:-]", "", cite_key or BibliographyService._generate_cite_key(fields)) or "ref"
+        key, suffix = base_key, 0
+        while key in store["cite_keys"]:
+            key = f"{base_key}{chr(ord('a') + suffix)}" if suffix < 26 else f"{base_key}_{suffix}"
+            suffix += 1
+        
+        store["entries"][identity] = {"cite_key": key, "fields": fields, "added_at": datetime.now().isoformat()}
+        store["cite_keys"][key] = identity
+        for alias in identities:
+            store["identities"].setdefault(alias, identity)
+        store["revision"] += 1
+        return key, True
+    
+    @staticmethod
+    def _index_entry(store: Dict, entry_id: str):
+        """(Re)register the identity aliases of one entry."""
+        store["identities"] = {k: v for k, v in store["identities"].items() if v != entry_id}
+        store["identities"][entry_id] = entry_id
+        for identity in entry_identities(store["entries"][entry_id]["fields"]):
+            store["identities"].setdefault(identity, entry_id)
+    
+    def _apply_bib_edits(self, store: Dict, imported: List[Tuple[str, Dict]]):
+        """
+        Take a hand-edited references.bib as the truth for the keys it lists.
+        
+        Entries whose rendering changed get the file's fields, keys that
+        disappeared are removed, and new keys are then added like any
+        source (so a renamed key doesn't merge into the entry it replaces).
+        """
+        listed = {cite_key for cite_key, _ in imported}
+        added = []
+        for cite_key, source in imported:
+            entry_id = store["cite_keys"].get(cite_key)
+            if entry_id is None:
+                added.append((cite_key, source))
+                continue
+            entry = store["entries"][entry_id]
+            fields = self._entry_fields(source)
+            if self.generate_bibtex_entry(fields, cite_key) != self.generate_bibtex_entry(entry["fields"], cite_key):
+                entry["fields"] = fields
+                self._index_entry(store, entry_id)
+                store["revision"] += 1
+        
+        removed = [key for key in store["cite_keys"] if key not in listed]
+        for cite_key in removed:
+            entry_id = store["cite_keys"].pop(cite_key)
+            del store["entries"][entry_id]
+            store["identities"] = {k: v for k, v in store["identities"].items() if v != entry_id}
+        if removed:
+            store["revision"] += 1
+            print(f"📚 Removed {len(removed)} entries deleted from {BIB_FILE}")
+        
+        for cite_key, source in added:
+            self._upsert(store, source, cite_key)
+    
+    def _render_bibtex(self, store: Dict) -> str:
+        entries = sorted(store["entries"].values(), key=lambda e: e["cite_key"].lower())
+        return BIB_HEADER + "\n".join(
+            self.generate_bibtex_entry(entry["fields"], entry["cite_key"]) for entry in entries
+        )
+    
+    def upsert_entries(self, workspace_id: str, sources: List[Dict], cite_keys: Optional[List[Optional[str]]] = None) -> List[str]:
+        """
+        Add or merge many sources with a single store write.
+        
+        Args:
+            workspace_id: Workspace ID
+            sources: Source metadata dicts
+            cite_keys: Preferred cite key per source (None = AuthorYear)
+            
+        Returns:
+            Cite key of each source, in input order
+        """
+        with self._lock:
+            store = self._load_store(workspace_id)
+            keys, changed = [], False
+            for i, source in enumerate(sources):
+                preferred = cite_keys[i] if cite_keys else None
+                key, updated = self._upsert(store, source, preferred)
+                keys.append(key)
+                changed = changed or updated
+            if changed:
+                self._save_store(workspace_id, store)
+        return keys
+    
+    async def update_bibliography(self, workspace_id: str, new_source: Dict, cite_key: Optional[str] = None) -> str:
+        """
+        Add source to workspace bibliography file.
+        
+        Re-adding a work already in the bibliography (same DOI, or same
+        title and year) merges it instead of duplicating it.
+        
+        Args:
+            workspace_id: Workspace ID
+            new_source: Source metadata dict
+            cite_key: Preferred cite key (default: AuthorYear)
+            
+        Returns:
+            The entry's cite key
+        """
+        [key] = await self.update_bibliography_bulk(workspace_id, [new_source], [cite_key])
+        print(f"✅ Added to bibliography: {key}")
+        return key
+    
+    async def update_bibliography_bulk(
+        self,
+        workspace_id: str,
+        sources: List[Dict],
+        cite_keys: Optional[List[Optional[str]]] = None
+    ) -> List[str]:
+        """Bulk version of update_bibliography (one write for the batch)."""
+        import asyncio
+        return await asyncio.to_thread(self.upsert_entries, workspace_id, sources, cite_keys)
+    
+    def get_entries(self, workspace_id: str) -> List[Dict]:
+        """All entries as {cite_key, ...fields}, ordered by cite key."""
+        with self._lock:
+            store = self._load_store(workspace_id)
+            entries = sorted(store["entries"].values(), key=lambda e: e["cite_key"].lower())
+            return [{"cite_key": e["cite_key"], **e["fields"]} for e in entries]
+    
+    def get_apa_references(self, workspace_id: str) -> List[str]:
+        """APA reference list, alphabetical; re-rendered only when entries change."""
+        with self._lock:
+            store = self._load_store(workspace_id)
+            cached = self._apa_cache.get(workspace_id)
+            if cached and cached[0] == store["revision"]:
+                return list(cached[1])
+            references = sorted(
+                (self.generate_apa_citation(e["fields"]) for e in store["entries"].values()),
+                key=str.lower
+            )
+            self._apa_cache[workspace_id] = (store["revision"], references)
+            return list(references)
     
     @staticmethod
     def generate_apa_citation(source: Dict) -> str:
@@ -130,24 +465,12 @@ class BibliographyService:
         
         return f"{author_str} ({year}). {title}."
     
-    @staticmethod
-    def load_bibliography(workspace_id: str) -> List[str]:
-        """Load all bibliography entries for workspace."""
-        from services.workspace_service import WORKSPACES_DIR
-        
-        bib_path = WORKSPACES_DIR / workspace_id / "references.bib"
-        
-        if not bib_path.exists():
-            return []
-        
-        with open(bib_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # Split into individual entries
-        entries = re.split(r'@\w+\{', content)
-        entries = [f"@{e}" for e in entries[1:] if e.strip()]
-        
-        return entries
+    def load_bibliography(self, workspace_id: str) -> List[str]:
+        """Load all bibliography entries for workspace (deduplicated BibTeX strings)."""
+        with self._lock:
+            store = self._load_store(workspace_id)
+            entries = sorted(store["entries"].values(), key=lambda e: e["cite_key"].lower())
+            return [self.generate_bibtex_entry(e["fields"], e["cite_key"]) for e in entries]
 
 
 # Singleton instance
@@ -16,6 +16,8 @@ import json
 import re
 import asyncio
 
+from services.intent_engine import intent_engine
+
 
 class ActionType(Enum):
     """Types of actions the system can perform."""
@@ -292,23 +294,15 @@ class CentralBrain:
     async def learn_from_message(self, message: str, session_id: str):
         """Extract and learn user information from messages."""
         ctx = await self.get_context(session_id)
-        msg_lower = message.lower().strip()
+        signals = intent_engine.analyze(message)
         
         # Pattern 1: "am {name}" or "i'm {name}" or "my name is {name}"
-        name_patterns = [
-            r"(?:^|\s)(?:am|i'm|i am)\s+([a-zA-Z]+)(?:\s|$|,|\.)",
-            r"my name is\s+([a-zA-Z]+)",
-            r"call me\s+([a-zA-Z]+)",
-            r"(?:^|\s)name(?:'s)?\s+([a-zA-Z]+)",
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, msg_lower)
-            if match:
-                potential_name = match.group(1).strip()
+        for signal in ("name_am", "name_my_name", "name_call_me", "name_bare"):
+            potential_name = signals.value(signal)
+            if potential_name:
                 # Filter out common words that aren't names
                 not_names = ["here", "fine", "good", "well", "okay", "ok", "ready", "back", "done", "tired"]
-                if potential_name and len(potential_name) > 1 and potential_name not in not_names:
+                if len(potential_name) > 1 and potential_name not in not_names:
                     ctx.user_preferences["name"] = potential_name.capitalize()
                     await self.save_context(session_id, ctx)
                     print(f"🧠 Learned user name: {potential_name.capitalize()}", flush=True)
@@ -13,14 +13,79 @@ Structure (NO sub-sub-headings):
 5.N Discussion of Objective N: [objective text]
 
 Each section is pure flowing academic prose with NO sub-headings inside.
+
+Chapters 2-4 are discovered and read once (cached by path and mtime), the
+per-objective literature/findings excerpts are extracted up front, and the
+sections are generated concurrently through a SectionGraph that streams
+them to the preview in chapter order.
 """
 
 import os
 import re
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
+from services.context_packer import context_packer, PassageIndex
+from services.section_graph import SectionGraph
+
+
+# Concurrent LLM calls while generating the chapter's sections
+MAX_CONCURRENT_SECTIONS = 4
+
+# Token budgets for the per-objective excerpts (the prompt's 8000-char slots)
+LITERATURE_TOKEN_BUDGET = 2000
+FINDINGS_TOKEN_BUDGET = 2000
+
+# resolved path -> (mtime_ns, file content); latest version only, LRU-bounded
+_chapter_file_cache: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+CHAPTER_FILE_CACHE_SIZE = 32
+
+
+def _find_chapter_file(number: int, explicit_path: Optional[str], search_dirs: List[Path]) -> Optional[Path]:
+    """Explicit path first, then Chapter_N*/chapter_N* in each search dir."""
+    candidates = [Path(explicit_path)] if explicit_path else []
+    for d in search_dirs:
+        if d.exists():
+            candidates.extend(d.glob(f"Chapter_{number}*.md"))
+            candidates.extend(d.glob(f"chapter_{number}*.md"))
+    for path in candidates:
+        if path.exists():
+            return path
+    return None
+
+
+def _read_chapter(path: Path) -> str:
+    """Read a chapter file, reusing the cached text until it changes."""
+    key = str(path.resolve())
+    mtime = path.stat().st_mtime_ns
+    cached = _chapter_file_cache.get(key)
+    if cached and cached[0] == mtime:
+        _chapter_file_cache.move_to_end(key)
+        return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    _chapter_file_cache[key] = (mtime, content)
+    _chapter_file_cache.move_to_end(key)
+    while len(_chapter_file_cache) > CHAPTER_FILE_CACHE_SIZE:
+        _chapter_file_cache.popitem(last=False)
+    return content
+
+
+def load_chapter_context(search_dirs: List[Path], explicit_paths: Dict[int, Optional[str]]) -> Dict[int, Tuple[Optional[Path], str]]:
+    """
+    Locate and read earlier chapters once for the whole chapter build.
+    
+    Returns:
+        {chapter number: (path or None, content)}
+    """
+    context = {}
+    for number, explicit in explicit_paths.items():
+        path = _find_chapter_file(number, explicit, search_dirs)
+        context[number] = (path, _read_chapter(path) if path else "")
+    return context
+
 
 def _strip_subheadings(text: str) -> str:
     """Remove any accidental sub-headings the LLM might have added."""
@@ -91,71 +156,26 @@ async def generate_chapter5_v2(
         WORKSPACES_DIR / "default" / "chapters",
     ]
     
-    # ============ LOAD CHAPTER 2 CONTENT ============
-    chapter_two_content = ""
-    ch2_search_paths = [chapter_two_filepath] if chapter_two_filepath else []
-    for d in search_dirs:
-        if d.exists():
-            ch2_search_paths.extend(list(d.glob("Chapter_2*.md")))
-            ch2_search_paths.extend(list(d.glob("chapter_2*.md")))
-    
-    for path in ch2_search_paths:
-        if path and isinstance(path, (str, Path)):
-            p = Path(path) if isinstance(path, str) else path
-            if p.exists():
-                with open(p, 'r', encoding='utf-8') as f:
-                    chapter_two_content = f.read()
-                print(f"✓ Loaded Chapter 2: {p}")
-                if job_id and session_id:
-                    await events.publish(job_id, "log", {"message": f"📖 Loaded Chapter 2: {p.name}"}, session_id=session_id)
-                break
-    
-                if job_id and session_id:
-                    await events.publish(job_id, "log", {"message": f"📖 Loaded Chapter 2: {p.name}"}, session_id=session_id)
-                break
-    
-    # ============ LOAD CHAPTER 3 CONTENT ============
-    chapter_three_content = ""
-    ch3_search_paths = [chapter_three_filepath] if chapter_three_filepath else []
-    for d in search_dirs:
-        if d.exists():
-            ch3_search_paths.extend(list(d.glob("Chapter_3*.md")))
-            ch3_search_paths.extend(list(d.glob("chapter_3*.md")))
-            
-    for path in ch3_search_paths:
-        if path and isinstance(path, (str, Path)):
-            p = Path(path) if isinstance(path, str) else path
-            if p.exists():
-                with open(p, 'r', encoding='utf-8') as f:
-                    chapter_three_content = f.read()
-                print(f"✓ Loaded Chapter 3: {p}")
-                if job_id and session_id:
-                    await events.publish(job_id, "log", {"message": f"🔬 Loaded Chapter 3: {p.name}"}, session_id=session_id)
-                break
-
-    # ============ LOAD CHAPTER 4 CONTENT ============
-    chapter_four_content = ""
-    ch4_search_paths = [chapter_four_filepath] if chapter_four_filepath else []
-    for d in search_dirs:
-        if d.exists():
-            ch4_search_paths.extend(list(d.glob("Chapter_4*.md")))
-            ch4_search_paths.extend(list(d.glob("chapter_4*.md")))
-    
-    for path in ch4_search_paths:
-        if path and isinstance(path, (str, Path)):
-            p = Path(path) if isinstance(path, str) else path
-            if p.exists():
-                with open(p, 'r', encoding='utf-8') as f:
-                    chapter_four_content = f.read()
-                print(f"✓ Loaded Chapter 4: {p}")
-                if job_id and session_id:
-                    await events.publish(job_id, "log", {"message": f"📊 Loaded Chapter 4: {p.name}"}, session_id=session_id)
-                break
+    # ============ LOAD CHAPTERS 2-4 (once, shared by every section) ============
+    context = load_chapter_context(search_dirs, {
+        2: chapter_two_filepath,
+        3: chapter_three_filepath,
+        4: chapter_four_filepath,
+    })
+    chapter_two_content = context[2][1]
+    chapter_three_content = context[3][1]
+    chapter_four_content = context[4][1]
+    
+    for number, icon in ((2, "📖"), (3, "🔬"), (4, "📊")):
+        path = context[number][0]
+        if path:
+            print(f"✓ Loaded Chapter {number}: {path}")
+            if job_id and session_id:
+                await events.publish(job_id, "log", {"message": f"{icon} Loaded Chapter {number}: {path.name}"}, session_id=session_id)
     
     # ============ GENERATE CHAPTER 5 ============
     chapter_content = "# CHAPTER FIVE\n\n# RESULTS AND DISCUSSION\n\n"
     
-    # --- 5.0 Introduction ---
     # Try to load Golden Thread variables for context
     objective_variables = {}
     try:
@@ -174,10 +194,9 @@ async def generate_chapter5_v2(
         for o_num, v_list in objective_variables.items():
             vars_ctx += f"- Objective {o_num}: {', '.join(v_list)}\n"
             
-    # --- 5.0 Introduction ---
-    if job_id and session_id:
-        await events.publish(job_id, "log", {"message": "✍️ Generating 5.0 Introduction..."}, session_id=session_id)
+    graph = SectionGraph(max_concurrency=MAX_CONCURRENT_SECTIONS)
     
+    # --- 5.0 Introduction ---
     intro_prompt = f"""Write section "5.0 Introduction" for Chapter 5 (Results and Discussion) of a PhD thesis.
 
 TOPIC: {topic}
@@ -207,34 +226,29 @@ CRITICAL REQUIREMENTS:
 - Do NOT use bullet points or numbered lists in the prose
 - Do NOT repeat the full topic title in sentences - use "this study" or "the research" instead"""
 
-    intro_content = await deepseek_direct_service.generate_content(
-        prompt=intro_prompt,
-        system_prompt="You are an expert PhD thesis writer. Write formal academic prose in UK English. CRITICAL: Output ONLY paragraphs - absolutely NO headings (no #, no ##, no ###), NO numbered sections like 5.0.1, NO bullet points. Pure flowing academic prose only.",
-        temperature=0.7,
-        max_tokens=2000
-    )
-    
-    # Strip any accidental headings the LLM might have added
-    intro_content = _strip_subheadings(intro_content)
-    
-    chapter_content += f"## 5.0 Introduction\n\n{intro_content}\n\n"
+    async def write_introduction(_deps):
+        intro_content = await deepseek_direct_service.generate_content(
+            prompt=intro_prompt,
+            system_prompt="You are an expert PhD thesis writer. Write formal academic prose in UK English. CRITICAL: Output ONLY paragraphs - absolutely NO headings (no #, no ##, no ###), NO numbered sections like 5.0.1, NO bullet points. Pure flowing academic prose only.",
+            temperature=0.7,
+            max_tokens=2000
+        )
+        # Strip any accidental headings the LLM might have added
+        return _strip_subheadings(intro_content)
     
-    if job_id and session_id:
-        await events.publish(job_id, "response_chunk", {
-            "chunk": f"## 5.0 Introduction\n\n{intro_content}\n\n",
-            "accumulated": chapter_content
-        }, session_id=session_id)
+    graph.add("intro", "## 5.0 Introduction", write_introduction,
+              log_message="✍️ Generating 5.0 Introduction...")
     
     # --- 5.1, 5.2, ... Discussion of each Objective ---
-    for i, objective in enumerate(objectives):
+    # Chapter 2 is indexed once for every objective's excerpt
+    chapter_two_index = context_packer.index_text(chapter_two_content, "chapter_2", "Chapter 2") if chapter_two_content else None
+    
+    def add_discussion(i: int, objective: str):
         section_num = f"5.{i+1}"
         obj_num_word = ["One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight"][i] if i < 8 else str(i+1)
         
-        if job_id and session_id:
-            await events.publish(job_id, "log", {"message": f"✍️ Generating {section_num} Discussion of Objective {obj_num_word}..."}, session_id=session_id)
-        
         # Extract relevant literature excerpts for this objective
-        lit_excerpt = _extract_relevant_literature(chapter_two_content, objective)
+        lit_excerpt = _extract_relevant_literature(chapter_two_content, objective, chapter_two_index)
         
         # Extract relevant findings from Chapter 4 for this objective
         findings_excerpt = _extract_relevant_findings(chapter_four_content, objective, i+1)
@@ -283,25 +297,42 @@ CRITICAL REQUIREMENTS:
 - Make specific comparisons: "While Smith (2024) found X, this study found Y, which suggests..."
 - Use connectives: Furthermore, Moreover, Conversely, In contrast, Similarly, Consequently"""
 
-        discussion_content = await deepseek_direct_service.generate_content(
-            prompt=discussion_prompt,
-            system_prompt="You are an expert PhD thesis writer. Write formal academic prose in UK English. CRITICAL: Output ONLY paragraphs - absolutely NO headings (no #, no ##, no ###), NO numbered sections like 5.1.1, NO bullet points, NO bold headers. Pure flowing academic prose with citations only.",
-            temperature=0.7,
-            max_tokens=4000
-        )
-        
-        # Strip any accidental headings the LLM might have added
-        discussion_content = _strip_subheadings(discussion_content)
-        
-        section_heading = f"## {section_num} Discussion of Objective {obj_num_word}: {objective}"
-        chapter_content += f"{section_heading}\n\n{discussion_content}\n\n"
+        async def write_discussion(_deps):
+            discussion_content = await deepseek_direct_service.generate_content(
+                prompt=discussion_prompt,
+                system_prompt="You are an expert PhD thesis writer. Write formal academic prose in UK English. CRITICAL: Output ONLY paragraphs - absolutely NO headings (no #, no ##, no ###), NO numbered sections like 5.1.1, NO bullet points, NO bold headers. Pure flowing academic prose with citations only.",
+                temperature=0.7,
+                max_tokens=4000
+            )
+            # Strip any accidental headings the LLM might have added
+            return _strip_subheadings(discussion_content)
         
+        graph.add(
+            f"objective_{i+1}",
+            f"## {section_num} Discussion of Objective {obj_num_word}: {objective}",
+            write_discussion,
+            log_message=f"✍️ Generating {section_num} Discussion of Objective {obj_num_word}..."
+        )
+    
+    for i, objective in enumerate(objectives):
+        add_discussion(i, objective)
+    
+    async def on_start(node):
+        if job_id and session_id and node.log_message:
+            await events.publish(job_id, "log", {"message": node.log_message}, session_id=session_id)
+    
+    async def on_ready(node, content):
+        nonlocal chapter_content
+        section_text = graph.render(node, content)
+        chapter_content += section_text
         if job_id and session_id:
             await events.publish(job_id, "response_chunk", {
-                "chunk": f"{section_heading}\n\n{discussion_content}\n\n",
+                "chunk": section_text,
                 "accumulated": chapter_content
             }, session_id=session_id)
     
+    await graph.run(on_start=on_start, on_ready=on_ready)
+    
     # ============ SAVE FILE ============
     safe_topic = re.sub(r'[^\w\s-]', '', topic)[:50].replace(' ', '_')
     filename = f"Chapter_5_Results_Discussion_{safe_topic}.md"
@@ -331,38 +362,17 @@ CRITICAL REQUIREMENTS:
     }
 
 
-def _extract_relevant_literature(chapter_two_content: str, objective: str) -> str:
-    """Extract sections of Chapter 2 most relevant to this objective."""
+def _extract_relevant_literature(chapter_two_content: str, objective: str, index: Optional[PassageIndex] = None) -> str:
+    """Extract the paragraphs of Chapter 2 most relevant to this objective."""
     if not chapter_two_content:
         return ""
     
-    # Get keywords from objective
-    keywords = [w.lower() for w in objective.split() if len(w) > 4]
-    
-    # Split Chapter 2 into paragraphs
-    paragraphs = chapter_two_content.split('\n\n')
-    
-    # Score each paragraph by keyword matches
-    scored = []
-    for para in paragraphs:
-        para_lower = para.lower()
-        score = sum(1 for kw in keywords if kw in para_lower)
-        if score > 0:
-            scored.append((score, para))
+    # Callers handling many objectives pass in a prebuilt index
+    if index is None:
+        index = context_packer.index_text(chapter_two_content, "chapter_2", "Chapter 2")
     
-    # Return top relevant paragraphs (up to 3000 words)
-    scored.sort(key=lambda x: x[0], reverse=True)
-    
-    result = []
-    word_count = 0
-    for score, para in scored[:15]:
-        words = len(para.split())
-        if word_count + words > 3000:
-            break
-        result.append(para)
-        word_count += words
-    
-    return '\n\n'.join(result)
+    packed = index.pack(objective, LITERATURE_TOKEN_BUDGET, max_per_source=None, with_headers=False)
+    return packed.render(with_headers=False)
 
 
 def _extract_relevant_findings(chapter_four_content: str, objective: str, obj_num: int) -> str:
@@ -383,30 +393,10 @@ def _extract_relevant_findings(chapter_four_content: str, objective: str, obj_nu
             if match:
                 return match.group(0)[:4000]
     
-    # Fallback: get keywords from objective and find relevant paragraphs
-    keywords = [w.lower() for w in objective.split() if len(w) > 4]
-    
-    paragraphs = chapter_four_content.split('\n\n')
-    
-    scored = []
-    for para in paragraphs:
-        para_lower = para.lower()
-        score = sum(1 for kw in keywords if kw in para_lower)
-        if score > 0:
-            scored.append((score, para))
-    
-    scored.sort(key=lambda x: x[0], reverse=True)
-    
-    result = []
-    word_count = 0
-    for score, para in scored[:10]:
-        words = len(para.split())
-        if word_count + words > 2000:
-            break
-        result.append(para)
-        word_count += words
-    
-    return '\n\n'.join(result)
+    # Fallback: rank Chapter 4 paragraphs against the objective
+    index = context_packer.index_text(chapter_four_content, "chapter_4", "Chapter 4")
+    packed = index.pack(objective, FINDINGS_TOKEN_BUDGET, max_per_source=None, with_headers=False)
+    return packed.render(with_headers=False)
 
 
 # Backwards compatibility - alias the old function name
@@ -14,7 +14,9 @@ Structure:
 6.6 Limitations of the Study
 6.7 Suggestions for Further Research
 
-All content is LLM-generated, not template-filled.
+All content is LLM-generated, not template-filled. Every section only
+depends on the shared context built up front, so the sections are generated
+concurrently through a SectionGraph and streamed in chapter order.
 """
 
 import asyncio
@@ -24,6 +26,12 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from services.section_graph import SectionGraph
+
+
+# Concurrent LLM calls while generating the chapter's sections
+MAX_CONCURRENT_SECTIONS = 4
+
 
 async def _generate_content(prompt: str, max_tokens: int = 1500) -> str:
     """Helper to generate content using DeepSeek."""
@@ -35,6 +43,14 @@ async def _generate_content(prompt: str, max_tokens: int = 1500) -> str:
     )
 
 
+def _section(prompt: str, max_tokens: int):
+    """SectionGraph generator for a single stripped LLM call."""
+    async def generate(_deps: Dict[str, str]) -> str:
+        content = await _generate_content(prompt, max_tokens=max_tokens)
+        return content.strip()
+    return generate
+
+
 def _extract_short_theme(objective: str, max_words: int = 5) -> str:
     """Extract a short theme from an objective for section headings."""
     # Remove common prefixes
@@ -102,10 +118,13 @@ async def generate_chapter6(
     chapter = "# CHAPTER SIX\n# SUMMARY, CONCLUSIONS AND RECOMMENDATIONS\n\n"
     
     num_objectives = len(objectives)
+    objectives_text = "\n".join([f"{i}. {obj}" for i, obj in enumerate(objectives, 1)])
     
-    # ========== 6.0 Introduction ==========
-    await events.publish(job_id, "log", {"message": "📝 Generating 6.0 Introduction..."}, session_id=session_id)
+    # Every section's prompt is built from the shared context above, so none
+    # depends on another and they can all be generated at once
+    graph = SectionGraph(max_concurrency=MAX_CONCURRENT_SECTIONS)
     
+    # ========== 6.0 Introduction ==========
     intro_prompt = f"""Write the introduction section (6.0) for Chapter Six: Summary, Conclusions and Recommendations.
 
 TOPIC: {topic}
@@ -125,14 +144,10 @@ Write 2-3 paragraphs that:
 
 Write the content now:"""
 
-    intro_content = await _generate_content(intro_prompt, max_tokens=800)
-    chapter += "## 6.0 Introduction\n\n"
-    chapter += intro_content.strip() + "\n\n"
+    graph.add("intro", "## 6.0 Introduction", _section(intro_prompt, 800),
+              log_message="📝 Generating 6.0 Introduction...")
     
     # ========== 6.1 Summary of the Study ==========
-    await events.publish(job_id, "log", {"message": "📝 Generating 6.1 Summary of the Study..."}, session_id=session_id)
-    
-    objectives_text = "\n".join([f"{i}. {obj}" for i, obj in enumerate(objectives, 1)])
     
     summary_prompt = f"""Write section 6.1 Summary of the Study for Chapter Six.
 
@@ -162,15 +177,10 @@ Write 4-5 substantial paragraphs covering:
 
 Write the content now:"""
 
-    summary_content = await _generate_content(summary_prompt, max_tokens=1500)
-    chapter += "## 6.1 Summary of the Study\n\n"
-    chapter += summary_content.strip() + "\n\n"
+    graph.add("summary", "## 6.1 Summary of the Study", _section(summary_prompt, 1500),
+              log_message="📝 Generating 6.1 Summary of the Study...")
     
     # ========== 6.2 Summary of Key Findings (per objective) ==========
-    await events.publish(job_id, "log", {"message": "📝 Generating 6.2 Summary of Key Findings..."}, session_id=session_id)
-    
-    chapter += "## 6.2 Summary of Key Findings\n\n"
-    
     findings_intro_prompt = f"""Write a brief introduction (1 paragraph) for the Summary of Key Findings section.
 
 State that this section presents a summary of the key findings organised by research objective.
@@ -181,16 +191,14 @@ Mention there were {num_objectives} objectives guiding this study.
 
 Write ONE paragraph only:"""
 
-    findings_intro = await _generate_content(findings_intro_prompt, max_tokens=300)
-    chapter += findings_intro.strip() + "\n\n"
+    graph.add("findings_intro", "## 6.2 Summary of Key Findings", _section(findings_intro_prompt, 300),
+              log_message="📝 Generating 6.2 Summary of Key Findings...")
     
     # Generate findings summary for each objective
     for i, objective in enumerate(objectives, 1):
         short_theme = _extract_short_theme(objective)
         obj_word = _number_to_words(i)
         
-        await events.publish(job_id, "log", {"message": f"📝 Generating findings for Objective {i}..."}, session_id=session_id)
-        
         finding_prompt = f"""Write the summary of key findings for Objective {i}.
 
 OBJECTIVE {i}: {objective}
@@ -218,15 +226,11 @@ Write 2-3 paragraphs summarising the KEY FINDINGS for this objective:
 
 Write the content now:"""
 
-        finding_content = await _generate_content(finding_prompt, max_tokens=800)
-        chapter += f"### 6.2.{i} Findings on Objective {obj_word}: {short_theme}\n\n"
-        chapter += finding_content.strip() + "\n\n"
+        graph.add(f"finding_{i}", f"### 6.2.{i} Findings on Objective {obj_word}: {short_theme}",
+                  _section(finding_prompt, 800),
+                  log_message=f"📝 Generating findings for Objective {i}...")
     
     # ========== 6.3 Conclusions (per objective) ==========
-    await events.publish(job_id, "log", {"message": "📝 Generating 6.3 Conclusions..."}, session_id=session_id)
-    
-    chapter += "## 6.3 Conclusions\n\n"
-    
     conclusions_intro_prompt = f"""Write a brief introduction (1 paragraph) for the Conclusions section.
 
 State that based on the findings presented, the following conclusions are drawn in relation to each research objective.
@@ -236,16 +240,14 @@ State that based on the findings presented, the following conclusions are drawn
 
 Write ONE paragraph only:"""
 
-    conclusions_intro = await _generate_content(conclusions_intro_prompt, max_tokens=300)
-    chapter += conclusions_intro.strip() + "\n\n"
+    graph.add("conclusions_intro", "## 6.3 Conclusions", _section(conclusions_intro_prompt, 300),
+              log_message="📝 Generating 6.3 Conclusions...")
     
     # Generate conclusion for each objective
     for i, objective in enumerate(objectives, 1):
         short_theme = _extract_short_theme(objective)
         obj_word = _number_to_words(i)
         
-        await events.publish(job_id, "log", {"message": f"📝 Generating conclusion for Objective {i}..."}, session_id=session_id)
-        
         conclusion_prompt = f"""Write the conclusion for Objective {i}.
 
 OBJECTIVE {i}: {objective}
@@ -271,13 +273,11 @@ Write 2-3 paragraphs that:
 
 Write the content now:"""
 
-        conclusion_content = await _generate_content(conclusion_prompt, max_tokens=800)
-        chapter += f"### 6.3.{i} Conclusion on Objective {obj_word}: {short_theme}\n\n"
-        chapter += conclusion_content.strip() + "\n\n"
+        graph.add(f"conclusion_{i}", f"### 6.3.{i} Conclusion on Objective {obj_word}: {short_theme}",
+                  _section(conclusion_prompt, 800),
+                  log_message=f"📝 Generating conclusion for Objective {i}...")
     
     # ========== 6.4 Recommendations ==========
-    await events.publish(job_id, "log", {"message": "📝 Generating 6.4 Recommendations..."}, session_id=session_id)
-    
     recommendations_prompt = f"""Write section 6.4 Recommendations for Chapter Six.
 
 TOPIC: {topic}
@@ -313,13 +313,10 @@ Under each, write flowing prose with numbered recommendations embedded.
 
 Write the content now:"""
 
-    recommendations_content = await _generate_content(recommendations_prompt, max_tokens=2000)
-    chapter += "## 6.4 Recommendations\n\n"
-    chapter += recommendations_content.strip() + "\n\n"
+    graph.add("recommendations", "## 6.4 Recommendations", _section(recommendations_prompt, 2000),
+              log_message="📝 Generating 6.4 Recommendations...")
     
     # ========== 6.5 Contribution to Knowledge ==========
-    await events.publish(job_id, "log", {"message": "📝 Generating 6.5 Contribution to Knowledge..."}, session_id=session_id)
-    
     contribution_prompt = f"""Write section 6.5 Contribution to Knowledge for Chapter Six.
 
 TOPIC: {topic}
@@ -341,13 +338,10 @@ Write 3-4 paragraphs explaining how this study contributes to:
 
 Write the content now:"""
 
-    contribution_content = await _generate_content(contribution_prompt, max_tokens=1200)
-    chapter += "## 6.5 Contribution to Knowledge\n\n"
-    chapter += contribution_content.strip() + "\n\n"
+    graph.add("contribution", "## 6.5 Contribution to Knowledge", _section(contribution_prompt, 1200),
+              log_message="📝 Generating 6.5 Contribution to Knowledge...")
     
     # ========== 6.6 Limitations of the Study ==========
-    await events.publish(job_id, "log", {"message": "📝 Generating 6.6 Limitations..."}, session_id=session_id)
-    
     limitations_prompt = f"""Write section 6.6 Limitations of the Study for Chapter Six.
 
 TOPIC: {topic}
@@ -371,13 +365,10 @@ Write 3-4 paragraphs acknowledging the limitations:
 
 Write the content now:"""
 
-    limitations_content = await _generate_content(limitations_prompt, max_tokens=1000)
-    chapter += "## 6.6 Limitations of the Study\n\n"
-    chapter += limitations_content.strip() + "\n\n"
+    graph.add("limitations", "## 6.6 Limitations of the Study", _section(limitations_prompt, 1000),
+              log_message="📝 Generating 6.6 Limitations...")
     
     # ========== 6.7 Suggestions for Further Research ==========
-    await events.publish(job_id, "log", {"message": "📝 Generating 6.7 Suggestions for Further Research..."}, session_id=session_id)
-    
     future_prompt = f"""Write section 6.7 Suggestions for Further Research for Chapter Six.
 
 TOPIC: {topic}
@@ -406,9 +397,23 @@ Write 3-4 paragraphs suggesting future research directions:
 
 Write the content now:"""
 
-    future_content = await _generate_content(future_prompt, max_tokens=1000)
-    chapter += "## 6.7 Suggestions for Further Research\n\n"
-    chapter += future_content.strip() + "\n\n"
+    graph.add("future_research", "## 6.7 Suggestions for Further Research", _section(future_prompt, 1000),
+              log_message="📝 Generating 6.7 Suggestions for Further Research...")
+    
+    async def on_start(node):
+        await events.publish(job_id, "log", {"message": node.log_message}, session_id=session_id)
+    
+    async def on_ready(node, content):
+        nonlocal chapter
+        section_text = graph.render(node, content)
+        chapter += section_text
+        if job_id:
+            await events.publish(job_id, "response_chunk", {
+                "chunk": section_text,
+                "accumulated": chapter
+            }, session_id=session_id)
+    
+    await graph.run(on_start=on_start, on_ready=on_ready)
     
     await events.publish(job_id, "log", {"message": "✅ Chapter 6 generation complete!"}, session_id=session_id)
     
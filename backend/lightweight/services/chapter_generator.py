@@ -13,7 +13,7 @@ from typing import Dict, List, Any, Optional
 from docx import Document
 from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
-from app.services.cited_content_generator import cited_content_generator
+from services.cited_content_generator import cited_content_generator
 
 
 class ChapterGenerator:
@@ -62,7 +62,8 @@ class ChapterGenerator:
                 section_title="Setting the Scene",
                 topic=f"{topic} in {case_study}",
                 word_count=500,
-                target_density=0.75
+                target_density=0.75,
+                mode="batched"
             )
         except Exception as e:
             print(f"   ⚠️  Error generating cited content: {str(e)[:100]}")
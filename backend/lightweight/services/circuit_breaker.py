@@ -2,10 +2,21 @@
 Circuit Breaker Pattern
 
 Prevents cascading failures by stopping requests to failing services.
+
+State is authoritative in process memory, so protected calls never wait on
+Redis. Each breaker tracks outcomes in a sliding time window and opens on
+failure *rate* (with a minimum failure count), not a bare counter. Workers
+share their window counts and state transitions through Redis in a
+background sync that runs at most every `sync_interval` seconds.
 """
+import os
+import json
+import time
+import socket
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Optional, Tuple
 from enum import Enum
 from core.cache import cache
 
@@ -16,127 +27,246 @@ class CircuitState(Enum):
     HALF_OPEN = "half_open"  # Testing if service recovered
 
 
+# Identifies this process in the shared per-breaker worker hash
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Process-wide breaker metrics: "<name>:<from>-><to>" transition counts plus
+# per-breaker call/rejection counters
+circuit_metrics: Dict[str, int] = {}
+
+
+def _incr_metric(key: str, amount: int = 1):
+    circuit_metrics[key] = circuit_metrics.get(key, 0) + amount
+
+
 class CircuitBreaker:
     """Circuit breaker for service calls."""
-    
+
     def __init__(
         self,
         name: str,
         failure_threshold: int = 5,
         recovery_timeout: int = 60,
-        success_threshold: int = 2
+        success_threshold: int = 2,
+        failure_rate_threshold: float = 0.5,
+        window_seconds: int = 60,
+        sync_interval: float = 5.0
     ):
         self.name = name
-        self.failure_threshold = failure_threshold
+        self.failure_threshold = failure_threshold  # Min failures in window before opening
         self.recovery_timeout = recovery_timeout
         self.success_threshold = success_threshold
-        
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_seconds = window_seconds
+        self.sync_interval = sync_interval
+
         # State tracking
         self.state = CircuitState.CLOSED
-        self.failure_count = 0
-        self.success_count = 0
+        self.success_count = 0  # Consecutive successes while HALF_OPEN
         self.last_failure_time: Optional[datetime] = None
         self.last_state_change: Optional[datetime] = None
-    
-    async def _get_state(self) -> Dict:
-        """Get state from cache."""
-        state_key = f"circuit:{self.name}"
-        state_data = await cache.get(state_key)
-        if state_data:
-            self.state = CircuitState(state_data.get("state", "closed"))
-            self.failure_count = state_data.get("failure_count", 0)
-            self.success_count = state_data.get("success_count", 0)
-            if state_data.get("last_failure_time"):
-                self.last_failure_time = datetime.fromisoformat(state_data["last_failure_time"])
-            if state_data.get("last_state_change"):
-                self.last_state_change = datetime.fromisoformat(state_data["last_state_change"])
-        return state_data or {}
-    
-    async def _save_state(self):
-        """Save state to cache."""
-        state_key = f"circuit:{self.name}"
-        state_data = {
-            "state": self.state.value,
-            "failure_count": self.failure_count,
-            "success_count": self.success_count,
-            "last_failure_time": self.last_failure_time.isoformat() if self.last_failure_time else None,
-            "last_state_change": self.last_state_change.isoformat() if self.last_state_change else None
-        }
-        await cache.set(state_key, state_data, ttl=3600)
-    
-    async def call(self, func, *args, **kwargs):
-        """Call function with circuit breaker protection."""
-        await self._get_state()
-        
-        # Check if circuit should transition
+        self._opened_at: float = 0.0  # Wall clock, shared with other workers
+        self._window: Deque[Tuple[float, bool]] = deque()  # (monotonic time, success)
+
+        # Shared view from the last sync
+        self._global_failures = 0
+        self._global_total = 0
+        self._last_sync = 0.0
+        self._publish_state = False
+        self._sync_task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Sliding window
+    # ------------------------------------------------------------------
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+
+    def _window_counts(self) -> Tuple[int, int]:
+        """Return (failures, total) for this process's window."""
+        self._prune()
+        failures = sum(1 for _, ok in self._window if not ok)
+        return failures, len(self._window)
+
+    @property
+    def failure_count(self) -> int:
+        return self._window_counts()[0]
+
+    def _should_open(self, failures: int, total: int) -> bool:
+        return (
+            failures >= self.failure_threshold
+            and total > 0
+            and failures / total >= self.failure_rate_threshold
+        )
+
+    # ------------------------------------------------------------------
+    # State transitions
+    # ------------------------------------------------------------------
+
+    def _transition(self, new_state: CircuitState, opened_at: Optional[float] = None, publish: bool = True):
+        old_state = self.state
+        if old_state == new_state:
+            return
+
+        self.state = new_state
+        self.last_state_change = datetime.now()
+        self.success_count = 0
+        if new_state == CircuitState.OPEN:
+            self._opened_at = opened_at or time.time()
+        elif new_state == CircuitState.CLOSED:
+            self._window.clear()
+
+        self._publish_state = self._publish_state or publish
+        _incr_metric(f"{self.name}:{old_state.value}->{new_state.value}")
+
+        if new_state == CircuitState.OPEN:
+            print(f"⚠️ Circuit {self.name} entering OPEN state (from {old_state.value})")
+        elif new_state == CircuitState.HALF_OPEN:
+            print(f"🔄 Circuit {self.name} entering HALF_OPEN state")
+        else:
+            print(f"✅ Circuit {self.name} recovered, entering CLOSED state")
+
+    def _allow_request(self) -> bool:
         if self.state == CircuitState.OPEN:
-            if self.last_failure_time:
-                elapsed = (datetime.now() - self.last_failure_time).total_seconds()
-                if elapsed >= self.recovery_timeout:
-                    # Try to recover
-                    self.state = CircuitState.HALF_OPEN
-                    self.success_count = 0
-                    self.last_state_change = datetime.now()
-                    await self._save_state()
-                    print(f"🔄 Circuit {self.name} entering HALF_OPEN state")
-                else:
-                    # Still in open state, reject immediately
-                    raise Exception(f"Circuit breaker {self.name} is OPEN. Service unavailable.")
-        
-        # Attempt call
-        try:
-            result = await func(*args, **kwargs)
-            
-            # Success
+            if time.time() - self._opened_at >= self.recovery_timeout:
+                # Try to recover
+                self._transition(CircuitState.HALF_OPEN)
+            else:
+                return False
+        return True
+
+    def _record(self, success: bool):
+        self._window.append((time.monotonic(), success))
+
+        if success:
             if self.state == CircuitState.HALF_OPEN:
                 self.success_count += 1
                 if self.success_count >= self.success_threshold:
-                    # Recovered
-                    self.state = CircuitState.CLOSED
-                    self.failure_count = 0
-                    self.success_count = 0
-                    self.last_state_change = datetime.now()
-                    await self._save_state()
-                    print(f"✅ Circuit {self.name} recovered, entering CLOSED state")
-            elif self.state == CircuitState.CLOSED:
-                # Reset failure count on success
-                if self.failure_count > 0:
-                    self.failure_count = max(0, self.failure_count - 1)
-                    await self._save_state()
-            
-            return result
-            
+                    self._transition(CircuitState.CLOSED)
+            return
+
+        self.last_failure_time = datetime.now()
+        if self.state == CircuitState.HALF_OPEN:
+            # Failed during recovery, go back to open
+            self._transition(CircuitState.OPEN)
+        elif self.state == CircuitState.CLOSED:
+            failures, total = self._window_counts()
+            if self._should_open(failures, total):
+                self._transition(CircuitState.OPEN)
+
+    # ------------------------------------------------------------------
+    # Cross-worker sync
+    # ------------------------------------------------------------------
+
+    def _maybe_sync(self):
+        """Schedule a background sync if one is due. Never blocks the caller."""
+        now = time.monotonic()
+        due = self._publish_state or now - self._last_sync >= self.sync_interval
+        if not due or (self._sync_task and not self._sync_task.done()):
+            return
+        self._last_sync = now
+        try:
+            self._sync_task = asyncio.get_running_loop().create_task(self._sync())
+        except RuntimeError:
+            pass  # No running loop
+
+    async def _sync(self):
+        """Share this worker's window counts and merge everyone else's."""
+        try:
+            client = await cache.get_client()
+            failures, total = self._window_counts()
+            now = time.time()
+            workers_key = f"circuit:{self.name}:workers"
+            state_key = f"circuit:{self.name}"
+
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hset(workers_key, WORKER_ID, json.dumps({"failures": failures, "total": total, "ts": now}))
+                pipe.expire(workers_key, self.window_seconds * 2)
+                if self._publish_state:
+                    pipe.set(state_key, json.dumps({
+                        "state": self.state.value,
+                        "opened_at": self._opened_at,
+                        "worker": WORKER_ID,
+                        "ts": now
+                    }), ex=3600)
+                pipe.hgetall(workers_key)
+                pipe.get(state_key)
+                results = await pipe.execute()
+            self._publish_state = False
+
+            workers, shared_state = results[-2], results[-1]
+            global_failures = global_total = 0
+            for raw in (workers or {}).values():
+                entry = json.loads(raw)
+                if now - entry.get("ts", 0) <= self.window_seconds:
+                    global_failures += entry.get("failures", 0)
+                    global_total += entry.get("total", 0)
+            self._global_failures, self._global_total = global_failures, global_total
+
+            if self.state != CircuitState.CLOSED:
+                return
+
+            # Another worker opened the circuit recently - follow it
+            if shared_state:
+                shared = json.loads(shared_state)
+                opened_at = shared.get("opened_at", 0)
+                if (shared.get("state") == CircuitState.OPEN.value
+                        and shared.get("worker") != WORKER_ID
+                        and now - opened_at < self.recovery_timeout):
+                    self._transition(CircuitState.OPEN, opened_at=opened_at, publish=False)
+                    return
+
+            # Failures spread across workers add up to an outage
+            if self._should_open(global_failures, global_total):
+                self._transition(CircuitState.OPEN)
         except Exception as e:
-            # Failure
-            self.failure_count += 1
-            self.last_failure_time = datetime.now()
-            
-            if self.state == CircuitState.HALF_OPEN:
-                # Failed during recovery, go back to open
-                self.state = CircuitState.OPEN
-                self.success_count = 0
-                self.last_state_change = datetime.now()
-                await self._save_state()
-                print(f"❌ Circuit {self.name} failed during recovery, entering OPEN state")
-            elif self.failure_count >= self.failure_threshold:
-                # Too many failures, open circuit
-                self.state = CircuitState.OPEN
-                self.last_state_change = datetime.now()
-                await self._save_state()
-                print(f"⚠️ Circuit {self.name} opened after {self.failure_count} failures")
-            
-            await self._save_state()
+            # Redis trouble must never break protected calls
+            print(f"⚠️ Circuit {self.name} sync failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def call(self, func, *args, **kwargs):
+        """Call function with circuit breaker protection."""
+        self._maybe_sync()
+        _incr_metric(f"{self.name}:calls")
+
+        if not self._allow_request():
+            # Still in open state, reject immediately
+            _incr_metric(f"{self.name}:rejected")
+            raise Exception(f"Circuit breaker {self.name} is OPEN. Service unavailable.")
+
+        # Attempt call
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            _incr_metric(f"{self.name}:failures")
+            self._record(False)
+            self._maybe_sync()
             raise
-    
+
+        self._record(True)
+        return result
+
     async def get_status(self) -> Dict:
         """Get circuit breaker status."""
-        await self._get_state()
+        failures, total = self._window_counts()
+        prefix = f"{self.name}:"
         return {
             "name": self.name,
             "state": self.state.value,
-            "failure_count": self.failure_count,
+            "failure_count": failures,
             "success_count": self.success_count,
-            "last_failure_time": self.last_failure_time.isoformat() if self.last_failure_time else None
+            "window_total": total,
+            "failure_rate": failures / total if total else 0.0,
+            "global_failure_count": self._global_failures,
+            "global_window_total": self._global_total,
+            "last_failure_time": self.last_failure_time.isoformat() if self.last_failure_time else None,
+            "last_state_change": self.last_state_change.isoformat() if self.last_state_change else None,
+            "metrics": {k[len(prefix):]: v for k, v in circuit_metrics.items() if k.startswith(prefix)}
         }
 
 
@@ -148,7 +278,3 @@ circuit_breakers = {
     "web_search": CircuitBreaker("web_search", failure_threshold=5, recovery_timeout=60),
     "image_search": CircuitBreaker("image_search", failure_threshold=5, recovery_timeout=60)
 }
-
-
-
-
@@ -0,0 +1,314 @@
+"""
+Citation Index - Shared In-Text Citation Resolution
+
+One index per set of sources that maps in-text citations such as
+"(Smith & Jones, 2020a)" or "Müller et al. (2019)" to a source's citation
+key. It is used by DocumentExporter (citation hyperlinks), ThesisCombiner
+(reference merging) and CitationManager (citations used in a document).
+
+Features:
+- Precomputed normalized keys per source: first-author surname, second
+  surname or "et al.", year and a/b/c suffix (assigned when one author has
+  several works in a year)
+- Cosmetic variants resolve to the same source: diacritics, "&" vs "and",
+  "et al" with or without the dot, "Smith, 2020" vs "Smith (2020)"
+- Fuzzy fallback: unique first-author + year match, then close surname
+  spellings within the year
+- scan(): single-pass scanner returning one span per citation (resolved or
+  not) for parenthetical, multi-citation and narrative forms
+- Indexes cached per workspace revision / source fingerprint
+"""
+
+import difflib
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+MAX_CACHED_INDEXES = 16
+FUZZY_SURNAME_CUTOFF = 0.8
+
+_NAME_PARTICLES = r"(?:(?:van|von|der|den|de|da|del|della|di|du|le|la|al|el|bin|ibn)\s+)*"
+_SURNAME = rf"{_NAME_PARTICLES}[A-ZÀ-ÖØ-ÞĀ-ž][\w'’\-]*"
+_AUTHORS = (
+    rf"{_SURNAME}"
+    rf"(?:(?:\s*,\s*{_SURNAME})*\s*,?\s+(?:&|and)\s+{_SURNAME})?"
+    r"(?:\s+et\.?\s+al\.?)?"
+)
+_YEAR = r"(?:\d{4}[a-z]?|n\.\s?d\.)"
+_LOCATOR = r"(?:\s*,\s*(?:p|pp|para)\.\s*[\d\-–]+)?"
+_SEP = r"(?:\s*,\s*|\s+)"
+
+# One parenthetical citation: "Smith & Jones, 2020a" / "Lee et al., 2019, p. 4"
+ITEM_RE = re.compile(rf"(?P<authors>{_AUTHORS}){_SEP}(?P<year>{_YEAR}){_LOCATOR}")
+# Narrative citation: "Smith et al. (2020)"
+NARRATIVE_RE = re.compile(rf"(?P<authors>{_AUTHORS})\s+\((?P<year>{_YEAR}){_LOCATOR}\)")
+
+_ITEM = rf"{_AUTHORS}{_SEP}{_YEAR}{_LOCATOR}"
+# Scanner: a parenthetical group "(see Smith, 2020; Lee, 2019)" or a narrative citation
+CITATION_RE = re.compile(
+    rf"(?P<paren>\((?:(?:e\.g\.|i\.e\.|see|cf\.)\s*,?\s*)?{_ITEM}(?:\s*;\s*{_ITEM})*\))"
+    rf"|(?P<narr_authors>{_AUTHORS})\s+\((?P<narr_year>{_YEAR}){_LOCATOR}\)"
+)
+_SPLIT_AUTHORS_RE = re.compile(r"\s*(?:,|&|\band\b)\s*")
+_ET_AL_RE = re.compile(r"\s+et\.?\s+al\.?$")
+_YEAR_RE = re.compile(r"(\d{4})([a-z]?)")
+
+
+def normalize_name(name: str) -> str:
+    """ASCII-folded, lower-cased letters only ("O’Brien-Müller" -> "obrienmuller")."""
+    folded = unicodedata.normalize("NFKD", name)
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return re.sub(r"[^a-z]", "", folded.lower())
+
+
+def surname(author: Any) -> str:
+    """Surname of an author given as "First Last", "Last, First" or {"name": ...}."""
+    name = author.get("name", "") if isinstance(author, dict) else str(author or "")
+    name = name.strip()
+    if "," in name:
+        return name.split(",", 1)[0].strip()
+    parts = name.split()
+    return parts[-1] if parts else ""
+
+
+def parse_year(year: Any) -> Tuple[str, str]:
+    """("2020a") -> ("2020", "a"); anything without a year -> ("n.d.", "")."""
+    match = _YEAR_RE.search(str(year or ""))
+    if not match:
+        return "n.d.", ""
+    return match.group(1), match.group(2)
+
+
+def citation_signature(authors_text: str, year_text: str) -> Tuple[str, str, bool, str, str]:
+    """
+    Normalized (first surname, second surname, et al., year, suffix) of an
+    in-text citation.
+    """
+    authors_text = authors_text.strip()
+    et_al = bool(_ET_AL_RE.search(authors_text))
+    authors_text = _ET_AL_RE.sub("", authors_text)
+    names = [normalize_name(n) for n in _SPLIT_AUTHORS_RE.split(authors_text) if normalize_name(n)]
+    first = names[0] if names else ""
+    second = names[1] if len(names) == 2 and not et_al else ""
+    if len(names) > 2:
+        et_al = True
+    year, suffix = parse_year(year_text)
+    return first, second, et_al, year, suffix
+
+
+def normalize_citation(text: str) -> str:
+    """
+    Canonical form of a citation string for deduplication, so cosmetic
+    variants ("Smith & Jones (2020)", "Smith and Jones, 2020") compare equal.
+    Text that is not a citation is just whitespace/case-normalized.
+    """
+    stripped = text.strip().strip("[]")
+    match = NARRATIVE_RE.fullmatch(stripped) or ITEM_RE.fullmatch(stripped.strip("()"))
+    if not match:
+        return re.sub(r"\s+", " ", text.lower()).strip()
+    first, second, et_al, year, suffix = citation_signature(match.group("authors"), match.group("year"))
+    return f"{first}|{'etal' if et_al else second}|{year}{suffix}"
+
+
+@dataclass
+class IndexedSource:
+    """A source's precomputed resolution keys."""
+    citation_key: str
+    first: str
+    second: str
+    et_al: bool
+    year: str
+    suffix: str
+    source: Dict[str, Any]
+
+    @property
+    def bookmark(self) -> str:
+        return f"ref_{self.citation_key}"
+
+
+@dataclass
+class CitationSpan:
+    """One in-text citation found by CitationIndex.scan()."""
+    start: int
+    end: int
+    text: str
+    authors: str
+    year: str
+    resolved: Optional[IndexedSource] = None
+
+    @property
+    def citation_key(self) -> Optional[str]:
+        return self.resolved.citation_key if self.resolved else None
+
+
+class CitationIndex:
+    """Resolve in-text citations against a fixed list of sources."""
+
+    def __init__(self, sources: List[Dict[str, Any]]):
+        self.entries: List[IndexedSource] = []
+        self._exact: Dict[Tuple, IndexedSource] = {}
+        self._by_first_year: Dict[Tuple[str, str], List[IndexedSource]] = {}
+        self._surnames_by_year: Dict[str, List[str]] = {}
+        self._resolve_cache: Dict[Tuple[str, str], Optional[IndexedSource]] = {}
+
+        for source in sources:
+            key = source.get("citation_key") or source.get("citation_id") or source.get("id")
+            authors = source.get("authors") or []
+            if isinstance(authors, str):
+                authors = [authors]
+            if not key or not authors:
+                continue
+            names = [normalize_name(surname(a)) for a in authors]
+            names = [n for n in names if n]
+            if not names:
+                continue
+            year, suffix = parse_year(source.get("year"))
+            self.entries.append(IndexedSource(
+                citation_key=key,
+                first=names[0],
+                second=names[1] if len(names) == 2 else "",
+                et_al=len(names) > 2,
+                year=year,
+                suffix=suffix,
+                source=source
+            ))
+
+        # Same first author and year: disambiguate as 2020a, 2020b, ... by title
+        for entry in self.entries:
+            self._by_first_year.setdefault((entry.first, entry.year), []).append(entry)
+        for group in self._by_first_year.values():
+            if len(group) > 1 and not any(e.suffix for e in group):
+                for i, entry in enumerate(sorted(group, key=lambda e: str(e.source.get("title", "")).lower())):
+                    entry.suffix = chr(ord("a") + i) if i < 26 else ""
+
+        for entry in self.entries:
+            # "(Lee, 2021)" may only stand for "Lee 2021a" if there is no Lee 2021b;
+            # otherwise it is left to the uniqueness check in resolve()
+            unique = len(self._by_first_year[(entry.first, entry.year)]) == 1
+            for key in self._keys(entry.first, entry.second, entry.et_al, entry.year, entry.suffix, unique):
+                self._exact.setdefault(key, entry)
+            self._surnames_by_year.setdefault(entry.year, []).append(entry.first)
+
+    @staticmethod
+    def _keys(first: str, second: str, et_al: bool, year: str, suffix: str, unique: bool) -> List[Tuple]:
+        keys = [(first, "etal" if et_al else second, year, suffix)]
+        if suffix and unique:
+            keys.append((first, "etal" if et_al else second, year, ""))
+        return keys
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def resolve(self, authors_text: str, year_text: str) -> Optional[IndexedSource]:
+        """Source cited as `authors_text` + `year_text`, or None."""
+        cache_key = (authors_text, year_text)
+        if cache_key in self._resolve_cache:
+            return self._resolve_cache[cache_key]
+
+        first, second, et_al, year, suffix = citation_signature(authors_text, year_text)
+        resolved = self._exact.get((first, "etal" if et_al else second, year, suffix))
+
+        if resolved is None and first:
+            # Fuzzy: "et al." vs. listing both authors, missing/extra suffix
+            candidates = self._by_first_year.get((first, year), [])
+            if suffix:
+                candidates = [c for c in candidates if c.suffix == suffix] or candidates
+            if len(candidates) == 1:
+                resolved = candidates[0]
+
+        if resolved is None and first and year in self._surnames_by_year:
+            # Fuzzy: near-identical surname spelling within the same year
+            close = difflib.get_close_matches(first, self._surnames_by_year[year], n=1, cutoff=FUZZY_SURNAME_CUTOFF)
+            if close:
+                candidates = self._by_first_year.get((close[0], year), [])
+                if suffix:
+                    candidates = [c for c in candidates if c.suffix == suffix] or candidates
+                if len(candidates) == 1:
+                    resolved = candidates[0]
+
+        self._resolve_cache[cache_key] = resolved
+        return resolved
+
+    def scan(self, text: str) -> List[CitationSpan]:
+        """
+        Find every in-text citation in `text` in one pass.
+
+        Parenthetical groups with several citations yield one span per
+        citation; narrative citations span "Author (Year)".
+        """
+        spans = []
+        for match in CITATION_RE.finditer(text):
+            if match.group("paren"):
+                offset = match.start("paren")
+                for item in ITEM_RE.finditer(match.group("paren")):
+                    spans.append(CitationSpan(
+                        start=offset + item.start(),
+                        end=offset + item.end(),
+                        text=item.group(0),
+                        authors=item.group("authors"),
+                        year=item.group("year"),
+                        resolved=self.resolve(item.group("authors"), item.group("year"))
+                    ))
+            else:
+                spans.append(CitationSpan(
+                    start=match.start(),
+                    end=match.end(),
+                    text=match.group(0),
+                    authors=match.group("narr_authors"),
+                    year=match.group("narr_year"),
+                    resolved=self.resolve(match.group("narr_authors"), match.group("narr_year"))
+                ))
+        return spans
+
+    def cited_keys(self, text: str) -> List[str]:
+        """Citation keys cited in `text`, in first-citation order."""
+        return list(dict.fromkeys(span.citation_key for span in self.scan(text) if span.resolved))
+
+
+class CitationIndexCache:
+    """Citation indexes shared by exporters, combiners and managers."""
+
+    def __init__(self):
+        self._indexes: "OrderedDict[str, CitationIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, cache_key: str, build) -> CitationIndex:
+        with self._lock:
+            if cache_key in self._indexes:
+                self._indexes.move_to_end(cache_key)
+                return self._indexes[cache_key]
+        index = build()
+        with self._lock:
+            self._indexes[cache_key] = index
+            while len(self._indexes) > MAX_CACHED_INDEXES:
+                self._indexes.popitem(last=False)
+        return index
+
+    def for_sources(self, sources: List[Dict[str, Any]]) -> CitationIndex:
+        """Index for an explicit source list (cached by its citation fields)."""
+        fingerprint = hashlib.sha1(json.dumps([
+            [s.get("citation_key") or s.get("citation_id") or s.get("id"), s.get("authors"), s.get("year"), s.get("title")]
+            for s in sources
+        ], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return self._get(f"sources:{fingerprint}", lambda: CitationIndex(sources))
+
+    def for_workspace(self, workspace_id: str) -> CitationIndex:
+        """Index over a workspace's sources, rebuilt when its sources index changes."""
+        from services.sources_service import sources_service
+
+        index_path = sources_service._get_index_path(workspace_id)
+        revision = index_path.stat().st_mtime_ns if index_path.exists() else 0
+        return self._get(
+            f"workspace:{workspace_id}:{revision}",
+            lambda: CitationIndex(sources_service.list_sources(workspace_id))
+        )
+
+
+# Singleton instance
+citation_indexes = CitationIndexCache()
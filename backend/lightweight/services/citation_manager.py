@@ -172,11 +172,13 @@ class CitationManager:
         self.citations_dir = self.workspace_path / ".citations"
         self.citations_dir.mkdir(exist_ok=True)
         self.citations: Dict[str, Citation] = {}
+        self._citation_index = None
         self.load_citations()
     
     def add_citation(self, citation: Citation):
         """Add citation to manager."""
         self.citations[citation.citation_id] = citation
+        self._citation_index = None
         self.save_citations()
     
     def add_journal_article(
@@ -258,6 +260,29 @@ class CitationManager:
             return citation.in_text_narrative(page)
         return ""
     
+    def citation_index(self):
+        """Shared citation resolution index over this manager's citations."""
+        if self._citation_index is None:
+            from .citation_index import CitationIndex
+            self._citation_index = CitationIndex([
+                {
+                    "citation_key": c.citation_id,
+                    "authors": [f"{a.last_name}, {a.first_name}" for a in c.authors],
+                    "year": c.year,
+                    "title": c.title,
+                }
+                for c in self.citations.values()
+            ])
+        return self._citation_index
+    
+    def find_citations(self, text: str) -> List[str]:
+        """IDs of the citations used in `text`, in first-citation order."""
+        return self.citation_index().cited_keys(text)
+    
+    def generate_bibliography_for_text(self, text: str) -> str:
+        """APA 7 bibliography of every citation used in `text`."""
+        return self.generate_bibliography(self.find_citations(text))
+    
     def generate_bibliography(self, citation_ids: List[str]) -> str:
         """Generate complete bibliography in APA 7 format."""
         references = []
@@ -349,6 +374,8 @@ class CitationManager:
                 )
                 
                 self.citations[cid] = citation
+            
+            self._citation_index = None
     
     def export_citations_for_chapter(
         self,
@@ -6,10 +6,14 @@ Uses MDAP citation microagents to generate content with:
 - Real academic papers from search APIs
 - Proper APA/Harvard formatting
 - Reference list generation
+- Paragraph-batched mode (mode="batched", used by ChapterGenerator):
+  whole paragraphs per LLM call with numbered citation slots, validated
+  and attached in one parallel post-pass
 """
 
+import re
 import asyncio
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from app.services.citation_microagents import (
     CitationFinderAgent,
     CitationValidatorAgent,
@@ -18,12 +22,22 @@ from app.services.citation_microagents import (
     CitationDensityAgent,
     SentenceCitationAgent
 )
+from services.citation_microagents import format_apa_authors
 from app.services.maker_framework import VotingOrchestrator, RedFlagDetector, AgentPool
 from app.services.mdap_llm_client import MDAPlLMClient
 from app.services.academic_search import academic_search_service
 from core.events import events  # Import at module level
 
 
+# Citation slot written by the LLM in batched mode, e.g. "... outcomes [CITE:3]."
+CITATION_SLOT_PATTERN = re.compile(r'\s*\[CITE:\s*(\d+)\]')
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?])\s+(?=[A-Z"(])')
+
+WORDS_PER_PARAGRAPH = 150
+MAX_CANDIDATE_PAPERS = 12
+MIN_VALIDATION_CONFIDENCE = 0.5
+
+
 class CitedContentGenerator:
     """
     Generates heavily-cited academic content using MDAP citation agents.
@@ -100,7 +114,8 @@ class CitedContentGenerator:
         topic: str,
         word_count: int = 500,
         target_density: float = 0.75,
-        job_id: Optional[str] = None  # For event emission
+        job_id: Optional[str] = None,  # For event emission
+        mode: str = "sentence"
     ) -> Dict[str, Any]:
         """
         Generate a section with heavy citations.
@@ -110,6 +125,9 @@ class CitedContentGenerator:
             topic: Main topic to write about
             word_count: Target word count
             target_density: Target citation density (0.75 = 75% of sentences)
+            mode: "sentence" (one voted LLM call per sentence, default) or
+                "batched" (one LLM call per paragraph, parallel citation
+                validation)
             
         Returns:
             Dict with content, references, and metrics
@@ -155,7 +173,89 @@ class CitedContentGenerator:
                 }
             }
         
-        # Step 2: Generate cited sentences
+        # Step 2: Generate cited content
+        if mode == "batched":
+            content, sentence_count, current_word_count = await self._generate_batched(
+                topic=topic,
+                papers=papers,
+                word_count=word_count,
+                target_density=target_density,
+                job_id=job_id
+            )
+        else:
+            content, sentence_count, current_word_count = await self._generate_sentence_by_sentence(
+                topic=topic,
+                papers=papers,
+                word_count=word_count,
+                target_density=target_density,
+                job_id=job_id
+            )
+        
+        # Step 3: Analyze citation density
+        if job_id:
+            await events.log(job_id, "📊 Analyzing citation density...")
+            await events.debate_message(job_id, "DensityAnalyzer", "Calculating citation metrics and validation...")
+        
+        print("📊 Step 3: Analyzing citation density...")
+        density_response, _ = await self.agent_pool.execute_with_voting(
+            self.density_analyzer,
+            self.orchestrator,
+            {"text": content}
+        )
+        density_data = density_response.content
+        print(f"   ✓ Citation density: {density_data.get('citation_density', 0):.1%}\n")
+        
+        # Step 4: Generate reference list
+        if job_id:
+            await events.log(job_id, f"📚 Generating reference list for {len(self.cited_papers)} papers...")
+            await events.debate_message(job_id, "ReferenceGenerator", f"Formatting {len(self.cited_papers)} references in {self.citation_style} style...")
+        
+        print("📚 Step 4: Generating reference list...")
+        references = await self._generate_references()
+        print(f"   ✓ {len(references)} unique references\n")
+        
+        # Compile results
+        result = {
+            "section_title": section_title,
+            "content": content,
+            "references": references,
+            "cited_papers": self.cited_papers,
+            "metrics": {
+                "word_count": current_word_count,
+                "sentence_count": sentence_count,
+                "citation_count": len(self.cited_papers),
+                "citation_density": density_data.get('citation_density', 0),
+                "unique_papers": len(self.cited_papers)
+            }
+        }
+        
+        if job_id:
+            await events.log(job_id, f"✅ Section complete! {current_word_count} words, {len(self.cited_papers)} citations ({density_data.get('citation_density', 0):.1%} density)", "success")
+            await events.stage_completed(job_id, "content_generation", {
+                "section": section_title,
+                "metrics": result["metrics"]
+            })
+        
+        print(f"✅ Section complete!")
+        print(f"   Words: {current_word_count}")
+        print(f"   Citations: {len(self.cited_papers)}")
+        print(f"   Density: {density_data.get('citation_density', 0):.1%}\n")
+        
+        return result
+    
+    # =========================================================================
+    # SENTENCE-BY-SENTENCE MODE
+    # =========================================================================
+    
+    async def _generate_sentence_by_sentence(
+        self,
+        topic: str,
+        papers: List[Dict[str, Any]],
+        word_count: int,
+        target_density: float,
+        job_id: Optional[str] = None
+    ) -> Tuple[str, int, int]:
+        """Generate content one voted LLM call per sentence (original mode)."""
         if job_id:
             await events.log(job_id, f"✍️ Generating {int(word_count / 15)} cited sentences...")
             await events.debate_message(job_id, "SentenceWriter", f"Beginning sentence generation with citation integration...")
@@ -219,58 +319,205 @@ class CitedContentGenerator:
         
         content = " ".join(sentences)
         print(f"   ✓ Total: {len(sentences)} sentences, {current_word_count} words\n")
+        return content, len(sentences), current_word_count
+    
+    # =========================================================================
+    # PARAGRAPH-BATCHED MODE
+    # =========================================================================
+    
+    def _in_text_citation(self, paper: Dict[str, Any]) -> str:
+        """Format an in-text citation locally (no LLM call)."""
+        authors = format_apa_authors(paper.get('authors', []), for_reference=False)
+        year = paper.get('year') or 'n.d.'
+        if self.citation_style.upper() == "HARVARD":
+            return f"({authors} {year})"
+        return f"({authors}, {year})"
+    
+    def _build_paragraph_prompt(
+        self,
+        topic: str,
+        candidates: List[Dict[str, Any]],
+        sentences_per_paragraph: int,
+        cited_per_paragraph: int,
+        paragraph_index: int,
+        total_paragraphs: int,
+        previous: Optional[str]
+    ) -> str:
+        papers_text = "\n".join([
+            f"[{i}] {p.get('title', 'N/A')} ({p.get('year', 'n.d.')}) - {(p.get('abstract') or '')[:200]}"
+            for i, p in enumerate(candidates)
+        ])
         
-        # Step 3: Analyze citation density
-        if job_id:
-            await events.log(job_id, "📊 Analyzing citation density...")
-            await events.debate_message(job_id, "DensityAnalyzer", "Calculating citation metrics and validation...")
-        
-        print("📊 Step 3: Analyzing citation density...")
-        density_response, _ = await self.agent_pool.execute_with_voting(
-            self.density_analyzer,
-            self.orchestrator,
-            {"text": content}
+        prompt = f"""Write paragraph {paragraph_index + 1} of {total_paragraphs} of an academic section about: {topic}
+
+Candidate papers:
+{papers_text}
+
+Requirements:
+- Exactly {sentences_per_paragraph} sentences of formal academic prose
+- {cited_per_paragraph} of those sentences must end with a citation slot [CITE:n] placed just before the final period, where n is the number of the paper that supports that sentence
+- Cite a paper only for a claim its title/abstract actually supports
+- Use at most one slot per sentence; never write author names or years yourself
+- Uncited sentences provide transitions and synthesis"""
+        
+        if previous:
+            prompt += f"\n\nPrevious paragraph (continue from it, do not repeat it):\n{previous}"
+        
+        prompt += "\n\nReturn ONLY the paragraph text."
+        return prompt
+    
+    async def _write_paragraph(self, prompt: str) -> str:
+        response = await self.llm_client.call(
+            system_prompt="You are an academic writer. Write cohesive, well-evidenced paragraphs.",
+            user_prompt=prompt,
+            max_tokens=700
         )
-        density_data = density_response.content
-        print(f"   ✓ Citation density: {density_data.get('citation_density', 0):.1%}\n")
+        return " ".join(response.strip().split())
+    
+    async def _validate_slot(self, claim: str, paper: Dict[str, Any]) -> bool:
+        """Run CitationValidatorAgent (with voting) for one sentence/paper pair."""
+        try:
+            paper = {**paper, "abstract": paper.get("abstract") or "N/A"}
+            response, _ = await self.agent_pool.execute_with_voting(
+                self.citation_validator,
+                self.orchestrator,
+                {"claim": claim, "paper": paper}
+            )
+            verdict = response.content or {}
+            return bool(verdict.get("is_valid")) and verdict.get("confidence", 0) >= MIN_VALIDATION_CONFIDENCE
+        except Exception as e:
+            print(f"   ⚠️ Citation validation failed: {e}")
+            return False
+    
+    async def _attach_citations(
+        self,
+        paragraphs: List[str],
+        candidates: List[Dict[str, Any]]
+    ) -> Tuple[List[List[str]], int, int]:
+        """
+        Validate every citation slot in one parallel pass and replace valid
+        slots with formatted in-text citations. Invalid or out-of-range slots
+        are dropped, so no sentence carries an unchecked citation.
         
-        # Step 4: Generate reference list
-        if job_id:
-            await events.log(job_id, f"📚 Generating reference list for {len(self.cited_papers)} papers...")
-            await events.debate_message(job_id, "ReferenceGenerator", f"Formatting {len(self.cited_papers)} references in {self.citation_style} style...")
+        Returns:
+            (sentences per paragraph, slots checked, citations attached)
+        """
+        split = [SENTENCE_SPLIT_PATTERN.split(p) for p in paragraphs]
+        
+        checks = []  # (paragraph index, sentence index, paper index)
+        tasks = []
+        for p_idx, sentences in enumerate(split):
+            for s_idx, sentence in enumerate(sentences):
+                claim = CITATION_SLOT_PATTERN.sub("", sentence)
+                for match in CITATION_SLOT_PATTERN.finditer(sentence):
+                    paper_idx = int(match.group(1))
+                    if paper_idx < len(candidates):
+                        checks.append((p_idx, s_idx, paper_idx))
+                        tasks.append(self._validate_slot(claim, candidates[paper_idx]))
+        
+        verdicts = await asyncio.gather(*tasks)
+        
+        valid: Dict[Tuple[int, int], List[int]] = {}
+        for (p_idx, s_idx, paper_idx), ok in zip(checks, verdicts):
+            if ok and paper_idx not in valid.setdefault((p_idx, s_idx), []):
+                valid[(p_idx, s_idx)].append(paper_idx)
+        
+        attached = 0
+        for p_idx, sentences in enumerate(split):
+            for s_idx, sentence in enumerate(sentences):
+                if not CITATION_SLOT_PATTERN.search(sentence):
+                    continue
+                sentence = CITATION_SLOT_PATTERN.sub("", sentence)
+                paper_indices = valid.get((p_idx, s_idx), [])
+                if paper_indices:
+                    citations = [self._in_text_citation(candidates[i]) for i in paper_indices]
+                    citation = "(" + "; ".join(c[1:-1] for c in citations) + ")"
+                    body, end = (sentence[:-1], sentence[-1]) if sentence[-1:] in ".!?" else (sentence, ".")
+                    sentence = f"{body.rstrip()} {citation}{end}"
+                    attached += 1
+                    for i in paper_indices:
+                        paper = candidates[i]
+                        if paper not in self.cited_papers:
+                            self.cited_papers.append(paper)
+                        paper_key = paper.get('title', 'Unknown')
+                        self.citations_used[paper_key] = self.citations_used.get(paper_key, 0) + 1
+                sentences[s_idx] = sentence
+        
+        return split, len(checks), attached
+    
+    async def _generate_batched(
+        self,
+        topic: str,
+        papers: List[Dict[str, Any]],
+        word_count: int,
+        target_density: float,
+        job_id: Optional[str] = None
+    ) -> Tuple[str, int, int]:
+        """
+        Generate content one LLM call per paragraph.
         
-        print("📚 Step 4: Generating reference list...")
-        references = await self._generate_references()
-        print(f"   ✓ {len(references)} unique references\n")
+        Each prompt lists the numbered candidate papers and asks for [CITE:n]
+        slots; slots are validated and attached afterwards in parallel.
+        """
+        # Only papers we can actually cite in-text
+        candidates = [p for p in papers if format_apa_authors(p.get('authors', []))][:MAX_CANDIDATE_PAPERS]
+        if not candidates:
+            candidates = papers[:MAX_CANDIDATE_PAPERS]
         
-        # Compile results
-        result = {
-            "section_title": section_title,
-            "content": content,
-            "references": references,
-            "cited_papers": self.cited_papers,
-            "metrics": {
-                "word_count": current_word_count,
-                "sentence_count": len(sentences),
-                "citation_count": len(self.cited_papers),
-                "citation_density": density_data.get('citation_density', 0),
-                "unique_papers": len(self.cited_papers)
-            }
-        }
+        total_paragraphs = max(1, round(word_count / WORDS_PER_PARAGRAPH))
+        sentences_per_paragraph = max(3, round(WORDS_PER_PARAGRAPH / 20))
+        cited_per_paragraph = max(1, round(sentences_per_paragraph * target_density))
         
         if job_id:
-            await events.log(job_id, f"✅ Section complete! {current_word_count} words, {len(self.cited_papers)} citations ({density_data.get('citation_density', 0):.1%} density)", "success")
-            await events.stage_completed(job_id, "content_generation", {
-                "section": section_title,
-                "metrics": result["metrics"]
-            })
+            await events.log(job_id, f"✍️ Generating {total_paragraphs} cited paragraphs...")
+            await events.debate_message(job_id, "SentenceWriter", "Drafting paragraphs with citation slots...")
+        
+        print(f"✍️  Step 2: Generating {total_paragraphs} paragraphs (batched)...")
+        paragraphs = []
+        for i in range(total_paragraphs):
+            prompt = self._build_paragraph_prompt(
+                topic, candidates, sentences_per_paragraph, cited_per_paragraph,
+                i, total_paragraphs, paragraphs[-1] if paragraphs else None
+            )
+            paragraph = await self._write_paragraph(prompt)
+            if paragraph:
+                paragraphs.append(paragraph)
+            
+            print(f"   ✓ Paragraph {i + 1}/{total_paragraphs}")
+            if job_id:
+                await events.publish(job_id, "progress", {
+                    "stage": "sentence_generation",
+                    "percent": int((i + 1) / total_paragraphs * 100)
+                })
         
-        print(f"✅ Section complete!")
-        print(f"   Words: {current_word_count}")
-        print(f"   Citations: {len(self.cited_papers)}")
-        print(f"   Density: {density_data.get('citation_density', 0):.1%}\n")
+        print("   🔎 Validating citations...")
+        if job_id:
+            await events.debate_message(job_id, "CitationValidator", "Validating citation slots in parallel...")
+        split, checked, attached = await self._attach_citations(paragraphs, candidates)
+        print(f"   ✓ {attached} citations attached ({checked} slots checked)")
         
-        return result
+        final_paragraphs = [" ".join(sentences) for sentences in split]
+        sentence_count = sum(len(sentences) for sentences in split)
+        
+        if job_id:
+            index = 0
+            for sentences in split:
+                for sentence in sentences:
+                    await events.publish(job_id, "content_chunk", {
+                        "sentence": sentence,
+                        "index": index,
+                        "total": sentence_count
+                    })
+                    index += 1
+        
+        content = "\n\n".join(final_paragraphs)
+        current_word_count = len(content.split())
+        print(f"   ✓ Total: {len(final_paragraphs)} paragraphs, {sentence_count} sentences, {current_word_count} words\n")
+        return content, sentence_count, current_word_count
+    
+    # =========================================================================
+    # HELPERS
+    # =========================================================================
     
     async def _search_papers(
         self,
@@ -345,16 +592,18 @@ class CitedContentGenerator:
         if not self.cited_papers:
             return []
         
-        # Format each paper (with voting)
-        references = []
-        
-        for paper in self.cited_papers:
-            format_response, _ = await self.agent_pool.execute_with_voting(
+        # Format each paper (with voting), in parallel
+        responses = await asyncio.gather(*[
+            self.agent_pool.execute_with_voting(
                 self.citation_formatter,
                 self.orchestrator,
                 {"paper": paper, "style": self.citation_style}
             )
-            
+            for paper in self.cited_papers
+        ])
+        
+        references = []
+        for format_response, _ in responses:
             reference = format_response.content.get('reference', '')
             if reference:
                 references.append(reference)
@@ -0,0 +1,326 @@
+"""
+Context Packer - Relevance-Ranked, Token-Budgeted Prompt Context
+
+Builds the literature/chapter context pasted into generation prompts.
+Instead of the first N characters of the most-cited sources, the packer
+returns the passages most relevant to the section being written, sized to
+the caller's token budget.
+
+Features:
+- Workspace sources (extracted full text, falling back to abstracts) and
+  prior chapter files split once into ~200-token passages
+- BM25 ranking by search_index (an in-memory FTS5 index), the same
+  ranker as document and source search
+- Passage index cached per workspace revision (sources index + chapter
+  file mtimes), rebuilt only when something changes
+- Greedy packing into a token budget with duplicate-passage removal and a
+  per-source cap so one paper cannot crowd out the rest
+- Stable citation keys (the source's BibTeX key, chapter_N for chapters)
+- index_text() for ranking ad-hoc documents (e.g. Chapter 2 inside the
+  Chapter 5 generator) with the same ranker
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from services.search_index import SearchIndex
+
+
+PASSAGE_TOKENS = 200  # Target passage size
+DEFAULT_TOKEN_BUDGET = 3000
+MAX_PASSAGES_PER_SOURCE = 3
+MAX_TEXT_INDEXES = 32  # Cached index_text() results
+
+# The title counts as part of a document's first passage
+PASSAGE_BOOSTS = {"title": 1.0, "text": 1.0}
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_CHAPTER_FILE_RE = re.compile(r"^chapter_(\d+)", re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimation (4 chars ≈ 1 token)."""
+    return max(1, len(text) // 4)
+
+
+def split_passages(text: str, target_tokens: int = PASSAGE_TOKENS) -> List[str]:
+    """
+    Split text into passages of roughly `target_tokens`.
+
+    Short paragraphs are merged with their neighbours; paragraphs longer
+    than twice the target are split on sentence boundaries.
+    """
+    target_chars = target_tokens * 4
+    pieces = []
+    for para in _PARAGRAPH_RE.split(text):
+        para = para.strip()
+        if not para:
+            continue
+        if len(para) <= target_chars * 2:
+            pieces.append(para)
+            continue
+        chunk = ""
+        for sentence in _SENTENCE_RE.split(para):
+            if chunk and len(chunk) + len(sentence) > target_chars:
+                pieces.append(chunk)
+                chunk = ""
+            chunk = f"{chunk} {sentence}".strip()
+        if chunk:
+            pieces.append(chunk)
+
+    passages, current = [], ""
+    for piece in pieces:
+        # Headings start a new passage instead of trailing the previous one
+        if current and (len(current) + len(piece) > target_chars or piece.startswith("#")):
+            passages.append(current)
+            current = ""
+        current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+@dataclass
+class Passage:
+    """One retrievable slice of a source or chapter."""
+    citation_key: str
+    label: str  # e.g. "Smith et al. (2020)" or "Chapter 2"
+    title: str
+    text: str
+    position: int  # Order within its document
+    tokens: int = 0
+
+    def __post_init__(self):
+        if not self.tokens:
+            self.tokens = estimate_tokens(self.text)
+
+
+@dataclass
+class PackedContext:
+    """Passages selected for a prompt, in rank order."""
+    passages: List[Passage] = field(default_factory=list)
+    tokens_used: int = 0
+    token_budget: int = 0
+
+    @property
+    def citation_keys(self) -> List[str]:
+        return list(dict.fromkeys(p.citation_key for p in self.passages))
+
+    def render(self, with_headers: bool = True) -> str:
+        """Format passages for a prompt."""
+        if not with_headers:
+            return "\n\n".join(p.text for p in self.passages)
+        return "\n\n".join(
+            f"[{p.citation_key}] {p.label} - {p.title}\n{p.text}" for p in self.passages
+        )
+
+
+class PassageIndex:
+    """BM25 index over a fixed list of passages (in-memory SearchIndex)."""
+
+    def __init__(self, passages: List[Passage]):
+        self.passages = passages
+        self.index = SearchIndex(None, PASSAGE_BOOSTS)
+        fields = {
+            str(idx): {"title": passage.title if passage.position == 0 else "", "text": passage.text}
+            for idx, passage in enumerate(passages)
+        }
+        self.index.reconcile({key: "" for key in fields}, fields.__getitem__)
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def search(self, query: str, top_k: Optional[int] = None) -> List[Tuple[float, Passage]]:
+        """Passages matching `query`, best first."""
+        if not self.passages:
+            return []
+        hits = self.index.search(
+            query, limit=top_k or len(self.passages), operators=False, matched_fields=False
+        )
+        return [(hit.score, self.passages[int(hit.key)]) for hit in hits]
+
+    def pack(
+        self,
+        query: str,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_per_source: Optional[int] = MAX_PASSAGES_PER_SOURCE,
+        with_headers: bool = True
+    ) -> PackedContext:
+        """
+        Greedily fill `token_budget` with the best passages for `query`.
+
+        Passages that don't fit are skipped (a smaller, lower-ranked one may
+        still fit); duplicate passage text is only included once.
+        """
+        packed = PackedContext(token_budget=token_budget)
+        seen_text = set()
+        per_source: Counter = Counter()
+
+        for _score, passage in self.search(query):
+            if max_per_source and per_source[passage.citation_key] >= max_per_source:
+                continue
+            fingerprint = hashlib.sha1(" ".join(passage.text.lower().split()).encode("utf-8")).hexdigest()
+            if fingerprint in seen_text:
+                continue
+            cost = passage.tokens
+            if with_headers:
+                cost += estimate_tokens(f"[{passage.citation_key}] {passage.label} - {passage.title}")
+            if packed.tokens_used + cost > token_budget:
+                continue
+            packed.passages.append(passage)
+            packed.tokens_used += cost
+            seen_text.add(fingerprint)
+            per_source[passage.citation_key] += 1
+        return packed
+
+
+def _format_authors(authors) -> str:
+    if not authors:
+        return "Unknown"
+    names = [a if isinstance(a, str) else a.get("name", "") for a in authors] if isinstance(authors, list) else [str(authors)]
+    names = [n for n in names if n] or ["Unknown"]
+    if len(names) == 1:
+        return names[0]
+    if len(names) == 2:
+        return f"{names[0]} and {names[1]}"
+    return f"{names[0]} et al."
+
+
+class ContextPacker:
+    """Per-workspace passage indexes for prompt context."""
+
+    def __init__(self):
+        self._indexes: Dict[str, Tuple[tuple, PassageIndex]] = {}  # workspace -> (revision, index)
+        self._text_indexes: "OrderedDict[str, PassageIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # WORKSPACE INDEX
+    # =========================================================================
+
+    @staticmethod
+    def _chapter_files(workspace_dir: Path) -> List[Path]:
+        files = {}
+        for folder in (workspace_dir, workspace_dir / "chapters"):
+            if folder.exists():
+                for path in folder.glob("*.md"):
+                    if _CHAPTER_FILE_RE.match(path.name):
+                        files.setdefault(path.name, path)
+        return sorted(files.values(), key=lambda p: p.name)
+
+    def _revision(self, workspace_id: str) -> tuple:
+        """Cheap fingerprint of everything the workspace index is built from."""
+        from services.workspace_service import WORKSPACES_DIR
+
+        workspace_dir = WORKSPACES_DIR / workspace_id
+        parts = []
+        sources_index = workspace_dir / "sources" / "index.json"
+        if sources_index.exists():
+            stat = sources_index.stat()
+            parts.append(("sources", stat.st_mtime_ns, stat.st_size))
+        for path in self._chapter_files(workspace_dir):
+            stat = path.stat()
+            parts.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(parts)
+
+    def _build_workspace_index(self, workspace_id: str, include_chapters: bool) -> PassageIndex:
+        from services.sources_service import sources_service
+        from services.workspace_service import WORKSPACES_DIR
+
+        passages: List[Passage] = []
+        sources_dir = WORKSPACES_DIR / workspace_id / "sources"
+
+        for source in sources_service.list_sources(workspace_id):
+            text = ""
+            if source.get("text_file"):
+                text_path = sources_dir / source["text_file"]
+                if text_path.exists():
+                    try:
+                        text = text_path.read_text(encoding="utf-8")
+                    except Exception:
+                        text = ""
+            text = text or source.get("full_text") or source.get("abstract") or ""
+            if not text.strip():
+                continue
+
+            citation_key = source.get("citation_key") or sources_service._generate_citation_key(source)
+            label = f"{_format_authors(source.get('authors'))} ({source.get('year') or 'n.d.'})"
+            title = source.get("title", "Untitled")
+            for position, chunk in enumerate(split_passages(text)):
+                passages.append(Passage(citation_key, label, title, chunk, position))
+
+        if include_chapters:
+            for path in self._chapter_files(WORKSPACES_DIR / workspace_id):
+                number = _CHAPTER_FILE_RE.match(path.name).group(1)
+                try:
+                    text = path.read_text(encoding="utf-8")
+                except Exception:
+                    continue
+                for position, chunk in enumerate(split_passages(text)):
+                    passages.append(Passage(f"chapter_{number}", f"Chapter {number}", path.stem, chunk, position))
+
+        return PassageIndex(passages)
+
+    def get_index(self, workspace_id: str, include_chapters: bool = True) -> PassageIndex:
+        """Passage index for a workspace, rebuilt only when its revision changes."""
+        cache_key = f"{workspace_id}:{int(include_chapters)}"
+        revision = self._revision(workspace_id)
+        with self._lock:
+            cached = self._indexes.get(cache_key)
+            if cached and cached[0] == revision:
+                return cached[1]
+
+        index = self._build_workspace_index(workspace_id, include_chapters)
+        with self._lock:
+            self._indexes[cache_key] = (revision, index)
+        print(f"📇 Indexed {len(index)} passages for workspace {workspace_id}")
+        return index
+
+    def pack_workspace(
+        self,
+        workspace_id: str,
+        query: str,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        include_chapters: bool = True,
+        max_per_source: Optional[int] = MAX_PASSAGES_PER_SOURCE
+    ) -> PackedContext:
+        """Most relevant workspace passages for `query`, within `token_budget`."""
+        return self.get_index(workspace_id, include_chapters).pack(query, token_budget, max_per_source)
+
+    # =========================================================================
+    # AD-HOC TEXT
+    # =========================================================================
+
+    def index_text(self, text: str, citation_key: str, label: str = "", title: str = "") -> PassageIndex:
+        """
+        Passage index over a single document (kept in a small LRU by content).
+
+        Passages are the document's own paragraphs, so packed excerpts read
+        like the original text.
+        """
+        key = hashlib.sha1(f"{citation_key}\0{text}".encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._text_indexes:
+                self._text_indexes.move_to_end(key)
+                return self._text_indexes[key]
+
+        passages = [
+            Passage(citation_key, label or citation_key, title, para.strip(), position)
+            for position, para in enumerate(_PARAGRAPH_RE.split(text)) if para.strip()
+        ]
+        index = PassageIndex(passages)
+        with self._lock:
+            self._text_indexes[key] = index
+            while len(self._text_indexes) > MAX_TEXT_INDEXES:
+                self._text_indexes.popitem(last=False)
+        return index
+
+
+# Singleton instance
+context_packer = ContextPacker()
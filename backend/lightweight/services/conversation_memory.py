@@ -6,11 +6,14 @@ semantic search to recall relevant context from any point in history.
 
 Features:
 - Persistent storage of all messages
+- Indexed message store (message_store): tail reads, pagination and
+  counters without re-reading the history, keyword search across sessions
 - Semantic embeddings for similarity search
 - Efficient retrieval of relevant past context
 - Summarization of long conversation history
 """
 
+import asyncio
 import json
 import hashlib
 from pathlib import Path
@@ -18,6 +21,7 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict, field
 
+from services.message_store import MessageStore
 from services.workspace_service import WORKSPACES_DIR
 
 
@@ -62,11 +66,13 @@ class ConversationMemoryService:
             metadata.json      # Conversation metadata + summary
             messages.jsonl     # All messages (append-only)
             embeddings.bin     # Vector embeddings for search
+        messages_index.db      # Offset + full-text index over all messages.jsonl
     """
     
     def __init__(self):
         self.max_context_messages = 20  # Max messages to include in prompt
         self.summary_threshold = 50  # Summarize when exceeding this
+        self._stores: Dict[str, MessageStore] = {}
     
     def _get_conversations_dir(self, workspace_id: str) -> Path:
         """Get conversations directory for workspace."""
@@ -74,6 +80,23 @@ class ConversationMemoryService:
         conv_dir.mkdir(parents=True, exist_ok=True)
         return conv_dir
     
+    def _get_store(self, workspace_id: str) -> MessageStore:
+        """Message index for a workspace (created, and JSONL files indexed, on first use)."""
+        store = self._stores.get(workspace_id)
+        if store is None:
+            store = self._stores[workspace_id] = MessageStore(self._get_conversations_dir(workspace_id))
+        return store
+    
+    async def _run_store(self, workspace_id: str, method: str, *args, **kwargs):
+        """
+        Call a MessageStore method in a worker thread: appends are SQLite
+        write transactions that may wait on other processes, and searches
+        first catch up on every conversation file.
+        """
+        def call():
+            return getattr(self._get_store(workspace_id), method)(*args, **kwargs)
+        return await asyncio.to_thread(call)
+    
     def _get_conversation_dir(self, workspace_id: str, conversation_id: str) -> Path:
         """Get directory for a specific conversation."""
         conv_dir = self._get_conversations_dir(workspace_id) / conversation_id
@@ -125,8 +148,7 @@ class ConversationMemoryService:
         metadata: Optional[Dict] = None
     ) -> ChatMessage:
         """Add a message to conversation history."""
-        conv_dir = self._get_conversation_dir(workspace_id, conversation_id)
-        messages_path = conv_dir / "messages.jsonl"
+        self._get_conversation_dir(workspace_id, conversation_id)
         
         timestamp = datetime.now().isoformat()
         message_id = self._generate_message_id(content, timestamp)
@@ -140,14 +162,13 @@ class ConversationMemoryService:
             metadata=metadata or {}
         )
         
-        # Append to messages file (JSONL for efficient streaming)
-        with open(messages_path, 'a', encoding='utf-8') as f:
-            msg_dict = asdict(message)
-            msg_dict.pop('embedding', None)  # Don't store embeddings in JSONL
-            f.write(json.dumps(msg_dict) + '\n')
+        # Append to messages file (JSONL) and index it
+        msg_dict = asdict(message)
+        msg_dict.pop('embedding', None)  # Don't store embeddings in JSONL
+        total = await self._run_store(workspace_id, "append", conversation_id, msg_dict)
         
         # Update metadata
-        await self._update_conversation_metadata(workspace_id, conversation_id)
+        await self._update_conversation_metadata(workspace_id, conversation_id, total)
         
         # ============ NEW: Index in vector database for semantic search ============
         try:
@@ -178,15 +199,16 @@ class ConversationMemoryService:
     async def _update_conversation_metadata(
         self,
         workspace_id: str,
-        conversation_id: str
+        conversation_id: str,
+        total: Optional[int] = None
     ):
         """Update conversation metadata after adding message."""
         conv_dir = self._get_conversation_dir(workspace_id, conversation_id)
         metadata_path = conv_dir / "metadata.json"
-        messages_path = conv_dir / "messages.jsonl"
         
-        # Count messages
-        total = sum(1 for _ in open(messages_path, encoding='utf-8'))
+        # Count messages (kept by the index)
+        if total is None:
+            total = await self._run_store(workspace_id, "count", conversation_id)
         
         # Load and update metadata
         if metadata_path.exists():
@@ -211,25 +233,8 @@ class ConversationMemoryService:
         offset: int = 0
     ) -> List[Dict]:
         """Get messages from conversation with pagination."""
-        conv_dir = self._get_conversation_dir(workspace_id, conversation_id)
-        messages_path = conv_dir / "messages.jsonl"
-        
-        if not messages_path.exists():
-            return []
-        
-        messages = []
-        with open(messages_path, 'r', encoding='utf-8') as f:
-            for i, line in enumerate(f):
-                if i < offset:
-                    continue
-                if len(messages) >= limit:
-                    break
-                try:
-                    messages.append(json.loads(line))
-                except:
-                    pass
-        
-        return messages
+        self._get_conversation_dir(workspace_id, conversation_id)
+        return await self._run_store(workspace_id, "page", conversation_id, offset=offset, limit=limit)
     
     async def get_all_messages(
         self,
@@ -246,23 +251,8 @@ class ConversationMemoryService:
         num_messages: int = 10
     ) -> List[Dict]:
         """Get most recent messages for context."""
-        conv_dir = self._get_conversation_dir(workspace_id, conversation_id)
-        messages_path = conv_dir / "messages.jsonl"
-        
-        if not messages_path.exists():
-            return []
-        
-        # Read last N lines efficiently
-        messages = []
-        with open(messages_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            for line in lines[-num_messages:]:
-                try:
-                    messages.append(json.loads(line))
-                except:
-                    pass
-        
-        return messages
+        self._get_conversation_dir(workspace_id, conversation_id)
+        return await self._run_store(workspace_id, "tail", conversation_id, num_messages)
     
     async def search_messages(
         self,
@@ -276,28 +266,21 @@ class ConversationMemoryService:
         
         For semantic search with embeddings, see search_messages_semantic().
         """
-        query_lower = query.lower()
-        results = []
+        self._get_conversation_dir(workspace_id, conversation_id)
+        return await self._run_store(workspace_id, "search", query, conversation_id=conversation_id, limit=limit)
+    
+    async def search_all_messages(
+        self,
+        workspace_id: str,
+        query: str,
+        limit: int = 20
+    ) -> List[Dict]:
+        """
+        Search messages by keyword across every conversation in the workspace.
         
-        conv_dir = self._get_conversation_dir(workspace_id, conversation_id)
-        messages_path = conv_dir / "messages.jsonl"
-        
-        if not messages_path.exists():
-            return []
-        
-        with open(messages_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    msg = json.loads(line)
-                    content = msg.get('content', '').lower()
-                    if query_lower in content:
-                        results.append(msg)
-                        if len(results) >= limit:
-                            break
-                except:
-                    pass
-        
-        return results
+        Results are ranked by relevance and include their conversation_id.
+        """
+        return await self._run_store(workspace_id, "search", query, limit=limit)
     
     async def search_messages_semantic(
         self,
@@ -6,11 +6,20 @@ Uses DeepSeek's direct API (not OpenRouter) with:
 - DeepSeek-V3.2-Speciale: Reasoning-first model for complex tasks (API-only)
 
 Reasoning models are automatically used for complex tasks requiring reasoning.
+
+generate_content waits for admission from the shared provider controller
+(services.provider_admission), as a BACKGROUND call unless the caller is
+answering a user directly.
 """
 
+import asyncio
+import time
 import httpx
 from typing import Dict, Any, List, Optional
 from core.config import settings
+from services.provider_admission import Priority, estimate_tokens, failure_outcome, get_provider_admission
+
+PROVIDER = "deepseek"
 
 
 class DeepSeekDirectService:
@@ -54,7 +63,8 @@ class DeepSeekDirectService:
         use_reasoning: bool = False,
         model_key: Optional[str] = None,
         stream: bool = False,
-        stream_callback: Optional[callable] = None
+        stream_callback: Optional[callable] = None,
+        priority: Priority = Priority.BACKGROUND
     ) -> str:
         """
         Generate content using DeepSeek direct API.
@@ -66,6 +76,8 @@ class DeepSeekDirectService:
             max_tokens: Maximum tokens
             use_reasoning: If True, uses reasoning model for complex tasks
             model_key: Specific model to use (default: auto-select)
+            priority: Admission class; INTERACTIVE for calls a user is
+                waiting on (chat, routing), BACKGROUND for generation jobs
             
         Returns:
             Generated content
@@ -99,6 +111,13 @@ class DeepSeekDirectService:
             "stream": stream
         }
         
+        admission = get_provider_admission()
+        estimate = estimate_tokens(prompt) + estimate_tokens(system_prompt) + max_tokens
+        lease = await admission.acquire(PROVIDER, model_id, estimate, priority)
+        start_time = time.time()
+        first_chunk_latency = None
+        used_tokens = None
+        
         try:
             async with httpx.AsyncClient(timeout=httpx.Timeout(300.0, connect=10.0)) as client:
                 if stream:
@@ -127,12 +146,14 @@ class DeepSeekDirectService:
                                     delta = chunk_data["choices"][0].get("delta", {})
                                     content = delta.get("content", "")
                                     if content:
+                                        if first_chunk_latency is None:
+                                            first_chunk_latency = time.time() - start_time
                                         full_content.append(content)
                                         if stream_callback:
                                             await stream_callback(content)
                             except json.JSONDecodeError: continue
                     
-                    return "".join(full_content)
+                    result = "".join(full_content)
                 else:
                     # Non-streaming mode
                     response = await client.post(
@@ -143,10 +164,25 @@ class DeepSeekDirectService:
                     if response.status_code != 200:
                         response.raise_for_status()
                     data = response.json()
-                    return data["choices"][0]["message"]["content"]
+                    result = data["choices"][0]["message"]["content"]
+                    used_tokens = (data.get("usage") or {}).get("total_tokens")
         except Exception as e:
             print(f"⚠️  DeepSeek API error: {e}")
+            await asyncio.to_thread(admission.release, lease, **failure_outcome(e))
             raise
+        except BaseException:
+            # Cancelled (e.g. job stopped): free the slot
+            await asyncio.to_thread(admission.release, lease, "success")
+            raise
+        
+        # Non-streaming calls have no time to first chunk (latency stays None);
+        # streaming calls don't report usage, so estimate it from the output
+        if used_tokens is None:
+            used_tokens = estimate - max_tokens + estimate_tokens(result)
+        await asyncio.to_thread(
+            admission.release, lease, "success", used_tokens=used_tokens, latency=first_chunk_latency
+        )
+        return result
     
     async def generate_stream(
         self,
@@ -0,0 +1,185 @@
+"""
+Derivative Service - Cached Thumbnails and Web Renditions for Workspace Files
+
+Generates downscaled variants of images and first-page previews of PDFs so
+file browsers and chat previews don't pull full-resolution originals.
+
+Features:
+- Variants: "thumb" (320px) and "web" (1600px) longest edge
+- Images re-encoded to WebP (PNG/JPEG fallback), PDFs rendered page 1 via PyMuPDF
+- Derivatives cached under <workspace>/.cache/derivatives keyed by content hash
+- Content hashes memoized per (path, mtime, size) so large files are hashed once
+
+Dependencies: Pillow, optional PyMuPDF (PDF previews)
+"""
+
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    Image = None
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+    fitz = None
+
+
+VARIANT_SIZES = {
+    "thumb": 320,
+    "web": 1600,
+}
+
+# Raster formats we can downscale; SVG and (possibly animated) GIF pass through
+RASTER_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tif', '.tiff'}
+PDF_EXTENSIONS = {'.pdf'}
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class DerivativeService:
+    """Create and cache downscaled renditions of workspace files."""
+
+    def __init__(self, max_hash_entries: int = 4096):
+        self.max_hash_entries = max_hash_entries
+        self._hashes: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # CONTENT HASHING
+    # =========================================================================
+
+    def content_hash(self, file_path: Path) -> str:
+        """SHA-256 of the file, memoized until its mtime or size changes."""
+        stat = file_path.stat()
+        key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._hashes.get(key)
+            if cached:
+                self._hashes.move_to_end(key)
+                return cached
+
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        with self._lock:
+            self._hashes[key] = content_hash
+            while len(self._hashes) > self.max_hash_entries:
+                self._hashes.popitem(last=False)
+        return content_hash
+
+    # =========================================================================
+    # DERIVATIVES
+    # =========================================================================
+
+    @staticmethod
+    def supports(file_path: Path, variant: str) -> bool:
+        """Whether a variant can be produced for this file type."""
+        if variant not in VARIANT_SIZES:
+            return False
+        suffix = file_path.suffix.lower()
+        if suffix in RASTER_EXTENSIONS:
+            return PIL_AVAILABLE
+        if suffix in PDF_EXTENSIONS:
+            return PIL_AVAILABLE and PYMUPDF_AVAILABLE
+        return False
+
+    def _render_pdf_page(self, file_path: Path, max_edge: int) -> 'Image.Image':
+        with fitz.open(str(file_path)) as doc:
+            page = doc.load_page(0)
+            zoom = max_edge / max(page.rect.width, page.rect.height)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+    @staticmethod
+    def _encode(image: 'Image.Image') -> Tuple[bytes, str, str]:
+        """Encode as WebP, falling back to PNG/JPEG if WebP is unavailable."""
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+        buffer = io.BytesIO()
+        try:
+            image.save(buffer, format="WEBP", quality=82, method=4)
+            return buffer.getvalue(), "image/webp", ".webp"
+        except (KeyError, OSError):
+            buffer = io.BytesIO()
+            if has_alpha:
+                image.save(buffer, format="PNG", optimize=True)
+                return buffer.getvalue(), "image/png", ".png"
+            image.save(buffer, format="JPEG", quality=85, optimize=True, progressive=True)
+            return buffer.getvalue(), "image/jpeg", ".jpg"
+
+    def get_derivative(
+        self,
+        file_path: Path,
+        cache_root: Path,
+        variant: str
+    ) -> Optional[Dict[str, str]]:
+        """
+        Return a cached rendition, generating it on first request.
+
+        Args:
+            file_path: Original image or PDF
+            cache_root: Workspace directory holding the .cache folder
+            variant: "thumb" or "web"
+
+        Returns:
+            {"path": ..., "media_type": ..., "etag": ...}, or None when the
+            original is already small enough (or the type is unsupported)
+        """
+        if not self.supports(file_path, variant):
+            return None
+
+        content_hash = self.content_hash(file_path)
+        cache_dir = Path(cache_root) / ".cache" / "derivatives"
+        etag = f"{content_hash[:32]}-{variant}"
+
+        for ext, media_type in ((".webp", "image/webp"), (".jpg", "image/jpeg"), (".png", "image/png")):
+            cached = cache_dir / f"{content_hash}_{variant}{ext}"
+            if cached.exists():
+                return {"path": str(cached), "media_type": media_type, "etag": etag}
+
+        max_edge = VARIANT_SIZES[variant]
+        if file_path.suffix.lower() in PDF_EXTENSIONS:
+            image = self._render_pdf_page(file_path, max_edge)
+        else:
+            with Image.open(file_path) as original:
+                if max(original.size) <= max_edge:
+                    return None  # Serving the original is already cheap
+                original.draft("RGB", (max_edge, max_edge))  # Fast JPEG downscale on decode
+                image = original.copy()
+            image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        data, media_type, ext = self._encode(image)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        target = cache_dir / f"{content_hash}_{variant}{ext}"
+        tmp_path = target.with_suffix(ext + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(target)
+        print(f"🖼️ Created {variant} derivative for {file_path.name} ({len(data) // 1024} KB)")
+
+        return {"path": str(target), "media_type": media_type, "etag": etag}
+
+
+# Singleton instance
+_derivative_service = None
+
+def get_derivative_service() -> DerivativeService:
+    """Get global derivative service instance."""
+    global _derivative_service
+    if _derivative_service is None:
+        _derivative_service = DerivativeService()
+    return _derivative_service
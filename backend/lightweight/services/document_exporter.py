@@ -14,6 +14,8 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
+from services.citation_index import CitationIndex, citation_indexes
+
 try:
     from docx import Document
     from docx.shared import Pt, Inches, RGBColor
@@ -31,11 +33,6 @@ class DocumentExporter:
     Export documents to DOCX/PDF with proper citation hyperlinking.
     """
     
-    def __init__(self):
-        self.citation_pattern = re.compile(
-            r'\(([A-Za-z\-]+(?:\s+(?:&|and)\s+[A-Za-z\-]+)?(?:\s+et\s+al\.)?),?\s*(\d{4})\)'
-        )
-    
     def export_to_docx(
         self,
         content: str,
@@ -126,61 +123,15 @@ class DocumentExporter:
         
         return str(output_path)
     
-    def _build_citation_map(self, sources: List[Dict]) -> Dict[str, Dict]:
-        """Build mapping from author-year patterns to source info."""
-        mapping = {}
-        
-        for source in sources:
-            citation_key = source.get('citation_key', '')
-            authors = source.get('authors', [])
-            year = source.get('year', '')
-            
-            if not citation_key or not year:
-                continue
-            
-            # Get author last names
-            if authors:
-                first = authors[0]
-                first_name = first.get('name', first) if isinstance(first, dict) else first
-                first_last = first_name.split()[-1] if first_name else ''
-                
-                if len(authors) == 1:
-                    pattern = f"{first_last}, {year}"
-                    mapping[pattern] = {
-                        'key': citation_key,
-                        'bookmark': f"ref_{citation_key}",
-                        'doi': source.get('doi', ''),
-                        'url': source.get('url', '')
-                    }
-                elif len(authors) == 2:
-                    second = authors[1]
-                    second_name = second.get('name', second) if isinstance(second, dict) else second
-                    second_last = second_name.split()[-1] if second_name else ''
-                    
-                    for connector in ['&', 'and']:
-                        pattern = f"{first_last} {connector} {second_last}, {year}"
-                        mapping[pattern] = {
-                            'key': citation_key,
-                            'bookmark': f"ref_{citation_key}",
-                            'doi': source.get('doi', ''),
-                            'url': source.get('url', '')
-                        }
-                else:
-                    pattern = f"{first_last} et al., {year}"
-                    mapping[pattern] = {
-                        'key': citation_key,
-                        'bookmark': f"ref_{citation_key}",
-                        'doi': source.get('doi', ''),
-                        'url': source.get('url', '')
-                    }
-        
-        return mapping
+    def _build_citation_map(self, sources: List[Dict]) -> CitationIndex:
+        """Shared citation resolution index for these sources (cached)."""
+        return citation_indexes.for_sources(sources)
     
     def _add_paragraph_with_citations(
         self, 
         doc: 'Document', 
         text: str, 
-        citation_map: Dict
+        citation_map: CitationIndex
     ):
         """Add paragraph with clickable citation hyperlinks."""
         para = doc.add_paragraph()
@@ -188,30 +139,17 @@ class DocumentExporter:
         # Find all citations in the text
         last_end = 0
         
-        for match in self.citation_pattern.finditer(text):
-            # Add text before citation
-            if match.start() > last_end:
-                para.add_run(text[last_end:match.start()])
-            
-            # Get citation text
-            author_part = match.group(1)
-            year = match.group(2)
-            citation_text = f"({author_part}, {year})"
+        for span in citation_map.scan(text):
+            if not span.resolved:
+                continue
             
-            # Look up in mapping
-            lookup_key = f"{author_part}, {year}"
-            if lookup_key in citation_map:
-                # Add as internal hyperlink
-                self._add_internal_hyperlink(
-                    para, 
-                    citation_text,
-                    citation_map[lookup_key]['bookmark']
-                )
-            else:
-                # Just add as regular text
-                para.add_run(citation_text)
+            # Add text before citation
+            if span.start > last_end:
+                para.add_run(text[last_end:span.start])
             
-            last_end = match.end()
+            # Add as internal hyperlink
+            self._add_internal_hyperlink(para, span.text, span.resolved.bookmark)
+            last_end = span.end
         
         # Add remaining text
         if last_end < len(text):
@@ -250,7 +188,7 @@ class DocumentExporter:
         self, 
         doc: 'Document', 
         line: str, 
-        citation_map: Dict
+        citation_map: CitationIndex
     ):
         """Add reference entry with a bookmark anchor."""
         # Extract citation key
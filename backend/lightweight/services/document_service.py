@@ -64,8 +64,13 @@ class DocumentService:
         return {}
     
     def _save_metadata(self):
-        """Save document metadata."""
+        """Save document metadata and update the chunk search index."""
         self.metadata_file.write_text(json.dumps(self.metadata, indent=2))
+        try:
+            from services.search_index import file_revision, sync_document_index
+            sync_document_index(self.documents_dir, self.metadata, file_revision(self.metadata_file))
+        except Exception as e:
+            logger.warning(f"Search index update failed: {e}")
     
     async def upload_document(
         self,
@@ -299,29 +304,28 @@ class DocumentService:
         top_k: int = 5
     ) -> List[Dict[str, Any]]:
         """
-        Simple keyword-based search in document chunks.
+        Keyword search in document chunks (BM25 over a persistent inverted
+        index; supports "quoted phrases" and prefix* terms).
         Returns chunks with document info and page numbers.
         """
-        results = []
+        from services.search_index import file_revision, sync_document_index
         
-        for doc_id, doc_meta in self.metadata.items():
-            if doc_ids and doc_id not in doc_ids:
-                continue
-            
-            query_lower = query.lower()
-            for chunk in doc_meta.get("chunks", []):
-                text = chunk.get("text", "").lower()
-                if query_lower in text:
-                    results.append({
-                        "doc_id": doc_id,
-                        "doc_name": doc_meta["filename"],
-                        "page": chunk.get("page", 0),
-                        "text": chunk["text"],
-                        "chunk_index": chunk.get("chunk_index", 0),
-                        "relevance_score": text.count(query_lower) / max(len(text.split()), 1)
-                    })
+        # No-op unless the metadata changed without going through _save_metadata
+        index = sync_document_index(self.documents_dir, self.metadata, file_revision(self.metadata_file))
+        hits = index.search(query, limit=top_k, groups=doc_ids or None)
         
-        # Sort by relevance and return top_k
-        results.sort(key=lambda x: x["relevance_score"], reverse=True)
-        return results[:top_k]
+        results = []
+        for hit in hits:
+            doc_id, number = hit.key.rsplit(":", 1)
+            doc_meta = self.metadata[doc_id]
+            chunk = doc_meta["chunks"][int(number)]
+            results.append({
+                "doc_id": doc_id,
+                "doc_name": doc_meta["filename"],
+                "page": chunk.get("page", 0),
+                "text": chunk["text"],
+                "chunk_index": chunk.get("chunk_index", 0),
+                "relevance_score": hit.score
+            })
+        return results
 
@@ -53,8 +53,8 @@ async def process_uploaded_pdf(
         # Step 2: Chunk text for embedding
         chunks = vector_service.chunk_text(
             text,
-            chunk_size=500,  # ~500 words per chunk
-            overlap=50       # 50 word overlap between chunks
+            chunk_size=500,  # ~500 tokens per chunk, split on sentences
+            overlap=50       # 50 token overlap between chunks
         )
         
         # Step 3: Extract citations (simple regex-based)
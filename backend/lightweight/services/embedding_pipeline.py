@@ -0,0 +1,262 @@
+"""
+Embedding Pipeline - Batched, Cached Embeddings for VectorService
+
+Sits between VectorService and the embedding model so identical text is
+only ever embedded once and model calls are packed efficiently.
+
+Features:
+- Content-hash embedding cache on local disk (SQLite, WAL, via
+  sqlite_store), keyed by model; cache I/O runs off the event loop
+- Duplicate texts within a call embedded once
+- Batches packed by item count and token budget, sent with bounded
+  concurrency off the event loop
+- Token-aware chunking on sentence boundaries (tiktoken when installed,
+  ~4 chars/token otherwise)
+- HashingEmbeddingFunction: deterministic local embeddings for offline
+  tests and development (VECTOR_EMBEDDING_FUNCTION=local)
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from services.sqlite_store import SQLiteDatabase
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+    TIKTOKEN_AVAILABLE = True
+except Exception:
+    _ENCODING = None
+    TIKTOKEN_AVAILABLE = False
+
+
+MAX_BATCH_ITEMS = 128
+MAX_BATCH_TOKENS = 100000  # Well under the API's per-request limit
+MAX_CONCURRENT_BATCHES = 4
+MAX_INPUT_TOKENS = 8000  # text-embedding-3-* accept 8191
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+_WORD_RE = re.compile(r"\w+")
+
+EmbeddingFunction = Callable[[List[str]], List[Sequence[float]]]
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in `text` for the embedding model (estimated without tiktoken)."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+def _split_long(sentence: str, max_tokens: int) -> List[str]:
+    """
+    Split a sentence longer than max_tokens at word boundaries.
+
+    Each piece is measured as joined text (summing per-word estimates
+    undercounts); the longest run of words that fits is found by binary
+    search, so long sentences don't cost a re-count per word.
+    """
+    words = sentence.split()
+    pieces, start = [], 0
+    while start < len(words):
+        # Every word is at least half a token (tiktoken: at least one), which bounds the search
+        low, high = start + 1, min(len(words), start + 2 * max_tokens + 2)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if count_tokens(" ".join(words[start:mid])) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        pieces.append(" ".join(words[start:low]))
+        start = low
+    return pieces
+
+
+def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+    """
+    Split text into chunks of at most `chunk_size` tokens, ending on
+    sentence boundaries where possible.
+
+    Args:
+        text: Text to chunk
+        chunk_size: Max tokens per chunk
+        overlap: Tokens of trailing sentences repeated at the start of the
+            next chunk
+
+    Returns:
+        List of text chunks
+    """
+    chunk_size = min(chunk_size, MAX_INPUT_TOKENS)
+    sentences = []
+    for sentence in _SENTENCE_RE.split(text):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        tokens = count_tokens(sentence)
+        if tokens > chunk_size:
+            sentences.extend((piece, count_tokens(piece)) for piece in _split_long(sentence, chunk_size))
+        else:
+            sentences.append((sentence, tokens))
+
+    # Chunks are measured as joined text, which can count more than the sum of their sentences
+    chunks = []
+    current: List[tuple] = []
+    for sentence, tokens in sentences:
+        if current and count_tokens(" ".join([s for s, _ in current] + [sentence])) > chunk_size:
+            chunks.append(" ".join(s for s, _ in current))
+            # Carry trailing sentences (up to `overlap` tokens) into the next chunk
+            carried, carried_tokens = [], 0
+            for previous in reversed(current):
+                if carried_tokens + previous[1] > overlap:
+                    break
+                if count_tokens(" ".join([previous[0]] + [s for s, _ in carried] + [sentence])) > chunk_size:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous[1]
+            current = carried
+        current.append((sentence, tokens))
+    if current:
+        chunks.append(" ".join(s for s, _ in current))
+    return chunks
+
+
+class HashingEmbeddingFunction:
+    """Deterministic bag-of-words feature hashing; no model or network needed."""
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in input:
+            vector = [0.0] * self.dimensions
+            for word in _WORD_RE.findall(text.lower()):
+                digest = hashlib.md5(word.encode("utf-8")).digest()
+                index = int.from_bytes(digest[:4], "little") % self.dimensions
+                vector[index] += 1.0 if digest[4] & 1 else -1.0
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+
+class EmbeddingCache:
+    """Embeddings by (model, sha256 of text), stored as float32 blobs."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.db = SQLiteDatabase(db_path)
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, hash)
+                )
+            """)
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self.db.reader() as conn:
+            for start in range(0, len(keys), 500):
+                batch = list(keys[start:start + 500])
+                rows = conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({', '.join('?' for _ in batch)})",
+                    [model] + batch
+                )
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, Sequence[float]]):
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                [(model, key, array("f", vector).tobytes()) for key, vector in vectors.items()]
+            )
+
+    def stats(self, model: str) -> Dict[str, int]:
+        with self.db.reader() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+        return {"cached_embeddings": count}
+
+
+class EmbeddingPipeline:
+    """Embed texts through the cache, in packed batches with bounded concurrency."""
+
+    def __init__(
+        self,
+        embedding_function: EmbeddingFunction,
+        model_name: str,
+        cache: Optional[EmbeddingCache] = None,
+        max_batch_items: int = MAX_BATCH_ITEMS,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_concurrency: int = MAX_CONCURRENT_BATCHES
+    ):
+        self.embedding_function = embedding_function
+        self.model_name = model_name
+        self.cache = cache
+        self.max_batch_items = max_batch_items
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max_concurrency
+
+    def _batches(self, texts: List[str]) -> List[List[int]]:
+        """Indices of `texts` grouped into batches within the item and token limits."""
+        batches, current, current_tokens = [], [], 0
+        for i, text in enumerate(texts):
+            tokens = count_tokens(text)
+            if current and (len(current) >= self.max_batch_items or current_tokens + tokens > self.max_batch_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeddings for `texts`, in order. Only texts not seen before (for
+        this model) reach the embedding function.
+        """
+        if not texts:
+            return []
+        keys = [EmbeddingCache.key(text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+        if self.cache:
+            # Cache reads and writes are SQLite calls; keep them off the event loop
+            vectors = await asyncio.to_thread(self.cache.get_many, self.model_name, list(set(keys)))
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+
+        if missing:
+            missing_keys = list(missing)
+            missing_texts = [missing[key] for key in missing_keys]
+            slots = asyncio.Semaphore(self.max_concurrency)
+
+            async def run(batch: List[int]):
+                async with slots:
+                    batch_vectors = await asyncio.to_thread(
+                        self.embedding_function, [missing_texts[i] for i in batch]
+                    )
+                new = {missing_keys[i]: [float(v) for v in vector] for i, vector in zip(batch, batch_vectors)}
+                if self.cache:
+                    await asyncio.to_thread(self.cache.put_many, self.model_name, new)
+                vectors.update(new)
+
+            await asyncio.gather(*[run(batch) for batch in self._batches(missing_texts)])
+            print(f"🧮 Embedded {len(missing)} new texts ({len(texts) - len(missing)} reused)")
+
+        return [vectors[key] for key in keys]
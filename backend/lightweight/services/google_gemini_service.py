@@ -80,7 +80,8 @@ class GoogleGeminiService:
         image_path: str,
         prompt: str = "Describe this image in detail. What do you see?",
         model: str = "gemini-1.5-pro",
-        workspace_id: str = None
+        workspace_id: str = None,
+        image_part: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Analyze an image using Google Gemini Vision.
@@ -90,6 +91,7 @@ class GoogleGeminiService:
             prompt: Question/instruction about the image
             model: Gemini model to use
             workspace_id: Workspace ID if image is in workspace
+            image_part: Pre-encoded inline_data part (skips reading the file)
             
         Returns:
             Analysis result
@@ -111,7 +113,8 @@ class GoogleGeminiService:
         
         try:
             # Encode image
-            image_part = self._encode_image(image_file)
+            if image_part is None:
+                image_part = self._encode_image(image_file)
             
             # Prepare request
             model_id = self.MODELS.get(model, {}).get("id", "gemini-1.5-pro")
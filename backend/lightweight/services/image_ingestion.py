@@ -0,0 +1,284 @@
+"""
+Image Ingestion Service - Concurrent, Deduplicating Image Downloads
+
+Shared pipeline for saving remote images into a workspace, used by the
+batch-download endpoint and IntelligentImageSearchService.
+
+Features:
+- Bounded concurrent downloads over one pooled HTTP client
+- Streams bodies to disk with a size cap (no full response in memory)
+- SHA-256 content dedup across the images folder (.image_hashes.json)
+- Format sniffed from magic bytes, not the URL; exotic formats (BMP, TIFF,
+  ...) normalized to PNG/JPEG in a worker pool
+- Optional per-image progress callback (used for SSE)
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    Image = None
+
+
+MAX_IMAGE_BYTES = 25 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+HASH_INDEX_FILE = ".image_hashes.json"
+
+# Formats browsers and DOCX export handle natively
+WEB_FORMATS = {"png": ".png", "jpeg": ".jpg", "gif": ".gif", "webp": ".webp", "svg": ".svg"}
+
+_normalize_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-normalize")
+
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def sniff_image_format(header: bytes) -> Optional[str]:
+    """Identify an image format from its first bytes."""
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header.startswith(b"BM"):
+        return "bmp"
+    if header[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    if header[4:12] in (b"ftypavif", b"ftypheic", b"ftypheix", b"ftypmif1"):
+        return "heif"
+    if header.startswith(b"\x00\x00\x01\x00"):
+        return "ico"
+    text = header[:256].lstrip().lower()
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in header[:1024].lower()):
+        return "svg"
+    return None
+
+
+def _safe_stem(name: str) -> str:
+    stem = Path(name.split("?")[0]).stem
+    stem = re.sub(r"[^\w\-]+", "_", stem).strip("_")
+    return stem[:80]
+
+
+def _normalize_image(path: Path, image_format: str) -> Path:
+    """Convert a non-web format to PNG (alpha) or JPEG. Runs in the worker pool."""
+    with Image.open(path) as img:
+        img.load()
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if has_alpha:
+            target = path.with_suffix(".png")
+            img.convert("RGBA").save(target, format="PNG", optimize=True)
+        else:
+            target = path.with_suffix(".jpg")
+            img.convert("RGB").save(target, format="JPEG", quality=90, optimize=True)
+    if target != path:
+        path.unlink(missing_ok=True)
+    return target
+
+
+class ImageIngestionService:
+    """Download images into a workspace folder concurrently, with dedup."""
+
+    def __init__(self, max_concurrency: int = 6, max_bytes: int = MAX_IMAGE_BYTES):
+        self.max_concurrency = max_concurrency
+        self.max_bytes = max_bytes
+        self._index_locks: Dict[str, asyncio.Lock] = {}
+        self._indexes: Dict[str, Dict[str, str]] = {}  # images dir -> {sha256: filename}
+
+    # =========================================================================
+    # HASH INDEX
+    # =========================================================================
+
+    def _load_index(self, images_dir: Path) -> Dict[str, str]:
+        index_path = images_dir / HASH_INDEX_FILE
+        if index_path.exists():
+            try:
+                return json.loads(index_path.read_text(encoding="utf-8"))
+            except Exception:
+                pass
+        # First run: index what is already in the folder
+        index = {}
+        for item in images_dir.iterdir():
+            if item.is_file() and not item.name.startswith("."):
+                index.setdefault(hashlib.sha256(item.read_bytes()).hexdigest(), item.name)
+        return index
+
+    def _save_index(self, images_dir: Path, index: Dict[str, str]):
+        index_path = images_dir / HASH_INDEX_FILE
+        tmp_path = index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(index), encoding="utf-8")
+        tmp_path.replace(index_path)
+
+    # =========================================================================
+    # DOWNLOAD
+    # =========================================================================
+
+    async def _download_to_temp(self, client: httpx.AsyncClient, url: str, temp_path: Path) -> str:
+        """Stream `url` into `temp_path`, enforcing the size cap. Returns sha256."""
+        digest = hashlib.sha256()
+        size = 0
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            declared = response.headers.get("content-length")
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                raise ValueError(f"Image too large ({int(declared) // 1024} KB)")
+            with open(temp_path, "wb") as f:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ValueError(f"Image exceeds {self.max_bytes // (1024 * 1024)} MB limit")
+                    digest.update(chunk)
+                    f.write(chunk)
+        if size == 0:
+            raise ValueError("Empty response")
+        return digest.hexdigest()
+
+    async def _ingest_one(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        images_dir: Path,
+        index: Dict[str, str],
+        index_lock: asyncio.Lock,
+        position: int,
+        item: Dict[str, Any],
+        on_progress: Optional[ProgressCallback]
+    ) -> Dict[str, Any]:
+        url = item.get("url") or item.get("image_url")
+        requested_name = item.get("filename")
+        result: Dict[str, Any] = {"index": position, "url": url}
+
+        async def report(status: str, **extra):
+            if on_progress:
+                await on_progress({"index": position, "url": url, "status": status, **extra})
+
+        if not url:
+            result.update({"status": "failed", "error": "No URL provided"})
+            await report("failed", error=result["error"])
+            return result
+
+        temp_path = images_dir / f".download_{uuid.uuid4().hex}.part"
+        try:
+            async with semaphore:
+                await report("downloading")
+                content_hash = await self._download_to_temp(client, url, temp_path)
+
+            with open(temp_path, "rb") as f:
+                image_format = sniff_image_format(f.read(1024))
+            if not image_format:
+                raise ValueError("Response is not a recognised image format")
+
+            async with index_lock:
+                existing = index.get(content_hash)
+                if existing and (images_dir / existing).exists():
+                    temp_path.unlink(missing_ok=True)
+                    result.update({"status": "success", "filename": existing, "duplicate": True,
+                                   "content_hash": content_hash, "format": image_format})
+                    await report("duplicate", filename=existing)
+                    return result
+
+            if image_format in WEB_FORMATS:
+                ext = WEB_FORMATS[image_format]
+            elif PIL_AVAILABLE:
+                await report("normalizing", format=image_format)
+                loop = asyncio.get_running_loop()
+                temp_path = await loop.run_in_executor(_normalize_pool, _normalize_image, temp_path, image_format)
+                ext = temp_path.suffix
+            else:
+                ext = f".{image_format}"
+
+            async with index_lock:
+                # Another download of the same content may have finished meanwhile
+                existing = index.get(content_hash)
+                if existing and (images_dir / existing).exists():
+                    temp_path.unlink(missing_ok=True)
+                    result.update({"status": "success", "filename": existing, "duplicate": True,
+                                   "content_hash": content_hash, "format": image_format})
+                    await report("duplicate", filename=existing)
+                    return result
+
+                stem = _safe_stem(requested_name or url) or "image"
+                filename = f"{stem}{ext}"
+                if (images_dir / filename).exists():
+                    filename = f"{stem}_{content_hash[:8]}{ext}"
+                final_path = images_dir / filename
+                temp_path.replace(final_path)
+                index[content_hash] = filename
+
+            result.update({
+                "status": "success",
+                "filename": filename,
+                "duplicate": False,
+                "content_hash": content_hash,
+                "format": image_format,
+                "size": final_path.stat().st_size
+            })
+            await report("saved", filename=filename, size=result["size"])
+            return result
+
+        except Exception as e:
+            temp_path.unlink(missing_ok=True)
+            result.update({"status": "failed", "error": str(e)})
+            await report("failed", error=str(e))
+            return result
+
+    async def ingest(
+        self,
+        images: List[Dict[str, Any]],
+        images_dir: Path,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Download images into `images_dir`.
+
+        Args:
+            images: [{"url": ..., "filename": optional}, ...]
+            images_dir: Destination folder (created if needed)
+            on_progress: Optional async callback receiving per-image events
+                (downloading, normalizing, saved, duplicate, failed)
+
+        Returns:
+            One result dict per input image, in input order
+        """
+        images_dir = Path(images_dir)
+        images_dir.mkdir(parents=True, exist_ok=True)
+
+        lock_key = str(images_dir.resolve())
+        index_lock = self._index_locks.setdefault(lock_key, asyncio.Lock())
+        async with index_lock:
+            if lock_key not in self._indexes:
+                self._indexes[lock_key] = await asyncio.to_thread(self._load_index, images_dir)
+            index = self._indexes[lock_key]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        headers = {"User-Agent": "Mozilla/5.0 (compatible; ThesisImageFetcher/1.0)"}
+
+        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True, limits=limits, headers=headers) as client:
+            results = await asyncio.gather(*[
+                self._ingest_one(client, semaphore, images_dir, index, index_lock, i, item, on_progress)
+                for i, item in enumerate(images)
+            ])
+
+        async with index_lock:
+            self._save_index(images_dir, index)
+
+        return list(results)
+
+
+# Singleton instance
+image_ingestion_service = ImageIngestionService()
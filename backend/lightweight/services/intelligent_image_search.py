@@ -348,56 +348,46 @@ Only include images with score >= 0.7."""
         Returns:
             {"success": True, "local_path": "...", "relative_path": "..."}
         """
-        try:
-            import httpx
-            import hashlib
-            from pathlib import Path
-            import time
-            
-            # Create images directory
-            images_dir = Path("workspaces") / workspace_id / "images"
-            images_dir.mkdir(parents=True, exist_ok=True)
+        results = await self.save_images_locally([{"url": image_url, "filename": filename}], workspace_id)
+        return results[0]
+    
+    async def save_images_locally(
+        self,
+        images: List[Dict[str, Any]],
+        workspace_id: str = "default"
+    ) -> List[Dict[str, Any]]:
+        """
+        Download several images concurrently into the workspace (deduplicated).
+        
+        Args:
+            images: [{"url": ..., "filename": optional}, ...]
+            workspace_id: Workspace to save in
             
-            # Download image
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                
-                content = response.content
-                content_type = response.headers.get("content-type", "")
-                
-                # Determine extension
-                if "png" in content_type:
-                    ext = ".png"
-                elif "gif" in content_type:
-                    ext = ".gif"
-                elif "webp" in content_type:
-                    ext = ".webp"
-                else:
-                    ext = ".jpg"  # Default to jpg
-                
-                # Generate filename if not provided
-                if not filename:
-                    hash_str = hashlib.md5(content).hexdigest()[:8]
-                    filename = f"img_{int(time.time())}_{hash_str}{ext}"
-                elif not filename.endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp')):
-                    filename += ext
-                
-                # Save
-                file_path = images_dir / filename
-                file_path.write_bytes(content)
-                
-                return {
-                    "success": True,
-                    "local_path": str(file_path),
-                    "relative_path": f"{workspace_id}/images/{filename}",
-                    "filename": filename,
-                    "size": len(content)
-                }
-                
-        except Exception as e:
-            print(f"⚠️ Image download failed: {e}")
-            return {"success": False, "error": str(e), "url": image_url}
+        Returns:
+            One save_image_locally-style result per image, in input order
+        """
+        from pathlib import Path
+        from services.image_ingestion import image_ingestion_service
+        
+        images_dir = Path("workspaces") / workspace_id / "images"
+        results = await image_ingestion_service.ingest(images, images_dir)
+        
+        saved = []
+        for r in results:
+            if r["status"] != "success":
+                print(f"⚠️ Image download failed: {r.get('error')}")
+                saved.append({"success": False, "error": r.get("error"), "url": r["url"]})
+                continue
+            file_path = images_dir / r["filename"]
+            saved.append({
+                "success": True,
+                "local_path": str(file_path),
+                "relative_path": f"{workspace_id}/images/{r['filename']}",
+                "filename": r["filename"],
+                "size": file_path.stat().st_size,
+                "duplicate": r.get("duplicate", False)
+            })
+        return saved
     
     async def search_and_save(
         self,
@@ -439,17 +429,22 @@ Only include images with score >= 0.7."""
             # Determine how many to save
             images_to_save = results if save_all else [results[0]]
             
-            for img in images_to_save:
-                url = img.get("url") or img.get("full") or img.get("src")
-                if url:
-                    result = await self.save_image_locally(url, workspace_id)
-                    if result.get("success"):
-                        saved_images.append({
-                            **result,
-                            "original_url": url,
-                            "title": img.get("title", ""),
-                            "source": img.get("source", "")
-                        })
+            to_download = [
+                (img, img.get("url") or img.get("full") or img.get("src"))
+                for img in images_to_save
+            ]
+            to_download = [(img, url) for img, url in to_download if url]
+            
+            # Download all selected images concurrently
+            results = await self.save_images_locally([{"url": url} for _, url in to_download], workspace_id)
+            for (img, url), result in zip(to_download, results):
+                if result.get("success"):
+                    saved_images.append({
+                        **result,
+                        "original_url": url,
+                        "title": img.get("title", ""),
+                        "source": img.get("source", "")
+                    })
             
             if not saved_images:
                 return {
@@ -7,6 +7,9 @@ Handles ANY user request with intelligence:
 - Graceful handling of impossible requests
 - Context-aware responses
 - Speed-first, intelligence-always
+- Keyword checks read from the shared compiled IntentEngine (one regex pass
+  per message); LLM classification only below LLM_CONFIDENCE_THRESHOLD,
+  cached per normalized message
 
 Users are weird and aggressive - this handles EVERYTHING.
 """
@@ -16,6 +19,42 @@ import re
 from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from services.intent_engine import intent_engine, MessageSignals, LLM_CONFIDENCE_THRESHOLD
+
+
+# Parameter extraction patterns (only run once an intent has been chosen)
+TOPIC_PATTERN = re.compile(r'topic[:\s]+([^,\n]+)', re.IGNORECASE)
+CASE_STUDY_PATTERN = re.compile(r'case\s*study[:\s]+([^,\n]+)', re.IGNORECASE)
+PROPOSAL_TOPIC_PATTERN = re.compile(r'proposal\s+(?:on|about|for|regarding)\s+(.+)', re.IGNORECASE)
+CHAPTER_TOPIC_PATTERN = re.compile(r'(?:chapter\s*(?:one|two|1|2|i|ii)|introduction|literature\s+review)[\s,]+(?:on|about)\s+(.+?)(?:\.|$)', re.IGNORECASE)
+WEB_QUERY_PREFIX_PATTERN = re.compile(r'^(?:search\s+for|search|look\s+up|find\s+out|google|go\s+to|browse|visit|open)\s+', re.IGNORECASE)
+FILENAME_PATTERN = re.compile(r'(?:called|named|as|filename[:\s]+)\s*["\']?([^\s"\']+)["\']?')
+FILE_EXTENSION_PATTERN = re.compile(r'(\S+\.(md|txt|json|py|js|html|css))')
+FILE_CONTENT_PATTERNS = [
+    re.compile(r'(?:with|containing|with the word|with content|content[:\s]+)[:\s]*["\']?([^"\']+)["\']?$', re.IGNORECASE),
+    re.compile(r'(?:with|containing)[:\s]+(.+?)(?:\s*$)', re.IGNORECASE),
+]
+JSON_OBJECT_PATTERN = re.compile(r'\{[\s\S]*\}')
+
+# Keyword lists still needed for stripping words out of extracted topics
+PROPOSAL_KEYWORDS = ['proposal', 'first 3 chapters', 'first three chapters', 'chapters 1-3',
+                     'chapters 1 to 3', 'full proposal', 'complete proposal', 'thesis proposal',
+                     'research proposal', 'make me proposal', 'generate proposal']
+CHAPTER_ONE_KEYWORDS = ['chapter 1', 'chapter one', 'introduction chapter', 'first chapter']
+CHAPTER_TWO_KEYWORDS = ['chapter 2', 'chapter two', 'literature review', 'second chapter', 'chapter two']
+
+UNSUPPORTED_RESPONSES = [
+    ("unsupported_video", "video",
+     "Video generation is not yet supported. I can help with text, images, documents, and research."),
+    ("unsupported_audio", "audio",
+     "Audio generation is not yet supported. I can help with text, images, documents, and research."),
+    ("unsupported_music", "music",
+     "Music creation is not yet supported. I can help with text, images, documents, and research."),
+    ("unsupported_voice", "voice",
+     "Voice synthesis is not yet supported. I can help with text, images, documents, and research."),
+    ("unsupported_3d", "3d model",
+     "3D modeling is not yet supported. I can help with text, images, documents, and research."),
+]
 
 
 class IntentType(Enum):
@@ -103,7 +142,25 @@ class IntelligentIntentSystem:
         Returns:
             IntentResult with intent, route, and parameters
         """
-        message_lower = message.lower().strip()
+        result = self._classify_with_patterns(message)
+        if result and result.confidence >= LLM_CONFIDENCE_THRESHOLD:
+            return result
+        
+        # =====================================================
+        # SMART PATH - LLM classification for ambiguous cases
+        # =====================================================
+        
+        # Only reached when patterns are unsure; cached per normalized message
+        return await intent_engine.classify_with_llm(
+            "intelligent_intent",
+            message,
+            lambda: self._llm_classify(message, context),
+            cacheable=lambda r: not r.reasoning.startswith("Fallback")
+        )
+    
+    def _classify_with_patterns(self, message: str) -> Optional[IntentResult]:
+        """Fast path: classify from the compiled signal pass (< 1ms, no LLM)."""
+        signals = intent_engine.analyze(message)
         word_count = len(message.split())
         
         # =====================================================
@@ -111,7 +168,7 @@ class IntelligentIntentSystem:
         # =====================================================
         
         # 1. GREETINGS (instant)
-        if self._is_greeting(message_lower, word_count):
+        if self._is_greeting(signals, word_count):
             return IntentResult(
                 intent=IntentType.GREETING,
                 route=RouteType.INSTANT,
@@ -122,42 +179,42 @@ class IntelligentIntentSystem:
             )
         
         # 2. UNSUPPORTED REQUESTS (video, audio, etc.)
-        unsupported = self._check_unsupported(message_lower)
+        unsupported = self._check_unsupported(signals)
         if unsupported:
             return unsupported
         
         # 3. DATA/DATASET GENERATION
-        data_intent = self._classify_data_request(message_lower)
+        data_intent = self._classify_data_request(signals)
         if data_intent:
             return data_intent
         
         # 4. CHAPTER GENERATION (thesis chapters) - PRIORITY before other detections
-        chapter_intent = self._classify_chapter_request(message_lower, message)
+        chapter_intent = self._classify_chapter_request(signals, message)
         if chapter_intent:
             return chapter_intent
         
         # 4. IMAGE REQUESTS - Search vs Generate
-        image_intent = self._classify_image_request(message_lower)
+        image_intent = self._classify_image_request(signals)
         if image_intent:
             return image_intent
         
         # 5. SEARCH REQUESTS
-        search_intent = self._classify_search_request(message_lower)
+        search_intent = self._classify_search_request(signals)
         if search_intent:
             return search_intent
         
         # 6. FILE OPERATIONS
-        file_intent = self._classify_file_request(message_lower)
+        file_intent = self._classify_file_request(signals)
         if file_intent:
             return file_intent
         
         # 7. WRITING/CONTENT REQUESTS
-        writing_intent = self._classify_writing_request(message_lower)
+        writing_intent = self._classify_writing_request(signals)
         if writing_intent:
             return writing_intent
         
         # 7. SIMPLE QUESTIONS (direct LLM)
-        if self._is_simple_question(message_lower, word_count):
+        if self._is_simple_question(signals, word_count):
             return IntentResult(
                 intent=IntentType.SIMPLE_QUESTION,
                 route=RouteType.DIRECT_LLM,
@@ -168,7 +225,7 @@ class IntelligentIntentSystem:
             )
         
         # 8. CASUAL CHAT (direct LLM)
-        if word_count < 25 and not self._needs_tools(message_lower):
+        if word_count < 25 and not self._needs_tools(signals):
             return IntentResult(
                 intent=IntentType.CASUAL_CHAT,
                 route=RouteType.DIRECT_LLM,
@@ -178,88 +235,41 @@ class IntelligentIntentSystem:
                 reasoning="Short message without tool keywords"
             )
         
-        # =====================================================
-        # SMART PATH - LLM classification for ambiguous cases
-        # =====================================================
-        
-        # If we reach here, use LLM to understand intent
-        return await self._llm_classify(message, context)
+        return None
     
-    def _is_greeting(self, msg: str, word_count: int) -> bool:
+    def _is_greeting(self, signals: MessageSignals, word_count: int) -> bool:
         """Check if message is a greeting."""
-        greetings = ["hi", "hello", "hey", "greetings", "sup", "yo", "howdy", "hola", "good morning", "good afternoon", "good evening"]
-        
         # If it's short and contains a greeting
-        if word_count <= 5 and any(g in msg for g in greetings):
-            # BUT if it also contains tool keywords or URLs, it's NOT just a greeting
-            tool_keywords = ["search", "find", "generate", "create", "make", "write", "save", "file", "go to", "open", "browse", "google.com", "http", ".com", ".org", ".net"]
-            if any(t in msg for t in tool_keywords):
-                return False
-            return True
-        return False
+        # BUT if it also contains tool keywords or URLs, it's NOT just a greeting
+        return word_count <= 5 and signals.has("greeting") and not signals.has("greeting_blocker")
     
-    def _check_unsupported(self, msg: str) -> Optional[IntentResult]:
-        """Check for unsupported request types."""
-        unsupported_map = {
-            ("video", "make video", "create video", "generate video"): 
-                "Video generation is not yet supported. I can help with text, images, documents, and research.",
-            ("audio", "make audio", "create audio", "generate audio", "record"):
-                "Audio generation is not yet supported. I can help with text, images, documents, and research.",
-            ("music", "make music", "compose", "song"):
-                "Music creation is not yet supported. I can help with text, images, documents, and research.",
-            ("voice", "text to speech", "tts", "speak"):
-                "Voice synthesis is not yet supported. I can help with text, images, documents, and research.",
-            ("3d model", "3d render", "blender", "cad"):
-                "3D modeling is not yet supported. I can help with text, images, documents, and research.",
-            ("translate", "translation"):
-                None,  # We CAN do translation via LLM
-        }
-        
-        for keywords, response in unsupported_map.items():
-            if response and any(k in msg for k in keywords):
-                # Check if it's a creation request (not just mentioning)
-                if any(action in msg for action in ["make", "create", "generate", "produce", "build", "record"]):
-                    return IntentResult(
-                        intent=IntentType.UNSUPPORTED,
-                        route=RouteType.GRACEFUL,
-                        confidence=0.95,
-                        params={"requested": keywords[0]},
-                        message=response,
-                        reasoning=f"Detected unsupported request: {keywords[0]}"
-                    )
+    def _check_unsupported(self, signals: MessageSignals) -> Optional[IntentResult]:
+        """Check for unsupported request types (translation is fine - the LLM does it)."""
+        # Only a creation request counts, not just mentioning the medium
+        if not signals.has("creation_action"):
+            return None
+        
+        for signal, requested, response in UNSUPPORTED_RESPONSES:
+            if signals.has(signal):
+                return IntentResult(
+                    intent=IntentType.UNSUPPORTED,
+                    route=RouteType.GRACEFUL,
+                    confidence=0.95,
+                    params={"requested": requested},
+                    message=response,
+                    reasoning=f"Detected unsupported request: {requested}"
+                )
         return None
     
-    def _classify_data_request(self, msg: str) -> Optional[IntentResult]:
+    def _classify_data_request(self, signals: MessageSignals) -> Optional[IntentResult]:
         """Classify dataset/data collection requests."""
-        
-        # Keywords that indicate dataset generation
-        dataset_keywords = [
-            'generate dataset', 'create dataset', 'make dataset',
-            'generate data', 'create data', 'synthetic data',
-            'collect data', 'data collection', 'fill questionnaire',
-            'simulate responses', 'generate responses', 'sample data',
-            'create csv', 'generate csv', 'spss data', 'survey data',
-            'respondent data', 'generate respondents'
-        ]
-        
-        if any(keyword in msg for keyword in dataset_keywords):
-            # Try to extract sample size
-            import re
+        if signals.has("dataset"):
+            # Try to extract sample size: "100 respondents", "sample of 50", "n=385"
             sample_size = None
-            
-            # Pattern: "100 respondents", "sample of 50", "n=385"
-            size_patterns = [
-                r'(\d+)\s+respondents?',
-                r'(\d+)\s+samples?',
-                r'sample\s+(?:size\s+)?(?:of\s+)?(\d+)',
-                r'n\s*=\s*(\d+)',
-                r'(\d+)\s+(?:data\s+)?points?',
-            ]
-            
-            for pattern in size_patterns:
-                match = re.search(pattern, msg)
-                if match:
-                    sample_size = int(match.group(1))
+            for signal in ("sample_size_respondents", "sample_size_samples", "sample_size_of",
+                           "sample_size_n", "sample_size_points"):
+                if signals.has(signal):
+                    sample_size = int(signals.value(signal))
                     break
             
             return IntentResult(
@@ -275,16 +285,7 @@ class IntelligentIntentSystem:
             )
         
         # Check for Chapter 5 generation (results and discussion)
-        chapter5_keywords = [
-            'chapter 5', 'chapter five', 'chapter5',
-            'results and discussion', 'discussion of findings',
-            'interpret findings', 'findings discussion',
-            'generate chapter 5', 'create chapter 5', 'write chapter 5',
-            'chapter five results', 'synthesis of findings',
-            'compare with literature', 'discussion chapter'
-        ]
-        
-        if any(keyword in msg for keyword in chapter5_keywords):
+        if signals.has("chapter_five"):
             return IntentResult(
                 intent=IntentType.CHAPTER_FIVE_GENERATE,
                 route=RouteType.PIPELINE,
@@ -298,16 +299,7 @@ class IntelligentIntentSystem:
             )
         
         # Check for Chapter 6 generation (conclusions and recommendations)
-        chapter6_keywords = [
-            'chapter 6', 'chapter six', 'chapter6',
-            'summary conclusion recommendation', 'conclusions and recommendations',
-            'conclusion and recommendation', 'summary conclusion',
-            'generate chapter 6', 'create chapter 6', 'write chapter 6',
-            'chapter six conclusion', 'conclusion chapter', 'recommendations chapter',
-            'final chapter', 'thesis conclusion'
-        ]
-        
-        if any(keyword in msg for keyword in chapter6_keywords):
+        if signals.has("chapter_six"):
             return IntentResult(
                 intent=IntentType.CHAPTER_SIX_GENERATE,
                 route=RouteType.PIPELINE,
@@ -321,16 +313,7 @@ class IntelligentIntentSystem:
             )
         
         # Check for Chapter 4 generation (data analysis)
-        chapter4_keywords = [
-            'chapter 4', 'chapter four', 'chapter4',
-            'data analysis', 'analyze data', 'analyse data',
-            'data presentation', 'present findings', 'present data',
-            'analyze findings', 'analyse findings', 'interpret data',
-            'generate chapter 4', 'create chapter 4', 'write chapter 4',
-            'data and analysis', 'findings chapter'
-        ]
-        
-        if any(keyword in msg for keyword in chapter4_keywords):
+        if signals.has("chapter_four"):
             return IntentResult(
                 intent=IntentType.CHAPTER_FOUR_GENERATE,
                 route=RouteType.PIPELINE,
@@ -344,16 +327,7 @@ class IntelligentIntentSystem:
             )
         
         # Check for thesis combination/complete thesis generation
-        thesis_keywords = [
-            'generate complete thesis', 'generate full thesis', 'generate entire thesis',
-            'combine chapters', 'combine all chapters', 'one file thesis',
-            'complete thesis', 'full thesis', 'entire thesis',
-            'thesis status', 'thesis combined', 'all chapters in one',
-            'generate thesis', 'create thesis', 'make thesis',
-            'thesis chapter 1 to 6', 'chapters 1-6', 'chapters 1 through 6'
-        ]
-        
-        if any(keyword in msg for keyword in thesis_keywords):
+        if signals.has("thesis_combine"):
             return IntentResult(
                 intent=IntentType.THESIS_COMBINE_GENERATE,
                 route=RouteType.PIPELINE,
@@ -367,25 +341,20 @@ class IntelligentIntentSystem:
         
         return None
     
-    def _classify_image_request(self, msg: str) -> Optional[IntentResult]:
+    def _classify_image_request(self, signals: MessageSignals) -> Optional[IntentResult]:
         """Classify image-related requests - search vs generate."""
+        msg = signals.text
         
         # Check if it's an image request at all
-        image_keywords = ["image", "picture", "photo", "pic", "photograph", "illustration"]
-        if not any(k in msg for k in image_keywords):
+        if not signals.has("image_word"):
             return None
         
         # SEARCH indicators (prioritize these!) - must be combined with image keywords
-        search_indicators = ["search", "find", "look for", "get me", "show me", "image of", "picture of", "photo of"]
-        is_search = any(s in msg for s in search_indicators)
+        is_search = signals.has("image_search")
         
         # GENERATE indicators (only for specific content)
-        generate_indicators = ["generate", "create", "make", "draw", "design"]
-        generate_content = ["diagram", "flowchart", "chart", "infographic", "framework", 
-                          "schematic", "visualization", "concept", "illustration of concept"]
-        
-        needs_generation = any(g in msg for g in generate_content)
-        explicit_generate = any(f"{g} image" in msg or f"{g} picture" in msg for g in generate_indicators)
+        needs_generation = signals.has("image_generate_content")
+        explicit_generate = signals.has("image_generate_explicit")
         
         # Decision logic
         if is_search and not needs_generation and not explicit_generate:
@@ -432,16 +401,14 @@ class IntelligentIntentSystem:
             reasoning="Ambiguous image request, defaulting to search"
         )
     
-    def _classify_search_request(self, msg: str) -> Optional[IntentResult]:
+    def _classify_search_request(self, signals: MessageSignals) -> Optional[IntentResult]:
         """Classify search requests - web, papers, etc."""
+        msg = signals.text
         
         # PAPER/ACADEMIC search
-        paper_indicators = ["paper", "research", "study", "academic", "literature", "journal", "article", "publication"]
-        search_verbs = ["search", "find", "look for"]
-        
-        if any(p in msg for p in paper_indicators) and any(s in msg for s in search_verbs):
+        if signals.has("paper_word") and signals.has("paper_search_verb"):
             # Check for synthesis request
-            if any(s in msg for s in ["synthesis", "synthesize", "review", "summarize", "analyze"]):
+            if signals.has("synthesis_word"):
                 # Extract topic
                 topic = msg
                 for remove in ["search", "find", "papers", "research", "and", "synthesize", "write", "synthesis", "on", "about"]:
@@ -471,14 +438,13 @@ class IntelligentIntentSystem:
             )
         
         # WEB search
-        if any(s in msg for s in ["search", "look up", "find out", "google", "go to", "browse", "open"]):
-            if len(msg.split()) < 20:  # Slightly longer queries allowed for URLs
-                import re
+        if signals.has("web_search"):
+            if signals.word_count < 20:  # Slightly longer queries allowed for URLs
                 # Use regex to only remove prefix verbs/meta from the START of the query
-                query = re.sub(r'^(?:search\s+for|search|look\s+up|find\s+out|google|go\s+to|browse|visit|open)\s+', '', msg, flags=re.IGNORECASE).strip()
+                query = WEB_QUERY_PREFIX_PATTERN.sub('', msg).strip()
                 
                 # If it looks like a URL but we didn't extract a query, use the whole msg
-                if not query and (".com" in msg or ".org" in msg or "http" in msg):
+                if not query and signals.has("url_hint"):
                     query = msg
                 
                 return IntentResult(
@@ -492,15 +458,15 @@ class IntelligentIntentSystem:
         
         return None
     
-    def _classify_file_request(self, msg: str) -> Optional[IntentResult]:
+    def _classify_file_request(self, signals: MessageSignals) -> Optional[IntentResult]:
         """Classify file operation requests."""
+        msg = signals.text
         
         # PDF actions
-        if "pdf" in msg:
-            if any(a in msg for a in ["summarize", "read", "analyze", "extract", "what's in"]):
+        if signals.has("pdf"):
+            if signals.has("pdf_action"):
                 # Extract PDF name if mentioned
-                pdf_match = re.search(r'(\S+\.pdf)', msg, re.IGNORECASE)
-                pdf_name = pdf_match.group(1) if pdf_match else None
+                pdf_name = signals.value("pdf_name")
                 
                 return IntentResult(
                     intent=IntentType.PDF_ACTION,
@@ -512,31 +478,21 @@ class IntelligentIntentSystem:
                 )
         
         # FILE CREATION/WRITE detection (NEW!)
-        write_verbs = ["create", "make", "write", "save", "generate"]
-        file_types = ["file", "md file", "markdown file", "txt file", "text file", "json file"]
-        
-        has_write_verb = any(v in msg for v in write_verbs)
-        has_file_type = any(f in msg for f in file_types)
-        
-        if has_write_verb and has_file_type:
+        if signals.has("file_write_verb") and signals.has("file_type"):
             # Extract filename if provided
-            filename_match = re.search(r'(?:called|named|as|filename[:\s]+)\s*["\']?([^\s"\']+)["\']?', msg)
+            filename_match = FILENAME_PATTERN.search(msg)
             filename = filename_match.group(1) if filename_match else None
             
             # If no explicit filename, try to detect file extension patterns like "test.md"
             if not filename:
-                ext_match = re.search(r'(\S+\.(md|txt|json|py|js|html|css))', msg)
+                ext_match = FILE_EXTENSION_PATTERN.search(msg)
                 if ext_match:
                     filename = ext_match.group(1)
             
             # Extract content from patterns like "with the word X", "containing X", "with content X"
-            content_patterns = [
-                r'(?:with|containing|with the word|with content|content[:\s]+)[:\s]*["\']?([^"\']+)["\']?$',
-                r'(?:with|containing)[:\s]+(.+?)(?:\s*$)',
-            ]
             content = None
-            for pattern in content_patterns:
-                content_match = re.search(pattern, msg, re.IGNORECASE)
+            for pattern in FILE_CONTENT_PATTERNS:
+                content_match = pattern.search(msg)
                 if content_match:
                     content = content_match.group(1).strip()
                     break
@@ -555,7 +511,7 @@ class IntelligentIntentSystem:
             )
         
         # File listing
-        if any(l in msg for l in ["list files", "show files", "what files", "see files"]):
+        if signals.has("file_list"):
             return IntentResult(
                 intent=IntentType.FILE_LIST,
                 route=RouteType.TOOL_DIRECT,
@@ -566,7 +522,7 @@ class IntelligentIntentSystem:
             )
         
         # File reading
-        if any(r in msg for r in ["read file", "open file", "show file", "view file"]):
+        if signals.has("file_read"):
             return IntentResult(
                 intent=IntentType.FILE_READ,
                 route=RouteType.TOOL_DIRECT,
@@ -578,18 +534,15 @@ class IntelligentIntentSystem:
         
         return None
     
-    def _classify_writing_request(self, msg: str) -> Optional[IntentResult]:
+    def _classify_writing_request(self, signals: MessageSignals) -> Optional[IntentResult]:
         """Classify writing/content requests."""
-        
-        write_verbs = ["write", "create", "generate", "make", "draft", "compose"]
-        content_types = ["essay", "document", "report", "paper", "article", "content", "text"]
+        msg = signals.text
         
         # Check for writing request
-        has_write_verb = any(v in msg for v in write_verbs)
-        has_content_type = any(c in msg for c in content_types)
-        
-        if has_write_verb and has_content_type:
+        if signals.has("write_verb") and signals.has("content_type"):
             # Extract topic
+            write_verbs = ["write", "create", "generate", "make", "draft", "compose"]
+            content_types = ["essay", "document", "report", "paper", "article", "content", "text"]
             topic = msg
             for remove in write_verbs + content_types + ["an", "a", "about", "on"]:
                 topic = topic.replace(remove, "").strip()
@@ -605,56 +558,29 @@ class IntelligentIntentSystem:
         
         return None
     
-    def _classify_chapter_request(self, msg: str, original: str) -> Optional[IntentResult]:
+    def _classify_chapter_request(self, signals: MessageSignals, original: str) -> Optional[IntentResult]:
         """Classify thesis chapter generation requests."""
-        
-        # Chapter One indicators
-        chapter_one_keywords = ["chapter one", "chapter 1", "chapter i", "introduction chapter", 
-                          "thesis introduction", "write chapter one", "generate chapter one",
-                          "dissertation chapter one", "thesis chapter one"]
-        
-        # Chapter Two indicators
-        chapter_two_keywords = ["chapter two", "chapter 2", "chapter ii", "literature review",
-                          "lit review", "write chapter two", "generate chapter two",
-                          "write literature review", "generate literature review",
-                          "review of literature", "related literature"]
-        
-        # Section indicators (user might just mention sections)
-        section_keywords = ["background of the study", "statement of the problem", 
-                          "objectives of the study", "research questions", "justification",
-                          "setting the scene", "delimitations", "limitations"]
-        
-        # Chapter-specific keywords
-        chapter_one_keywords = ['chapter 1', 'chapter one', 'introduction chapter', 'first chapter']
-        chapter_two_keywords = ['chapter 2', 'chapter two', 'literature review', 'second chapter', 'chapter two']
-        chapter_three_keywords = ['chapter 3', 'chapter three', 'methodology', 'research methodology', 'third chapter', 'methods chapter']
-        
-        # PROPOSAL keywords - for generating all 3 chapters
-        proposal_keywords = ['proposal', 'first 3 chapters', 'first three chapters', 'chapters 1-3', 
-                            'chapters 1 to 3', 'full proposal', 'complete proposal', 'thesis proposal',
-                            'research proposal', 'make me proposal', 'generate proposal']
-        
-        message_lower = msg.lower() # Convert message to lowercase once for efficiency
+        msg = signals.text
+        message_lower = msg
         
         # Check for proposal request FIRST (highest priority)
-        if any(keyword in message_lower for keyword in proposal_keywords):
+        if signals.has("proposal"):
             # Extract topic and case study from message
             topic = ""
             case_study = ""
             
             # Pattern: "Topic: X, Case Study: Y"
-            import re
-            topic_match = re.search(r'topic[:\s]+([^,\n]+)', message_lower, re.IGNORECASE)
+            topic_match = TOPIC_PATTERN.search(message_lower)
             if topic_match:
                 topic = topic_match.group(1).strip()
             
             # Pattern: "proposal on X" or "proposal about X"
             if not topic:
-                on_match = re.search(r'proposal\s+(?:on|about|for|regarding)\s+(.+)', original, re.IGNORECASE)
+                on_match = PROPOSAL_TOPIC_PATTERN.search(original)
                 if on_match:
                     topic = on_match.group(1).strip()
             
-            case_match = re.search(r'case\s*study[:\s]+([^,\n]+)', message_lower, re.IGNORECASE)
+            case_match = CASE_STUDY_PATTERN.search(message_lower)
             if case_match:
                 case_study = case_match.group(1).strip()
             
@@ -674,7 +600,7 @@ class IntelligentIntentSystem:
                 # If still no topic, use cleaned message as fallback
                 if not topic:
                     topic = original
-                    for kw in proposal_keywords + ["write", "generate", "create"]:
+                    for kw in PROPOSAL_KEYWORDS + ["write", "generate", "create"]:
                         topic = topic.lower().replace(kw, "").strip()
                     topic = topic.strip()
 
@@ -694,13 +620,13 @@ class IntelligentIntentSystem:
             )
         
         # Then check for individual chapters
-        is_chapter_one = any(keyword in message_lower for keyword in chapter_one_keywords)
-        is_chapter_two = any(keyword in message_lower for keyword in chapter_two_keywords)
-        is_chapter_three = any(keyword in message_lower for keyword in chapter_three_keywords)
-        is_section_request = any(k in msg for k in section_keywords) and any(w in msg for w in ["write", "generate", "create"])
+        is_chapter_one = signals.has("chapter_one")
+        is_chapter_two = signals.has("chapter_two")
+        is_chapter_three = signals.has("chapter_three")
+        is_section_request = signals.has("section") and signals.has("section_verb")
         
         # Generic chapter request (fallback to chapter one)
-        generic_chapter = any(k in msg for k in ["write chapter", "generate chapter", "thesis chapter", "dissertation chapter"])
+        generic_chapter = signals.has("generic_chapter")
         
         if is_chapter_three or is_chapter_two or is_chapter_one or is_section_request or generic_chapter:
             # Try to extract topic and case study from message
@@ -708,18 +634,17 @@ class IntelligentIntentSystem:
             case_study = ""
             
             # Pattern: "Topic: X, Case Study: Y"
-            import re
-            topic_match = re.search(r'topic[:\s]+([^,\n]+)', msg, re.IGNORECASE)
+            topic_match = TOPIC_PATTERN.search(msg)
             if topic_match:
                 topic = topic_match.group(1).strip()
             
-            case_match = re.search(r'case\s*study[:\s]+([^,\n]+)', msg, re.IGNORECASE)
+            case_match = CASE_STUDY_PATTERN.search(msg)
             if case_match:
                 case_study = case_match.group(1).strip()
             
             # Pattern: "chapter X on Y"  
             if not topic:
-                on_match = re.search(r'(?:chapter\s*(?:one|two|1|2|i|ii)|introduction|literature\s+review)[\s,]+(?:on|about)\s+(.+?)(?:\.|$)', msg, re.IGNORECASE)
+                on_match = CHAPTER_TOPIC_PATTERN.search(msg)
                 if on_match:
                     topic = on_match.group(1).strip()
             
@@ -727,7 +652,7 @@ class IntelligentIntentSystem:
             if not topic:
                 # Remove chapter keywords
                 topic = original
-                for kw in chapter_one_keywords + chapter_two_keywords + ["write", "generate", "create"]:
+                for kw in CHAPTER_ONE_KEYWORDS + CHAPTER_TWO_KEYWORDS + ["write", "generate", "create"]:
                     topic = topic.lower().replace(kw, "").strip()
                 topic = topic.strip()
             
@@ -779,29 +704,19 @@ class IntelligentIntentSystem:
         
         return None
     
-    def _is_simple_question(self, msg: str, word_count: int) -> bool:
+    def _is_simple_question(self, signals: MessageSignals, word_count: int) -> bool:
         """Check if it's a simple question that LLM can answer directly."""
-        question_starters = ["what", "who", "when", "where", "why", "how", "is", "are", 
-                           "can", "do", "does", "will", "would", "should", "could", 
-                           "explain", "define", "describe", "tell me"]
-        
-        if word_count < 30 and any(msg.startswith(q) for q in question_starters):
-            # Make sure it doesn't need tools
-            if not self._needs_tools(msg):
-                return True
-        return False
+        # Make sure it doesn't need tools
+        return word_count < 30 and signals.has("question_start") and not self._needs_tools(signals)
     
-    def _needs_tools(self, msg: str) -> bool:
+    def _needs_tools(self, signals: MessageSignals) -> bool:
         """Check if message needs external tools."""
-        tool_triggers = [
-            "search", "find", "generate", "create", "make", "write", "save", 
-            "file", "document", "image", "picture", "paper", "pdf"
-        ]
-        return any(t in msg for t in tool_triggers)
+        return signals.has("needs_tools")
     
     async def _llm_classify(self, message: str, context: Optional[Dict] = None) -> IntentResult:
         """Use LLM to classify ambiguous intents."""
         from services.deepseek_direct import deepseek_direct_service
+        from services.provider_admission import Priority
         
         try:
             prompt = f"""Classify this user request and determine the best action.
@@ -833,11 +748,12 @@ JSON only:"""
                 prompt=prompt,
                 system_prompt="You are an intent classification system. Output ONLY valid JSON.",
                 temperature=0.3,
-                max_tokens=300
+                max_tokens=300,
+                priority=Priority.INTERACTIVE
             )
             
             # Parse JSON response
-            json_match = re.search(r'\{[\s\S]*\}', response)
+            json_match = JSON_OBJECT_PATTERN.search(response)
             if json_match:
                 data = json.loads(json_match.group())
                 
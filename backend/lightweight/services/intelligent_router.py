@@ -5,13 +5,42 @@ Maps natural language requests to thesis generation workflows without requiring
 Uses Gemini's function calling to intelligently route requests and ask clarifying questions.
 """
 
-import re
 import json
+import re
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 import google.generativeai as genai
 import os
 
+from services.intent_engine import intent_engine, MessageSignals, LLM_CONFIDENCE_THRESHOLD
+
+
+QUESTION_CONFIDENCE_PENALTY = 0.3  # "what should chapter 2 cover?" is not a request
+
+# How reliably each routing signal identifies the request on its own; only
+# hits at or above LLM_CONFIDENCE_THRESHOLD skip the LLM (which also extracts
+# topic / case study / objectives from the message)
+ROUTE_SIGNAL_CONFIDENCE = {
+    "route_chapter_verb": 0.9,    # "write chapter 2"
+    "route_chapter_start": 0.6,   # "start chapter 2" (but also "does chapter 2...")
+    "route_chapter": 0.4,         # any mention of "chapter 2"
+    "route_dataset": 0.5,
+    "route_study_tools": 0.5,
+    "route_combine": 0.8,
+    "route_full_thesis": 0.8,
+}
+
+# Words a bare routing command is made of ("please write chapter 2 now").
+# Anything else in the message ("... on mobile money in Kenya") is topic or
+# case-study text only the LLM extracts, so such messages skip the fast path
+COMMAND_WORDS = {
+    "write", "generate", "create", "make", "do", "start", "begin", "combine", "merge", "join",
+    "chapter", "chapters", "thesis", "document", "dataset", "data", "synthetic",
+    "questionnaire", "questionnaires", "interview", "interviews", "survey", "study", "tools",
+    "full", "complete", "entire", "all", "every", "the", "a", "an", "my", "me", "for",
+    "into", "one", "please", "now", "next", "i", "want", "need", "to", "can", "you", "lets", "let's",
+}
+
 
 class IntelligentRouter:
     """Routes natural language requests to appropriate thesis generation functions."""
@@ -62,30 +91,13 @@ class IntelligentRouter:
             }
         }
         
-        # Intent patterns for quick matching (fallback if LLM unavailable)
-        self.intent_patterns = {
-            "generate_chapter": [
-                r"(?:write|generate|create|make).*chapter\s*(\d+)",
-                r"chapter\s*(\d+)",
-                r"(?:do|start|begin).*chapter\s*(\d+)",
-            ],
-            "generate_dataset": [
-                r"(?:create|generate|make).*(?:dataset|data)",
-                r"(?:need|want).*data",
-                r"synthetic.*data",
-            ],
-            "generate_study_tools": [
-                r"(?:create|generate|make).*(?:questionnaire|interview|survey)",
-                r"study.*tools",
-            ],
-            "combine_thesis": [
-                r"(?:combine|merge|join).*(?:chapters|thesis)",
-                r"(?:create|make).*(?:full|complete).*(?:thesis|document)",
-            ],
-            "generate_full_thesis": [
-                r"(?:generate|create|write).*(?:full|complete|entire).*thesis",
-                r"(?:all|every).*chapters",
-            ]
+        # Intent signals for quick matching (compiled in services.intent_engine)
+        self.intent_signals = {
+            "generate_chapter": ["route_chapter_verb", "route_chapter", "route_chapter_start"],
+            "generate_dataset": ["route_dataset"],
+            "generate_study_tools": ["route_study_tools"],
+            "combine_thesis": ["route_combine"],
+            "generate_full_thesis": ["route_full_thesis"],
         }
     
     async def route(self, user_message: str, session_context: Dict = None) -> Dict[str, Any]:
@@ -107,12 +119,31 @@ class IntelligentRouter:
         """
         session_context = session_context or {}
         
-        # Try LLM-based routing first
+        # Unambiguous requests are routed by the compiled patterns alone
+        pattern_result = self._route_with_patterns(user_message, session_context)
+        action = pattern_result["action"]
+        if (
+            action in self.thesis_workflows
+            and not pattern_result["needs_clarification"]
+            and not self._has_extra_details(user_message)
+            and self._pattern_confidence(intent_engine.analyze(user_message), action) >= LLM_CONFIDENCE_THRESHOLD
+        ):
+            return pattern_result
+        
+        # Otherwise ask the LLM (cached per message + session context;
+        # pattern fallbacks after an LLM error are not cached)
         try:
-            return await self._route_with_llm(user_message, session_context)
+            context_key = json.dumps(session_context, sort_keys=True, default=str)
+            return await intent_engine.classify_with_llm(
+                "intelligent_router",
+                user_message,
+                lambda: self._route_with_llm(user_message, session_context),
+                context_key=context_key,
+                cacheable=lambda r: isinstance(r, dict) and r.get("routed_by") != "patterns"
+            )
         except Exception as e:
             print(f"⚠️ LLM routing failed, using pattern matching: {e}")
-            return self._route_with_patterns(user_message, session_context)
+            return pattern_result
     
     async def _route_with_llm(self, user_message: str, session_context: Dict) -> Dict[str, Any]:
         """Use DeepSeek function calling (or prompt engineering) to route the request."""
@@ -169,10 +200,12 @@ Return ONLY valid JSON.
         
         try:
             from services.deepseek_direct import deepseek_direct_service
+            from services.provider_admission import Priority
             response_text = await deepseek_direct_service.generate_content(
                 prompt=prompt,
                 system_prompt="You are a strict JSON-outputting routing agent.",
-                temperature=0.1
+                temperature=0.1,
+                priority=Priority.INTERACTIVE
             )
             
             # clean response
@@ -182,17 +215,34 @@ Return ONLY valid JSON.
         except Exception as e:
             print(f"⚠️ DeepSeek routing failed: {e}")
             # Fallback to pattern matching
-            return self._route_with_patterns(user_message, session_context)
+            result = self._route_with_patterns(user_message, session_context)
+            result["routed_by"] = "patterns"
+            return result
+    
+    def _pattern_confidence(self, signals: MessageSignals, action: str) -> float:
+        """Confidence of the strongest routing signal behind a pattern-routed action."""
+        group = "generate_chapter" if action.startswith("generate_chapter_") else action
+        confidence = max(
+            (ROUTE_SIGNAL_CONFIDENCE[name] for name in self.intent_signals.get(group, []) if signals.has(name)),
+            default=0.0
+        )
+        if signals.has("question_start") or signals.text.endswith("?"):
+            confidence -= QUESTION_CONFIDENCE_PENALTY
+        return confidence
+    
+    def _has_extra_details(self, user_message: str) -> bool:
+        """Whether the message says more than a bare command (e.g. a topic or case study)."""
+        words = re.findall(r"[a-z']+", user_message.lower())
+        return any(word not in COMMAND_WORDS for word in words)
     
     def _route_with_patterns(self, user_message: str, session_context: Dict) -> Dict[str, Any]:
-        """Fallback pattern-based routing."""
-        msg_lower = user_message.lower().strip()
+        """Pattern-based routing (fast path, and fallback if LLM unavailable)."""
+        signals = intent_engine.analyze(user_message)
         
         # Check for chapter generation
-        for pattern in self.intent_patterns["generate_chapter"]:
-            match = re.search(pattern, msg_lower)
-            if match:
-                chapter_num = match.group(1)
+        for signal in self.intent_signals["generate_chapter"]:
+            chapter_num = signals.value(signal)
+            if chapter_num:
                 func_name = f"generate_chapter_{chapter_num}"
                 
                 if func_name in self.thesis_workflows:
@@ -215,54 +265,51 @@ Return ONLY valid JSON.
                     }
         
         # Check for dataset generation
-        for pattern in self.intent_patterns["generate_dataset"]:
-            if re.search(pattern, msg_lower):
-                missing_params = self._check_missing_params("generate_dataset", session_context)
-                
-                if missing_params:
-                    return {
-                        "action": "clarify",
-                        "params": {},
-                        "needs_clarification": True,
-                        "clarification_message": self._build_clarification_message(missing_params)
-                    }
-                
+        if signals.has(*self.intent_signals["generate_dataset"]):
+            missing_params = self._check_missing_params("generate_dataset", session_context)
+            
+            if missing_params:
                 return {
-                    "action": "generate_dataset",
-                    "params": self._extract_params("generate_dataset", session_context),
-                    "needs_clarification": False,
-                    "workflow_path": self.thesis_workflows["generate_dataset"]["workflow_path"]
+                    "action": "clarify",
+                    "params": {},
+                    "needs_clarification": True,
+                    "clarification_message": self._build_clarification_message(missing_params)
                 }
+            
+            return {
+                "action": "generate_dataset",
+                "params": self._extract_params("generate_dataset", session_context),
+                "needs_clarification": False,
+                "workflow_path": self.thesis_workflows["generate_dataset"]["workflow_path"]
+            }
         
         # Check for combine thesis
-        for pattern in self.intent_patterns["combine_thesis"]:
-            if re.search(pattern, msg_lower):
-                return {
-                    "action": "combine_thesis",
-                    "params": {},
-                    "needs_clarification": False,
-                    "workflow_path": self.thesis_workflows["combine_thesis"]["workflow_path"]
-                }
+        if signals.has(*self.intent_signals["combine_thesis"]):
+            return {
+                "action": "combine_thesis",
+                "params": {},
+                "needs_clarification": False,
+                "workflow_path": self.thesis_workflows["combine_thesis"]["workflow_path"]
+            }
         
         # Check for full thesis generation
-        for pattern in self.intent_patterns["generate_full_thesis"]:
-            if re.search(pattern, msg_lower):
-                missing_params = self._check_missing_params("generate_full_thesis", session_context)
-                
-                if missing_params:
-                    return {
-                        "action": "clarify",
-                        "params": {},
-                        "needs_clarification": True,
-                        "clarification_message": self._build_clarification_message(missing_params)
-                    }
-                
+        if signals.has(*self.intent_signals["generate_full_thesis"]):
+            missing_params = self._check_missing_params("generate_full_thesis", session_context)
+            
+            if missing_params:
                 return {
-                    "action": "generate_full_thesis",
-                    "params": self._extract_params("generate_full_thesis", session_context),
-                    "needs_clarification": False,
-                    "workflow_path": self.thesis_workflows["generate_full_thesis"]["workflow_path"]
+                    "action": "clarify",
+                    "params": {},
+                    "needs_clarification": True,
+                    "clarification_message": self._build_clarification_message(missing_params)
                 }
+            
+            return {
+                "action": "generate_full_thesis",
+                "params": self._extract_params("generate_full_thesis", session_context),
+                "needs_clarification": False,
+                "workflow_path": self.thesis_workflows["generate_full_thesis"]["workflow_path"]
+            }
         
         # No match found
         return {
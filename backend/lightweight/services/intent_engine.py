@@ -0,0 +1,367 @@
+"""
+Intent Engine - Single-Pass Compiled Message Classification
+
+Shared front end for the chat routers (IntelligentIntentSystem,
+IntelligentRouter, TaskClassifier, CentralBrain). Every keyword list and
+regex those classifiers used to loop over is registered here as a named
+signal and evaluated once per message; each classifier just reads the
+signals it cares about.
+
+Features:
+- Keyword signals (most of the table): every keyword of every signal in
+  one trie-shaped alternation, walked once with finditer; keywords that
+  overlap (e.g. "search" inside "research", "make" inside "make video")
+  are resolved through a precomputed prefix table
+- Regex signals with their own structure (e.g. "write ... chapter N")
+  precompiled and tested individually
+- Evaluated on `message.lower().strip()` like the classifiers always did
+  (`keyword in msg` / `re.search` / `re.match` semantics per signal)
+- Per-message results cached by that lowercased text (LRU)
+- Shared LLM classification cache with in-flight de-duplication, so the
+  same ambiguous message never triggers duplicate LLM calls
+- LLM_CONFIDENCE_THRESHOLD: classifiers only call the LLM below it
+"""
+
+import re
+import time
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+
+# Pattern results at or above this confidence skip LLM classification
+LLM_CONFIDENCE_THRESHOLD = 0.7
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, trim and collapse whitespace (the LLM cache key for a message)."""
+    return _WHITESPACE.sub(" ", message.lower()).strip()
+
+
+def _keywords(*keywords: str) -> Tuple[str, ...]:
+    """A keyword signal: present if any keyword is a substring of the message."""
+    return keywords
+
+
+# =============================================================================
+# SIGNAL TABLE
+#
+# name -> (keywords or pattern, anchored)
+#   anchored=False: present if it occurs anywhere (substring / re.search)
+#   anchored=True:  present if the message starts with it (startswith / re.match)
+# The matched text is available as the signal's value; a (?P<value>...)
+# group inside a pattern narrows the value to that group.
+# =============================================================================
+
+SIGNALS: Dict[str, Tuple[Union[str, Tuple[str, ...]], bool]] = {
+    # --- Greetings / chat -----------------------------------------------------
+    "greeting": (_keywords("hi", "hello", "hey", "greetings", "sup", "yo", "howdy", "hola",
+                           "good morning", "good afternoon", "good evening"), False),
+    "greeting_blocker": (_keywords("search", "find", "generate", "create", "make", "write", "save",
+                                   "file", "go to", "open", "browse", "google.com", "http",
+                                   ".com", ".org", ".net"), False),
+    "question_start": (_keywords("what", "who", "when", "where", "why", "how", "is", "are",
+                                 "can", "do", "does", "will", "would", "should", "could",
+                                 "explain", "define", "describe", "tell me"), True),
+    "needs_tools": (_keywords("search", "find", "generate", "create", "make", "write", "save",
+                              "file", "document", "image", "picture", "paper", "pdf"), False),
+
+    # --- Unsupported media ----------------------------------------------------
+    "unsupported_video": (_keywords("video", "make video", "create video", "generate video"), False),
+    "unsupported_audio": (_keywords("audio", "make audio", "create audio", "generate audio", "record"), False),
+    "unsupported_music": (_keywords("music", "make music", "compose", "song"), False),
+    "unsupported_voice": (_keywords("voice", "text to speech", "tts", "speak"), False),
+    "unsupported_3d": (_keywords("3d model", "3d render", "blender", "cad"), False),
+    "creation_action": (_keywords("make", "create", "generate", "produce", "build", "record"), False),
+
+    # --- Datasets and later chapters -----------------------------------------
+    "dataset": (_keywords("generate dataset", "create dataset", "make dataset",
+                          "generate data", "create data", "synthetic data",
+                          "collect data", "data collection", "fill questionnaire",
+                          "simulate responses", "generate responses", "sample data",
+                          "create csv", "generate csv", "spss data", "survey data",
+                          "respondent data", "generate respondents"), False),
+    "sample_size_respondents": (r"(?P<value>\d+)\s+respondents?", False),
+    "sample_size_samples": (r"(?P<value>\d+)\s+samples?", False),
+    "sample_size_of": (r"sample\s+(?:size\s+)?(?:of\s+)?(?P<value>\d+)", False),
+    "sample_size_n": (r"n\s*=\s*(?P<value>\d+)", False),
+    "sample_size_points": (r"(?P<value>\d+)\s+(?:data\s+)?points?", False),
+    "chapter_five": (_keywords("chapter 5", "chapter five", "chapter5",
+                               "results and discussion", "discussion of findings",
+                               "interpret findings", "findings discussion",
+                               "generate chapter 5", "create chapter 5", "write chapter 5",
+                               "chapter five results", "synthesis of findings",
+                               "compare with literature", "discussion chapter"), False),
+    "chapter_six": (_keywords("chapter 6", "chapter six", "chapter6",
+                              "summary conclusion recommendation", "conclusions and recommendations",
+                              "conclusion and recommendation", "summary conclusion",
+                              "generate chapter 6", "create chapter 6", "write chapter 6",
+                              "chapter six conclusion", "conclusion chapter", "recommendations chapter",
+                              "final chapter", "thesis conclusion"), False),
+    "chapter_four": (_keywords("chapter 4", "chapter four", "chapter4",
+                               "data analysis", "analyze data", "analyse data",
+                               "data presentation", "present findings", "present data",
+                               "analyze findings", "analyse findings", "interpret data",
+                               "generate chapter 4", "create chapter 4", "write chapter 4",
+                               "data and analysis", "findings chapter"), False),
+    "thesis_combine": (_keywords("generate complete thesis", "generate full thesis", "generate entire thesis",
+                                 "combine chapters", "combine all chapters", "one file thesis",
+                                 "complete thesis", "full thesis", "entire thesis",
+                                 "thesis status", "thesis combined", "all chapters in one",
+                                 "generate thesis", "create thesis", "make thesis",
+                                 "thesis chapter 1 to 6", "chapters 1-6", "chapters 1 through 6"), False),
+
+    # --- Proposal and chapters 1-3 -------------------------------------------
+    "proposal": (_keywords("proposal", "first 3 chapters", "first three chapters", "chapters 1-3",
+                           "chapters 1 to 3", "full proposal", "complete proposal", "thesis proposal",
+                           "research proposal", "make me proposal", "generate proposal"), False),
+    "chapter_one": (_keywords("chapter 1", "chapter one", "introduction chapter", "first chapter"), False),
+    "chapter_two": (_keywords("chapter 2", "chapter two", "literature review", "second chapter"), False),
+    "chapter_three": (_keywords("chapter 3", "chapter three", "methodology", "research methodology",
+                                "third chapter", "methods chapter"), False),
+    "section": (_keywords("background of the study", "statement of the problem",
+                          "objectives of the study", "research questions", "justification",
+                          "setting the scene", "delimitations", "limitations"), False),
+    "section_verb": (_keywords("write", "generate", "create"), False),
+    "generic_chapter": (_keywords("write chapter", "generate chapter", "thesis chapter", "dissertation chapter"), False),
+
+    # --- Images ---------------------------------------------------------------
+    "image_word": (_keywords("image", "picture", "photo", "pic", "photograph", "illustration"), False),
+    "image_search": (_keywords("search", "find", "look for", "get me", "show me",
+                               "image of", "picture of", "photo of"), False),
+    "image_generate_content": (_keywords("diagram", "flowchart", "chart", "infographic", "framework",
+                                         "schematic", "visualization", "concept", "illustration of concept"), False),
+    "image_generate_explicit": (r"(?:generate|create|make|draw|design) (?:image|picture)", False),
+
+    # --- Search ---------------------------------------------------------------
+    "paper_word": (_keywords("paper", "research", "study", "academic", "literature", "journal",
+                             "article", "publication"), False),
+    "paper_search_verb": (_keywords("search", "find", "look for"), False),
+    "synthesis_word": (_keywords("synthesis", "synthesize", "review", "summarize", "analyze"), False),
+    "web_search": (_keywords("search", "look up", "find out", "google", "go to", "browse", "open"), False),
+    "url_hint": (_keywords(".com", ".org", "http"), False),
+
+    # --- Files ----------------------------------------------------------------
+    "pdf": (_keywords("pdf"), False),
+    "pdf_action": (_keywords("summarize", "read", "analyze", "extract", "what's in"), False),
+    "pdf_name": (r"(?P<value>\S+\.pdf)", False),
+    "file_write_verb": (_keywords("create", "make", "write", "save", "generate"), False),
+    "file_type": (_keywords("file", "md file", "markdown file", "txt file", "text file", "json file"), False),
+    "file_list": (_keywords("list files", "show files", "what files", "see files"), False),
+    "file_read": (_keywords("read file", "open file", "show file", "view file"), False),
+
+    # --- Writing --------------------------------------------------------------
+    "write_verb": (_keywords("write", "create", "generate", "make", "draft", "compose"), False),
+    "content_type": (_keywords("essay", "document", "report", "paper", "article", "content", "text"), False),
+
+    # --- Task complexity (TaskClassifier) -------------------------------------
+    "force_worker": (_keywords(
+        "essay about", "essay on", "write an essay", "write essay",
+        "document about", "document on", "create a document", "create document",
+        "report about", "report on", "write a report", "write report",
+        "paper about", "paper on", "write a paper", "write paper",
+        "article about", "article on", "write an article", "write article",
+        "create a file", "make a file", "generate a file",
+        "long form", "multi-page", "multiple pages"), False),
+    "simple_task": (r"(?:hi|hello|hey|greetings)"
+                    r"|(?:what|how|when|where|why)\s+"
+                    r"|(?:show|list|get|fetch)\s+"
+                    r"|(?:help|assist)\s*$", True),
+    "complex_task": (r"(?:write|create|generate|make|build|develop)\s+(?:an?\s+)?(?:essay|document|report|paper|article|content)"
+                     r"|(?:and|with|include|add|plus)\s+(?:image|picture|photo|graph|chart|diagram)"
+                     r"|(?:search|find|look\s+for)\s+(?:and|then|after)\s+"
+                     r"|(?:multiple|several|many|various)\s+"
+                     r"|(?:step|stage|phase|process)\s+"
+                     r"|\d+\s+(?:word|page|section|chapter|image|picture)", False),
+    "parallel_task": (r"(?:search|find)\s+.*\s+(?:and|&)\s+(?:generate|create|make)"
+                      r"|(?:image|picture).*\s+(?:and|&)\s+(?:image|picture)"
+                      r"|multiple\s+(?:search|image|task)", False),
+    "worker_required": (r"(?:essay|document|report|paper).*\s+\d+\s+word"
+                        r"|(?:write|create|generate|make)\s+(?:an?\s+)?(?:essay|document|report|paper)"
+                        r"|(?:generate|create).*\s+(?:and|with).*\s+(?:image|picture|photo)"
+                        r"|complex\s+(?:task|request|job)"
+                        r"|(?:multi|many|several)\s+step"
+                        r"|(?:essay|paper|document).*\s+(?:with|and).*\s+(?:image|picture|photo)"
+                        r"|(?:write|create).*\s+about\s+.*\s+(?:with|and).*\s+(?:pic|image|picture)", False),
+    "essay_request": (r"(?:write|create|generate|make)\s+(?:an?\s+)?(?:essay|document|report|paper)", False),
+    "mentions_image": (_keywords("image", "picture", "pic"), False),
+    "image_or_picture": (_keywords("image", "picture"), False),
+    "search_or_find": (_keywords("search", "find"), False),
+    "generate_or_create": (_keywords("generate", "create"), False),
+    "search_or_research": (_keywords("search", "research"), False),
+    "word_requirement": (r"(?P<value>\d+)\s+word", False),
+
+    # --- Workflow routing (IntelligentRouter) ---------------------------------
+    "route_chapter_verb": (r"(?:write|generate|create|make).*chapter\s*(?P<value>\d+)", False),
+    "route_chapter": (r"chapter\s*(?P<value>\d+)", False),
+    "route_chapter_start": (r"(?:do|start|begin).*chapter\s*(?P<value>\d+)", False),
+    "route_dataset": (r"(?:create|generate|make).*(?:dataset|data)|(?:need|want).*data|synthetic.*data", False),
+    "route_study_tools": (r"(?:create|generate|make).*(?:questionnaire|interview|survey)|study.*tools", False),
+    "route_combine": (r"(?:combine|merge|join).*(?:chapters|thesis)"
+                      r"|(?:create|make).*(?:full|complete).*(?:thesis|document)", False),
+    "route_full_thesis": (r"(?:generate|create|write).*(?:full|complete|entire).*thesis|(?:all|every).*chapters", False),
+
+    # --- User facts (CentralBrain) --------------------------------------------
+    "name_am": (r"(?:^|\s)(?:am|i'm|i am)\s+(?P<value>[a-zA-Z]+)(?:\s|$|,|\.)", False),
+    "name_my_name": (r"my name is\s+(?P<value>[a-zA-Z]+)", False),
+    "name_call_me": (r"call me\s+(?P<value>[a-zA-Z]+)", False),
+    "name_bare": (r"(?:^|\s)name(?:'s)?\s+(?P<value>[a-zA-Z]+)", False),
+}
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Regex alternation shaped as a prefix tree, so each position is tested
+    against one branch per next character instead of every keyword; the
+    greedy optional tails make it match the longest keyword at a position.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def render(node: Dict) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return render(trie)
+
+
+# keyword -> [(signal, anchored)], and keyword -> every keyword that is a prefix of it
+_KEYWORD_SIGNALS: Dict[str, List[Tuple[str, bool]]] = {}
+for _name, (_spec, _anchored) in SIGNALS.items():
+    if isinstance(_spec, tuple):
+        for _keyword in _spec:
+            _KEYWORD_SIGNALS.setdefault(_keyword, []).append((_name, _anchored))
+_KEYWORD_PREFIXES: Dict[str, Tuple[str, ...]] = {
+    keyword: tuple(k for k in _KEYWORD_SIGNALS if keyword.startswith(k))
+    for keyword in _KEYWORD_SIGNALS
+}
+
+# Zero-width, so finditer tries every start position: overlapping keywords
+# starting later (e.g. "search" in "research") are found at their own start
+_KEYWORD_SCAN = re.compile(f"(?=({_trie_pattern(list(_KEYWORD_SIGNALS))}))")
+
+_REGEX_SIGNALS: List[Tuple[str, "re.Pattern", bool]] = [
+    (name, re.compile(spec), anchored)
+    for name, (spec, anchored) in SIGNALS.items() if isinstance(spec, str)
+]
+
+
+@dataclass(frozen=True)
+class MessageSignals:
+    """Signals present in one message."""
+    text: str  # message.lower().strip()
+    word_count: int
+    words: Tuple[str, ...]
+    matches: Dict[str, str]  # signal name -> matched value
+
+    def has(self, *names: str) -> bool:
+        """True if ANY of the named signals is present."""
+        return any(name in self.matches for name in names)
+
+    def value(self, name: str) -> Optional[str]:
+        return self.matches.get(name)
+
+
+@lru_cache(maxsize=4096)
+def _analyze_text(text: str) -> MessageSignals:
+    matches: Dict[str, str] = {}
+
+    # Keyword signals: the longest keyword at each position implies every
+    # keyword that is a prefix of it (e.g. "make video" -> "make")
+    for match in _KEYWORD_SCAN.finditer(text):
+        longest = match.group(1)
+        if not longest:
+            continue
+        for keyword in _KEYWORD_PREFIXES[longest]:
+            for name, anchored in _KEYWORD_SIGNALS[keyword]:
+                if name not in matches and (not anchored or match.start() == 0):
+                    matches[name] = keyword
+
+    for name, pattern, anchored in _REGEX_SIGNALS:
+        match = pattern.match(text) if anchored else pattern.search(text)
+        if match:
+            matches[name] = match.group("value") if "value" in pattern.groupindex else match.group(0)
+
+    words = tuple(text.split())
+    return MessageSignals(text=text, word_count=len(words), words=words, matches=matches)
+
+
+class IntentEngine:
+    """Compiled signal matcher plus a shared LLM classification cache."""
+
+    def __init__(self, llm_cache_size: int = 1024, llm_cache_ttl: float = 3600.0):
+        self.llm_cache_size = llm_cache_size
+        self.llm_cache_ttl = llm_cache_ttl
+        self._llm_cache: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    # =========================================================================
+    # PATTERN SIGNALS
+    # =========================================================================
+
+    def analyze(self, message: str) -> MessageSignals:
+        """Evaluate every signal against the lowercased message (cached)."""
+        return _analyze_text(message.lower().strip())
+
+    # =========================================================================
+    # LLM CLASSIFICATION CACHE
+    # =========================================================================
+
+    async def classify_with_llm(
+        self,
+        namespace: str,
+        message: str,
+        classify: Callable[[], Awaitable[Any]],
+        context_key: Hashable = None,
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Run an LLM classification once per (namespace, message, context).
+
+        Concurrent callers for the same key await the same call; results are
+        kept for llm_cache_ttl seconds. Exceptions, and results rejected by
+        `cacheable` (e.g. error fallbacks), are not cached.
+        """
+        key = (namespace, normalize_message(message), context_key)
+
+        cached = self._llm_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.llm_cache_ttl:
+            self._llm_cache.move_to_end(key)
+            return cached[1]
+
+        inflight = self._inflight.get(key)
+        if inflight:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await classify()
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(result)
+        if cacheable is None or cacheable(result):
+            self._llm_cache[key] = (time.monotonic(), result)
+            while len(self._llm_cache) > self.llm_cache_size:
+                self._llm_cache.popitem(last=False)
+        return result
+
+
+# Singleton instance
+intent_engine = IntentEngine()
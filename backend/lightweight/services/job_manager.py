@@ -4,6 +4,9 @@ Job Manager Service - Persistent Background Job Execution
 Features:
 - Jobs run independently of frontend connection
 - State persisted to disk (survives browser close, server restart)
+- Write-behind store: active jobs live in memory, updates append to a
+  compact per-job log, full snapshots are taken on a timer or at terminal states
+- Per-workspace job index for listing without parsing every job file
 - Pause/Resume/Cancel controls
 - Reconnectable SSE streams
 - Progress tracking and step logging
@@ -11,6 +14,7 @@ Features:
 
 import asyncio
 import json
+import time
 import uuid
 from pathlib import Path
 from datetime import datetime
@@ -75,46 +79,260 @@ class Job:
         return cls(**data)
 
 
-class JobManager:
+TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+ACTIVE_STATUSES = (JobStatus.PENDING, JobStatus.RUNNING, JobStatus.PAUSED)
+
+
+class JobStore:
     """
-    Manages persistent background jobs.
+    Write-behind persistence for jobs.
+    
+    Layout per workspace (data/jobs/):
+    - {job_id}.json       compact snapshot of the full job
+    - {job_id}.log.jsonl  updates appended since the last snapshot
+    - _index.json         job_id -> {status, created_at, updated_at}
     
-    Jobs are stored as JSON files and run in background asyncio tasks.
-    They continue running even if the frontend disconnects.
+    Jobs held in memory are the source of truth. Each update is a single
+    appended log line; the snapshot is rewritten at most every
+    `snapshot_interval` seconds, or immediately at terminal states, after
+    which the log is truncated. Loading replays the log over the snapshot.
     """
     
-    def __init__(self):
-        self._active_jobs: Dict[str, asyncio.Task] = {}
-        self._job_events: Dict[str, asyncio.Queue] = {}  # For SSE streaming
-        self._pause_flags: Dict[str, asyncio.Event] = {}  # For pause/resume
-        self._cancel_flags: Dict[str, bool] = {}
+    INDEX_FILE = "_index.json"
+    
+    def __init__(self, snapshot_interval: float = 5.0):
+        self.snapshot_interval = snapshot_interval
+        self._jobs: Dict[str, Job] = {}  # job_id -> hot job
+        self._last_snapshot: Dict[str, float] = {}
+        self._indexes: Dict[str, Dict[str, Dict]] = {}  # workspace_id -> index
+        self._index_mtimes: Dict[str, float] = {}
     
     def _get_jobs_dir(self, workspace_id: str) -> Path:
-        """Get the jobs directory for a workspace."""
         jobs_dir = WORKSPACES_DIR / workspace_id / "data" / "jobs"
         jobs_dir.mkdir(parents=True, exist_ok=True)
         return jobs_dir
     
-    def _get_job_path(self, workspace_id: str, job_id: str) -> Path:
-        """Get the path to a job file."""
+    def _snapshot_path(self, workspace_id: str, job_id: str) -> Path:
         return self._get_jobs_dir(workspace_id) / f"{job_id}.json"
     
-    def _save_job(self, job: Job):
-        """Save job state to disk."""
+    def _log_path(self, workspace_id: str, job_id: str) -> Path:
+        return self._get_jobs_dir(workspace_id) / f"{job_id}.log.jsonl"
+    
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+    
+    def _index_path(self, workspace_id: str) -> Path:
+        return self._get_jobs_dir(workspace_id) / self.INDEX_FILE
+    
+    def _get_index(self, workspace_id: str) -> Dict[str, Dict]:
+        """Return the workspace index, reloading it if another process changed it."""
+        index_path = self._index_path(workspace_id)
+        if index_path.exists():
+            mtime = index_path.stat().st_mtime
+            if workspace_id not in self._indexes or self._index_mtimes.get(workspace_id) != mtime:
+                try:
+                    self._indexes[workspace_id] = json.loads(index_path.read_text(encoding='utf-8'))
+                    self._index_mtimes[workspace_id] = mtime
+                except Exception as e:
+                    print(f"⚠️ Error loading job index, rebuilding: {e}")
+                    self._rebuild_index(workspace_id)
+        elif workspace_id not in self._indexes:
+            self._rebuild_index(workspace_id)
+        
+        # Hot jobs are always fresher than what is on disk
+        index = self._indexes[workspace_id]
+        for job in self._jobs.values():
+            if job.workspace_id == workspace_id:
+                index[job.job_id] = self._index_entry(job)
+        return index
+    
+    def _rebuild_index(self, workspace_id: str):
+        """Build the index once from existing job files (migrates old layouts)."""
+        index = {}
+        for job_file in self._get_jobs_dir(workspace_id).glob("*.json"):
+            if job_file.name == self.INDEX_FILE:
+                continue
+            job = self._read_job(workspace_id, job_file.stem)
+            if job:
+                index[job.job_id] = self._index_entry(job)
+        self._indexes[workspace_id] = index
+        self._write_index(workspace_id)
+    
+    def _write_index(self, workspace_id: str):
+        index_path = self._index_path(workspace_id)
+        tmp_path = index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._indexes[workspace_id], ensure_ascii=False), encoding='utf-8')
+        tmp_path.replace(index_path)
+        self._index_mtimes[workspace_id] = index_path.stat().st_mtime
+    
+    @staticmethod
+    def _index_entry(job: Job) -> Dict:
+        status = job.status.value if isinstance(job.status, JobStatus) else job.status
+        return {"status": status, "created_at": job.created_at, "updated_at": job.updated_at}
+    
+    def _update_index(self, job: Job):
+        index = self._get_index(job.workspace_id)
+        previous = index.get(job.job_id)
+        index[job.job_id] = self._index_entry(job)
+        # Only status changes touch the index file; progress stays in memory
+        if not previous or previous.get("status") != index[job.job_id]["status"]:
+            self._write_index(job.workspace_id)
+    
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    
+    def put(self, job: Job):
+        """Register a job as hot and snapshot it."""
+        self._jobs[job.job_id] = job
+        self.snapshot(job)
+    
+    def snapshot(self, job: Job):
+        """Write the full job and drop the update log it supersedes."""
         job.updated_at = datetime.now().isoformat()
-        job_path = self._get_job_path(job.workspace_id, job.job_id)
-        job_path.write_text(json.dumps(job.to_dict(), indent=2, ensure_ascii=False), encoding='utf-8')
+        snapshot_path = self._snapshot_path(job.workspace_id, job.job_id)
+        tmp_path = snapshot_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(job.to_dict(), ensure_ascii=False), encoding='utf-8')
+        tmp_path.replace(snapshot_path)
+        
+        log_path = self._log_path(job.workspace_id, job.job_id)
+        if log_path.exists():
+            log_path.unlink()
+        
+        self._last_snapshot[job.job_id] = time.monotonic()
+        self._update_index(job)
+        
+        if job.status in TERMINAL_STATUSES:
+            self.evict(job.job_id)
+    
+    def append(self, job: Job, fields: Optional[Dict] = None, step: Optional[Dict] = None):
+        """
+        Record an update to a hot job.
+        
+        `fields` are top-level Job attributes to set; `step` is a step dict
+        upserted by name. Status changes are snapshotted immediately.
+        """
+        job.updated_at = datetime.now().isoformat()
+        
+        if fields and "status" in fields:
+            self.snapshot(job)
+            return
+        
+        if time.monotonic() - self._last_snapshot.get(job.job_id, 0.0) >= self.snapshot_interval:
+            self.snapshot(job)
+            return
+        
+        record = {"updated_at": job.updated_at}
+        if fields:
+            record["fields"] = fields
+        if step:
+            record["step"] = step
+        with open(self._log_path(job.workspace_id, job.job_id), "a", encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        
+        index = self._indexes.get(job.workspace_id)
+        if index is not None:
+            index[job.job_id] = self._index_entry(job)
+    
+    def _read_job(self, workspace_id: str, job_id: str) -> Optional[Job]:
+        """Load a job from its snapshot, replaying any pending log entries."""
+        snapshot_path = self._snapshot_path(workspace_id, job_id)
+        if not snapshot_path.exists():
+            return None
+        
+        try:
+            data = json.loads(snapshot_path.read_text(encoding='utf-8'))
+        except Exception as e:
+            print(f"⚠️ Error loading job {job_id}: {e}")
+            return None
+        
+        log_path = self._log_path(workspace_id, job_id)
+        if log_path.exists():
+            for line in log_path.read_text(encoding='utf-8').splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn final line from an interrupted write
+                data.update(record.get("fields", {}))
+                data["updated_at"] = record.get("updated_at", data.get("updated_at"))
+                step = record.get("step")
+                if step:
+                    steps = data.setdefault("steps", [])
+                    existing = next((s for s in steps if s.get("name") == step.get("name")), None)
+                    if existing:
+                        existing.update(step)
+                    else:
+                        steps.append(step)
+        
+        try:
+            return Job.from_dict(data)
+        except Exception as e:
+            print(f"⚠️ Error loading job {job_id}: {e}")
+            return None
+    
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    
+    def get(self, workspace_id: str, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job and job.workspace_id == workspace_id:
+            return job
+        return self._read_job(workspace_id, job_id)
+    
+    def evict(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        self._last_snapshot.pop(job_id, None)
+    
+    def query(
+        self,
+        workspace_id: str,
+        statuses: Optional[tuple] = None,
+        limit: int = 50
+    ) -> List[Job]:
+        """List jobs newest-updated first, loading only the entries returned."""
+        index = self._get_index(workspace_id)
+        wanted = {s.value if isinstance(s, JobStatus) else s for s in statuses} if statuses else None
+        
+        job_ids = [
+            job_id for job_id, entry in index.items()
+            if wanted is None or entry.get("status") in wanted
+        ]
+        job_ids.sort(key=lambda j: index[j].get("updated_at") or "", reverse=True)
+        
+        jobs = []
+        for job_id in job_ids:
+            if len(jobs) >= limit:
+                break
+            job = self.get(workspace_id, job_id)
+            if job:
+                jobs.append(job)
+        return jobs
+
+
+class JobManager:
+    """
+    Manages persistent background jobs.
+    
+    Jobs are persisted through a write-behind JobStore and run in background
+    asyncio tasks. They continue running even if the frontend disconnects.
+    """
+    
+    def __init__(self):
+        self._active_jobs: Dict[str, asyncio.Task] = {}
+        self._job_events: Dict[str, asyncio.Queue] = {}  # For SSE streaming
+        self._pause_flags: Dict[str, asyncio.Event] = {}  # For pause/resume
+        self._cancel_flags: Dict[str, bool] = {}
+        self._store = JobStore()
+    
+    def _save_job(self, job: Job):
+        """Snapshot full job state to disk."""
+        self._store.snapshot(job)
     
     def _load_job(self, workspace_id: str, job_id: str) -> Optional[Job]:
-        """Load job state from disk."""
-        job_path = self._get_job_path(workspace_id, job_id)
-        if job_path.exists():
-            try:
-                data = json.loads(job_path.read_text(encoding='utf-8'))
-                return Job.from_dict(data)
-            except Exception as e:
-                print(f"⚠️ Error loading job {job_id}: {e}")
-        return None
+        """Load job state (memory first, then disk)."""
+        return self._store.get(workspace_id, job_id)
     
     async def create_job(
         self,
@@ -142,8 +360,8 @@ class JobManager:
             files=files or []
         )
         
-        # Save job to disk
-        self._save_job(job)
+        # Keep job hot in memory and snapshot it
+        self._store.put(job)
         
         # Create event queue for SSE streaming
         self._job_events[job_id] = asyncio.Queue()
@@ -175,7 +393,7 @@ class JobManager:
             try:
                 job.status = JobStatus.RUNNING
                 job.started_at = datetime.now().isoformat()
-                self._save_job(job)
+                self._store.put(job)
                 
                 await self.emit_event(job.job_id, "status", {"status": "running"})
                 
@@ -207,6 +425,7 @@ class JobManager:
             finally:
                 # Cleanup
                 self._active_jobs.pop(job.job_id, None)
+                self._store.evict(job.job_id)
                 
         # Start the background task
         task = asyncio.create_task(_run_job())
@@ -232,7 +451,7 @@ class JobManager:
         
         job.progress = progress
         job.current_step = current_step
-        self._save_job(job)
+        self._store.append(job, fields={"progress": progress, "current_step": current_step})
         
         await self.emit_event(job.job_id, "progress", {
             "progress": progress,
@@ -255,20 +474,22 @@ class JobManager:
         else:
             job.steps.append(step)
         
-        self._save_job(job)
+        self._store.append(job, step=step)
         await self.emit_event(job.job_id, "step", {"step": step})
     
     async def complete_step(self, job: Job, step_name: str, result: Optional[Dict] = None):
         """Mark a step as completed."""
+        completed = None
         for step in job.steps:
             if step.get("name") == step_name:
                 step["status"] = "completed"
                 step["completed_at"] = datetime.now().isoformat()
                 if result:
                     step["result"] = result
+                completed = step
                 break
         
-        self._save_job(job)
+        self._store.append(job, step=completed)
         await self.emit_event(job.job_id, "step_complete", {"step": step_name, "result": result})
     
     async def emit_event(self, job_id: str, event_type: str, data: Dict):
@@ -298,28 +519,12 @@ class JobManager:
         status: Optional[JobStatus] = None,
         limit: int = 50
     ) -> List[Job]:
-        """List jobs for a workspace."""
-        jobs_dir = self._get_jobs_dir(workspace_id)
-        jobs = []
-        
-        for job_file in sorted(jobs_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
-            if len(jobs) >= limit:
-                break
-            
-            try:
-                data = json.loads(job_file.read_text(encoding='utf-8'))
-                job = Job.from_dict(data)
-                
-                if status is None or job.status == status:
-                    jobs.append(job)
-            except Exception as e:
-                print(f"⚠️ Error loading job file {job_file}: {e}")
-        
-        return jobs
+        """List jobs for a workspace (served from the job index)."""
+        return self._store.query(workspace_id, statuses=(status,) if status else None, limit=limit)
     
-    def get_active_jobs(self, workspace_id: str) -> List[Job]:
-        """Get currently running or paused jobs."""
-        return self.list_jobs(workspace_id, status=None)
+    def get_active_jobs(self, workspace_id: str, limit: int = 50) -> List[Job]:
+        """Get currently pending, running or paused jobs."""
+        return self._store.query(workspace_id, statuses=ACTIVE_STATUSES, limit=limit)
     
     async def pause_job(self, workspace_id: str, job_id: str) -> bool:
         """Pause a running job."""
@@ -408,11 +613,11 @@ class JobManager:
         Jobs that were 'running' when server stopped are marked as 'failed'
         with option to retry.
         """
-        jobs = self.list_jobs(workspace_id)
+        jobs = self.list_jobs(workspace_id, status=JobStatus.RUNNING, limit=1000)
         recovered = 0
         
         for job in jobs:
-            if job.status == JobStatus.RUNNING:
+            if job.job_id not in self._active_jobs:
                 # Job was interrupted - mark as failed
                 job.status = JobStatus.FAILED
                 job.error = "Server restarted - job interrupted"
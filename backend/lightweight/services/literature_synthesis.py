@@ -8,14 +8,16 @@ Features:
 - Gathers all workspace sources
 - Extracts and chunks text content
 - Synthesizes across sources with citations
+- Map-reduce mode: chunks synthesized concurrently, streamed in order
 - Streams output in real-time
 - Generates BibTeX references
 """
 
 import asyncio
 import json
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Any, AsyncGenerator
+from typing import Dict, List, Optional, Any, AsyncGenerator, Awaitable, Callable
 from datetime import datetime
 
 from services.sources_service import sources_service
@@ -33,6 +35,8 @@ class LiteratureSynthesisService:
         self.pdf_service = PDFService()
         self.max_chunk_size = 12000  # chars per chunk for LLM context
         self.max_sources_per_synthesis = 20  # Max sources to process at once
+        self.max_concurrent_chunks = 4  # Parallel chunk syntheses in map-reduce mode
+        self.progress_interval = 2.0  # Min seconds between persisted progress updates
     
     async def stream_generate(self, prompt: str, system: str = "") -> AsyncGenerator[str, None]:
         """Wrapper to stream LLM generation as async generator."""
@@ -384,17 +388,23 @@ CRITICAL RULES:
         topic: str,
         output_format: str = "markdown",
         job_manager: Optional[Any] = None,
-        job_id: Optional[str] = None
+        job_id: Optional[str] = None,
+        mode: str = "map_reduce"
     ) -> AsyncGenerator[str, None]:
         """
         Main synthesis pipeline - gathers sources, chunks, and synthesizes.
         
+        In "map_reduce" mode all chunks are synthesized concurrently (bounded by
+        `max_concurrent_chunks`) and streamed back in order, followed by the
+        conclusion reduce step. "sequential" processes one chunk at a time.
+        
         Args:
             workspace_id: Workspace to read sources from
             topic: Research topic/focus for synthesis
             output_format: 'markdown' or 'docx'
             job_manager: Optional job manager for progress updates
             job_id: Optional job ID for progress tracking
+            mode: 'map_reduce' (parallel chunks) or 'sequential'
         
         Yields:
             Chunks of synthesized text
@@ -405,17 +415,25 @@ CRITICAL RULES:
             if job_manager and job_id:
                 await job_manager.emit_log(job_id, msg)
         
-        async def update_progress(progress: float, step: str):
-            if job_manager and job_id:
-                await job_manager.update_progress(
-                    job_manager.get_job(workspace_id, job_id),
-                    progress,
-                    step
-                )
+        # Resolve the job once; progress is tracked in memory and persisted
+        # at most every `progress_interval` seconds.
+        job = job_manager.get_job(workspace_id, job_id) if job_manager and job_id else None
+        progress_state = {"last_persisted": 0.0}
+        
+        async def update_progress(progress: float, step: str, force: bool = False):
+            if not job:
+                return
+            now = time.monotonic()
+            if not force and now - progress_state["last_persisted"] < self.progress_interval:
+                job.progress = progress
+                job.current_step = step
+                return
+            progress_state["last_persisted"] = now
+            await job_manager.update_progress(job, progress, step)
         
         # Step 1: Gather sources
         await log("📚 Gathering sources from workspace...")
-        await update_progress(0.1, "Gathering sources...")
+        await update_progress(0.1, "Gathering sources...", force=True)
         
         sources = await self.gather_source_content(workspace_id)
         
@@ -439,31 +457,36 @@ CRITICAL RULES:
 
 """
         
-        # Step 4: Process each chunk
+        # Step 4: Process chunks (map)
         chunk_syntheses = []
         
-        for i, chunk in enumerate(chunks):
-            chunk_num = i + 1
-            progress = 0.2 + (0.6 * (i / len(chunks)))
-            
-            await log(f"🔍 Processing chunk {chunk_num}/{len(chunks)} ({len(chunk)} sources)...")
-            await update_progress(progress, f"Synthesizing chunk {chunk_num}/{len(chunks)}...")
-            
-            if len(chunks) > 1:
-                yield f"\n## Section {chunk_num}\n\n"
-            
-            synthesis = ""
-            async for text in self.synthesize_chunk(chunk, topic):
-                synthesis += text
+        if mode == "map_reduce" and len(chunks) > 1:
+            await log(f"⚡ Synthesizing {len(chunks)} chunks in parallel (max {self.max_concurrent_chunks} at once)...")
+            async for text in self._map_chunks(chunks, topic, chunk_syntheses, update_progress):
                 yield text
-            
-            chunk_syntheses.append(synthesis)
-            yield "\n\n"
+        else:
+            for i, chunk in enumerate(chunks):
+                chunk_num = i + 1
+                progress = 0.2 + (0.6 * (i / len(chunks)))
+                
+                await log(f"🔍 Processing chunk {chunk_num}/{len(chunks)} ({len(chunk)} sources)...")
+                await update_progress(progress, f"Synthesizing chunk {chunk_num}/{len(chunks)}...")
+                
+                if len(chunks) > 1:
+                    yield f"\n## Section {chunk_num}\n\n"
+                
+                synthesis = ""
+                async for text in self.synthesize_chunk(chunk, topic):
+                    synthesis += text
+                    yield text
+                
+                chunk_syntheses.append(synthesis)
+                yield "\n\n"
         
-        # Step 5: Generate conclusion if multiple chunks
+        # Step 5: Generate conclusion if multiple chunks (reduce)
         if len(chunks) > 1:
             await log("📝 Generating synthesis conclusion...")
-            await update_progress(0.85, "Generating conclusion...")
+            await update_progress(0.85, "Generating conclusion...", force=True)
             
             yield "\n## Conclusion\n\n"
             
@@ -482,7 +505,7 @@ Keep the conclusion to 200-300 words."""
         
         # Step 6: Generate references with hyperlinks
         await log("📋 Generating references with hyperlinks...")
-        await update_progress(0.95, "Generating references...")
+        await update_progress(0.95, "Generating references...", force=True)
         
         yield "\n\n---\n\n## References\n\n"
         
@@ -529,7 +552,63 @@ Keep the conclusion to 200-300 words."""
             yield f"{ref}\n\n"
         
         await log("✅ Synthesis complete!")
-        await update_progress(1.0, "Complete")
+        await update_progress(1.0, "Complete", force=True)
+    
+    async def _map_chunks(
+        self,
+        chunks: List[List[Dict[str, Any]]],
+        topic: str,
+        chunk_syntheses: List[str],
+        update_progress: Callable[[float, str], Awaitable[None]]
+    ) -> AsyncGenerator[str, None]:
+        """
+        Synthesize all chunks concurrently and stream them back in order.
+        
+        Each chunk streams into its own buffer. The buffer of the chunk
+        currently being emitted is drained live; later chunks keep generating
+        in the background and are flushed as soon as their turn comes.
+        Completed syntheses are appended to `chunk_syntheses` in chunk order.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_chunks)
+        buffers: List[asyncio.Queue] = [asyncio.Queue() for _ in chunks]
+        done = {"count": 0}
+        
+        async def run_chunk(index: int, chunk: List[Dict[str, Any]]):
+            try:
+                async with semaphore:
+                    async for text in self.synthesize_chunk(chunk, topic):
+                        buffers[index].put_nowait(text)
+            except Exception as e:
+                buffers[index].put_nowait(f"\n\nError during generation: {e}")
+            finally:
+                buffers[index].put_nowait(None)
+                done["count"] += 1
+                await update_progress(
+                    0.2 + 0.6 * (done["count"] / len(chunks)),
+                    f"Synthesized {done['count']}/{len(chunks)} chunks..."
+                )
+        
+        tasks = [asyncio.create_task(run_chunk(i, chunk)) for i, chunk in enumerate(chunks)]
+        
+        try:
+            for i, buffer in enumerate(buffers):
+                yield f"\n## Section {i + 1}\n\n"
+                
+                synthesis = ""
+                while True:
+                    text = await buffer.get()
+                    if text is None:
+                        break
+                    synthesis += text
+                    yield text
+                
+                chunk_syntheses.append(synthesis)
+                yield "\n\n"
+        finally:
+            # Consumer went away early - stop any syntheses still in flight
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
     
     def post_process_citations(self, content: str, sources: List[Dict]) -> str:
         """
@@ -0,0 +1,317 @@
+"""
+Message Store - Indexed Conversation History
+
+Backs ConversationMemoryService. Each conversation keeps its append-only
+messages.jsonl; a per-workspace SQLite index (WAL mode) next to the
+conversation folders records where every message line starts, so reads
+never parse the whole history.
+
+Features:
+- Tail reads and paginated history that seek straight to the needed lines
+- Per-conversation message counters maintained on append
+- Case-insensitive substring search (FTS5 trigram index, so mid-word
+  matches like "ress" in "progress" still hit) within one conversation or
+  across all conversations of a workspace
+- Existing JSONL files are indexed in place the first time they are
+  touched; lines appended by anything else are picked up the same way,
+  and a file that was rewritten is re-indexed from scratch
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from services.sqlite_store import SQLiteDatabase
+
+
+INDEX_FILENAME = "messages_index.db"
+MESSAGES_FILENAME = "messages.jsonl"
+SCHEMA_VERSION = 2  # 2: trigram FTS, rewrite detection
+
+FINGERPRINT_BYTES = 256
+
+
+def _fts_query(query: str) -> Optional[str]:
+    """FTS5 trigram query for messages containing `query`; None if it is too short to index (full scan)."""
+    needle = query.lower()
+    if len(needle.strip()) < 3:
+        return None
+    return '"' + needle.replace('"', '""') + '"'
+
+
+def _fingerprint(path: Path, end: int) -> str:
+    """Hash of the first and last bytes of path[:end], to notice a rewritten file."""
+    if end <= 0:
+        return ""
+    with open(path, "rb") as f:
+        head = f.read(min(end, FINGERPRINT_BYTES))
+        f.seek(max(0, end - FINGERPRINT_BYTES))
+        tail = f.read(end - f.tell())
+    return hashlib.sha1(head + b"|" + tail).hexdigest()
+
+
+class MessageStore:
+    """Offset + full-text index over the messages.jsonl files of one workspace."""
+
+    def __init__(self, conversations_dir: Path):
+        self.conversations_dir = conversations_dir
+        self.db_path = conversations_dir / INDEX_FILENAME
+        self.db = SQLiteDatabase(self.db_path)
+        self._init_db()
+
+    # =========================================================================
+    # INDEX
+    # =========================================================================
+
+    def _init_db(self):
+        with self.db.transaction() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # The index is derived from the JSONL files; rebuild it lazily
+                for table in ("conversations", "messages", "message_fts"):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS conversations (
+                    conversation_id TEXT PRIMARY KEY,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    indexed_bytes INTEGER NOT NULL DEFAULT 0,
+                    mtime_ns INTEGER NOT NULL DEFAULT 0,
+                    fingerprint TEXT NOT NULL DEFAULT ''
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    rowid INTEGER PRIMARY KEY,
+                    conversation_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    message_id TEXT,
+                    role TEXT,
+                    timestamp TEXT,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    UNIQUE (conversation_id, seq)
+                )
+            """)
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS message_fts USING fts5(content, tokenize='trigram')")
+
+    def _messages_path(self, conversation_id: str) -> Path:
+        return self.conversations_dir / conversation_id / MESSAGES_FILENAME
+
+    def _state(self, conn, conversation_id: str) -> Tuple[int, int, int, str]:
+        """(message count, indexed bytes, file mtime_ns, fingerprint) as last indexed."""
+        row = conn.execute(
+            "SELECT total, indexed_bytes, mtime_ns, fingerprint FROM conversations WHERE conversation_id = ?",
+            (conversation_id,)
+        ).fetchone()
+        return row if row else (0, 0, 0, "")
+
+    def _save_state(self, conn, conversation_id: str, total: int, indexed: int):
+        path = self._messages_path(conversation_id)
+        mtime = path.stat().st_mtime_ns if path.exists() else 0
+        conn.execute(
+            "INSERT INTO conversations (conversation_id, total, indexed_bytes, mtime_ns, fingerprint) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(conversation_id) DO UPDATE SET total = excluded.total, "
+            "indexed_bytes = excluded.indexed_bytes, mtime_ns = excluded.mtime_ns, fingerprint = excluded.fingerprint",
+            (conversation_id, total, indexed, mtime, _fingerprint(path, indexed))
+        )
+
+    def _catch_up(self, conn, conversation_id: str) -> int:
+        """
+        Index lines added to messages.jsonl since the last sync (inside a
+        write transaction). A file that shrank, or whose already indexed
+        bytes changed (rewritten in place), is re-indexed from scratch.
+
+        Returns:
+            Number of indexed messages
+        """
+        path = self._messages_path(conversation_id)
+        stat = path.stat() if path.exists() else None
+        size = stat.st_size if stat else 0
+        total, indexed, mtime, fingerprint = self._state(conn, conversation_id)
+
+        rewritten = size < indexed or (
+            indexed > 0 and stat.st_mtime_ns != mtime and _fingerprint(path, indexed) != fingerprint
+        )
+        if rewritten:
+            conn.execute(
+                "DELETE FROM message_fts WHERE rowid IN (SELECT rowid FROM messages WHERE conversation_id = ?)",
+                (conversation_id,)
+            )
+            conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+            total, indexed = 0, 0
+
+        if size > indexed:
+            with open(path, "rb") as f:
+                f.seek(indexed)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Partial line still being written
+                    offset = indexed
+                    indexed += len(line)
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        continue
+                    if not isinstance(message, dict):
+                        continue
+                    self._insert(conn, conversation_id, total, message, offset, len(line))
+                    total += 1
+
+        self._save_state(conn, conversation_id, total, indexed)
+        return total
+
+    def _insert(self, conn, conversation_id: str, seq: int, message: Dict[str, Any], offset: int, length: int):
+        cursor = conn.execute(
+            "INSERT INTO messages (conversation_id, seq, message_id, role, timestamp, offset, length) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (conversation_id, seq, message.get("id"), message.get("role"), message.get("timestamp"), offset, length)
+        )
+        conn.execute(
+            "INSERT INTO message_fts (rowid, content) VALUES (?, ?)",
+            (cursor.lastrowid, str(message.get("content") or ""))
+        )
+
+    def sync(self, conversation_id: str) -> int:
+        """Bring the index up to date with messages.jsonl. Returns the message count."""
+        path = self._messages_path(conversation_id)
+        stat = path.stat() if path.exists() else None
+        size, mtime_now = (stat.st_size, stat.st_mtime_ns) if stat else (0, 0)
+        with self.db.reader() as conn:
+            total, indexed, mtime, _ = self._state(conn, conversation_id)
+        if (size, mtime_now) == (indexed, mtime):
+            return total
+        with self.db.transaction() as conn:
+            return self._catch_up(conn, conversation_id)
+
+    def sync_all(self) -> List[str]:
+        """Sync every conversation in the workspace (dropping deleted ones). Returns their IDs."""
+        conversation_ids = {
+            p.name for p in self.conversations_dir.iterdir()
+            if p.is_dir() and (p / MESSAGES_FILENAME).exists()
+        }
+        with self.db.reader() as conn:
+            indexed_ids = {row[0] for row in conn.execute("SELECT conversation_id FROM conversations")}
+        for conversation_id in conversation_ids | indexed_ids:
+            self.sync(conversation_id)
+        return sorted(conversation_ids)
+
+    # =========================================================================
+    # READ / WRITE
+    # =========================================================================
+
+    def append(self, conversation_id: str, message: Dict[str, Any]) -> int:
+        """
+        Append a message line and index it.
+
+        Returns:
+            Message count after the append
+        """
+        line = (json.dumps(message) + "\n").encode("utf-8")
+        path = self._messages_path(conversation_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self.db.transaction() as conn:
+            total = self._catch_up(conn, conversation_id)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            self._insert(conn, conversation_id, total, message, offset, len(line))
+            self._save_state(conn, conversation_id, total + 1, offset + len(line))
+        return total + 1
+
+    def count(self, conversation_id: str) -> int:
+        return self.sync(conversation_id)
+
+    def _load(self, rows: Iterable[Tuple[str, int, int]], tag: bool = False) -> List[Dict[str, Any]]:
+        """Read messages at (conversation_id, offset, length), keeping row order."""
+        messages = []
+        handles = {}
+        try:
+            for conversation_id, offset, length in rows:
+                f = handles.get(conversation_id)
+                if f is None:
+                    f = handles[conversation_id] = open(self._messages_path(conversation_id), "rb")
+                f.seek(offset)
+                try:
+                    message = json.loads(f.read(length))
+                except ValueError:
+                    continue
+                if tag:
+                    message["conversation_id"] = conversation_id
+                messages.append(message)
+        finally:
+            for f in handles.values():
+                f.close()
+        return messages
+
+    def tail(self, conversation_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Last `limit` messages, oldest first."""
+        if limit <= 0:
+            return []
+        self.sync(conversation_id)
+        with self.db.reader() as conn:
+            rows = conn.execute(
+                "SELECT conversation_id, offset, length FROM messages WHERE conversation_id = ? "
+                "ORDER BY seq DESC LIMIT ?", (conversation_id, limit)
+            ).fetchall()
+        return self._load(reversed(rows))
+
+    def page(self, conversation_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Messages `offset`..`offset + limit` in conversation order."""
+        self.sync(conversation_id)
+        with self.db.reader() as conn:
+            rows = conn.execute(
+                "SELECT conversation_id, offset, length FROM messages WHERE conversation_id = ? AND seq >= ? "
+                "ORDER BY seq LIMIT ?", (conversation_id, max(offset, 0), limit)
+            ).fetchall()
+        return self._load(rows)
+
+    def search(
+        self,
+        query: str,
+        conversation_id: Optional[str] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Messages containing `query` (case-insensitive substring). Queries
+        under 3 characters scan every message instead of using the index.
+
+        Within one conversation results come in conversation order; across
+        the workspace they are ranked by BM25 and tagged with conversation_id.
+        """
+        if conversation_id:
+            self.sync(conversation_id)
+        else:
+            self.sync_all()
+
+        fts_query = _fts_query(query)
+        conditions, params = [], []
+        if fts_query:
+            conditions.append("message_fts MATCH ?")
+            params.append(fts_query)
+        if conversation_id:
+            conditions.append("m.conversation_id = ?")
+            params.append(conversation_id)
+        sql = (
+            "SELECT m.conversation_id, m.offset, m.length, f.content FROM message_fts f "
+            "JOIN messages m ON m.rowid = f.rowid"
+        )
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if conversation_id or not fts_query:
+            sql += " ORDER BY m.conversation_id, m.seq"
+        else:
+            sql += " ORDER BY bm25(message_fts)"
+
+        # SQLite folds case differently from str.lower(); confirm each candidate
+        needle = query.lower()
+        rows = []
+        with self.db.reader() as conn:
+            for conv_id, offset, length, content in conn.execute(sql, params):
+                if needle in content.lower():
+                    rows.append((conv_id, offset, length))
+                    if len(rows) >= limit:
+                        break
+
+        return self._load(rows, tag=not conversation_id)
@@ -0,0 +1,285 @@
+"""
+PDF Ingestion Service - Streaming, Bounded-Memory Bulk PDF Upload
+
+Pipeline behind /upload-pdfs for adding many PDFs to a workspace's sources.
+
+Features:
+- Uploads streamed to a staging folder in fixed-size chunks (never held
+  whole in memory), with %PDF magic check and size cap
+- SHA-256 content dedup against existing sources and within the batch
+- Metadata/text extraction (pdf_metadata_extractor, falling back to
+  PDFService.extract_text_simple) in a process pool, off the event loop;
+  full text goes to disk, only the metadata comes back
+- All sources committed to the index in one batched write
+- Optional per-file progress callback (used for SSE)
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_PDF_BYTES = 200 * 1024 * 1024
+STAGING_DIR_NAME = ".upload_staging"
+MAX_EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
+
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_extract_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """Process pool for PDF parsing (spawned, so workers don't inherit the event loop)."""
+    global _extract_pool
+    if _extract_pool is None:
+        _extract_pool = ProcessPoolExecutor(
+            max_workers=MAX_EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _extract_pool
+
+
+def _reset_extract_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died so the next batch starts a fresh one."""
+    global _extract_pool
+    if _extract_pool is pool:
+        _extract_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_pdf(pdf_path: str, text_path: str) -> Dict[str, Any]:
+    """
+    Extract metadata and text from one PDF. Runs in a worker process.
+
+    The full text is written to `text_path` instead of being returned, so
+    only small metadata dicts travel back to the API process.
+    """
+    from services.pdf_metadata_extractor import pdf_metadata_extractor
+
+    path = Path(pdf_path)
+    metadata = pdf_metadata_extractor.extract_metadata(path)
+    full_text = metadata.pop("full_text", "") or ""
+
+    if not full_text:
+        from services.pdf_service import get_pdf_service
+        full_text = get_pdf_service().extract_text_simple(path)
+
+    if full_text:
+        Path(text_path).write_text(full_text, encoding="utf-8")
+        metadata["text_path"] = text_path
+    metadata["text_preview"] = full_text[:5000]
+    metadata["text_length"] = len(full_text)
+    return metadata
+
+
+class PDFIngestionService:
+    """Stage uploaded PDFs, extract them in parallel and add them as sources."""
+
+    def __init__(self, max_bytes: int = MAX_PDF_BYTES):
+        self.max_bytes = max_bytes
+
+    # =========================================================================
+    # STAGING
+    # =========================================================================
+
+    async def _stage_one(self, upload, staging_dir: Path) -> Dict[str, Any]:
+        """Stream one UploadFile to disk in chunks. Returns a staged item."""
+        temp_path = staging_dir / f"{uuid.uuid4().hex}.pdf"
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(temp_path, "wb") as f:
+                while True:
+                    chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if size == 0 and b"%PDF-" not in chunk[:1024]:
+                        raise ValueError("Not a PDF file")
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ValueError(f"File exceeds {self.max_bytes // (1024 * 1024)} MB limit")
+                    digest.update(chunk)
+                    f.write(chunk)
+            if size == 0:
+                raise ValueError("Empty file")
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            await upload.close()
+
+        return {
+            "filename": upload.filename,
+            "pdf_path": temp_path,
+            "content_hash": digest.hexdigest(),
+            "size": size,
+        }
+
+    async def stage_uploads(self, workspace_id: str, files: List[Any]) -> Dict[str, List[Dict]]:
+        """
+        Stream uploads into the workspace staging folder.
+
+        Must run inside the request (UploadFiles are closed afterwards); the
+        rest of the pipeline can then run in the background.
+
+        Returns:
+            {"staged": [...], "errors": [{"filename", "error"}]}
+        """
+        from services.workspace_service import WORKSPACES_DIR
+
+        staging_dir = WORKSPACES_DIR / workspace_id / "sources" / STAGING_DIR_NAME
+        staging_dir.mkdir(parents=True, exist_ok=True)
+
+        staged, errors = [], []
+        for upload in files:
+            if not (upload.filename or "").lower().endswith(".pdf"):
+                errors.append({"filename": upload.filename, "error": "Not a PDF file"})
+                await upload.close()
+                continue
+            try:
+                staged.append(await self._stage_one(upload, staging_dir))
+            except Exception as e:
+                errors.append({"filename": upload.filename, "error": str(e)})
+        return {"staged": staged, "errors": errors}
+
+    # =========================================================================
+    # EXTRACTION + INDEXING
+    # =========================================================================
+
+    async def ingest(
+        self,
+        workspace_id: str,
+        staged: List[Dict[str, Any]],
+        errors: Optional[List[Dict[str, Any]]] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract staged PDFs and add them to the workspace sources.
+
+        Args:
+            workspace_id: Workspace ID
+            staged: Items returned by stage_uploads()
+            errors: Staging errors to carry into the summary
+            on_progress: Optional async callback receiving per-file events
+                (extracting, extracted, duplicate, failed)
+
+        Returns:
+            Summary dict: total_uploaded, successful, failed, results, errors
+        """
+        from services.sources_service import sources_service
+
+        errors = list(errors or [])
+        total = len(staged) + len(errors)
+        done = 0
+
+        async def report(item: Dict, status: str, **extra):
+            if on_progress:
+                await on_progress({"filename": item["filename"], "status": status,
+                                   "completed": done, "total": total, **extra})
+
+        # Skip content that is already a source; repeats within the batch
+        # resolve to the first copy once it has been added
+        known = {s["content_hash"]: s for s in sources_service.list_sources(workspace_id) if s.get("content_hash")}
+        results, unique, repeats = [], {}, []
+        for item in staged:
+            existing = known.get(item["content_hash"])
+            if existing or item["content_hash"] in unique:
+                item["pdf_path"].unlink(missing_ok=True)
+                done += 1
+                if existing:
+                    results.append(self._result(item, existing, duplicate=True))
+                    await report(item, "duplicate", source_id=existing["id"])
+                else:
+                    repeats.append(item)
+                    await report(item, "duplicate")
+            else:
+                unique[item["content_hash"]] = item
+
+        loop = asyncio.get_running_loop()
+        pool = _get_extract_pool()
+        failed: Dict[str, str] = {}  # content hash -> extraction error
+
+        async def extract(item: Dict) -> Optional[Dict]:
+            nonlocal done
+            await report(item, "extracting")
+            text_path = item["pdf_path"].with_suffix(".txt")
+            try:
+                metadata = await loop.run_in_executor(pool, _extract_pdf, str(item["pdf_path"]), str(text_path))
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    _reset_extract_pool(pool)
+                item["pdf_path"].unlink(missing_ok=True)
+                errors.append({"filename": item["filename"], "error": str(e)})
+                failed[item["content_hash"]] = str(e)
+                done += 1
+                await report(item, "failed", error=str(e))
+                return None
+
+            # Fall back to the upload's filename when no real title was found
+            if not metadata.get("title") or metadata["title"] == item["pdf_path"].stem:
+                metadata["title"] = item["filename"].replace('.pdf', '').replace('_', ' ').title()
+            metadata["content_hash"] = item["content_hash"]
+            done += 1
+            await report(item, "extracted", title=metadata["title"])
+            return {**item, "metadata": metadata}
+
+        print(f"📚 Extracting {len(unique)} PDFs for workspace {workspace_id} ({MAX_EXTRACT_WORKERS} workers)")
+        try:
+            extracted = [r for r in await asyncio.gather(*[extract(item) for item in unique.values()]) if r]
+
+            if extracted:
+                sources = await sources_service.add_pdf_sources(workspace_id, [
+                    {
+                        "pdf_path": item["pdf_path"],
+                        "metadata": item["metadata"],
+                        "original_filename": item["filename"],
+                    }
+                    for item in extracted
+                ])
+                added = {item["content_hash"]: source for item, source in zip(extracted, sources)}
+                results.extend(self._result(item, added[item["content_hash"]]) for item in extracted)
+                results.extend(self._result(item, added[item["content_hash"]], duplicate=True)
+                               for item in repeats if item["content_hash"] in added)
+        finally:
+            # Added sources were moved out of staging; anything left is garbage
+            for item in unique.values():
+                item["pdf_path"].unlink(missing_ok=True)
+                item["pdf_path"].with_suffix(".txt").unlink(missing_ok=True)
+
+        # Repeats of a file that failed extraction failed with it
+        errors.extend({"filename": item["filename"], "error": failed[item["content_hash"]]}
+                      for item in repeats if item["content_hash"] in failed)
+
+        return {
+            "workspace_id": workspace_id,
+            "total_uploaded": total,
+            "successful": len(results),
+            "failed": len(errors),
+            "results": results,
+            "errors": errors
+        }
+
+    @staticmethod
+    def _result(item: Dict, source: Dict, duplicate: bool = False) -> Dict[str, Any]:
+        return {
+            "filename": item["filename"],
+            "original_filename": item["filename"],
+            "source_id": source["id"],
+            "title": source["title"],
+            "authors": source.get("authors", []),
+            "year": source.get("year"),
+            "citation_key": source.get("citation_key"),
+            "duplicate": duplicate,
+            "status": "success"
+        }
+
+
+# Singleton instance
+pdf_ingestion_service = PDFIngestionService()
@@ -0,0 +1,466 @@
+"""
+Provider Admission - Cross-Process LLM Rate Limiting
+
+Admission controller in front of every LLM provider call made through
+APIHub. State lives in a local SQLite database (WAL mode), so all uvicorn
+and queue workers on the host share one view of each provider's quota
+instead of each believing it owns all of it.
+
+Features:
+- Requests-per-minute and tokens-per-minute token buckets per provider
+  and model; token estimates are reconciled with actual usage on release
+- Per-provider concurrency limit adapted AIMD-style: +1/limit per healthy
+  call, x0.5 on a 429 (plus a cool-down honouring Retry-After), x0.9 when
+  time to first chunk jumps well above its moving average
+- Priority classes: interactive callers (chat) have a reserved slot and a
+  reserved slice of the request budget, and background work yields while
+  any interactive caller is waiting. APIHub.generate_llm_response takes a
+  priority (chat replies are INTERACTIVE); DeepSeekDirectService.
+  generate_content, which the thesis generators call, is admitted as
+  BACKGROUND unless the caller says otherwise
+- Budgets per provider from the environment (e.g. DEEPSEEK_RPM,
+  DEEPSEEK_TPM), the same in every process
+- Shared circuit breaker for non-rate-limit failures
+- Leases expire, so a crashed worker can't hold slots forever
+"""
+
+import asyncio
+import math
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from services.sqlite_store import SQLiteDatabase
+
+
+LEASE_TTL = 300.0  # Seconds before an unreleased lease is reclaimed
+WAITER_TTL = 5.0  # Interactive waiters refresh their row at least this often
+MAX_POLL_INTERVAL = 0.5
+SLOT_POLL_INTERVAL = 0.05  # Retry interval while all concurrency slots are taken
+
+MIN_CONCURRENCY = 1.0
+RATE_LIMIT_DECREASE = 0.5
+LATENCY_DECREASE = 0.9
+LATENCY_SPIKE_FACTOR = 2.0  # Latency above this x the moving average counts as overload
+LATENCY_EWMA_WEIGHT = 0.2
+DECREASE_COOLDOWN = 2.0  # One multiplicative decrease per burst
+RATE_LIMIT_COOLDOWN = 5.0  # Default pause after a 429 without Retry-After
+
+BACKGROUND_REQUEST_RESERVE = 0.1  # Share of the RPM budget kept for interactive calls
+
+FAILURE_THRESHOLD = 5
+RECOVERY_TIME = 60.0
+
+DEFAULT_TIMEOUTS = {"interactive": 15.0, "background": 300.0}
+
+LLM_PROVIDERS = ("deepseek", "openrouter", "gemini")
+
+
+class Priority(IntEnum):
+    """Caller classes, most urgent first."""
+    INTERACTIVE = 0  # Chat responses a user is waiting on
+    BACKGROUND = 1  # Thesis/chapter generation, batch jobs
+
+
+@dataclass
+class RateLimitConfig:
+    """Rate limiting configuration."""
+    requests_per_minute: int = 60
+    tokens_per_minute: int = 100000
+    concurrent_requests: int = 10
+    initial_concurrency: int = 4
+
+
+@dataclass
+class Lease:
+    """An admitted call; hand it back to release() when the call finishes."""
+    lease_id: str
+    provider: str
+    model: str
+    priority: Priority
+    tokens: int
+    started: float
+
+
+class ProviderUnavailable(Exception):
+    """The provider can't take this call now (circuit open, cooling down or saturated)."""
+
+    def __init__(self, provider: str, reason: str, retry_after: float = 0.0):
+        super().__init__(f"{provider} unavailable: {reason}")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def failure_outcome(error: Exception) -> Dict[str, Any]:
+    """Map a provider exception to release() arguments (429s are not failures)."""
+    status = getattr(error, "status", None) or getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None and response is not None:
+        try:
+            retry_after = float(response.headers.get("retry-after"))
+        except (AttributeError, TypeError, ValueError):
+            retry_after = None
+
+    if status == 429 or "429" in str(error):
+        return {"outcome": "rate_limited", "retry_after": retry_after}
+    return {"outcome": "error"}
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def _env_config(provider: str) -> RateLimitConfig:
+    """Budget for `provider`; override with e.g. DEEPSEEK_RPM / DEEPSEEK_TPM."""
+    prefix = provider.upper()
+    return RateLimitConfig(
+        requests_per_minute=int(os.getenv(f"{prefix}_RPM", "60")),
+        tokens_per_minute=int(os.getenv(f"{prefix}_TPM", "100000")),
+        concurrent_requests=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", "10")),
+    )
+
+
+def _default_db_path() -> Path:
+    db_path = os.getenv("PROVIDER_ADMISSION_DB")
+    if db_path:
+        return Path(db_path)
+    return Path(__file__).parent.parent.parent / "thesis_data" / "provider_admission.db"
+
+
+class ProviderAdmission:
+    """Shared (cross-process) rate limiting and adaptive concurrency per provider."""
+
+    def __init__(self, db_path: Optional[str] = None, configs: Optional[Dict[str, RateLimitConfig]] = None):
+        self.db_path = Path(db_path) if db_path else _default_db_path()
+        self.db = SQLiteDatabase(self.db_path)
+        # "provider" or "provider:model" -> config
+        self.configs: Dict[str, RateLimitConfig] = dict(configs or {})
+        self._init_db()
+
+    # =========================================================================
+    # STORE
+    # =========================================================================
+
+    def _init_db(self):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    requests REAL NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (provider, model)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS providers (
+                    provider TEXT PRIMARY KEY,
+                    concurrency REAL NOT NULL,
+                    latency_ewma REAL NOT NULL DEFAULT 0,
+                    last_decrease REAL NOT NULL DEFAULT 0,
+                    cooldown_until REAL NOT NULL DEFAULT 0,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    opened_until REAL NOT NULL DEFAULT 0,
+                    rate_limited INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    lease_id TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS waiters (
+                    waiter_id TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    seen REAL NOT NULL
+                )
+            """)
+
+    def configure(self, provider: str, config: RateLimitConfig, model: Optional[str] = None):
+        """Set the budget for a provider, or for one of its models."""
+        self.configs[f"{provider}:{model}" if model else provider] = config
+
+    def _config(self, provider: str, model: str = "") -> RateLimitConfig:
+        return self.configs.get(f"{provider}:{model}") or self.configs.get(provider) or RateLimitConfig()
+
+    def _provider_row(self, conn, provider: str) -> Dict[str, float]:
+        row = conn.execute(
+            "SELECT concurrency, latency_ewma, last_decrease, cooldown_until, failures, opened_until, rate_limited "
+            "FROM providers WHERE provider = ?", (provider,)
+        ).fetchone()
+        if row is None:
+            config = self._config(provider)
+            concurrency = float(min(config.initial_concurrency, config.concurrent_requests))
+            conn.execute("INSERT INTO providers (provider, concurrency) VALUES (?, ?)", (provider, concurrency))
+            row = (concurrency, 0.0, 0.0, 0.0, 0, 0.0, 0)
+        keys = ("concurrency", "latency_ewma", "last_decrease", "cooldown_until", "failures", "opened_until", "rate_limited")
+        return dict(zip(keys, row))
+
+    def _bucket(self, conn, provider: str, model: str, now: float) -> Tuple[float, float]:
+        """Refilled (requests, tokens) available for provider/model."""
+        config = self._config(provider, model)
+        row = conn.execute(
+            "SELECT requests, tokens, updated FROM buckets WHERE provider = ? AND model = ?", (provider, model)
+        ).fetchone()
+        if row is None:
+            return float(config.requests_per_minute), float(config.tokens_per_minute)
+        requests, tokens, updated = row
+        elapsed = max(0.0, now - updated)
+        requests = min(config.requests_per_minute, requests + elapsed * config.requests_per_minute / 60.0)
+        tokens = min(config.tokens_per_minute, tokens + elapsed * config.tokens_per_minute / 60.0)
+        return requests, tokens
+
+    def _save_bucket(self, conn, provider: str, model: str, requests: float, tokens: float, now: float):
+        conn.execute(
+            "INSERT INTO buckets (provider, model, requests, tokens, updated) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(provider, model) DO UPDATE SET requests = excluded.requests, "
+            "tokens = excluded.tokens, updated = excluded.updated",
+            (provider, model, requests, tokens, now)
+        )
+
+    # =========================================================================
+    # ADMISSION
+    # =========================================================================
+
+    def _try_admit(self, provider: str, model: str, tokens: int, priority: Priority, waiter_id: str) -> Tuple[Optional[Lease], float]:
+        """
+        One admission attempt.
+
+        Returns:
+            (lease, 0) when admitted, otherwise (None, seconds to wait)
+        """
+        now = time.time()
+        config = self._config(provider, model)
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            conn.execute("DELETE FROM waiters WHERE seen < ?", (now - WAITER_TTL,))
+            state = self._provider_row(conn, provider)
+
+            if state["opened_until"] > now:
+                raise ProviderUnavailable(provider, "circuit open", state["opened_until"] - now)
+
+            wait = 0.0
+            if state["cooldown_until"] > now:
+                wait = state["cooldown_until"] - now
+            else:
+                in_flight = conn.execute(
+                    "SELECT COUNT(*) FROM leases WHERE provider = ?", (provider,)
+                ).fetchone()[0]
+                limit = max(int(state["concurrency"]), int(MIN_CONCURRENCY))
+                requests, available_tokens = self._bucket(conn, provider, model, now)
+                needed_requests = 1.0
+
+                if priority == Priority.BACKGROUND:
+                    interactive_waiting = conn.execute(
+                        "SELECT COUNT(*) FROM waiters WHERE provider = ? AND priority = ?",
+                        (provider, int(Priority.INTERACTIVE))
+                    ).fetchone()[0]
+                    # Keep a slot and a slice of the request budget for chat
+                    if limit > 1:
+                        limit -= 1
+                    needed_requests += config.requests_per_minute * BACKGROUND_REQUEST_RESERVE
+                    if interactive_waiting:
+                        limit = 0
+
+                # A single call larger than the whole budget only needs a full bucket
+                needed_tokens = min(tokens, config.tokens_per_minute)
+                if in_flight >= limit:
+                    wait = SLOT_POLL_INTERVAL
+                elif requests < needed_requests:
+                    wait = (needed_requests - requests) * 60.0 / config.requests_per_minute
+                elif available_tokens < needed_tokens:
+                    wait = (needed_tokens - available_tokens) * 60.0 / config.tokens_per_minute
+                else:
+                    lease = Lease(uuid.uuid4().hex, provider, model, priority, tokens, now)
+                    self._save_bucket(conn, provider, model, requests - 1.0, available_tokens - needed_tokens, now)
+                    conn.execute(
+                        "INSERT INTO leases (lease_id, provider, priority, expires_at) VALUES (?, ?, ?, ?)",
+                        (lease.lease_id, provider, int(priority), now + LEASE_TTL)
+                    )
+                    conn.execute("DELETE FROM waiters WHERE waiter_id = ?", (waiter_id,))
+                    return lease, 0.0
+
+            if priority == Priority.INTERACTIVE:
+                conn.execute(
+                    "INSERT INTO waiters (waiter_id, provider, priority, seen) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(waiter_id) DO UPDATE SET seen = excluded.seen",
+                    (waiter_id, provider, int(priority), now)
+                )
+            return None, wait
+
+    def _drop_waiter(self, waiter_id: str):
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM waiters WHERE waiter_id = ?", (waiter_id,))
+
+    async def acquire(
+        self,
+        provider: str,
+        model: str = "default",
+        tokens: int = 0,
+        priority: Priority = Priority.INTERACTIVE,
+        timeout: Optional[float] = None
+    ) -> Lease:
+        """
+        Wait until `provider` can take a call of roughly `tokens` tokens.
+
+        Args:
+            provider: Provider name (e.g. "deepseek")
+            model: Model name; budgets can differ per model
+            tokens: Estimated prompt + completion tokens
+            priority: Caller class
+            timeout: Max seconds to wait (default depends on priority)
+
+        Raises:
+            ProviderUnavailable: circuit open, or not admitted within timeout
+        """
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUTS[priority.name.lower()]
+        deadline = time.monotonic() + timeout
+        waiter_id = uuid.uuid4().hex
+
+        try:
+            while True:
+                lease, wait = await asyncio.to_thread(self._try_admit, provider, model, tokens, priority, waiter_id)
+                if lease:
+                    return lease
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    raise ProviderUnavailable(provider, "rate limited", wait)
+                await asyncio.sleep(min(wait, MAX_POLL_INTERVAL, max(remaining, 0.01)))
+        except BaseException:
+            if priority == Priority.INTERACTIVE:
+                await asyncio.to_thread(self._drop_waiter, waiter_id)
+            raise
+
+    def release(
+        self,
+        lease: Lease,
+        outcome: str = "success",
+        used_tokens: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        latency: Optional[float] = None
+    ):
+        """
+        Return a lease and feed the call's outcome back into the limits.
+
+        Args:
+            lease: Lease from acquire()
+            outcome: "success", "rate_limited" (429) or "error"
+            used_tokens: Actual tokens used, to correct the estimate
+            retry_after: Provider's Retry-After for a 429, in seconds
+            latency: Time to first chunk, in seconds (whole-call time grows
+                with output length, so long generations would look like
+                overload); None skips the latency check
+        """
+        now = time.time()
+        config = self._config(lease.provider)
+
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE lease_id = ?", (lease.lease_id,))
+            state = self._provider_row(conn, lease.provider)
+            concurrency = state["concurrency"]
+
+            if used_tokens is not None and used_tokens != lease.tokens:
+                model_config = self._config(lease.provider, lease.model)
+                requests, tokens = self._bucket(conn, lease.provider, lease.model, now)
+                tokens = min(model_config.tokens_per_minute, tokens + lease.tokens - used_tokens)
+                self._save_bucket(conn, lease.provider, lease.model, requests, tokens, now)
+
+            if outcome == "rate_limited":
+                # Our view of the quota was too generous: back off and drain
+                if now - state["last_decrease"] >= DECREASE_COOLDOWN:
+                    concurrency = max(MIN_CONCURRENCY, concurrency * RATE_LIMIT_DECREASE)
+                    state["last_decrease"] = now
+                state["cooldown_until"] = max(state["cooldown_until"], now + (retry_after or RATE_LIMIT_COOLDOWN))
+                state["rate_limited"] += 1
+                conn.execute("UPDATE buckets SET requests = 0, updated = ? WHERE provider = ?", (now, lease.provider))
+                print(f"🚦 {lease.provider} rate limited: concurrency -> {concurrency:.1f}", flush=True)
+
+            elif outcome == "error":
+                state["failures"] += 1
+                if state["failures"] >= FAILURE_THRESHOLD and state["opened_until"] <= now:
+                    state["opened_until"] = now + RECOVERY_TIME
+                    print(f"⚡ Circuit breaker OPEN for {lease.provider}", flush=True)
+
+            else:
+                ewma = state["latency_ewma"]
+                spiking = latency is not None and ewma > 0 and latency > ewma * LATENCY_SPIKE_FACTOR
+                if spiking and now - state["last_decrease"] >= DECREASE_COOLDOWN:
+                    concurrency = max(MIN_CONCURRENCY, concurrency * LATENCY_DECREASE)
+                    state["last_decrease"] = now
+                elif not spiking:
+                    concurrency = min(float(config.concurrent_requests), concurrency + 1.0 / concurrency)
+                if latency is not None:
+                    state["latency_ewma"] = latency if ewma == 0 else ewma + LATENCY_EWMA_WEIGHT * (latency - ewma)
+                state["failures"] = 0
+                state["opened_until"] = 0.0
+
+            conn.execute(
+                "UPDATE providers SET concurrency = ?, latency_ewma = ?, last_decrease = ?, cooldown_until = ?, "
+                "failures = ?, opened_until = ?, rate_limited = ? WHERE provider = ?",
+                (concurrency, state["latency_ewma"], state["last_decrease"], state["cooldown_until"],
+                 state["failures"], state["opened_until"], state["rate_limited"], lease.provider)
+            )
+
+    # =========================================================================
+    # CIRCUIT BREAKER / STATUS
+    # =========================================================================
+
+    def is_open(self, provider: str) -> bool:
+        """Whether the shared circuit for `provider` is open."""
+        with self.db.transaction() as conn:
+            return self._provider_row(conn, provider)["opened_until"] > time.time()
+
+    def status(self) -> Dict[str, Any]:
+        """Shared limiter state for every provider seen so far."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            providers = [row[0] for row in conn.execute("SELECT provider FROM providers")]
+            result = {}
+            for provider in providers:
+                state = self._provider_row(conn, provider)
+                in_flight = dict(conn.execute(
+                    "SELECT priority, COUNT(*) FROM leases WHERE provider = ? GROUP BY priority", (provider,)
+                ).fetchall())
+                buckets = {
+                    model: dict(zip(("requests", "tokens"), self._bucket(conn, provider, model, now)))
+                    for (model,) in conn.execute("SELECT model FROM buckets WHERE provider = ?", (provider,)).fetchall()
+                }
+                result[provider] = {
+                    "concurrency_limit": round(state["concurrency"], 2),
+                    "in_flight": {p.name.lower(): in_flight.get(int(p), 0) for p in Priority},
+                    "latency_ewma_ms": int(state["latency_ewma"] * 1000),
+                    "cooling_down_s": max(0.0, round(state["cooldown_until"] - now, 1)),
+                    "circuit_open": state["opened_until"] > now,
+                    "failures": state["failures"],
+                    "rate_limited_total": state["rate_limited"],
+                    "buckets": {m: {k: math.floor(v) for k, v in b.items()} for m, b in buckets.items()},
+                }
+            return result
+
+
+_admission: Optional[ProviderAdmission] = None
+
+
+def get_provider_admission() -> ProviderAdmission:
+    """Process-wide controller (state itself is shared through the database)."""
+    global _admission
+    if _admission is None:
+        _admission = ProviderAdmission(configs={provider: _env_config(provider) for provider in LLM_PROVIDERS})
+    return _admission
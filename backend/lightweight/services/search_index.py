@@ -0,0 +1,348 @@
+"""
+Search Index - BM25 Keyword Index
+
+The keyword ranker for the backend: an SQLite FTS5 inverted index, either
+persisted (WAL mode) next to the data it covers or held in memory. The
+persistent indexes are kept in sync incrementally: a document is only
+re-indexed when its fingerprint changes, and only when the data it was
+built from has changed since the last sync.
+
+Features:
+- BM25 ranking with per-field boosts (e.g. title > abstract > full text)
+- "Quoted phrase" and prefix (analy*) queries; plain words are OR-ed
+- Incremental add/update/remove, reconciled against the source data
+- Optional groups (e.g. the document a chunk belongs to) for filtering
+
+Used by DocumentService.search_chunks, SourcesService.search_sources
+(GraphQL search_sources) and, in memory, by context_packer.PassageIndex.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from services.sqlite_store import MemoryDatabase, SQLiteDatabase
+
+
+INDEX_FILENAME = "search_index.db"
+
+_TERM_RE = re.compile(r"[a-z0-9]+")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have how
+if in into is it its may more most not of on or our over such than that the their
+them then there these they this those through to was were what when where which
+while who whom why will with would also between within about among upon study
+""".split())
+
+
+def fingerprint(*parts) -> str:
+    """Stable hash of the values a document's index entry is built from."""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def file_revision(path: Path) -> str:
+    """Cheap change marker for a file (mtime and size); "" if it doesn't exist."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return ""
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def build_match_query(query: str, operators: bool = True) -> Optional[str]:
+    """
+    Translate a user query into a safe FTS5 expression.
+
+    Words (minus stopwords) and prefix* terms are OR-ed; every "quoted
+    phrase" is required. With operators=False (generated queries, e.g. a
+    section title) quotes and * are ignored and all words are OR-ed.
+    Returns None if nothing searchable is left.
+    """
+    any_of, phrases = [], []
+    for phrase, word in _QUERY_RE.findall(query if operators else query.replace('"', " ")):
+        if phrase:
+            terms = _TERM_RE.findall(phrase.lower())
+            if terms:
+                phrases.append('"' + " ".join(terms) + '"')
+        elif operators and word.endswith("*"):
+            prefix = "".join(_TERM_RE.findall(word.lower()))
+            if len(prefix) > 1:
+                any_of.append(f'"{prefix}"*')
+        else:
+            any_of.extend(
+                f'"{term}"' for term in _TERM_RE.findall(word.lower())
+                if len(term) > 1 and term not in STOPWORDS
+            )
+    any_of = list(dict.fromkeys(any_of))
+    parts = list(phrases)
+    if any_of:
+        parts.append("(" + " OR ".join(any_of) + ")")
+    return " AND ".join(parts) or None
+
+
+@dataclass
+class SearchHit:
+    key: str
+    score: float
+    matched_fields: List[str] = field(default_factory=list)
+
+
+class SearchIndex:
+    """FTS5 index over documents made of named text fields."""
+
+    def __init__(self, db_path: Optional[Path], boosts: Dict[str, float]):
+        """
+        Args:
+            db_path: Index file, or None for a private in-memory index
+            boosts: {field name: BM25 column weight}
+        """
+        self.db_path = db_path
+        self.boosts = boosts
+        self.fields = list(boosts)
+        self.db = SQLiteDatabase(db_path) if db_path is not None else MemoryDatabase()
+        self._revision: Optional[str] = None
+        self._init_db()
+
+    def _init_db(self):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS docs (
+                    rowid INTEGER PRIMARY KEY,
+                    key TEXT UNIQUE NOT NULL,
+                    grp TEXT,
+                    fp TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS docs_grp ON docs (grp)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            columns = ", ".join(self.fields)
+            conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    # =========================================================================
+    # UPDATES
+    # =========================================================================
+
+    def _delete(self, conn, key: str):
+        row = conn.execute("SELECT rowid FROM docs WHERE key = ?", (key,)).fetchone()
+        if row:
+            conn.execute("DELETE FROM fts WHERE rowid = ?", row)
+            conn.execute("DELETE FROM docs WHERE rowid = ?", row)
+
+    def _add(self, conn, key: str, fields: Dict[str, str], fp: str, group: Optional[str]):
+        self._delete(conn, key)
+        rowid = conn.execute("INSERT INTO docs (key, grp, fp) VALUES (?, ?, ?)", (key, group, fp)).lastrowid
+        placeholders = ", ".join("?" for _ in self.fields)
+        conn.execute(
+            f"INSERT INTO fts (rowid, {', '.join(self.fields)}) VALUES (?, {placeholders})",
+            [rowid] + [fields.get(name) or "" for name in self.fields]
+        )
+
+    def add(self, key: str, fields: Dict[str, str], fp: str = "", group: Optional[str] = None):
+        """Index (or re-index) one document."""
+        with self.db.transaction() as conn:
+            self._add(conn, key, fields, fp, group)
+
+    def remove(self, key: str):
+        with self.db.transaction() as conn:
+            self._delete(conn, key)
+
+    def reconcile(
+        self,
+        fingerprints: Dict[str, str],
+        load_fields: Callable[[str], Dict[str, str]],
+        groups: Optional[Dict[str, str]] = None
+    ) -> int:
+        """
+        Make the index match the given documents, re-indexing only those
+        whose fingerprint changed.
+
+        Args:
+            fingerprints: {key: fingerprint} for every document that should be indexed
+            load_fields: Returns the fields of a (new or changed) document
+            groups: Optional {key: group} used by search(groups=...)
+
+        Returns:
+            Number of documents added, updated or removed
+        """
+        with self.db.reader() as conn:
+            indexed = dict(conn.execute("SELECT key, fp FROM docs").fetchall())
+        stale = [key for key in indexed if key not in fingerprints]
+        changed = [key for key, fp in fingerprints.items() if indexed.get(key) != fp]
+        if not stale and not changed:
+            return 0
+
+        with self.db.transaction() as conn:
+            for key in stale:
+                self._delete(conn, key)
+            for key in changed:
+                self._add(conn, key, load_fields(key), fingerprints[key], (groups or {}).get(key))
+        return len(stale) + len(changed)
+
+    def get_revision(self) -> str:
+        """Revision of the source data the index was last synced with ("" if never)."""
+        if self._revision is None:
+            with self.db.reader() as conn:
+                row = conn.execute("SELECT value FROM meta WHERE name = 'revision'").fetchone()
+            self._revision = row[0] if row else ""
+        return self._revision
+
+    def set_revision(self, revision: str):
+        with self.db.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('revision', ?)", (revision,))
+        self._revision = revision
+
+    # =========================================================================
+    # SEARCH
+    # =========================================================================
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        groups: Optional[Iterable[str]] = None,
+        operators: bool = True,
+        matched_fields: bool = True
+    ) -> List[SearchHit]:
+        """
+        Rank documents for `query` with BM25 (field boosts as column weights).
+        Ties keep insertion order, so results are deterministic.
+
+        Args:
+            query: Words, prefix* terms and "quoted phrases"
+            limit: Max hits
+            groups: Only documents in these groups
+            operators: Honour "phrases" and prefix* (see build_match_query)
+            matched_fields: Report which fields matched each hit
+        """
+        expression = build_match_query(query, operators)
+        if not expression:
+            return []
+
+        weights = ", ".join(str(self.boosts[name]) for name in self.fields)
+        sql = (
+            f"SELECT docs.rowid, docs.key, bm25(fts, {weights}) AS rank FROM fts "
+            "JOIN docs ON docs.rowid = fts.rowid WHERE fts MATCH ?"
+        )
+        params: List = [expression]
+        if groups is not None:
+            groups = list(groups)
+            sql += f" AND docs.grp IN ({', '.join('?' for _ in groups)})"
+            params.extend(groups)
+        sql += " ORDER BY rank, docs.rowid LIMIT ?"
+        params.append(limit)
+
+        with self.db.reader() as conn:
+            try:
+                rows = conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                print(f"⚠️ Search query failed ({expression}): {e}")
+                return []
+            if not rows or not matched_fields:
+                return [SearchHit(key, -rank) for _, key, rank in rows]
+
+            # Which fields matched, for the top hits only
+            rowids = [rowid for rowid, _, _ in rows]
+            in_rows = ", ".join("?" for _ in rowids)
+            matched: Dict[int, List[str]] = {rowid: [] for rowid in rowids}
+            for name in sorted(self.fields, key=lambda n: -self.boosts[n]):
+                for (rowid,) in conn.execute(
+                    f"SELECT rowid FROM fts WHERE fts MATCH ? AND rowid IN ({in_rows})",
+                    [f"{{{name}}} : ({expression})"] + rowids
+                ):
+                    matched[rowid].append(name)
+
+        # FTS5 bm25() is lower-is-better; report a positive score. Not rounded:
+        # with few documents FTS5 clamps idf to 1e-6, so real scores can be tiny
+        return [SearchHit(key, -rank, matched[rowid]) for rowid, key, rank in rows]
+
+    @property
+    def size(self) -> int:
+        with self.db.reader() as conn:
+            return conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+
+# =============================================================================
+# WORKSPACE INDEXES
+# =============================================================================
+
+CHUNK_BOOSTS = {"title": 2.0, "text": 1.0}
+SOURCE_BOOSTS = {"title": 3.0, "citation_key": 2.5, "abstract": 2.0, "authors": 1.5, "venue": 1.0, "text": 0.5}
+
+_indexes: Dict[Path, SearchIndex] = {}
+
+
+# Persistent indexes are reconciled when the data they cover is saved, and
+# otherwise only when that data's revision (e.g. metadata file mtime) no
+# longer matches the one recorded at the last sync - never on every query.
+
+
+def _get_index(db_path: Path, boosts: Dict[str, float]) -> SearchIndex:
+    index = _indexes.get(db_path)
+    if index is None:
+        index = _indexes[db_path] = SearchIndex(db_path, boosts)
+    return index
+
+
+def sync_document_index(documents_dir: Path, metadata: Dict[str, Dict], revision: str = "") -> SearchIndex:
+    """
+    Chunk index for DocumentService (keys "doc_id:chunk_number", grouped by doc_id).
+
+    `revision` identifies the saved metadata (see file_revision); if the
+    index was last synced at that revision it is returned as is.
+    """
+    index = _get_index(documents_dir / INDEX_FILENAME, CHUNK_BOOSTS)
+    if revision and index.get_revision() == revision:
+        return index
+    chunks, fingerprints, groups = {}, {}, {}
+    for doc_id, doc in metadata.items():
+        # Uploaded documents never change, so the upload identifies the content
+        fp = fingerprint(doc.get("uploaded_at"), doc.get("filename"), len(doc.get("chunks", [])))
+        for number, chunk in enumerate(doc.get("chunks", [])):
+            key = f"{doc_id}:{number}"
+            chunks[key] = {"title": doc.get("filename", ""), "text": chunk.get("text", "")}
+            fingerprints[key] = fp
+            groups[key] = doc_id
+    index.reconcile(fingerprints, chunks.__getitem__, groups)
+    index.set_revision(revision)
+    return index
+
+
+def sync_source_index(sources_dir: Path, sources: Iterable[Dict], revision: str = "") -> SearchIndex:
+    """Source index for a workspace (keys are source IDs); `revision` as for sync_document_index."""
+    index = _get_index(sources_dir / INDEX_FILENAME, SOURCE_BOOSTS)
+    if revision and index.get_revision() == revision:
+        return index
+    by_id = {s["id"]: s for s in sources if s.get("id")}
+
+    def fields_of(source: Dict) -> Dict[str, str]:
+        authors = source.get("authors") or []
+        if not isinstance(authors, list):
+            authors = [authors]
+        return {
+            "title": source.get("title") or "",
+            "citation_key": source.get("citation_key") or "",
+            "abstract": source.get("abstract") or "",
+            "authors": " ".join(a.get("name", "") if isinstance(a, dict) else str(a) for a in authors),
+            "venue": source.get("venue") or "",
+        }
+
+    def load_fields(source_id: str) -> Dict[str, str]:
+        source = by_id[source_id]
+        fields = fields_of(source)
+        text_file = source.get("text_file")
+        if text_file and (sources_dir / text_file).exists():
+            fields["text"] = (sources_dir / text_file).read_text(encoding="utf-8", errors="ignore")
+        return fields
+
+    fingerprints = {sid: fingerprint(fields_of(s), s.get("text_file")) for sid, s in by_id.items()}
+    index.reconcile(fingerprints, load_fields)
+    index.set_revision(revision)
+    return index
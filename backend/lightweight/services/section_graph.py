@@ -0,0 +1,112 @@
+"""
+Section Graph - Concurrent Chapter Section Generation
+
+Chapters whose sections only depend on shared, already-loaded context (e.g.
+the per-objective discussions of Chapter 5 or the findings/conclusions of
+Chapter 6) declare their sections here in document order and let the graph
+schedule the LLM calls.
+
+Features:
+- Sections declared in document order, with optional dependencies
+- Independent sections generated concurrently under a concurrency budget
+- Finished sections released strictly in document order, so streamed
+  previews read exactly like the final file
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+@dataclass
+class SectionNode:
+    """One section of a chapter."""
+    key: str
+    heading: str  # Markdown placed before the content ("" for none)
+    generate: Callable[[Dict[str, str]], Awaitable[str]]  # Receives finished dependency contents
+    depends_on: Tuple[str, ...] = ()
+    log_message: Optional[str] = None
+
+
+@dataclass
+class SectionGraph:
+    """Generate chapter sections concurrently, emit them in document order."""
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    nodes: List[SectionNode] = field(default_factory=list)
+
+    def add(
+        self,
+        key: str,
+        heading: str,
+        generate: Callable[[Dict[str, str]], Awaitable[str]],
+        depends_on: Tuple[str, ...] = (),
+        log_message: Optional[str] = None
+    ) -> "SectionGraph":
+        if any(node.key == key for node in self.nodes):
+            raise ValueError(f"Duplicate section key: {key}")
+        self.nodes.append(SectionNode(key, heading, generate, tuple(depends_on), log_message))
+        return self
+
+    async def run(
+        self,
+        on_start: Optional[Callable[[SectionNode], Awaitable[None]]] = None,
+        on_ready: Optional[Callable[[SectionNode, str], Awaitable[None]]] = None
+    ) -> Dict[str, str]:
+        """
+        Generate every section.
+
+        Args:
+            on_start: Called when a section's LLM call begins
+            on_ready: Called once per section, in document order, as soon as
+                it and every section before it are finished
+
+        Returns:
+            {section key: generated content}
+        """
+        declared = set()
+        for node in self.nodes:
+            missing = [dep for dep in node.depends_on if dep not in declared]
+            if missing:
+                raise ValueError(f"Section {node.key} must be declared after its dependencies: {missing}")
+            declared.add(node.key)
+
+        slots = asyncio.Semaphore(self.max_concurrency)
+        tasks: Dict[str, asyncio.Task] = {}
+        results: Dict[str, str] = {}
+
+        async def build(node: SectionNode) -> str:
+            deps = {}
+            for dep in node.depends_on:
+                deps[dep] = await tasks[dep]
+            async with slots:
+                if on_start:
+                    await on_start(node)
+                return await node.generate(deps)
+
+        # Dependencies always precede their dependants, so there are no cycles
+        for node in self.nodes:
+            tasks[node.key] = asyncio.create_task(build(node))
+
+        try:
+            for node in self.nodes:
+                results[node.key] = await tasks[node.key]
+                if on_ready:
+                    await on_ready(node, results[node.key])
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return results
+
+    def assemble(self, results: Dict[str, str]) -> str:
+        """Join headings and contents in document order."""
+        return "".join(self.render(node, results[node.key]) for node in self.nodes)
+
+    @staticmethod
+    def render(node: SectionNode, content: str) -> str:
+        heading = f"{node.heading}\n\n" if node.heading else ""
+        return f"{heading}{content}\n\n"
@@ -3,19 +3,31 @@ Sources Context Loader - Integrate uploaded PDFs into LLM context
 
 This helper loads uploaded PDF sources and formats them for LLM consumption,
 enabling the AI to use uploaded literature when generating chapters.
+
+When a query (the section being written) is given, the most relevant
+passages are packed into a token budget by services.context_packer instead
+of pasting the opening text of the most-cited sources.
 """
 
 from typing import Dict, List, Optional
 from pathlib import Path
 
 
-def load_sources_for_llm(workspace_id: str, max_sources: int = 10) -> str:
+def load_sources_for_llm(
+    workspace_id: str,
+    max_sources: int = 10,
+    query: str = "",
+    token_budget: Optional[int] = None
+) -> str:
     """
     Load sources from workspace and format for LLM context.
     
     Args:
         workspace_id: Workspace ID
         max_sources: Maximum number of sources to include
+        query: What is being written; when given, passages are ranked by
+            relevance to it instead of sources by citation count
+        token_budget: Token budget for the packed passages (query mode)
         
     Returns:
         Formatted string with source content for LLM
@@ -28,6 +40,9 @@ def load_sources_for_llm(workspace_id: str, max_sources: int = 10) -> str:
         if not sources:
             return ""
         
+        if query:
+            return _load_relevant_passages(workspace_id, query, max_sources, token_budget, len(sources))
+        
         # Sort by relevance (citation count, recency)
         sorted_sources = sorted(
             sources,
@@ -82,6 +97,43 @@ def load_sources_for_llm(workspace_id: str, max_sources: int = 10) -> str:
         return ""
 
 
+def _load_relevant_passages(
+    workspace_id: str,
+    query: str,
+    max_sources: int,
+    token_budget: Optional[int],
+    total_sources: int
+) -> str:
+    """Relevance-ranked passages from the workspace sources, within a token budget."""
+    from services.context_packer import context_packer, DEFAULT_TOKEN_BUDGET
+    
+    index = context_packer.get_index(workspace_id, include_chapters=False)
+    packed = index.pack(query, token_budget or DEFAULT_TOKEN_BUDGET)
+    
+    # Keep passages from at most max_sources distinct sources
+    allowed = set(packed.citation_keys[:max_sources])
+    passages = [p for p in packed.passages if p.citation_key in allowed]
+    if not passages:
+        return ""
+    
+    context_parts = ["## 📚 Available Literature Sources\n"]
+    context_parts.append("Use these sources to support your writing. Cite them using (Author, Year) format.\n")
+    
+    for passage in passages:
+        context_parts.append(f"""
+### [{passage.citation_key}] {passage.label}
+**Title**: {passage.title}
+**Relevant Passage**:
+{passage.text}
+---
+""")
+    
+    context_parts.append(f"\n**Total sources available**: {total_sources}")
+    context_parts.append("\n**Instructions**: When citing, use format: (Author, Year). Example: 'Research shows that... (Smith, 2020).'")
+    
+    return "\n".join(context_parts)
+
+
 def get_citation_instructions() -> str:
     """Get citation instructions for LLM."""
     return """
@@ -95,19 +147,28 @@ def get_citation_instructions() -> str:
 
 
 # Add this function to chapter generator prompts
-def enhance_prompt_with_sources(base_prompt: str, workspace_id: str, max_sources: int = 10) -> str:
+def enhance_prompt_with_sources(
+    base_prompt: str,
+    workspace_id: str,
+    max_sources: int = 10,
+    token_budget: Optional[int] = None
+) -> str:
     """
     Enhance a chapter generation prompt with source context.
     
+    The prompt itself is the relevance query, so the sources added are
+    the passages closest to what is being asked for.
+    
     Args:
         base_prompt: Original prompt
         workspace_id: Workspace ID
         max_sources: Max sources to include
+        token_budget: Token budget for the source passages
         
     Returns:
         Enhanced prompt with sources
     """
-    sources_context = load_sources_for_llm(workspace_id, max_sources)
+    sources_context = load_sources_for_llm(workspace_id, max_sources, query=base_prompt, token_budget=token_budget)
     
     if not sources_context:
         return base_prompt
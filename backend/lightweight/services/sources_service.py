@@ -53,10 +53,19 @@ class SourcesService:
         }
     
     def _save_index(self, workspace_id: str, index: Dict):
-        """Save the sources index."""
+        """Save the sources index (atomically, via a temp file)."""
         index["updated_at"] = datetime.now().isoformat()
         index_path = self._get_index_path(workspace_id)
-        index_path.write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding='utf-8')
+        tmp_path = index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding='utf-8')
+        tmp_path.replace(index_path)
+        
+        # Keep the keyword search index in step (only changed sources are re-indexed)
+        try:
+            from services.search_index import file_revision, sync_source_index
+            sync_source_index(index_path.parent, index.get("sources", []), file_revision(index_path))
+        except Exception as e:
+            print(f"⚠️ Source search index update failed: {e}")
     
     def _generate_citation_key(self, source: Dict) -> str:
         """Generate a BibTeX citation key."""
@@ -177,19 +186,19 @@ class SourcesService:
             except Exception as e:
                 print(f"   ⚠️ PDF download failed: {e}")
         
+        # Update BibTeX (the key may get a collision suffix there)
+        await self._update_bibtex(workspace_id, source)
+        
         # Add to index
         index["sources"].append(source)
         self._save_index(workspace_id, index)
         
-        # Update BibTeX
-        await self._update_bibtex(workspace_id, source)
-        
         print(f"✅ Added source: {source['title'][:50]}")
         return source
     
     async def _update_bibtex(self, workspace_id: str, source: Dict):
-        """Add source to references.bib file."""
-        bib_path = WORKSPACES_DIR / workspace_id / "references.bib"
+        """Add source to references.bib file (deduplicated by the bibliography store)."""
+        from services.bibliography_service import bibliography_service
         
         # Format authors for BibTeX
         authors = source.get("authors", [])
@@ -205,23 +214,10 @@ class SourcesService:
         if not author_str or author_str.lower() == "unknown":
             return
         
-        # Create BibTeX entry
         entry_type = "article" if source.get("type") == "paper" else "misc"
-        bib_entry = f"""
-@{entry_type}{{{source['citation_key']},
-  author = {{{author_str}}},
-  title = {{{source['title']}}},
-  journal = {{{source.get('venue', '')}}},
-  year = {{{source['year']}}},
-  doi = {{{source.get('doi', '')}}},
-  url = {{{source.get('url', '')}}},
-}}
-
-"""
-        
-        # Append to bib file
-        with open(bib_path, 'a', encoding='utf-8') as f:
-            f.write(bib_entry)
+        source["citation_key"] = await bibliography_service.update_bibliography(
+            workspace_id, {**source, "type": entry_type}, cite_key=source["citation_key"]
+        )
     
     def list_sources(self, workspace_id: str) -> List[Dict]:
         """List all sources in a workspace."""
@@ -236,6 +232,27 @@ class SourcesService:
                 return source
         return None
     
+    def search_sources(self, workspace_id: str, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Keyword search over sources (BM25 over title, citation key, abstract,
+        authors, venue and extracted text; supports "phrases" and prefix*).
+        
+        Returns:
+            [{"source", "score", "matched_fields"}], best first
+        """
+        from services.search_index import file_revision, sync_source_index
+        
+        sources = self.list_sources(workspace_id)
+        by_id = {s.get("id"): s for s in sources}
+        # No-op unless index.json changed without going through _save_index
+        index = sync_source_index(
+            self._get_sources_dir(workspace_id), sources, file_revision(self._get_index_path(workspace_id))
+        )
+        return [
+            {"source": by_id[hit.key], "score": hit.score, "matched_fields": hit.matched_fields}
+            for hit in index.search(query, limit=limit)
+        ]
+    
     def get_source_text(self, workspace_id: str, source_id: str) -> Optional[str]:
         """Get extracted text content from a source."""
         source = self.get_source(workspace_id, source_id)
@@ -448,6 +465,69 @@ CONTENT_SNIPPET:
             print(f"📄 Extracting metadata from: {pdf_path.name}")
             metadata = pdf_metadata_extractor.extract_metadata(pdf_path)
         
+        source = self._store_pdf_source(workspace_id, pdf_path, metadata, original_filename)
+        
+        # Update bibliography (the key may get a collision suffix there)
+        source["citation_key"] = await bibliography_service.update_bibliography(
+            workspace_id, source, cite_key=source["citation_key"]
+        )
+        
+        # Add to index
+        index = self._load_index(workspace_id)
+        index["sources"].append(source)
+        self._save_index(workspace_id, index)
+        
+        print(f"✅ Added PDF source: {source['title'][:50]}")
+        return source
+    
+    async def add_pdf_sources(self, workspace_id: str, items: List[Dict]) -> List[Dict]:
+        """
+        Add many already-extracted PDFs with a single index write.
+        
+        Args:
+            workspace_id: Workspace ID
+            items: [{"pdf_path", "metadata", "original_filename"}, ...]; staged
+                PDFs (and metadata["text_path"] files) are moved, not copied
+            
+        Returns:
+            Added source dicts, in input order
+        """
+        from services.bibliography_service import bibliography_service
+        
+        sources = await asyncio.to_thread(lambda: [
+            self._store_pdf_source(
+                workspace_id,
+                Path(item["pdf_path"]),
+                item["metadata"],
+                item.get("original_filename"),
+                move=True
+            )
+            for item in items
+        ])
+        
+        # Keep each source's key in step with its references.bib entry
+        keys = await bibliography_service.update_bibliography_bulk(
+            workspace_id, sources, [s["citation_key"] for s in sources]
+        )
+        for source, key in zip(sources, keys):
+            source["citation_key"] = key
+        
+        index = self._load_index(workspace_id)
+        index["sources"].extend(sources)
+        self._save_index(workspace_id, index)
+        
+        print(f"✅ Added {len(sources)} PDF sources to workspace {workspace_id}")
+        return sources
+    
+    def _store_pdf_source(
+        self,
+        workspace_id: str,
+        pdf_path: Path,
+        metadata: Dict,
+        original_filename: Optional[str] = None,
+        move: bool = False
+    ) -> Dict:
+        """Place a PDF (and its extracted text) in the workspace and build its index entry."""
         sources_dir = self._get_sources_dir(workspace_id)
         pdfs_dir = sources_dir / "pdfs"
         pdfs_dir.mkdir(exist_ok=True)
@@ -466,7 +546,12 @@ CONTENT_SNIPPET:
             counter += 1
         
         import shutil
-        shutil.copy(pdf_path, dest_path)
+        if move:
+            shutil.move(str(pdf_path), dest_path)
+        else:
+            shutil.copy(pdf_path, dest_path)
+        
+        full_text = metadata.get("full_text", "")
         
         # Create source entry
         source_id = str(uuid.uuid4())[:8]
@@ -483,30 +568,26 @@ CONTENT_SNIPPET:
             "file_size": metadata.get("file_size", 0),
             "added_at": datetime.now().isoformat(),
             "text_extracted": True,
-            "full_text": metadata.get("full_text", "")[:5000],  # Store first 5000 chars
+            "full_text": (metadata.get("text_preview") or full_text)[:5000],  # Store first 5000 chars
             "original_filename": original_filename or pdf_path.name,
         }
+        if metadata.get("content_hash"):
+            source["content_hash"] = metadata["content_hash"]
         
         # Generate citation key
         source["citation_key"] = self._generate_citation_key(source)
         
-        # Save extracted text
-        if metadata.get("full_text"):
+        # Save extracted text (pre-extracted text files are moved into place)
+        if full_text or metadata.get("text_path"):
             extracted_dir = sources_dir / "extracted"
             extracted_dir.mkdir(exist_ok=True)
-            text_path = extracted_dir / f"{safe_filename}.txt"
-            text_path.write_text(metadata["full_text"], encoding='utf-8')
-            source["text_file"] = f"extracted/{safe_filename}.txt"
-        
-        # Add to index
-        index = self._load_index(workspace_id)
-        index["sources"].append(source)
-        self._save_index(workspace_id, index)
-        
-        # Update bibliography
-        await bibliography_service.update_bibliography(workspace_id, source)
+            text_path = extracted_dir / f"{dest_path.stem}.txt"
+            if full_text:
+                text_path.write_text(full_text, encoding='utf-8')
+            else:
+                shutil.move(metadata["text_path"], text_path)
+            source["text_file"] = f"extracted/{text_path.name}"
         
-        print(f"✅ Added PDF source: {source['title'][:50]}")
         return source
     
     def delete_source(self, workspace_id: str, source_id: str) -> bool:
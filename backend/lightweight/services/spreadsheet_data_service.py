@@ -0,0 +1,337 @@
+"""
+Spreadsheet Data Service - Paginated, Columnar Spreadsheet Previews
+
+Converts each CSV/XLSX sheet once into a columnar sidecar and serves row
+windows from it instead of re-parsing the source file on every request.
+
+Features:
+- Parquet sidecar per sheet (pickle when pyarrow is not installed), keyed by
+  the source file's mtime and size, stored under <workspace>/.cache/spreadsheets
+- Row windows (offset/limit), column projection, sorting and filtering
+- Typed schema response (integer, number, boolean, datetime, string)
+- Small in-process LRU of loaded frames so paging does not touch disk
+
+Dependencies: pandas, optional pyarrow
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+    pd = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = pq = None
+
+
+SPREADSHEET_EXTENSIONS = {'.csv', '.xlsx', '.xls'}
+FILTER_OPERATORS = {'eq', 'ne', 'contains', 'gt', 'gte', 'lt', 'lte'}
+CSV_SHEET_NAME = "data"
+
+
+class SpreadsheetDataService:
+    """Serve spreadsheet windows from cached columnar sidecars."""
+
+    def __init__(self, max_cached_frames: int = 8):
+        self.max_cached_frames = max_cached_frames
+        self._frames: "OrderedDict[Tuple[str, str], pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}  # sidecar dir -> lock
+
+    # =========================================================================
+    # SIDECAR MANAGEMENT
+    # =========================================================================
+
+    @staticmethod
+    def _fingerprint(file_path: Path) -> str:
+        stat = file_path.stat()
+        return f"{stat.st_mtime_ns}_{stat.st_size}"
+
+    def _sidecar_dir(self, file_path: Path, cache_root: Path) -> Path:
+        key = hashlib.sha1(str(file_path.resolve()).encode('utf-8')).hexdigest()[:16]
+        return cache_root / ".cache" / "spreadsheets" / key
+
+    def _sidecar_ext(self) -> str:
+        return ".parquet" if PYARROW_AVAILABLE else ".pkl"
+
+    @staticmethod
+    def _sheet_file_stem(index: int) -> str:
+        return f"sheet_{index}"
+
+    def _prepare_frame(self, df: 'pd.DataFrame') -> 'pd.DataFrame':
+        """Make a frame safe for columnar storage."""
+        df.columns = [str(c) for c in df.columns]
+        # Mixed-type object columns cannot be written as a single Arrow type
+        for col in df.columns:
+            if df[col].dtype == object:
+                non_null = df[col].dropna()
+                if not non_null.empty and non_null.map(type).nunique() > 1:
+                    df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+        return df
+
+    def _write_frame(self, df: 'pd.DataFrame', path: Path):
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        if PYARROW_AVAILABLE:
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+        else:
+            df.to_pickle(tmp_path)
+        tmp_path.replace(path)
+
+    def _build_sidecar(self, file_path: Path, sidecar_dir: Path, fingerprint: str) -> Dict[str, Any]:
+        """Parse the source spreadsheet once and write one sidecar per sheet."""
+        if file_path.suffix.lower() == '.csv':
+            frames = {CSV_SHEET_NAME: pd.read_csv(file_path)}
+        else:
+            frames = pd.read_excel(file_path, sheet_name=None)
+
+        sidecar_dir.mkdir(parents=True, exist_ok=True)
+        for old in sidecar_dir.iterdir():
+            old.unlink()
+
+        sheets = []
+        for index, (sheet_name, df) in enumerate(frames.items()):
+            df = self._prepare_frame(df)
+            self._write_frame(df, sidecar_dir / f"{self._sheet_file_stem(index)}{self._sidecar_ext()}")
+            sheets.append({
+                "name": str(sheet_name),
+                "row_count": len(df),
+                "schema": self._schema(df)
+            })
+
+        manifest = {"fingerprint": fingerprint, "format": self._sidecar_ext(), "sheets": sheets}
+        (sidecar_dir / "manifest.json").write_text(json.dumps(manifest), encoding='utf-8')
+        return manifest
+
+    def _read_manifest(self, sidecar_dir: Path, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """The sidecar's manifest if it is current for `fingerprint`, else None."""
+        manifest_path = sidecar_dir / "manifest.json"
+        if manifest_path.exists():
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+                if manifest.get("fingerprint") == fingerprint and manifest.get("format") == self._sidecar_ext():
+                    return manifest
+            except Exception:
+                pass
+        return None
+
+    def _get_manifest(self, file_path: Path, cache_root: Path) -> Tuple[Dict[str, Any], Path]:
+        sidecar_dir = self._sidecar_dir(file_path, cache_root)
+        fingerprint = self._fingerprint(file_path)
+
+        manifest = self._read_manifest(sidecar_dir, fingerprint)
+        if manifest:
+            return manifest, sidecar_dir
+
+        # One build per sidecar dir: a concurrent build would delete this one's
+        # temp files. Whoever waited re-checks, since the sidecar may now exist
+        with self._lock:
+            build_lock = self._build_locks.setdefault(str(sidecar_dir), threading.Lock())
+        with build_lock:
+            manifest = self._read_manifest(sidecar_dir, fingerprint)
+            if manifest:
+                return manifest, sidecar_dir
+            print(f"📊 Building columnar sidecar for {file_path.name}")
+            return self._build_sidecar(file_path, sidecar_dir, fingerprint), sidecar_dir
+
+    def _load_frame(self, sidecar_dir: Path, fingerprint: str, index: int) -> 'pd.DataFrame':
+        key = (str(sidecar_dir), f"{fingerprint}:{index}")
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                return self._frames[key]
+
+        path = sidecar_dir / f"{self._sheet_file_stem(index)}{self._sidecar_ext()}"
+        df = pq.read_table(path).to_pandas() if PYARROW_AVAILABLE else pd.read_pickle(path)
+
+        with self._lock:
+            self._frames[key] = df
+            while len(self._frames) > self.max_cached_frames:
+                self._frames.popitem(last=False)
+        return df
+
+    # =========================================================================
+    # QUERY
+    # =========================================================================
+
+    @staticmethod
+    def _schema(df: 'pd.DataFrame') -> List[Dict[str, Any]]:
+        schema = []
+        for col in df.columns:
+            dtype = df[col].dtype
+            if pd.api.types.is_bool_dtype(dtype):
+                col_type = "boolean"
+            elif pd.api.types.is_integer_dtype(dtype):
+                col_type = "integer"
+            elif pd.api.types.is_numeric_dtype(dtype):
+                col_type = "number"
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                col_type = "datetime"
+            else:
+                col_type = "string"
+            schema.append({
+                "name": str(col),
+                "type": col_type,
+                "dtype": str(dtype),
+                "nullable": bool(df[col].isna().any())
+            })
+        return schema
+
+    @staticmethod
+    def parse_filters(filters: Optional[List[str]]) -> List[Tuple[str, str, str]]:
+        """Parse "column:op:value" filter strings."""
+        parsed = []
+        for raw in filters or []:
+            parts = raw.split(":", 2)
+            if len(parts) != 3 or parts[1] not in FILTER_OPERATORS:
+                raise ValueError(f"Invalid filter '{raw}'. Use column:op:value with op in {sorted(FILTER_OPERATORS)}")
+            parsed.append((parts[0], parts[1], parts[2]))
+        return parsed
+
+    @staticmethod
+    def _apply_filter(df: 'pd.DataFrame', column: str, op: str, value: str) -> 'pd.DataFrame':
+        series = df[column]
+        if op == 'contains':
+            return df[series.astype(str).str.contains(value, case=False, na=False, regex=False)]
+
+        target: Any = value
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            target = float(value)
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            target = pd.Timestamp(value)
+        else:
+            series = series.astype(str)
+
+        if op == 'eq':
+            mask = series == target
+        elif op == 'ne':
+            mask = series != target
+        elif op == 'gt':
+            mask = series > target
+        elif op == 'gte':
+            mask = series >= target
+        elif op == 'lt':
+            mask = series < target
+        else:
+            mask = series <= target
+        return df[mask]
+
+    def query(
+        self,
+        file_path: Path,
+        cache_root: Path,
+        sheet: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 100,
+        columns: Optional[List[str]] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        filters: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Return one window of a spreadsheet sheet.
+
+        Args:
+            file_path: Source CSV/XLSX file
+            cache_root: Workspace directory holding the .cache folder
+            sheet: Sheet name (None = first sheet)
+            offset: First row of the window (after filtering/sorting)
+            limit: Maximum rows returned
+            columns: Column projection (None = all columns)
+            sort_by: Column to sort on
+            descending: Sort order
+            filters: ["column:op:value", ...] with op in eq, ne, contains, gt, gte, lt, lte
+
+        Returns:
+            {
+                "success": True,
+                "sheet": "Sheet1",
+                "sheet_names": [...],
+                "schema": [{"name", "type", "dtype", "nullable"}, ...],
+                "columns": [...],
+                "rows": [...records...],
+                "offset": 0, "limit": 100,
+                "total_rows": 50000,      # rows in the sheet
+                "filtered_rows": 1200     # rows matching filters
+            }
+        """
+        if not PANDAS_AVAILABLE:
+            return {"success": False, "error": "pandas not installed"}
+
+        file_path = Path(file_path)
+        if file_path.suffix.lower() not in SPREADSHEET_EXTENSIONS:
+            return {"success": False, "error": "Only .csv, .xlsx, and .xls files are supported"}
+
+        try:
+            parsed_filters = self.parse_filters(filters)
+            manifest, sidecar_dir = self._get_manifest(file_path, Path(cache_root))
+            sheet_names = [s["name"] for s in manifest["sheets"]]
+            if not sheet_names:
+                return {"success": False, "error": "Spreadsheet has no sheets"}
+
+            index = sheet_names.index(sheet) if sheet in sheet_names else 0
+            if sheet and sheet not in sheet_names:
+                return {"success": False, "error": f"Sheet not found: {sheet}"}
+            sheet_meta = manifest["sheets"][index]
+
+            df = self._load_frame(sidecar_dir, manifest["fingerprint"], index)
+            all_columns = [c["name"] for c in sheet_meta["schema"]]
+
+            for column, _, _ in parsed_filters:
+                if column not in all_columns:
+                    raise ValueError(f"Unknown filter column: {column}")
+            if sort_by and sort_by not in all_columns:
+                raise ValueError(f"Unknown sort column: {sort_by}")
+            selected = [c for c in columns if c in all_columns] if columns else all_columns
+
+            for column, op, value in parsed_filters:
+                df = self._apply_filter(df, column, op, value)
+            if sort_by:
+                df = df.sort_values(sort_by, ascending=not descending, kind="stable", na_position="last")
+
+            offset = max(0, offset)
+            limit = max(0, limit)
+            window = df.iloc[offset:offset + limit][selected]
+
+            # to_json maps NaN/NaT to null and numpy scalars to plain JSON
+            rows = json.loads(window.to_json(orient="records", date_format="iso"))
+
+            return {
+                "success": True,
+                "sheet": sheet_meta["name"],
+                "sheet_names": sheet_names,
+                "schema": [c for c in sheet_meta["schema"] if c["name"] in selected],
+                "columns": selected,
+                "rows": rows,
+                "offset": offset,
+                "limit": limit,
+                "total_rows": sheet_meta["row_count"],
+                "filtered_rows": len(df)
+            }
+        except ValueError as e:
+            return {"success": False, "error": str(e), "invalid_request": True}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+
+# Singleton instance
+_spreadsheet_data_service = None
+
+def get_spreadsheet_data_service() -> SpreadsheetDataService:
+    """Get global spreadsheet data service instance."""
+    global _spreadsheet_data_service
+    if _spreadsheet_data_service is None:
+        _spreadsheet_data_service = SpreadsheetDataService()
+    return _spreadsheet_data_service
@@ -0,0 +1,76 @@
+"""
+SQLite Store - Shared Connection Handling for Local SQLite Databases
+
+One place for the connection discipline of the SQLite-backed services,
+instead of a copy of it in each.
+
+Features:
+- Write transactions in WAL mode, serialized across processes with
+  BEGIN IMMEDIATE and rolled back on any exception
+- Short-lived reader connections (WAL lets them run beside a writer)
+- Private in-memory databases with the same interface, for indexes that
+  don't need to outlive the process
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+BUSY_TIMEOUT = 10.0  # Seconds to wait for another process's write lock
+
+
+class SQLiteDatabase:
+    """A database file; every transaction/reader opens its own connection."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction, serialized across processes (BEGIN IMMEDIATE)."""
+        conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    @contextmanager
+    def reader(self):
+        conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+class MemoryDatabase:
+    """A private in-memory database on one connection, guarded by a lock."""
+
+    def __init__(self):
+        self._conn = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @contextmanager
+    def reader(self):
+        with self._lock:
+            yield self._conn
@@ -8,10 +8,19 @@ Examples:
 - "Data was collected using questionnaires" → "Data will be collected using questionnaires"
 - "The study employed a survey design" → "The study will employ a survey design"
 - "Participants were selected through stratified sampling" → "Participants will be selected through stratified sampling"
+
+The regex converters (past → future fallback, and future → past for turning
+proposal chapters into thesis chapters) share a rule engine that compiles
+its rule table into a single alternation and rewrites a document in one
+pass, leaving quotes, citations, code and tables untouched and recording
+which rules fired.
 """
 
-from typing import Optional
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
 import asyncio
+import re
 
 
 async def convert_to_future_tense_llm(content: str, chapter_number: int = 3) -> str:
@@ -67,6 +76,112 @@ CONTENT TO CONVERT:
         return convert_to_future_tense_regex(content)
 
 
+# =============================================================================
+# RULE ENGINE
+# =============================================================================
+
+# Spans never rewritten: fenced code, table rows, quotations, (Author, 2020)
+PROTECTED_PATTERN = "|".join([
+    r"```[\s\S]*?```",
+    r"(?m:^[ \t]*\|.*$)",
+    r'"[^"\n]*"',
+    r"“[^”]*”",
+    r"\([^()\n]*\b\d{4}[a-z]?\b[^()\n]*\)",
+])
+
+
+@dataclass(frozen=True)
+class TenseRule:
+    """One rewrite. A match starting with a capital gets a capitalised replacement."""
+    name: str
+    pattern: str
+    replacement: str  # re template; may use the pattern's own groups
+
+
+@dataclass
+class ConversionResult:
+    text: str
+    fired: Dict[str, int] = field(default_factory=dict)  # Rule name -> rewrites
+    protected: int = 0  # Spans skipped as quotes/citations/code/tables
+
+
+class TenseRuleEngine:
+    """
+    Single-pass rule application.
+
+    All rules are joined into one alternation behind the protected spans.
+    At each position the earliest listed rule that matches wins, so tables
+    are ordered most specific first.
+    """
+
+    def __init__(self, rules: Sequence[TenseRule]):
+        self.rules: List[TenseRule] = list(rules)
+        self._rule_regexes = [re.compile(rule.pattern) for rule in self.rules]
+        branches = [f"(?P<protected>{PROTECTED_PATTERN})"]
+        branches += [f"(?P<r{i}>{rule.pattern})" for i, rule in enumerate(self.rules)]
+        self._regex = re.compile("|".join(branches))
+
+    def convert(self, text: str) -> ConversionResult:
+        fired: Counter = Counter()
+        protected = 0
+
+        def dispatch(match: re.Match) -> str:
+            nonlocal protected
+            name = match.lastgroup
+            if name == "protected":
+                protected += 1
+                return match.group()
+            index = int(name[1:])
+            rule = self.rules[index]
+            # Re-match the rule alone (same span and context) to expand its own groups
+            own = self._rule_regexes[index].match(text, match.start(), match.end())
+            replacement = own.expand(rule.replacement)
+            if match.group()[:1].isupper():
+                replacement = replacement[:1].upper() + replacement[1:]
+            fired[rule.name] += 1
+            return replacement
+
+        result = self._regex.sub(dispatch, text)
+        return ConversionResult(result, dict(fired), protected)
+
+
+# Past (thesis) -> future (proposal). Specific "was/were <participle>" phrases
+# are covered by passive_participle; subject rules only rewrite the verb so
+# they start where passive_participle would.
+PAST_TO_FUTURE_RULES = [
+    TenseRule("passive_participle", r"\b[Ww](?:as|ere)\s+(\w+ed)\b", r"will be \1"),
+    TenseRule("passive_sought", r"\b[Ww](?:as|ere) sought\b", "will be sought"),
+    TenseRule("study_used", r"\b[Tt]he (study|research) used\b", r"the \1 will use"),
+    TenseRule("study_employed", r"\b[Tt]he (study|research) employed\b", r"the \1 will employ"),
+    TenseRule("study_adopted", r"\b[Tt]he study adopted\b", "the study will adopt"),
+    TenseRule("data_passive", r"(?<=\b[Dd]ata )(?:was|were)\b", "will be"),
+    TenseRule(
+        "subject_passive",
+        r"(?:(?<=\b[Pp]articipants )|(?<=\b[Rr]espondents )|(?<=\b[Qq]uestionnaires )|(?<=\b[Ii]nstruments ))were\b",
+        "will be"
+    ),
+]
+
+# Future (proposal) -> past (thesis). Every remaining "will"/"shall" becomes
+# "did", so verb-specific "will <verb>" rewrites can't be reached.
+FUTURE_TO_PAST_RULES = [
+    TenseRule("will_be", r"\b[Ww]ill be\b", "was"),
+    TenseRule("will_have", r"\b[Ww]ill have\b", "had"),
+    TenseRule("will", r"\b[Ww]ill\b", "did"),
+    TenseRule("shall_be", r"\b[Ss]hall be\b", "was"),
+    TenseRule("shall", r"\b[Ss]hall\b", "did"),
+    TenseRule("is_expected", r"\b[Ii]s expected to\b", "was found to"),
+    TenseRule("are_expected", r"\b[Aa]re expected to\b", "were found to"),
+    TenseRule("is_anticipated", r"\b[Ii]s anticipated to\b", "was observed to"),
+    TenseRule("study_aims", r"\b([Tt]h(?:is|e)) (study|research) aims to\b", r"\1 \2 aimed to"),
+    TenseRule("study_seeks", r"\b[Tt]his study seeks to\b", "this study sought to"),
+    TenseRule("in_order_to_achieve", r"\b[Ii]n order to achieve\b", "to achieve"),
+]
+
+future_tense_engine = TenseRuleEngine(PAST_TO_FUTURE_RULES)
+past_tense_engine = TenseRuleEngine(FUTURE_TO_PAST_RULES)
+
+
 def convert_to_future_tense_regex(content: str) -> str:
     """
     Fallback regex-based conversion (less accurate but faster).
@@ -77,143 +192,20 @@ def convert_to_future_tense_regex(content: str) -> str:
     Returns:
         Content converted to future tense
     """
-    import re
-    
-    # Comprehensive past-to-future conversions
-    conversions = [
-        # "was/were + past participle" → "will be + past participle"
-        (r'\bwas\s+(\w+ed)\b', r'will be \1'),
-        (r'\bWas\s+(\w+ed)\b', r'Will be \1'),
-        (r'\bwere\s+(\w+ed)\b', r'will be \1'),
-        (r'\bWere\s+(\w+ed)\b', r'Will be \1'),
-        
-        # Specific academic verbs
-        (r'\bwas collected\b', 'will be collected'),
-        (r'\bWas collected\b', 'Will be collected'),
-        (r'\bwere collected\b', 'will be collected'),
-        (r'\bWere collected\b', 'Will be collected'),
-        
-        (r'\bwas selected\b', 'will be selected'),
-        (r'\bWas selected\b', 'Will be selected'),
-        (r'\bwere selected\b', 'will be selected'),
-        (r'\bWere selected\b', 'Will be selected'),
-        
-        (r'\bwas used\b', 'will be used'),
-        (r'\bWas used\b', 'Will be used'),
-        (r'\bwere used\b', 'will be used'),
-        (r'\bWere used\b', 'Will be used'),
-        
-        (r'\bwas employed\b', 'will be employed'),
-        (r'\bWas employed\b', 'Will be employed'),
-        (r'\bwere employed\b', 'will be employed'),
-        (r'\bWere employed\b', 'Will be employed'),
-        
-        (r'\bwas adopted\b', 'will be adopted'),
-        (r'\bWas adopted\b', 'Will be adopted'),
-        (r'\bwere adopted\b', 'will be adopted'),
-        (r'\bWere adopted\b', 'Will be adopted'),
-        
-        (r'\bwas applied\b', 'will be applied'),
-        (r'\bWas applied\b', 'Will be applied'),
-        (r'\bwere applied\b', 'will be applied'),
-        (r'\bWere applied\b', 'Will be applied'),
-        
-        (r'\bwas conducted\b', 'will be conducted'),
-        (r'\bWas conducted\b', 'Will be conducted'),
-        (r'\bwere conducted\b', 'will be conducted'),
-        (r'\bWere conducted\b', 'Will be conducted'),
-        
-        (r'\bwas administered\b', 'will be administered'),
-        (r'\bWas administered\b', 'Will be administered'),
-        (r'\bwere administered\b', 'will be administered'),
-        (r'\bWere administered\b', 'Will be administered'),
-        
-        (r'\bwas distributed\b', 'will be distributed'),
-        (r'\bWas distributed\b', 'Will be distributed'),
-        (r'\bwere distributed\b', 'will be distributed'),
-        (r'\bWere distributed\b', 'Will be distributed'),
-        
-        (r'\bwas analyzed\b', 'will be analyzed'),
-        (r'\bWas analyzed\b', 'Will be analyzed'),
-        (r'\bwere analyzed\b', 'will be analyzed'),
-        (r'\bWere analyzed\b', 'Will be analyzed'),
-        
-        (r'\bwas analysed\b', 'will be analysed'),
-        (r'\bWas analysed\b', 'Will be analysed'),
-        (r'\bwere analysed\b', 'will be analysed'),
-        (r'\bWere analysed\b', 'Will be analysed'),
-        
-        (r'\bwas obtained\b', 'will be obtained'),
-        (r'\bWas obtained\b', 'Will be obtained'),
-        (r'\bwere obtained\b', 'will be obtained'),
-        (r'\bWere obtained\b', 'Will be obtained'),
-        
-        (r'\bwas ensured\b', 'will be ensured'),
-        (r'\bWas ensured\b', 'Will be ensured'),
-        (r'\bwere ensured\b', 'will be ensured'),
-        (r'\bWere ensured\b', 'Will be ensured'),
-        
-        (r'\bwas maintained\b', 'will be maintained'),
-        (r'\bWas maintained\b', 'Will be maintained'),
-        (r'\bwere maintained\b', 'will be maintained'),
-        (r'\bWere maintained\b', 'Will be maintained'),
-        
-        (r'\bwas protected\b', 'will be protected'),
-        (r'\bWas protected\b', 'Will be protected'),
-        (r'\bwere protected\b', 'will be protected'),
-        (r'\bWere protected\b', 'Will be protected'),
-        
-        (r'\bwas sought\b', 'will be sought'),
-        (r'\bWas sought\b', 'Will be sought'),
-        (r'\bwere sought\b', 'will be sought'),
-        (r'\bWere sought\b', 'Will be sought'),
-        
-        (r'\bwas validated\b', 'will be validated'),
-        (r'\bWas validated\b', 'Will be validated'),
-        (r'\bwere validated\b', 'will be validated'),
-        (r'\bWere validated\b', 'Will be validated'),
-        
-        (r'\bwas tested\b', 'will be tested'),
-        (r'\bWas tested\b', 'Will be tested'),
-        (r'\bwere tested\b', 'will be tested'),
-        (r'\bWere tested\b', 'Will be tested'),
-        
-        # "The study used/employed/adopted" → "The study will use/employ/adopt"
-        (r'\bThe study used\b', 'The study will use'),
-        (r'\bthe study used\b', 'the study will use'),
-        (r'\bThe study employed\b', 'The study will employ'),
-        (r'\bthe study employed\b', 'the study will employ'),
-        (r'\bThe study adopted\b', 'The study will adopt'),
-        (r'\bthe study adopted\b', 'the study will adopt'),
-        (r'\bThe research used\b', 'The research will use'),
-        (r'\bthe research used\b', 'the research will use'),
-        (r'\bThe research employed\b', 'The research will employ'),
-        (r'\bthe research employed\b', 'the research will employ'),
-        
-        # "Data was/were" → "Data will be"
-        (r'\bData was\b', 'Data will be'),
-        (r'\bdata was\b', 'data will be'),
-        (r'\bData were\b', 'Data will be'),
-        (r'\bdata were\b', 'data will be'),
-        
-        # "Participants were" → "Participants will be"
-        (r'\bParticipants were\b', 'Participants will be'),
-        (r'\bparticipants were\b', 'participants will be'),
-        (r'\bRespondents were\b', 'Respondents will be'),
-        (r'\brespondents were\b', 'respondents will be'),
-        
-        # "Questionnaires were" → "Questionnaires will be"
-        (r'\bQuestionnaires were\b', 'Questionnaires will be'),
-        (r'\bquestionnaires were\b', 'questionnaires will be'),
-        (r'\bInstruments were\b', 'Instruments will be'),
-        (r'\binstruments were\b', 'instruments will be'),
-    ]
+    return future_tense_engine.convert(content).text
+
+
+def convert_to_past_tense_regex(content: str) -> str:
+    """
+    Convert proposal-style (future tense) text to thesis-style (past tense).
     
-    result = content
-    for pattern, replacement in conversions:
-        result = re.sub(pattern, replacement, result)
+    Args:
+        content: Chapter content in future tense
     
-    return result
+    Returns:
+        Content converted to past tense
+    """
+    return past_tense_engine.convert(content).text
 
 
 # Synchronous wrapper for compatibility
@@ -10,6 +10,9 @@ Features:
 - Adds proper preliminaries (Title Page, Declaration, Dedication, Acknowledgements, Abstract, TOC)
 - Adds appendices section at the end
 - Removes "Unknown" citations
+- Incremental: per-chapter artifacts (headings, references, word counts,
+  figures/tables, cleaned body) are cached on disk keyed by content hash,
+  so only changed chapters are re-parsed on each combine
 
 Flow:
 1. Chapter 1 starts immediately
@@ -31,13 +34,30 @@ Commands:
 import os
 import asyncio
 import re
+import hashlib
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any, Set
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, field
 import json
 
 
+# Markdown citations: [Author (Year)](url), [(Author, Year)](url), any [text](http...)
+CITATION_PATTERNS = [
+    re.compile(r'\[([^\]]+\s*\(\d{4}\))\]\(([^\)]+)\)'),
+    re.compile(r'\[\(([^\)]+,\s*\d{4})\)\]\(([^\)]+)\)'),
+    re.compile(r'\[([^\]]+)\]\(https?://[^\)]+\)'),
+]
+TITLE_PATTERN = re.compile(r'^#\s+(.+)$', re.MULTILINE)
+SECTION_PATTERN = re.compile(r'^##\s+(\d+\.\d+[^\n]+)$', re.MULTILINE)
+FIGURE_PATTERN = re.compile(r'^\s*\**(Figure\s+\d+(?:\.\d+)*[:.][^\n]*?)\**\s*$', re.MULTILINE | re.IGNORECASE)
+TABLE_PATTERN = re.compile(r'^\s*\**(Table\s+\d+(?:\.\d+)*[:.][^\n]*?)\**\s*$', re.MULTILINE | re.IGNORECASE)
+CHAPTER_FILE_PATTERN = re.compile(r'^([Cc])hapter_(\d)(.*)\.md$')
+
+ARTIFACT_CACHE_FILE = ".thesis_combiner_cache.json"
+ARTIFACT_CACHE_VERSION = 1
+
+
 @dataclass
 class ThesisSection:
     """Single section of thesis (chapter)."""
@@ -46,6 +66,20 @@ class ThesisSection:
     content: str
     word_count: int
     filepath: Optional[str] = None
+    artifact: Optional['ChapterArtifact'] = None
+
+
+@dataclass
+class ChapterArtifact:
+    """Parsed, cacheable view of one chapter file."""
+    content_hash: str
+    title: str
+    word_count: int
+    sections: List[str] = field(default_factory=list)
+    references: List[Dict[str, str]] = field(default_factory=list)  # Unique, in match order
+    figures: List[str] = field(default_factory=list)
+    tables: List[str] = field(default_factory=list)
+    cleaned_content: str = ""  # Chapter body without its own References section
 
 
 class ThesisCombiner:
@@ -87,6 +121,8 @@ class ThesisCombiner:
         self.output_dir = output_dir or str(self.workspace_dir)
         self.chapters: Dict[int, ThesisSection] = {}
         self.all_references: List[Dict[str, str]] = []
+        self._artifact_cache: Optional[Dict[str, Dict]] = None
+        self._artifact_cache_dirty = False
         self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         # Thesis metadata
@@ -96,94 +132,194 @@ class ThesisCombiner:
         self.department = department
         self.degree = degree
     
+    def _artifact_cache_path(self) -> Path:
+        return self.workspace_dir / ARTIFACT_CACHE_FILE
+    
+    def _load_artifact_cache(self) -> Dict[str, Dict]:
+        """Load cached chapter artifacts (filepath -> artifact dict)."""
+        if self._artifact_cache is None:
+            self._artifact_cache = {}
+            cache_path = self._artifact_cache_path()
+            if cache_path.exists():
+                try:
+                    data = json.loads(cache_path.read_text(encoding='utf-8'))
+                    if data.get("version") == ARTIFACT_CACHE_VERSION:
+                        self._artifact_cache = data.get("chapters", {})
+                except Exception as e:
+                    print(f"  ⚠️ Ignoring unreadable combiner cache: {e}")
+        return self._artifact_cache
+    
+    def _save_artifact_cache(self):
+        if not self._artifact_cache_dirty:
+            return
+        try:
+            cache_path = self._artifact_cache_path()
+            tmp_path = cache_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({
+                "version": ARTIFACT_CACHE_VERSION,
+                "chapters": self._artifact_cache
+            }, ensure_ascii=False), encoding='utf-8')
+            tmp_path.replace(cache_path)
+            self._artifact_cache_dirty = False
+        except Exception as e:
+            print(f"  ⚠️ Could not save combiner cache: {e}")
+    
+    def _parse_chapter(self, ch_num: int, content: str, content_hash: str) -> ChapterArtifact:
+        """Parse a chapter once: title, headings, references, figures, tables."""
+        title_match = TITLE_PATTERN.search(content)
+        
+        references = []
+        seen = set()
+        for pattern in CITATION_PATTERNS:
+            for match in pattern.finditer(content):
+                citation_text = match.group(1).strip()
+                citation_url = match.group(2) if len(match.groups()) > 1 else ""
+                
+                # Skip if contains "Unknown" or is empty
+                if not citation_text or "unknown" in citation_text.lower():
+                    continue
+                
+                normalized = re.sub(r'\s+', ' ', citation_text.lower())
+                if normalized not in seen:
+                    references.append({'citation': citation_text, 'url': citation_url, 'chapter': ch_num})
+                    seen.add(normalized)
+        
+        return ChapterArtifact(
+            content_hash=content_hash,
+            title=title_match.group(1) if title_match else f"Chapter {ch_num}",
+            word_count=len(content.split()),
+            sections=SECTION_PATTERN.findall(content),
+            references=references,
+            figures=[m.strip() for m in FIGURE_PATTERN.findall(content)],
+            tables=[m.strip() for m in TABLE_PATTERN.findall(content)],
+            cleaned_content=self.remove_chapter_references(content)
+        )
+    
+    def _get_artifact(self, ch_num: int, filepath: Path) -> Tuple[ChapterArtifact, str]:
+        """
+        Return (artifact, content) for a chapter file.
+        
+        The file is re-parsed only if its content hash differs from the
+        cached artifact's.
+        """
+        cache = self._load_artifact_cache()
+        key = str(filepath)
+        content = filepath.read_text(encoding='utf-8')
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        
+        cached = cache.get(key)
+        if cached and cached.get("content_hash") == content_hash:
+            artifact = ChapterArtifact(**cached)
+            for ref in artifact.references:
+                ref['chapter'] = ch_num
+            return artifact, content
+        
+        artifact = self._parse_chapter(ch_num, content, content_hash)
+        print(f"  🔍 Parsed Chapter {ch_num} (changed)")
+        cache[key] = asdict(artifact)
+        self._artifact_cache_dirty = True
+        return artifact, content
+    
+    def _find_chapter_files(self) -> Dict[int, Path]:
+        """Find chapter files in a single directory scan."""
+        candidates: Dict[int, List[Tuple[int, Path]]] = {}
+        if not self.workspace_dir.exists():
+            return {}
+        
+        for entry in os.scandir(self.workspace_dir):
+            match = CHAPTER_FILE_PATTERN.match(entry.name)
+            if match and entry.is_file():
+                ch_num = int(match.group(2))
+                # Prefer "Chapter_N" over "chapter_N", then directory order
+                rank = 0 if match.group(1) == "C" else 1
+                candidates.setdefault(ch_num, []).append((rank, Path(entry.path)))
+        
+        return {
+            ch_num: min(files, key=lambda f: f[0])[1]
+            for ch_num, files in candidates.items()
+        }
+    
     def load_chapters_from_files(self) -> bool:
         """
         Load all generated chapter files from workspace.
         
+        Chapters whose content hash matches the artifact cache are not
+        re-parsed; their cached artifact is reused.
+        
         Returns:
             True if all chapters loaded successfully, False otherwise
         """
         print("📖 Loading chapters from workspace...")
         
+        chapter_files = self._find_chapter_files()
         chapters_found = 0
         for ch_num in range(1, 7):
-            # Search for chapter files (both patterns)
-            chapter_files = (
-                list(self.workspace_dir.glob(f"Chapter_{ch_num}*.md")) +
-                list(self.workspace_dir.glob(f"chapter_{ch_num}*.md")) +
-                list(self.workspace_dir.glob(f"Chapter_{ch_num}_*.md"))
-            )
-            
-            if chapter_files:
-                filepath = chapter_files[0]  # Use first match
+            filepath = chapter_files.get(ch_num)
+            if filepath:
                 try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Extract chapter title
-                    title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-                    title = title_match.group(1) if title_match else f"Chapter {ch_num}"
-                    
-                    # Count words
-                    word_count = len(content.split())
+                    artifact, content = self._get_artifact(ch_num, filepath)
                     
                     self.chapters[ch_num] = ThesisSection(
                         chapter_num=ch_num,
-                        title=title,
+                        title=artifact.title,
                         content=content,
-                        word_count=word_count,
-                        filepath=str(filepath)
+                        word_count=artifact.word_count,
+                        filepath=str(filepath),
+                        artifact=artifact
                     )
                     
-                    print(f"  ✅ Chapter {ch_num}: {filepath.name} ({word_count} words)")
+                    print(f"  ✅ Chapter {ch_num}: {filepath.name} ({artifact.word_count} words)")
                     chapters_found += 1
                 except Exception as e:
                     print(f"  ⚠️ Could not load Chapter {ch_num}: {e}")
             else:
                 print(f"  ❌ Chapter {ch_num} not found")
         
+        self._save_artifact_cache()
         return chapters_found > 0
     
+    def _chapter_artifact(self, chapter: ThesisSection) -> ChapterArtifact:
+        """Artifact for a loaded chapter, parsing in memory if it has none."""
+        if chapter.artifact is None:
+            content_hash = hashlib.sha256(chapter.content.encode('utf-8')).hexdigest()
+            chapter.artifact = self._parse_chapter(chapter.chapter_num, chapter.content, content_hash)
+        return chapter.artifact
+    
     def extract_all_references(self) -> List[Dict[str, str]]:
         """
         Extract ALL citations/references from ALL chapters.
         
+        Merges the cached per-chapter reference lists; only chapters without
+        a cached artifact are scanned. Citations are matched through the
+        shared citation index, so cosmetic variants ("Smith & Jones (2020)"
+        vs "Smith and Jones, 2020") collapse into one reference and resolved
+        ones carry the workspace source's citation_key.
+        
         Returns:
             List of unique reference dictionaries sorted alphabetically
         """
+        from services.citation_index import citation_indexes, normalize_citation
+        
+        try:
+            index = citation_indexes.for_workspace(self.workspace_id)
+        except Exception as e:
+            print(f"  ⚠️ Citation index unavailable, deduplicating by text only: {e}")
+            index = None
+        
         all_refs = []
         seen_citations = set()
         
         for ch_num, chapter in self.chapters.items():
-            content = chapter.content
-            
-            # Extract markdown citations: [Author (Year)](url) or [(Author, Year)](url)
-            citation_patterns = [
-                r'\[([^\]]+\s*\(\d{4}\))\]\(([^\)]+)\)',  # [Author (Year)](url)
-                r'\[\(([^\)]+,\s*\d{4})\)\]\(([^\)]+)\)',  # [(Author, Year)](url)
-                r'\[([^\]]+)\]\(https?://[^\)]+\)',  # Any bracketed text with URL
-            ]
-            
-            for pattern in citation_patterns:
-                matches = re.finditer(pattern, content)
-                for match in matches:
-                    citation_text = match.group(1).strip()
-                    citation_url = match.group(2) if len(match.groups()) > 1 else ""
-                    
-                    # Skip if contains "Unknown" or is empty
-                    if not citation_text or "unknown" in citation_text.lower():
-                        continue
-                    
-                    # Normalize citation text for deduplication
-                    normalized = re.sub(r'\s+', ' ', citation_text.lower())
-                    
-                    if normalized not in seen_citations:
-                        all_refs.append({
-                            'citation': citation_text,
-                            'url': citation_url,
-                            'chapter': ch_num
-                        })
-                        seen_citations.add(normalized)
+            for ref in self._chapter_artifact(chapter).references:
+                spans = index.scan(ref['citation']) if index else []
+                resolved = spans[0].resolved if len(spans) == 1 else None
+                normalized = f"key:{resolved.citation_key}" if resolved else normalize_citation(ref['citation'])
+                if normalized not in seen_citations:
+                    ref = dict(ref)
+                    if resolved:
+                        ref['citation_key'] = resolved.citation_key
+                    all_refs.append(ref)
+                    seen_citations.add(normalized)
         
         # Sort alphabetically by citation text
         all_refs = sorted(all_refs, key=lambda x: x['citation'].lower())
@@ -365,9 +501,8 @@ This thesis investigates {self.topic.lower()} within the context of {self.case_s
             chapter = self.chapters[ch_num]
             toc += f"### {chapter.title}\n"
             
-            # Extract section headings from content
-            section_pattern = r'^##\s+(\d+\.\d+[^\n]+)$'
-            sections = re.findall(section_pattern, chapter.content, re.MULTILINE)
+            # Section headings come from the cached chapter artifact
+            sections = self._chapter_artifact(chapter).sections
             
             for section in sections[:15]:  # Limit sections shown
                 toc += f"- {section}\n"
@@ -489,8 +624,8 @@ No references extracted.
         for ch_num in sorted(self.chapters.keys()):
             chapter = self.chapters[ch_num]
             
-            # Remove individual reference section from chapter
-            cleaned_content = self.remove_chapter_references(chapter.content)
+            # Individual reference section already stripped in the artifact
+            cleaned_content = self._chapter_artifact(chapter).cleaned_content
             
             thesis_content += f"\n\n{'='*80}\n\n"
             thesis_content += cleaned_content
@@ -504,6 +639,8 @@ No references extracted.
         
         # Add thesis statistics at the very end
         total_words = sum(ch.word_count for ch in self.chapters.values())
+        total_figures = sum(len(self._chapter_artifact(ch).figures) for ch in self.chapters.values())
+        total_tables = sum(len(self._chapter_artifact(ch).tables) for ch in self.chapters.values())
         thesis_content += f"""
 
 {'='*80}
@@ -515,6 +652,8 @@ No references extracted.
 - Total Words: {total_words:,}
 - Estimated Pages: {int(total_words / 250)}
 - Total References: {len(self.all_references)}
+- Total Figures: {total_figures}
+- Total Tables: {total_tables}
 - Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 **Document Structure:**
@@ -2,7 +2,8 @@
 Vector Database Service using ChromaDB
 
 Provides document embedding, storage, and semantic search capabilities.
-Workspace-scoped collections for multi-tenancy.
+Workspace-scoped collections for multi-tenancy. Embeddings are computed by
+EmbeddingPipeline (cached by content hash, batched) and handed to ChromaDB.
 """
 
 import chromadb
@@ -10,45 +11,77 @@ from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-import hashlib
-import json
+import asyncio
+import os
+
+from services import embedding_pipeline
+from services.embedding_pipeline import EmbeddingCache, EmbeddingPipeline, HashingEmbeddingFunction
 
 # Storage directory for ChromaDB
 VECTOR_DB_DIR = Path(__file__).parent.parent.parent / "chroma_data"
 VECTOR_DB_DIR.mkdir(exist_ok=True)
 
+# "local" selects offline hashing embeddings (tests, no API key)
+EMBEDDING_FUNCTION = os.getenv("VECTOR_EMBEDDING_FUNCTION", "openai").lower()
+
 
 class VectorService:
     """
     Vector database service for semantic search and RAG.
     
     Features:
-    - Workspace-scoped collections
-    - Automatic embeddings via OpenAI
+    - Workspace-scoped collections (handles cached per workspace)
+    - Embeddings via OpenAI, cached on disk by content hash
+    - Pluggable embedding function (e.g. local hashing for offline tests)
     - Metadata filtering
     - Semantic similarity search
     """
     
-    def __init__(self):
-        """Initialize ChromaDB client with persistent storage."""
-        self.client = chromadb.PersistentClient(
+    def __init__(self, embedding_function=None, model_name: Optional[str] = None, client=None):
+        """
+        Initialize ChromaDB client with persistent storage.
+        
+        Args:
+            embedding_function: Callable taking a list of texts and returning
+                their vectors; defaults to VECTOR_EMBEDDING_FUNCTION
+            model_name: Embedding cache namespace for a custom function
+            client: ChromaDB client (defaults to the persistent one)
+        """
+        self.client = client or chromadb.PersistentClient(
             path=str(VECTOR_DB_DIR),
             settings=Settings(
                 anonymized_telemetry=False,
                 allow_reset=True
             )
         )
+        self._collections: Dict[str, Any] = {}
         
-        # Use OpenAI embeddings (requires OPENAI_API_KEY env var)
-        # Falls back to default sentence transformers if not available
-        try:
-            self.embedding_function = embedding_functions.OpenAIEmbeddingFunction(
-                model_name="text-embedding-3-small"
-            )
-            print("✓ Vector service using OpenAI embeddings")
-        except Exception as e:
-            print(f"⚠️ OpenAI embeddings unavailable, using default: {e}")
-            self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        if embedding_function is not None:
+            self.embedding_function = embedding_function
+            self.model_name = model_name or type(embedding_function).__name__
+        elif EMBEDDING_FUNCTION == "local":
+            self.embedding_function = HashingEmbeddingFunction()
+            self.model_name = "local-hashing-384"
+            print("✓ Vector service using local hashing embeddings")
+        else:
+            # Use OpenAI embeddings (requires OPENAI_API_KEY env var)
+            # Falls back to default sentence transformers if not available
+            try:
+                self.embedding_function = embedding_functions.OpenAIEmbeddingFunction(
+                    model_name="text-embedding-3-small"
+                )
+                self.model_name = "text-embedding-3-small"
+                print("✓ Vector service using OpenAI embeddings")
+            except Exception as e:
+                print(f"⚠️ OpenAI embeddings unavailable, using default: {e}")
+                self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+                self.model_name = "default"
+        
+        self.embeddings = EmbeddingPipeline(
+            self.embedding_function,
+            self.model_name,
+            cache=EmbeddingCache(VECTOR_DB_DIR / "embedding_cache.db")
+        )
     
     def _get_collection_name(self, workspace_id: str) -> str:
         """Get collection name for workspace."""
@@ -56,13 +89,23 @@ class VectorService:
         return f"workspace_{workspace_id.replace('-', '_')}"
     
     def _get_collection(self, workspace_id: str):
-        """Get or create collection for workspace."""
-        collection_name = self._get_collection_name(workspace_id)
-        return self.client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=self.embedding_function,
-            metadata={"workspace_id": workspace_id}
-        )
+        """Get or create collection for workspace (cached after the first call)."""
+        collection = self._collections.get(workspace_id)
+        if collection is None:
+            collection = self.client.get_or_create_collection(
+                name=self._get_collection_name(workspace_id),
+                embedding_function=self.embedding_function,
+                metadata={"workspace_id": workspace_id}
+            )
+            self._collections[workspace_id] = collection
+        return collection
+    
+    def _max_batch_size(self) -> int:
+        """Largest number of records ChromaDB accepts in one write."""
+        try:
+            return self.client.get_max_batch_size()
+        except Exception:
+            return 5000
     
     async def add_document(
         self,
@@ -105,11 +148,22 @@ class VectorService:
             for i in range(len(chunks))
         ]
         
-        # Add to collection (automatic embedding)
-        collection.add(
-            documents=chunks,
-            metadatas=chunk_metadata,
-            ids=chunk_ids
+        embeddings = await self.embeddings.embed(chunks)
+        
+        # Upsert so re-indexing a document replaces its chunks in place
+        batch_size = self._max_batch_size()
+        for start in range(0, len(chunks), batch_size):
+            end = start + batch_size
+            collection.upsert(
+                documents=chunks[start:end],
+                embeddings=embeddings[start:end],
+                metadatas=chunk_metadata[start:end],
+                ids=chunk_ids[start:end]
+            )
+        
+        # Drop chunks left over from a longer previous version
+        collection.delete(
+            where={"$and": [{"document_id": document_id}, {"chunk_index": {"$gte": len(chunks)}}]}
         )
         
         print(f"✓ Indexed {len(chunks)} chunks for document {document_id}")
@@ -141,10 +195,11 @@ class VectorService:
         """
         try:
             collection = self._get_collection(workspace_id)
+            query_embeddings = await self.embeddings.embed([query])
             
             # Query collection
             results = collection.query(
-                query_texts=[query],
+                query_embeddings=query_embeddings,
                 n_results=n_results,
                 where=filter_metadata if filter_metadata else None
             )
@@ -213,7 +268,8 @@ class VectorService:
                 "workspace_id": workspace_id,
                 "collection_name": self._get_collection_name(workspace_id),
                 "total_chunks": count,
-                "embedding_model": "text-embedding-3-small" if hasattr(self.embedding_function, 'model_name') else "default"
+                "embedding_model": self.model_name,
+                **(await asyncio.to_thread(self.embeddings.cache.stats, self.model_name))
             }
         
         except Exception as e:
@@ -227,27 +283,17 @@ class VectorService:
         overlap: int = 50
     ) -> List[str]:
         """
-        Chunk text into overlapping segments.
+        Chunk text into overlapping segments on sentence boundaries.
         
         Args:
             text: Text to chunk
-            chunk_size: Target chunk size in tokens (approx)
+            chunk_size: Max chunk size in tokens (exact with tiktoken, else estimated)
             overlap: Overlap between chunks in tokens
         
         Returns:
             List of text chunks
         """
-        # Simple word-based chunking (TODO: use tiktoken for exact token count)
-        words = text.split()
-        chunks = []
-        
-        i = 0
-        while i < len(words):
-            chunk_words = words[i:i + chunk_size]
-            chunks.append(" ".join(chunk_words))
-            i += chunk_size - overlap
-        
-        return chunks
+        return embedding_pipeline.chunk_text(text, chunk_size, overlap)
 
 
 # Singleton instance
@@ -8,16 +8,41 @@ Supports:
 - Analyzing uploaded images
 - Analyzing downloaded images in workspace
 - Multimodal conversations (text + images)
+- Images downscaled to each model's effective resolution and re-encoded
+  (PNG for flat-colour figures, JPEG for photos) before upload
+- Prepared payloads cached by (content hash, model) and reused across chat turns
 """
 
+import io
 import httpx
 import base64
+import asyncio
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from core.config import settings
 from services.openrouter import openrouter_service
 from services.google_gemini_service import google_gemini_service
 from services.workspace_service import WORKSPACES_DIR
+from services.derivative_service import get_derivative_service
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    Image = None
+
+
+# Formats every provider accepts as-is; anything else is re-encoded
+PASSTHROUGH_MIME_TYPES = {'image/jpeg', 'image/png', 'image/webp', 'image/gif'}
+
+# Originals under this size and within the model's resolution are sent untouched
+PASSTHROUGH_MAX_BYTES = 512 * 1024
+
+# Upper bound on cached base64 payloads held in memory
+PAYLOAD_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 
 class VisionService:
@@ -30,21 +55,24 @@ class VisionService:
             "name": "Gemini 1.5 Pro (Direct)",
             "provider": "google-direct",
             "supports_vision": True,
-            "direct_api": True
+            "direct_api": True,
+            "max_edge": 3072
         },
         "gpt4-vision": {
             "id": "openai/gpt-4-vision-preview",
             "name": "GPT-4 Vision",
             "provider": "openai",
             "supports_vision": True,
-            "direct_api": False
+            "direct_api": False,
+            "max_edge": 2048
         },
         "claude-vision": {
             "id": "anthropic/claude-3.5-sonnet",
             "name": "Claude 3.5 Sonnet",
             "provider": "anthropic",
             "supports_vision": True,
-            "direct_api": False
+            "direct_api": False,
+            "max_edge": 1568
         }
     }
     
@@ -52,12 +80,100 @@ class VisionService:
         self.openrouter = openrouter_service
         self.gemini = google_gemini_service
         self.default_model = "gemini-vision"  # Use Google Gemini by default
+        self._payloads: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
+        self._payload_bytes = 0
+        self._payload_lock = threading.Lock()
     
     def _encode_image(self, image_path: Path) -> str:
         """Encode image to base64 for API."""
         with open(image_path, "rb") as image_file:
             return base64.b64encode(image_file.read()).decode('utf-8')
     
+    # =========================================================================
+    # VISION INPUT PREPARATION
+    # =========================================================================
+    
+    def _downscale_image(self, image_path: Path, max_edge: int) -> Optional[Tuple[bytes, str]]:
+        """
+        Resize to fit `max_edge` and pick a compact encoding.
+        
+        Returns (bytes, mime_type), or None when the original should be sent.
+        """
+        original_mime = self._get_image_mime_type(image_path)
+        if not PIL_AVAILABLE or original_mime == 'image/svg+xml':
+            return None
+        
+        with Image.open(image_path) as img:
+            needs_resize = max(img.size) > max_edge
+            if (not needs_resize and original_mime in PASSTHROUGH_MIME_TYPES
+                    and image_path.stat().st_size <= PASSTHROUGH_MAX_BYTES):
+                return None
+            if needs_resize:
+                img.draft("RGB", (max_edge, max_edge))  # Fast JPEG downscale on decode
+            img = img.copy()
+        
+        if max(img.size) > max_edge:
+            img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        img = img.convert("RGBA" if has_alpha else "RGB")
+        
+        # Charts and diagrams have few colours and sharp edges: PNG keeps them
+        # legible and small. Photos compress far better as JPEG.
+        buffer = io.BytesIO()
+        if has_alpha or img.getcolors(256) is not None:
+            img.save(buffer, format="PNG", optimize=True)
+            data, mime_type = buffer.getvalue(), 'image/png'
+        else:
+            img.save(buffer, format="JPEG", quality=85, optimize=True)
+            data, mime_type = buffer.getvalue(), 'image/jpeg'
+        
+        if not needs_resize and original_mime in PASSTHROUGH_MIME_TYPES and len(data) >= image_path.stat().st_size:
+            return None  # Re-encoding did not help
+        return data, mime_type
+    
+    def _prepare_image_sync(self, image_path: Path, model_key: str) -> Tuple[str, str]:
+        content_hash = get_derivative_service().content_hash(image_path)
+        key = (content_hash, model_key)
+        with self._payload_lock:
+            cached = self._payloads.get(key)
+            if cached:
+                self._payloads.move_to_end(key)
+                return cached
+        
+        max_edge = self.VISION_MODELS.get(model_key, {}).get("max_edge", 2048)
+        try:
+            prepared = self._downscale_image(image_path, max_edge)
+        except Exception as e:
+            print(f"⚠️ Could not downscale {image_path.name}, sending original: {e}")
+            prepared = None
+        
+        if prepared:
+            data, mime_type = prepared
+            print(f"🖼️ Prepared {image_path.name} for {model_key}: "
+                  f"{image_path.stat().st_size // 1024} KB -> {len(data) // 1024} KB")
+            payload = (base64.b64encode(data).decode('utf-8'), mime_type)
+        else:
+            payload = (self._encode_image(image_path), self._get_image_mime_type(image_path))
+        
+        with self._payload_lock:
+            if key not in self._payloads:
+                self._payloads[key] = payload
+                self._payload_bytes += len(payload[0])
+            while self._payload_bytes > PAYLOAD_CACHE_MAX_BYTES and len(self._payloads) > 1:
+                _, (evicted, _) = self._payloads.popitem(last=False)
+                self._payload_bytes -= len(evicted)
+        return payload
+    
+    async def _prepare_image(self, image_path: Path, model_key: str) -> Tuple[str, str]:
+        """
+        Get the (base64, mime_type) payload for an image, sized for `model_key`.
+        
+        Decoding and resizing run in a worker thread; results are cached by
+        content hash so repeated questions about one image re-use the payload.
+        """
+        return await asyncio.to_thread(self._prepare_image_sync, image_path, model_key)
+    
     def _get_image_mime_type(self, image_path: Path) -> str:
         """Get MIME type based on file extension."""
         ext = image_path.suffix.lower()
@@ -120,20 +236,21 @@ class VisionService:
         # Use Google Gemini Direct API if available
         if model_config.get("direct_api") and model_config["provider"] == "google-direct":
             try:
+                base64_image, mime_type = await self._prepare_image(image_file, model_key)
                 result = await self.gemini.analyze_image(
                     image_path=str(image_file),
                     prompt=prompt,
                     model="gemini-1.5-pro",
-                    workspace_id=workspace_id
+                    workspace_id=workspace_id,
+                    image_part={"inline_data": {"mime_type": mime_type, "data": base64_image}}
                 )
                 return result
             except Exception as e:
                 print(f"⚠️ Gemini direct API failed, falling back: {e}")
         
         try:
-            # Encode image
-            base64_image = self._encode_image(image_file)
-            mime_type = self._get_image_mime_type(image_file)
+            # Encode image (downscaled for this model, cached)
+            base64_image, mime_type = await self._prepare_image(image_file, model_key)
             
             # Format message based on model provider
             if model_config["provider"] == "openai":
@@ -255,17 +372,20 @@ class VisionService:
             }
         
         # Resolve all image paths
-        images_data = []
+        image_files = []
         for img_path in image_paths:
             image_file = self._resolve_image_path(img_path, workspace_id)
             if image_file.exists() and self._is_image_file(image_file):
-                base64_image = self._encode_image(image_file)
-                mime_type = self._get_image_mime_type(image_file)
-                images_data.append({
-                    "path": str(image_file),
-                    "base64": base64_image,
-                    "mime_type": mime_type
-                })
+                image_files.append(image_file)
+        
+        # Prepare payloads concurrently
+        prepared = await asyncio.gather(*[
+            self._prepare_image(image_file, model_key) for image_file in image_files
+        ])
+        images_data = [
+            {"path": str(image_file), "base64": base64_image, "mime_type": mime_type}
+            for image_file, (base64_image, mime_type) in zip(image_files, prepared)
+        ]
         
         if not images_data:
             return {
@@ -386,8 +506,7 @@ class VisionService:
         conversation_history = conversation_history or []
         
         try:
-            base64_image = self._encode_image(image_file)
-            mime_type = self._get_image_mime_type(image_file)
+            base64_image, mime_type = await self._prepare_image(image_file, model_key)
             model_config = self.VISION_MODELS[model_key]
             
             # Build messages with history and image
@@ -0,0 +1,8 @@
+"""Make `services` (and the shared `app` package) importable when pytest runs from any directory."""
+import sys
+from pathlib import Path
+
+LIGHTWEIGHT_DIR = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(LIGHTWEIGHT_DIR.parent))
+sys.path.insert(0, str(LIGHTWEIGHT_DIR))
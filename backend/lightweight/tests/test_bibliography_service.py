@@ -0,0 +1,50 @@
+"""Bibliography store: hand edits to references.bib win for the keys they touch"""
+import os
+
+import pytest
+
+import services.workspace_service as workspace_service
+from services.bibliography_service import BIB_FILE, BibliographyService
+
+
+SMITH = {"title": "Mobile money and savings", "authors": ["John Smith"], "year": "2020"}
+OKELLO = {"title": "Teacher motivation in Uganda", "authors": ["Grace Okello"], "year": "2019"}
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(workspace_service, "WORKSPACES_DIR", tmp_path)
+    service = BibliographyService()
+    service.upsert_entries("ws", [SMITH, OKELLO])
+    return service
+
+
+def edit_bib(tmp_path, old: str, new: str):
+    bib_path = tmp_path / "ws" / BIB_FILE
+    stat = bib_path.stat()
+    bib_path.write_text(bib_path.read_text(encoding="utf-8").replace(old, new), encoding="utf-8")
+    # Make sure the edit is visible even on coarse mtime filesystems
+    os.utime(bib_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_edited_title_updates_entry(service, tmp_path):
+    edit_bib(tmp_path, "Mobile money and savings", "Mobile money and household savings")
+
+    entries = {e["cite_key"]: e for e in service.get_entries("ws")}
+    assert sorted(entries) == ["Okello2019", "Smith2020"]
+    assert entries["Smith2020"]["title"] == "Mobile money and household savings"
+    # The old title no longer matches; the new one merges into the edited entry
+    assert service.upsert_entries("ws", [{**SMITH, "title": "Mobile money and household savings"}]) == ["Smith2020"]
+    assert len(service.get_entries("ws")) == 2
+
+
+def test_deleted_entry_stays_deleted(service, tmp_path):
+    bib_path = tmp_path / "ws" / BIB_FILE
+    content = bib_path.read_text(encoding="utf-8")
+    start = content.index("@article{Okello2019")
+    edit_bib(tmp_path, content[start:content.index("\n}\n", start) + 3], "")
+
+    assert [e["cite_key"] for e in service.get_entries("ws")] == ["Smith2020"]
+    # Reloading from disk (fresh service) doesn't bring it back either
+    assert [e["cite_key"] for e in BibliographyService().get_entries("ws")] == ["Smith2020"]
+    assert "Okello2019" not in bib_path.read_text(encoding="utf-8")
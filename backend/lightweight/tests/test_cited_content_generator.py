@@ -0,0 +1,105 @@
+"""Batched cited content: [CITE:n] slots are validated and attached with stubbed agents"""
+import asyncio
+from types import SimpleNamespace
+
+from services.cited_content_generator import CitedContentGenerator
+
+
+SMITH = {"title": "Mobile money and savings", "authors": ["John Smith"], "year": 2020, "abstract": "..."}
+OKELLO = {"title": "Teacher motivation in Uganda", "authors": ["Grace Okello"], "year": 2019}
+DOE = {"title": "Crop yields", "authors": ["Jane Doe"], "year": 2018}
+
+
+class StubAgentPool:
+    """Stands in for AgentPool.execute_with_voting; verdicts keyed by paper title."""
+
+    def __init__(self, verdicts):
+        self.verdicts = verdicts
+        self.calls = []
+
+    async def execute_with_voting(self, agent, orchestrator, inputs):
+        self.calls.append(inputs)
+        verdict = self.verdicts[inputs["paper"]["title"]]
+        if isinstance(verdict, Exception):
+            raise verdict
+        return SimpleNamespace(content=verdict), None
+
+
+class StubLLMClient:
+    def __init__(self, paragraphs):
+        self.paragraphs = list(paragraphs)
+
+    async def call(self, system_prompt, user_prompt, max_tokens):
+        return self.paragraphs.pop(0)
+
+
+def make_generator(verdicts, paragraphs=()):
+    # Skip __init__: no real LLM client, voting orchestrator or settings
+    generator = CitedContentGenerator.__new__(CitedContentGenerator)
+    generator.citation_style = "APA"
+    generator.cited_papers = []
+    generator.citations_used = {}
+    generator.citation_validator = object()
+    generator.orchestrator = object()
+    generator.agent_pool = StubAgentPool(verdicts)
+    generator.llm_client = StubLLMClient(paragraphs)
+    return generator
+
+
+VERDICTS = {
+    SMITH["title"]: {"is_valid": True, "confidence": 0.9},
+    OKELLO["title"]: {"is_valid": True, "confidence": 0.2},   # Below MIN_VALIDATION_CONFIDENCE
+    DOE["title"]: RuntimeError("LLM down"),
+}
+
+
+def test_validate_slot():
+    generator = make_generator(VERDICTS)
+
+    assert asyncio.run(generator._validate_slot("Mobile money raises savings.", SMITH))
+    assert not asyncio.run(generator._validate_slot("Teachers are motivated.", OKELLO))
+    assert not asyncio.run(generator._validate_slot("Yields rose.", DOE))
+    # The validator always sees an abstract
+    assert generator.agent_pool.calls[1]["paper"]["abstract"] == "N/A"
+
+
+def test_attach_citations():
+    generator = make_generator(VERDICTS)
+    paragraphs = [
+        "Mobile money raises savings [CITE:0]. Teachers respond to pay [CITE:1]. "
+        "Yields vary [CITE:2]. Adoption is uneven [CITE:9].",
+        "Savings also rise in rural areas [CITE: 0]. This matters for policy.",
+    ]
+
+    split, checked, attached = asyncio.run(
+        generator._attach_citations(paragraphs, [SMITH, OKELLO, DOE])
+    )
+
+    assert split == [
+        ["Mobile money raises savings (Smith, 2020).", "Teachers respond to pay.",
+         "Yields vary.", "Adoption is uneven."],
+        ["Savings also rise in rural areas (Smith, 2020).", "This matters for policy."],
+    ]
+    # The out-of-range slot is dropped without a validator call
+    assert (checked, attached) == (4, 2)
+    assert [call["claim"] for call in generator.agent_pool.calls][0] == "Mobile money raises savings."
+    assert generator.cited_papers == [SMITH]
+    assert generator.citations_used == {SMITH["title"]: 2}
+
+
+def test_generate_batched():
+    generator = make_generator(VERDICTS, paragraphs=[
+        "Mobile money raises savings [CITE:0]. It is now common.",
+        "Teachers respond to pay [CITE:1]. Savings rise again [CITE:0].",
+    ])
+
+    content, sentence_count, word_count = asyncio.run(generator._generate_batched(
+        topic="mobile money", papers=[SMITH, OKELLO], word_count=300, target_density=0.75
+    ))
+
+    assert content == (
+        "Mobile money raises savings (Smith, 2020). It is now common.\n\n"
+        "Teachers respond to pay. Savings rise again (Smith, 2020)."
+    )
+    assert sentence_count == 4
+    assert word_count == len(content.split())
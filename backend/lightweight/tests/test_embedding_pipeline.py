@@ -0,0 +1,62 @@
+"""Offline tests for the embedding pipeline (HashingEmbeddingFunction, no model)"""
+import asyncio
+import math
+import tempfile
+from pathlib import Path
+
+from services.embedding_pipeline import (
+    EmbeddingCache,
+    EmbeddingPipeline,
+    HashingEmbeddingFunction,
+    chunk_text,
+    count_tokens,
+)
+
+
+TEXT = (
+    "Mobile money has changed how rural households save. It is cheap. "
+    + " ".join(["Savings grew in a b c d e f g h i j k l m n o p q r s t u v w x y z villages"] * 12)
+    + ".\n\nShort. Sentences. Like. These. Add. Up. " * 20
+    + "The study concludes that access matters more than income."
+)
+
+
+class CountingEmbeddingFunction(HashingEmbeddingFunction):
+    """Records every batch it is asked to embed."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def __call__(self, input):
+        self.calls.append(list(input))
+        return super().__call__(input)
+
+
+def test_chunks_fit_budget():
+    for chunk_size in (20, 100, 500):
+        chunks = chunk_text(TEXT, chunk_size=chunk_size, overlap=10)
+        assert chunks
+        assert all(count_tokens(chunk) <= chunk_size for chunk in chunks), chunk_size
+        # Nothing is dropped
+        joined = " ".join(chunks)
+        assert all(word in joined for word in TEXT.split())
+
+
+def test_embeddings_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(Path(tmp) / "cache.db")
+        first = CountingEmbeddingFunction()
+        pipeline = EmbeddingPipeline(first, "local-hashing-384", cache=cache, max_batch_items=2)
+
+        vectors = asyncio.run(pipeline.embed(["alpha", "beta", "alpha", "gamma"]))
+        assert sorted(text for batch in first.calls for text in batch) == ["alpha", "beta", "gamma"]
+        assert all(len(batch) <= 2 for batch in first.calls)
+        assert vectors[0] == vectors[2]
+        assert math.isclose(sum(v * v for v in vectors[1]), 1.0, rel_tol=1e-5)
+
+        second = CountingEmbeddingFunction()
+        again = asyncio.run(EmbeddingPipeline(second, "local-hashing-384", cache=cache).embed(["gamma", "alpha"]))
+        assert second.calls == []
+        assert again == [vectors[3], vectors[0]]
+
@@ -0,0 +1,222 @@
+"""Intent engine signals against the classifiers' original keyword lists and regexes"""
+import re
+
+from services.intent_engine import SIGNALS, intent_engine
+from services.task_classifier import task_classifier
+
+
+# Copied from the classifiers as they were before they shared the engine
+# (IntelligentIntentSystem, IntelligentRouter, TaskClassifier, CentralBrain).
+# ("any", words): any(w in msg)   ("start", words): any(msg.startswith(w))
+# ("search"/"match", patterns): first pattern that matches; value = group 1
+ORIGINAL = {
+    "greeting": ("any", ["hi", "hello", "hey", "greetings", "sup", "yo", "howdy", "hola", "good morning", "good afternoon", "good evening"]),
+    "greeting_blocker": ("any", ["search", "find", "generate", "create", "make", "write", "save", "file", "go to", "open", "browse", "google.com", "http", ".com", ".org", ".net"]),
+    "question_start": ("start", ["what", "who", "when", "where", "why", "how", "is", "are",
+                                 "can", "do", "does", "will", "would", "should", "could",
+                                 "explain", "define", "describe", "tell me"]),
+    "needs_tools": ("any", ["search", "find", "generate", "create", "make", "write", "save",
+                            "file", "document", "image", "picture", "paper", "pdf"]),
+    "unsupported_video": ("any", ["video", "make video", "create video", "generate video"]),
+    "unsupported_audio": ("any", ["audio", "make audio", "create audio", "generate audio", "record"]),
+    "unsupported_music": ("any", ["music", "make music", "compose", "song"]),
+    "unsupported_voice": ("any", ["voice", "text to speech", "tts", "speak"]),
+    "unsupported_3d": ("any", ["3d model", "3d render", "blender", "cad"]),
+    "creation_action": ("any", ["make", "create", "generate", "produce", "build", "record"]),
+    "dataset": ("any", ['generate dataset', 'create dataset', 'make dataset',
+                        'generate data', 'create data', 'synthetic data',
+                        'collect data', 'data collection', 'fill questionnaire',
+                        'simulate responses', 'generate responses', 'sample data',
+                        'create csv', 'generate csv', 'spss data', 'survey data',
+                        'respondent data', 'generate respondents']),
+    "sample_size_respondents": ("search", [r'(\d+)\s+respondents?']),
+    "sample_size_samples": ("search", [r'(\d+)\s+samples?']),
+    "sample_size_of": ("search", [r'sample\s+(?:size\s+)?(?:of\s+)?(\d+)']),
+    "sample_size_n": ("search", [r'n\s*=\s*(\d+)']),
+    "sample_size_points": ("search", [r'(\d+)\s+(?:data\s+)?points?']),
+    "chapter_five": ("any", ['chapter 5', 'chapter five', 'chapter5',
+                             'results and discussion', 'discussion of findings',
+                             'interpret findings', 'findings discussion',
+                             'generate chapter 5', 'create chapter 5', 'write chapter 5',
+                             'chapter five results', 'synthesis of findings',
+                             'compare with literature', 'discussion chapter']),
+    "chapter_six": ("any", ['chapter 6', 'chapter six', 'chapter6',
+                            'summary conclusion recommendation', 'conclusions and recommendations',
+                            'conclusion and recommendation', 'summary conclusion',
+                            'generate chapter 6', 'create chapter 6', 'write chapter 6',
+                            'chapter six conclusion', 'conclusion chapter', 'recommendations chapter',
+                            'final chapter', 'thesis conclusion']),
+    "chapter_four": ("any", ['chapter 4', 'chapter four', 'chapter4',
+                             'data analysis', 'analyze data', 'analyse data',
+                             'data presentation', 'present findings', 'present data',
+                             'analyze findings', 'analyse findings', 'interpret data',
+                             'generate chapter 4', 'create chapter 4', 'write chapter 4',
+                             'data and analysis', 'findings chapter']),
+    "thesis_combine": ("any", ['generate complete thesis', 'generate full thesis', 'generate entire thesis',
+                               'combine chapters', 'combine all chapters', 'one file thesis',
+                               'complete thesis', 'full thesis', 'entire thesis',
+                               'thesis status', 'thesis combined', 'all chapters in one',
+                               'generate thesis', 'create thesis', 'make thesis',
+                               'thesis chapter 1 to 6', 'chapters 1-6', 'chapters 1 through 6']),
+    "proposal": ("any", ['proposal', 'first 3 chapters', 'first three chapters', 'chapters 1-3',
+                         'chapters 1 to 3', 'full proposal', 'complete proposal', 'thesis proposal',
+                         'research proposal', 'make me proposal', 'generate proposal']),
+    "chapter_one": ("any", ['chapter 1', 'chapter one', 'introduction chapter', 'first chapter']),
+    "chapter_two": ("any", ['chapter 2', 'chapter two', 'literature review', 'second chapter', 'chapter two']),
+    "chapter_three": ("any", ['chapter 3', 'chapter three', 'methodology', 'research methodology', 'third chapter', 'methods chapter']),
+    "section": ("any", ["background of the study", "statement of the problem",
+                        "objectives of the study", "research questions", "justification",
+                        "setting the scene", "delimitations", "limitations"]),
+    "section_verb": ("any", ["write", "generate", "create"]),
+    "generic_chapter": ("any", ["write chapter", "generate chapter", "thesis chapter", "dissertation chapter"]),
+    "image_word": ("any", ["image", "picture", "photo", "pic", "photograph", "illustration"]),
+    "image_search": ("any", ["search", "find", "look for", "get me", "show me", "image of", "picture of", "photo of"]),
+    "image_generate_content": ("any", ["diagram", "flowchart", "chart", "infographic", "framework",
+                                       "schematic", "visualization", "concept", "illustration of concept"]),
+    "image_generate_explicit": ("any", [f"{g} {w}" for g in ["generate", "create", "make", "draw", "design"]
+                                        for w in ("image", "picture")]),
+    "paper_word": ("any", ["paper", "research", "study", "academic", "literature", "journal", "article", "publication"]),
+    "paper_search_verb": ("any", ["search", "find", "look for"]),
+    "synthesis_word": ("any", ["synthesis", "synthesize", "review", "summarize", "analyze"]),
+    "web_search": ("any", ["search", "look up", "find out", "google", "go to", "browse", "open"]),
+    "url_hint": ("any", [".com", ".org", "http"]),
+    "pdf": ("any", ["pdf"]),
+    "pdf_action": ("any", ["summarize", "read", "analyze", "extract", "what's in"]),
+    "pdf_name": ("search", [r'(\S+\.pdf)']),
+    "file_write_verb": ("any", ["create", "make", "write", "save", "generate"]),
+    "file_type": ("any", ["file", "md file", "markdown file", "txt file", "text file", "json file"]),
+    "file_list": ("any", ["list files", "show files", "what files", "see files"]),
+    "file_read": ("any", ["read file", "open file", "show file", "view file"]),
+    "write_verb": ("any", ["write", "create", "generate", "make", "draft", "compose"]),
+    "content_type": ("any", ["essay", "document", "report", "paper", "article", "content", "text"]),
+    "force_worker": ("any", [
+        "essay about", "essay on", "write an essay", "write essay",
+        "document about", "document on", "create a document", "create document",
+        "report about", "report on", "write a report", "write report",
+        "paper about", "paper on", "write a paper", "write paper",
+        "article about", "article on", "write an article", "write article",
+        "create a file", "make a file", "generate a file",
+        "long form", "multi-page", "multiple pages",
+    ]),
+    "simple_task": ("match", [
+        r"^(hi|hello|hey|greetings)",
+        r"^(what|how|when|where|why)\s+",
+        r"^(show|list|get|fetch)\s+",
+        r"^(help|assist)\s*$",
+    ]),
+    "complex_task": ("search", [
+        r"(write|create|generate|make|build|develop)\s+(an?\s+)?(essay|document|report|paper|article|content)",
+        r"(and|with|include|add|plus)\s+(image|picture|photo|graph|chart|diagram)",
+        r"(search|find|look\s+for)\s+(and|then|after)\s+",
+        r"(multiple|several|many|various)\s+",
+        r"(step|stage|phase|process)\s+",
+        r"\d+\s+(word|page|section|chapter|image|picture)",
+    ]),
+    "parallel_task": ("search", [
+        r"(search|find)\s+.*\s+(and|&)\s+(generate|create|make)",
+        r"(image|picture).*\s+(and|&)\s+(image|picture)",
+        r"multiple\s+(search|image|task)",
+    ]),
+    "worker_required": ("search", [
+        r"(essay|document|report|paper).*\s+\d+\s+word",
+        r"(write|create|generate|make)\s+(an?\s+)?(essay|document|report|paper)",
+        r"(generate|create).*\s+(and|with).*\s+(image|picture|photo)",
+        r"complex\s+(task|request|job)",
+        r"(multi|many|several)\s+step",
+        r"(essay|paper|document).*\s+(with|and).*\s+(image|picture|photo)",
+        r"(write|create).*\s+about\s+.*\s+(with|and).*\s+(pic|image|picture)",
+    ]),
+    "essay_request": ("search", [r"(write|create|generate|make)\s+(an?\s+)?(essay|document|report|paper)"]),
+    "mentions_image": ("any", ["image", "picture", "pic"]),
+    "image_or_picture": ("any", ["image", "picture"]),
+    "search_or_find": ("any", ["search", "find"]),
+    "generate_or_create": ("any", ["generate", "create"]),
+    "search_or_research": ("any", ["search", "research"]),
+    "word_requirement": ("search", [r"(\d+)\s+word"]),
+    "route_chapter_verb": ("search", [r"(?:write|generate|create|make).*chapter\s*(\d+)"]),
+    "route_chapter": ("search", [r"chapter\s*(\d+)"]),
+    "route_chapter_start": ("search", [r"(?:do|start|begin).*chapter\s*(\d+)"]),
+    "route_dataset": ("search", [r"(?:create|generate|make).*(?:dataset|data)", r"(?:need|want).*data", r"synthetic.*data"]),
+    "route_study_tools": ("search", [r"(?:create|generate|make).*(?:questionnaire|interview|survey)", r"study.*tools"]),
+    "route_combine": ("search", [r"(?:combine|merge|join).*(?:chapters|thesis)",
+                                 r"(?:create|make).*(?:full|complete).*(?:thesis|document)"]),
+    "route_full_thesis": ("search", [r"(?:generate|create|write).*(?:full|complete|entire).*thesis",
+                                     r"(?:all|every).*chapters"]),
+    "name_am": ("search", [r"(?:^|\s)(?:am|i'm|i am)\s+([a-zA-Z]+)(?:\s|$|,|\.)"]),
+    "name_my_name": ("search", [r"my name is\s+([a-zA-Z]+)"]),
+    "name_call_me": ("search", [r"call me\s+([a-zA-Z]+)"]),
+    "name_bare": ("search", [r"(?:^|\s)name(?:'s)?\s+([a-zA-Z]+)"]),
+}
+
+# Signals whose value the classifiers read (the first capture group)
+VALUE_SIGNALS = {
+    "sample_size_respondents", "sample_size_samples", "sample_size_of", "sample_size_n",
+    "sample_size_points", "pdf_name", "word_requirement", "route_chapter_verb", "route_chapter",
+    "route_chapter_start", "name_am", "name_my_name", "name_call_me", "name_bare",
+}
+
+GOLDEN_MESSAGES = [
+    "hi",
+    "Hello there!",
+    "this is it",
+    "  What is a research gap?  ",
+    "Write   an essay\nabout climate change with 600 words",
+    "write an essay about X with 600 words",
+    "essay on AI\nwith 2 images and 1500 words please",
+    "Search for papers on teacher motivation and generate a chart",
+    "generate dataset with 200 respondents, n = 150",
+    "sample size of 384 for the survey data",
+    "Chapter 2: can you explain the literature review structure?",
+    "write chapter 4 data analysis",
+    "combine all chapters\ninto the complete thesis",
+    "research the topic",
+    "go to google.com and look up pdf tools",
+    "summarize report.pdf",
+    "create a md file called notes.md with the word hello",
+    "I'm Sarah, my name is Sarah. Call me Sal",
+    "make a video and some music",
+    "create data collection plan",
+    "show files",
+    "help",
+    "data\ncollection",
+    "Generate   image of a cat",
+]
+
+
+def original_signal(kind: str, spec, text: str):
+    """(present, value) as the original classifier code computed it."""
+    if kind == "any":
+        return any(word in text for word in spec), None
+    if kind == "start":
+        return any(text.startswith(word) for word in spec), None
+    for pattern in spec:
+        match = (re.match if kind == "match" else re.search)(pattern, text)
+        if match:
+            return True, match.group(1) if match.re.groups else match.group(0)
+    return False, None
+
+
+def test_every_signal_is_pinned():
+    assert set(ORIGINAL) == set(SIGNALS)
+
+
+def test_signals_match_original_classifiers():
+    for message in GOLDEN_MESSAGES:
+        text = message.lower().strip()
+        signals = intent_engine.analyze(message)
+        for name, (kind, spec) in ORIGINAL.items():
+            present, value = original_signal(kind, spec, text)
+            assert signals.has(name) == present, (message, name)
+            if present and name in VALUE_SIGNALS:
+                assert signals.value(name) == value, (message, name)
+
+
+def test_task_classifier_whitespace():
+    # Irregular spacing keeps "write an essay" from forcing a worker, so
+    # the word requirement is still read
+    result = task_classifier.classify("Write   an essay\nabout X with 600 words")
+    assert result["word_count_requirement"] == 600
+    assert result["strategy"] == "worker"
+
+    result = task_classifier.classify("write an essay about X with 600 words")
+    assert result["word_count_requirement"] == 0  # Forced worker
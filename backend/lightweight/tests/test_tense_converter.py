@@ -0,0 +1,62 @@
+"""Golden-text tests for the single-pass tense converters"""
+from services.tense_converter import (
+    convert_to_future_tense_regex,
+    convert_to_past_tense_regex,
+    future_tense_engine,
+)
+
+
+PAST_CHAPTER = """## 3.2 Research Design
+
+A survey research design was adopted for this study. The study employed both quantitative and qualitative methods, and the research used a cross-sectional approach.
+
+## 3.3 Data Collection
+
+Data was collected using structured questionnaires. Questionnaires were distributed to 120 respondents. Participants were selected through stratified random sampling, and instruments were pilot tested before use. Respondents were
+informed of their rights. Ethical approval was sought from the university, and confidentiality was maintained throughout. The data were analysed using SPSS."""
+
+PAST_CHAPTER_AS_PROPOSAL = """## 3.2 Research Design
+
+A survey research design will be adopted for this study. The study will employ both quantitative and qualitative methods, and the research will use a cross-sectional approach.
+
+## 3.3 Data Collection
+
+Data will be collected using structured questionnaires. Questionnaires will be distributed to 120 respondents. Participants will be selected through stratified random sampling, and instruments will be pilot tested before use. Respondents will be informed of their rights. Ethical approval will be sought from the university, and confidentiality will be maintained throughout. The data will be analysed using SPSS."""
+
+PROPOSAL_CHAPTER = """## 1.3 Objectives
+
+This study aims to assess the effect of mobile banking on savings. The researcher will collect data from 120 respondents. Data will be analysed using SPSS, and the results are expected to inform policy.
+
+## 3.5 Ethics
+
+Informed consent shall be obtained from all participants. In order to achieve reliability, the instrument will have been piloted. The research aims to examine, and this study seeks to extend, prior work. Findings is anticipated to guide practitioners. Will the study succeed? It shall."""
+
+PROPOSAL_CHAPTER_AS_THESIS = """## 1.3 Objectives
+
+This study aimed to assess the effect of mobile banking on savings. The researcher did collect data from 120 respondents. Data was analysed using SPSS, and the results were found to inform policy.
+
+## 3.5 Ethics
+
+Informed consent was obtained from all participants. To achieve reliability, the instrument had been piloted. The research aimed to examine, and this study sought to extend, prior work. Findings was observed to guide practitioners. Did the study succeed? It did."""
+
+
+def test_golden_chapters():
+    assert convert_to_future_tense_regex(PAST_CHAPTER) == PAST_CHAPTER_AS_PROPOSAL
+    assert convert_to_past_tense_regex(PROPOSAL_CHAPTER) == PROPOSAL_CHAPTER_AS_THESIS
+
+
+def test_protected_spans():
+    text = (
+        'Data was collected as advised (Smith, 2020, "was used"). One respondent said "it was tested".\n'
+        "| Item | was scored |\n"
+        "Consent was sought."
+    )
+    result = future_tense_engine.convert(text)
+    assert result.text == (
+        'Data will be collected as advised (Smith, 2020, "was used"). One respondent said "it was tested".\n'
+        "| Item | was scored |\n"
+        "Consent will be sought."
+    )
+    assert result.protected == 3
+    assert result.fired == {"passive_participle": 1, "passive_sought": 1}
+
@@ -3,6 +3,9 @@
 Sync Search Results to Zotero
 
 Quick script to search for papers and sync them to your Zotero library.
+
+Sync state (paper ID -> Zotero key/version) is kept in a local JSON file,
+so re-running a search only pushes papers that are new or changed.
 """
 
 import asyncio
@@ -16,7 +19,11 @@ from scholarly_search import ScholarlySearch, Config
 from app.services.zotero_service import ZoteroService
 
 
-async def sync_to_zotero(query: str, limit: int = 10, collection_name: str = None):
+DEFAULT_STATE_PATH = Path(__file__).parent / "thesis_data" / "zotero_sync_state.json"
+
+
+async def sync_to_zotero(query: str, limit: int = 10, collection_name: str = None,
+                         state_path: Path = DEFAULT_STATE_PATH):
     """
     Search for papers and sync to Zotero.
     
@@ -24,6 +31,7 @@ async def sync_to_zotero(query: str, limit: int = 10, collection_name: str = Non
         query: Search query
         limit: Number of papers per source
         collection_name: Optional collection name
+        state_path: Local sync state file
     """
     print(f"\n🔍 Searching for: '{query}'")
     print(f"   Limit: {limit} papers per source\n")
@@ -72,20 +80,19 @@ async def sync_to_zotero(query: str, limit: int = 10, collection_name: str = Non
         if not collection_name:
             collection_name = f"Search: {query}"
         
-        # Bulk add papers
-        results = await zotero.bulk_add_papers(
+        # Incremental bulk sync (50 items per request)
+        results = await zotero.sync_papers(
             [p.to_dict() for p in papers],
-            collection_name=collection_name
+            collection_name=collection_name,
+            state_path=state_path
         )
         
         print(f"\n✅ Zotero Sync Complete!")
-        print(f"   Successfully added: {results['successful']}/{results['total']} papers")
+        print(f"   Created: {results['created']}, updated: {results['updated']}, "
+              f"unchanged: {results['unchanged']} ({results['requests']} API requests)")
         print(f"   Failed: {results['failed']}")
         print(f"   Collection: '{collection_name}'")
         
-        if results['failed'] > 0:
-            print(f"\n💡 Some papers may already exist in your library")
-        
     except Exception as e:
         print(f"\n❌ Zotero sync failed: {e}")
         print("   Falling back to RIS export...")
@@ -100,9 +107,11 @@ async def main():
     parser.add_argument("query", help="Search query")
     parser.add_argument("--limit", type=int, default=5, help="Papers per source (default: 5)")
     parser.add_argument("--collection", help="Zotero collection name")
+    parser.add_argument("--state", type=Path, default=DEFAULT_STATE_PATH,
+                        help="Sync state file (default: thesis_data/zotero_sync_state.json)")
     args = parser.parse_args()
     
-    await sync_to_zotero(args.query, args.limit, args.collection)
+    await sync_to_zotero(args.query, args.limit, args.collection, args.state)
 
 
 if __name__ == "__main__":
@@ -358,6 +358,8 @@ export function FilePreviewPanel({ file, onClose, workspaceId, browserAction }:
         : isBinaryFile
             ? `${process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'}/api/workspace/${workspaceId}/serve/${encodeURIComponent(file.path)}`
             : `${process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'}/api/workspace/${workspaceId}/files/${encodeURIComponent(file.path)}`;
+    // Image previews get a downscaled rendition; downloads ask for the original
+    const downloadUrl = isBinaryFile && !file.path.startsWith('http') ? `${fileUrl}?download=true` : fileUrl;
 
     return (
         <div className="flex flex-col h-full bg-white border-l">
@@ -406,7 +408,7 @@ export function FilePreviewPanel({ file, onClose, workspaceId, browserAction }:
                                 <button
                                     onClick={() => {
                                         const a = document.createElement('a');
-                                        a.href = fileUrl;
+                                        a.href = downloadUrl;
                                         a.download = file.name;
                                         a.click();
                                         setShowDownloadMenu(false);
@@ -526,7 +528,7 @@ export function FilePreviewPanel({ file, onClose, workspaceId, browserAction }:
                                 </p>
                                 <div className="flex gap-3">
                                     <a
-                                        href={fileUrl}
+                                        href={downloadUrl}
                                         download={file.name}
                                         className="px-6 py-3 bg-blue-600 text-white rounded-lg hover:bg-blue-700 flex items-center gap-2"
                                     >
@@ -667,7 +669,7 @@ export function FilePreviewPanel({ file, onClose, workspaceId, browserAction }:
                                                         })}
                                                     </tbody>
                                                 </table>
-                                                {((spreadsheetData.data && spreadsheetData.data.length > 100) || (spreadsheetData.sheets && (Object.values(spreadsheetData.sheets)[0] as any[]).length > 100)) && (
+                                                {(spreadsheetData.filtered_rows ?? 0) > 100 && (
                                                     <div className="p-3 text-center text-xs text-gray-500 bg-gray-50 border-t italic">
                                                         Showing first 100 rows only
                                                     </div>
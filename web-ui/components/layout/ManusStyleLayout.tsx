@@ -801,7 +801,7 @@ Objectives:
         formData.append('files', file);
 
         try {
-          const response = await fetch(`${backendUrl}/api/workspace/${workspaceId}/upload-pdfs`, {
+          const response = await fetch(`${backendUrl}/api/workspace/${workspaceId}/upload-pdfs?wait=true`, {
             method: 'POST',
             body: formData,
           });